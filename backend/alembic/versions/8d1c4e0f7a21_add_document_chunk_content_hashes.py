@@ -0,0 +1,28 @@
+"""add document chunk content hashes
+
+Revision ID: 8d1c4e0f7a21
+Revises: 2b75d0a8ffcb
+Create Date: 2026-10-18 14:40:12.118304
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "8d1c4e0f7a21"
+down_revision = "2b75d0a8ffcb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document",
+        sa.Column("chunk_content_hashes", postgresql.ARRAY(sa.String()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("document", "chunk_content_hashes")
@@ -0,0 +1,37 @@
+"""add query history export indexes
+
+Revision ID: c4f7a9e2d315
+Revises: 8d1c4e0f7a21
+Create Date: 2026-10-18 16:05:41.532907
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4f7a9e2d315"
+down_revision = "8d1c4e0f7a21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keyset pagination of chat sessions over (time_created, id)
+    op.create_index(
+        "ix_chat_session_time_created_id",
+        "chat_session",
+        ["time_created", "id"],
+        unique=False,
+    )
+    # bulk loading the messages of a page of chat sessions
+    op.create_index(
+        op.f("ix_chat_message_chat_session_id"),
+        "chat_message",
+        ["chat_session_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chat_message_chat_session_id"), table_name="chat_message")
+    op.drop_index("ix_chat_session_time_created_id", table_name="chat_session")
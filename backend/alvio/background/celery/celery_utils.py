@@ -47,10 +47,23 @@ def extract_ids_from_runnable_connector(
     Optionally, a callback can be passed to handle the length of each document batch.
     """
     all_connector_doc_ids: set[str] = set()
+    for doc_batch_ids in extract_id_batches_from_runnable_connector(
+        runnable_connector, callback
+    ):
+        all_connector_doc_ids.update(doc_batch_ids)
 
+    return all_connector_doc_ids
+
+
+def extract_id_batches_from_runnable_connector(
+    runnable_connector: BaseConnector,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> Generator[set[str], None, None]:
+    """Same as extract_ids_from_runnable_connector, but yields the IDs batch by batch
+    so callers don't have to hold every ID of the connector in memory."""
     if isinstance(runnable_connector, SlimConnector):
         for metadata_batch in runnable_connector.retrieve_all_slim_documents():
-            all_connector_doc_ids.update({doc.id for doc in metadata_batch})
+            yield {doc.id for doc in metadata_batch}
 
     doc_batch_id_generator = None
 
@@ -92,13 +105,11 @@ def extract_ids_from_runnable_connector(
                     "extract_ids_from_runnable_connector: Stop signal detected"
                 )
 
-        all_connector_doc_ids.update(doc_batch_processing_func(doc_batch_ids))
+        yield doc_batch_processing_func(doc_batch_ids)
 
         if callback:
             callback.progress("extract_ids_from_runnable_connector", len(doc_batch_ids))
 
-    return all_connector_doc_ids
-
 
 def celery_is_listening_to_queue(worker: Any, name: str) -> bool:
     """Checks to see if we're listening to the named queue"""
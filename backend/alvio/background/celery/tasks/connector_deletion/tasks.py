@@ -52,6 +52,7 @@ from alvio.redis.redis_connector_delete import RedisConnectorDelete
 from alvio.redis.redis_connector_delete import RedisConnectorDeletePayload
 from alvio.redis.redis_pool import get_redis_client
 from alvio.redis.redis_pool import get_redis_replica_client
+from alvio.utils.variable_functionality import fetch_ee_implementation_or_noop
 from alvio.utils.variable_functionality import (
     fetch_versioned_implementation_with_fallback,
 )
@@ -318,12 +319,12 @@ def try_generate_document_cc_pair_cleanup_tasks(
         task_logger.info(
             f"RedisConnectorDeletion.generate_tasks starting. cc_pair={cc_pair_id}"
         )
-        tasks_generated = redis_connector.delete.generate_tasks(
-            app, db_session, lock_beat
-        )
-        if tasks_generated is None:
+        result = redis_connector.delete.generate_tasks(app, db_session, lock_beat)
+        if result is None:
             raise ValueError("RedisConnectorDeletion.generate_tasks returned None")
 
+        tasks_generated, docs_to_delete = result
+
         try:
             insert_sync_record(
                 db_session=db_session,
@@ -349,11 +350,13 @@ def try_generate_document_cc_pair_cleanup_tasks(
 
         task_logger.info(
             "RedisConnectorDeletion.generate_tasks finished. "
-            f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+            f"cc_pair={cc_pair_id} tasks_generated={tasks_generated} "
+            f"docs={docs_to_delete}"
         )
 
         # set this only after all tasks have been added
         fence_payload.num_tasks = tasks_generated
+        fence_payload.num_docs = docs_to_delete
         redis_connector.delete.set_fence(fence_payload)
 
     return tasks_generated
@@ -383,9 +386,15 @@ def monitor_connector_deletion_taskset(
         # the fence is setting up but isn't ready yet
         return
 
+    # fences written before deletion was batched count one task per document
+    num_docs = (
+        fence_data.num_docs if fence_data.num_docs is not None else fence_data.num_tasks
+    )
+
     remaining = redis_connector.delete.get_remaining()
     task_logger.info(
-        f"Connector deletion progress: cc_pair={cc_pair_id} remaining={remaining} initial={fence_data.num_tasks}"
+        f"Connector deletion progress: cc_pair={cc_pair_id} remaining={remaining} "
+        f"initial={fence_data.num_tasks} docs={num_docs}"
     )
     if remaining > 0:
         with get_session_with_current_tenant() as db_session:
@@ -423,7 +432,7 @@ def monitor_connector_deletion_taskset(
                     "Connector deletion - documents still found after taskset completion. "
                     "Clearing the current deletion attempt and allowing deletion to restart: "
                     f"cc_pair={cc_pair_id} "
-                    f"docs_deleted={fence_data.num_tasks} "
+                    f"docs_deleted={num_docs} "
                     f"docs_remaining={len(doc_ids)}"
                 )
 
@@ -499,12 +508,18 @@ def monitor_connector_deletion_taskset(
                 db_session.delete(connector)
             db_session.commit()
 
+            # the deleted cc_pair may have been the last one syncing its source
+            fetch_ee_implementation_or_noop(
+                "alvio.external_permissions.censoring_cache",
+                "invalidate_censoring_enabled_sources_cache",
+            )()
+
             update_sync_record_status(
                 db_session=db_session,
                 entity_id=cc_pair_id,
                 sync_type=SyncType.CONNECTOR_DELETION,
                 sync_status=SyncStatus.SUCCESS,
-                num_docs_synced=fence_data.num_tasks,
+                num_docs_synced=num_docs,
             )
 
         except Exception as e:
@@ -518,7 +533,7 @@ def monitor_connector_deletion_taskset(
                 entity_id=cc_pair_id,
                 sync_type=SyncType.CONNECTOR_DELETION,
                 sync_status=SyncStatus.FAILED,
-                num_docs_synced=fence_data.num_tasks,
+                num_docs_synced=num_docs,
             )
 
             task_logger.exception(
@@ -532,7 +547,7 @@ def monitor_connector_deletion_taskset(
         f"cc_pair={cc_pair_id} "
         f"connector={connector_id_to_delete} "
         f"credential={credential_id_to_delete} "
-        f"docs_deleted={fence_data.num_tasks}"
+        f"docs_deleted={num_docs}"
     )
 
     redis_connector.delete.reset()
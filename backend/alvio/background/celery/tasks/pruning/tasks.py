@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -13,6 +14,7 @@ from celery.exceptions import SoftTimeLimitExceeded
 from pydantic import ValidationError
 from redis import Redis
 from redis.lock import Lock as RedisLock
+from sqlalchemy import Select
 from sqlalchemy.orm import Session
 
 from alvio.background.celery.apps.app_base import task_logger
@@ -20,11 +22,15 @@ from alvio.background.celery.celery_redis import celery_find_task
 from alvio.background.celery.celery_redis import celery_get_queue_length
 from alvio.background.celery.celery_redis import celery_get_queued_task_ids
 from alvio.background.celery.celery_redis import celery_get_unacked_task_ids
-from alvio.background.celery.celery_utils import extract_ids_from_runnable_connector
+from alvio.background.celery.celery_utils import (
+    extract_id_batches_from_runnable_connector,
+)
 from alvio.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
 from alvio.background.celery.tasks.docprocessing.utils import IndexingCallbackBase
 from alvio.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
+from alvio.configs.app_configs import DB_YIELD_PER_DEFAULT
 from alvio.configs.app_configs import JOB_TIMEOUT
+from alvio.configs.app_configs import PRUNING_MAX_IDS_IN_MEMORY
 from alvio.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from alvio.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from alvio.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -41,7 +47,9 @@ from alvio.db.connector import mark_ccpair_as_pruned
 from alvio.db.connector_credential_pair import get_connector_credential_pair
 from alvio.db.connector_credential_pair import get_connector_credential_pair_from_id
 from alvio.db.connector_credential_pair import get_connector_credential_pairs
-from alvio.db.document import get_documents_for_connector_credential_pair
+from alvio.db.document import (
+    construct_sorted_document_id_select_for_connector_credential_pair,
+)
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
 from alvio.db.enums import ConnectorCredentialPairStatus
 from alvio.db.enums import SyncStatus
@@ -57,6 +65,8 @@ from alvio.redis.redis_pool import get_redis_client
 from alvio.redis.redis_pool import get_redis_replica_client
 from alvio.server.runtime.alvio_runtime import AlvioRuntime
 from alvio.server.utils import make_short_id
+from alvio.utils.external_sort import sorted_difference
+from alvio.utils.external_sort import SortedSpillSet
 from alvio.utils.logger import format_error_for_logging
 from alvio.utils.logger import LoggerContextVars
 from alvio.utils.logger import pruning_ctx
@@ -108,6 +118,11 @@ class PruneCallback(IndexingCallbackBase):
         super().progress(tag, amount)
 
 
+def _stream_scalars(db_session: Session, stmt: Select) -> Iterator[str]:
+    """Runs the query only once iteration starts and fetches the rows in chunks."""
+    yield from db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT)
+
+
 """Jobs / utils for kicking off pruning tasks."""
 
 
@@ -206,7 +221,9 @@ def check_for_pruning(self: Task, *, tenant_id: str) -> bool | None:
                     task_logger.info(
                         f"Pruning queued: cc_pair={cc_pair.id} id={payload_id}"
                     )
-            r.set(AlvioRedisSignals.BLOCK_PRUNING, 1, ex=_get_pruning_block_expiration())
+            r.set(
+                AlvioRedisSignals.BLOCK_PRUNING, 1, ex=_get_pruning_block_expiration()
+            )
 
         # we want to run this less frequently than the overall task
         lock_beat.reacquire()
@@ -525,43 +542,49 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
-            )
-
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
-                    db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
+            # the docs in the source, kept sorted and spilled to disk past the
+            # memory ceiling so huge connectors don't exhaust the worker
+            with SortedSpillSet(PRUNING_MAX_IDS_IN_MEMORY) as all_connector_doc_ids:
+                for doc_batch_ids in extract_id_batches_from_runnable_connector(
+                    runnable_connector, callback
+                ):
+                    all_connector_doc_ids.add(doc_batch_ids)
+
+                task_logger.info(
+                    "Pruning source docs collected: "
+                    f"cc_pair={cc_pair_id} "
+                    f"connector_source={cc_pair.connector.source} "
+                    f"spilled_runs={all_connector_doc_ids.num_runs}"
                 )
-            }
 
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+                # the docs in our local index, streamed in the same order
+                all_indexed_document_ids = _stream_scalars(
+                    db_session,
+                    construct_sorted_document_id_select_for_connector_credential_pair(
+                        connector_id, credential_id
+                    ),
+                )
 
-            task_logger.info(
-                "Pruning set collected: "
-                f"cc_pair={cc_pair_id} "
-                f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
+                # docs to remove (no longer in the source), produced by merging both
+                # sorted streams and sent off as they are found
+                doc_ids_to_remove = sorted_difference(
+                    all_indexed_document_ids, all_connector_doc_ids
+                )
 
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.io, db_session, None
-            )
+                task_logger.info(
+                    f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
+                )
+                tasks_generated = redis_connector.prune.generate_tasks(
+                    doc_ids_to_remove, self.io, db_session, None
+                )
             if tasks_generated is None:
                 return None
 
             task_logger.info(
                 "RedisConnector.prune.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+                f"cc_pair={cc_pair_id} "
+                f"connector_source={cc_pair.connector.source} "
+                f"tasks_generated={tasks_generated}"
             )
 
             redis_connector.prune.generator_complete = tasks_generated
@@ -812,4 +835,3 @@ def validate_pruning_fence(
 
     redis_connector.prune.reset()
     return
-
@@ -42,6 +42,22 @@ class RetryDocumentIndex:
             chunk_count=chunk_count,
         )
 
+    @retry(
+        retry=retry_if_exception_type(httpx.ReadTimeout),
+        wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+        stop=stop_after_delay(STOP_AFTER),
+    )
+    def delete_multiple(
+        self,
+        doc_id_to_chunk_count: dict[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        return self.index.delete_multiple(
+            doc_id_to_chunk_count,
+            tenant_id=tenant_id,
+        )
+
     @retry(
         retry=retry_if_exception_type(httpx.ReadTimeout),
         wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
@@ -63,3 +79,21 @@ class RetryDocumentIndex:
             fields=fields,
             user_fields=user_fields,
         )
+
+    @retry(
+        retry=retry_if_exception_type(httpx.ReadTimeout),
+        wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+        stop=stop_after_delay(STOP_AFTER),
+    )
+    def update_multiple(
+        self,
+        doc_id_to_fields: dict[str, VespaDocumentFields],
+        *,
+        tenant_id: str,
+        doc_id_to_chunk_count: dict[str, int | None],
+    ) -> dict[str, int]:
+        return self.index.update_multiple(
+            doc_id_to_fields,
+            tenant_id=tenant_id,
+            doc_id_to_chunk_count=doc_id_to_chunk_count,
+        )
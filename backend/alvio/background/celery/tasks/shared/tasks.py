@@ -10,18 +10,26 @@ from redis import Redis
 from tenacity import RetryError
 
 from alvio.access.access import get_access_for_document
+from alvio.access.access import get_access_for_documents
+from alvio.access.access import get_null_document_access
 from alvio.background.celery.apps.app_base import task_logger
 from alvio.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from alvio.configs.constants import ALVIO_CELERY_BEAT_HEARTBEAT_KEY
 from alvio.configs.constants import AlvioCeleryTask
 from alvio.db.document import delete_document_by_connector_credential_pair__no_commit
+from alvio.db.document import delete_documents_by_connector_credential_pair__no_commit
 from alvio.db.document import delete_documents_complete__no_commit
 from alvio.db.document import fetch_chunk_count_for_document
 from alvio.db.document import get_document
 from alvio.db.document import get_document_connector_count
+from alvio.db.document import get_document_connector_counts
+from alvio.db.document import get_documents_by_ids
 from alvio.db.document import mark_document_as_modified
 from alvio.db.document import mark_document_as_synced
+from alvio.db.document import mark_documents_as_modified
+from alvio.db.document import mark_documents_as_synced
 from alvio.db.document_set import fetch_document_sets_for_document
+from alvio.db.document_set import fetch_document_sets_for_documents
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
 from alvio.db.relationships import delete_document_references_from_kg
 from alvio.db.search_settings import get_active_search_settings
@@ -57,6 +65,41 @@ class AlvioCeleryTaskCompletionStatus(str, Enum):
     RETRYABLE_EXCEPTION = "retryable_exception"
 
 
+def classify_vespa_sync_exception(
+    task: Task, ex: Exception, log_context: str
+) -> tuple[AlvioCeleryTaskCompletionStatus, Exception | None]:
+    """Returns the completion status of a task that failed to sync documents to
+    Vespa and the exception to retry it with, None if it should not be retried.
+    A non retryable status with an exception means the task is out of retries."""
+    e: Exception | None = None
+    if isinstance(ex, RetryError):
+        task_logger.warning(
+            f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+        )
+
+        # only set the inner exception if it is of type Exception
+        e_temp = ex.last_attempt.exception()
+        if isinstance(e_temp, Exception):
+            e = e_temp
+    else:
+        e = ex
+
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.BAD_REQUEST:
+            task_logger.exception(
+                f"Non-retryable HTTPStatusError: "
+                f"{log_context} "
+                f"status={e.response.status_code}"
+            )
+        return AlvioCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION, None
+
+    task_logger.exception(f"{task.name} exceptioned: {log_context}")
+
+    if task.max_retries is not None and task.request.retries >= task.max_retries:
+        return AlvioCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION, e
+    return AlvioCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION, e
+
+
 @shared_task(
     name=AlvioCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_TASK,
     soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
@@ -268,6 +311,198 @@ def document_by_cc_pair_cleanup_task(
     return True
 
 
+@shared_task(
+    name=AlvioCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_BATCH_TASK,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=DOCUMENT_BY_CC_PAIR_CLEANUP_MAX_RETRIES,
+    bind=True,
+)
+def document_by_cc_pair_cleanup_batch_task(
+    self: Task,
+    document_ids: list[str],
+    connector_id: int,
+    credential_id: int,
+    tenant_id: str,
+) -> bool:
+    """Same as document_by_cc_pair_cleanup_task for a batch of documents. Created by
+    connector deletion.
+
+    The reference counts of the whole batch are resolved in one query, documents only
+    referenced by this cc_pair are deleted from the document index and postgres in
+    bulk and the remaining documents get their access and document sets updated in
+    bulk. Work that was committed before a retry is not redone since the reference
+    counts of deleted documents drop to zero."""
+    task_logger.debug(
+        f"Task start: first_doc={document_ids[0]} docs={len(document_ids)}"
+    )
+
+    start = time.monotonic()
+
+    completion_status = AlvioCeleryTaskCompletionStatus.UNDEFINED
+
+    cc_pair_identifier = ConnectorCredentialPairIdentifier(
+        connector_id=connector_id,
+        credential_id=credential_id,
+    )
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                active_search_settings.primary,
+                active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            doc_id_to_count = dict(
+                get_document_connector_counts(db_session, document_ids)
+            )
+            doc_ids_to_delete = [
+                doc_id for doc_id, count in doc_id_to_count.items() if count == 1
+            ]
+            doc_ids_to_update = [
+                doc_id for doc_id, count in doc_id_to_count.items() if count > 1
+            ]
+            doc_id_to_doc = {
+                doc.id: doc for doc in get_documents_by_ids(db_session, document_ids)
+            }
+
+            chunks_deleted = 0
+            if doc_ids_to_delete:
+                # count == 1 means this is the only remaining cc_pair reference to the doc
+                # delete it from vespa and the db
+                doc_id_to_chunks_deleted = retry_index.delete_multiple(
+                    {
+                        doc_id: (
+                            doc_id_to_doc[doc_id].chunk_count
+                            if doc_id in doc_id_to_doc
+                            else None
+                        )
+                        for doc_id in doc_ids_to_delete
+                    },
+                    tenant_id=tenant_id,
+                )
+                chunks_deleted = sum(doc_id_to_chunks_deleted.values())
+
+                # also removes the kg references of the documents
+                delete_documents_complete__no_commit(
+                    db_session=db_session,
+                    document_ids=doc_ids_to_delete,
+                )
+                db_session.commit()
+
+            chunks_updated = 0
+            docs_to_update = [
+                doc_id_to_doc[doc_id]
+                for doc_id in doc_ids_to_update
+                if doc_id in doc_id_to_doc
+            ]
+            if docs_to_update:
+                # count > 1 means the document still has cc_pair references
+                updated_doc_ids = [doc.id for doc in docs_to_update]
+
+                # the below functions do not include cc_pairs being deleted.
+                # i.e. they will correctly omit access for the current cc_pair
+                doc_id_to_access = get_access_for_documents(
+                    document_ids=updated_doc_ids, db_session=db_session
+                )
+                doc_id_to_doc_sets = dict(
+                    fetch_document_sets_for_documents(updated_doc_ids, db_session)
+                )
+
+                doc_id_to_fields = {
+                    doc.id: VespaDocumentFields(
+                        document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                        access=doc_id_to_access.get(doc.id)
+                        or get_null_document_access(),
+                        boost=doc.boost,
+                        hidden=doc.hidden,
+                    )
+                    for doc in docs_to_update
+                }
+
+                # update Vespa. OK if a doc doesn't exist. Raises exception otherwise.
+                doc_id_to_chunks_updated = retry_index.update_multiple(
+                    doc_id_to_fields,
+                    tenant_id=tenant_id,
+                    doc_id_to_chunk_count={
+                        doc.id: doc.chunk_count for doc in docs_to_update
+                    },
+                )
+                chunks_updated = sum(doc_id_to_chunks_updated.values())
+
+                # there are still other cc_pair references to the docs, so just resync to Vespa
+                delete_documents_by_connector_credential_pair__no_commit(
+                    db_session=db_session,
+                    document_ids=updated_doc_ids,
+                    connector_credential_pair_identifier=cc_pair_identifier,
+                )
+
+                mark_documents_as_synced(updated_doc_ids, db_session)
+
+            if doc_ids_to_delete or docs_to_update:
+                completion_status = AlvioCeleryTaskCompletionStatus.SUCCEEDED
+            else:
+                completion_status = AlvioCeleryTaskCompletionStatus.SKIPPED
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"first_doc={document_ids[0]} "
+                f"docs={len(document_ids)} "
+                f"deleted={len(doc_ids_to_delete)} "
+                f"updated={len(docs_to_update)} "
+                f"skipped={len(document_ids) - len(doc_ids_to_delete) - len(docs_to_update)} "
+                f"chunks_deleted={chunks_deleted} "
+                f"chunks_updated={chunks_updated} "
+                f"elapsed={elapsed:.2f}"
+            )
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. first_doc={document_ids[0]} "
+            f"docs={len(document_ids)}"
+        )
+        completion_status = AlvioCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        completion_status, retry_exception = classify_vespa_sync_exception(
+            self, ex, f"first_doc={document_ids[0]} docs={len(document_ids)}"
+        )
+        if (
+            completion_status == AlvioCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+            and retry_exception is not None
+        ):
+            # This is the last attempt! mark the documents as dirty in the db so that
+            # they eventually get fixed out of band via stale document reconciliation
+            task_logger.warning(
+                f"Max celery task retries reached. Marking docs as dirty for reconciliation: "
+                f"first_doc={document_ids[0]} docs={len(document_ids)}"
+            )
+            with get_session_with_current_tenant() as db_session:
+                # delete the cc pair relationships now and let reconciliation clean
+                # them up in vespa
+                delete_documents_by_connector_credential_pair__no_commit(
+                    db_session=db_session,
+                    document_ids=document_ids,
+                    connector_credential_pair_identifier=cc_pair_identifier,
+                )
+                mark_documents_as_modified(document_ids, db_session)
+        elif retry_exception is not None:
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            # this will raise a celery exception
+            self.retry(exc=retry_exception, countdown=countdown)
+    finally:
+        task_logger.info(
+            f"document_by_cc_pair_cleanup_batch_task completed: "
+            f"status={completion_status.value} "
+            f"first_doc={document_ids[0]} docs={len(document_ids)}"
+        )
+
+    return completion_status == AlvioCeleryTaskCompletionStatus.SUCCEEDED
+
+
 @shared_task(name=AlvioCeleryTask.CELERY_BEAT_HEARTBEAT, ignore_result=True, bind=True)
 def celery_beat_heartbeat(self: Task, *, tenant_id: str) -> None:
     """When this task runs, it writes a key to Redis with a TTL.
@@ -8,6 +8,7 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
 from alvio.configs.app_configs import DB_YIELD_PER_DEFAULT
+from alvio.configs.app_configs import VESPA_SYNC_BATCH_SIZE
 from alvio.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from alvio.configs.constants import AlvioCeleryPriority
 from alvio.configs.constants import AlvioCeleryQueues
@@ -15,6 +16,7 @@ from alvio.configs.constants import AlvioCeleryTask
 from alvio.configs.constants import AlvioRedisConstants
 from alvio.db.document import construct_document_id_select_by_needs_sync
 from alvio.db.document import count_documents_by_needs_sync
+from alvio.utils.batching import batch_generator
 from alvio.utils.logger import setup_logger
 
 # Redis keys for document sync tracking
@@ -74,7 +76,8 @@ def generate_document_sync_tasks(
     lock: RedisLock,
     tenant_id: str,
 ) -> tuple[int, int]:
-    """Generate sync tasks for all documents that need syncing.
+    """Generate sync tasks for all documents that need syncing, each task syncs a
+    page of VESPA_SYNC_BATCH_SIZE documents.
 
     Args:
         r: Redis client
@@ -94,8 +97,10 @@ def generate_document_sync_tasks(
     # Get all documents that need syncing
     stmt = construct_document_id_select_by_needs_sync()
 
-    for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
-        doc_id = cast(str, doc_id)
+    for doc_ids in batch_generator(
+        db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT),
+        VESPA_SYNC_BATCH_SIZE,
+    ):
         current_time = time.monotonic()
 
         # Reacquire lock periodically to prevent timeout
@@ -103,7 +108,7 @@ def generate_document_sync_tasks(
             lock.reacquire()
             last_lock_time = current_time
 
-        num_docs += 1
+        num_docs += len(doc_ids)
 
         # Create a unique task ID
         custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
@@ -111,10 +116,10 @@ def generate_document_sync_tasks(
         # Add to the tracking taskset in Redis BEFORE creating the celery task
         r.sadd(DOCUMENT_SYNC_TASKSET_KEY, custom_task_id)
 
-        # Create the Celery task
+        # Create the Celery task, one per page of documents
         celery_app.send_task(
-            AlvioCeleryTask.VESPA_METADATA_SYNC_TASK,
-            kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
+            AlvioCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+            kwargs=dict(document_ids=cast(list[str], doc_ids), tenant_id=tenant_id),
             queue=AlvioCeleryQueues.VESPA_METADATA_SYNC,
             task_id=custom_task_id,
             priority=AlvioCeleryPriority.MEDIUM,
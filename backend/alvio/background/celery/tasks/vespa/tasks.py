@@ -1,10 +1,8 @@
 import time
 from collections.abc import Callable
-from http import HTTPStatus
 from typing import Any
 from typing import cast
 
-import httpx
 from celery import Celery
 from celery import shared_task
 from celery import Task
@@ -12,17 +10,23 @@ from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
-from tenacity import RetryError
 
 from alvio.access.access import get_access_for_document
+from alvio.access.access import get_access_for_documents
+from alvio.access.access import get_null_document_access
 from alvio.background.celery.apps.app_base import task_logger
 from alvio.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from alvio.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
 from alvio.background.celery.tasks.shared.tasks import LIGHT_TIME_LIMIT
 from alvio.background.celery.tasks.shared.tasks import AlvioCeleryTaskCompletionStatus
+from alvio.background.celery.tasks.shared.tasks import (
+    classify_vespa_sync_exception,
+)
 from alvio.background.celery.tasks.vespa.document_sync import DOCUMENT_SYNC_FENCE_KEY
 from alvio.background.celery.tasks.vespa.document_sync import get_document_sync_payload
-from alvio.background.celery.tasks.vespa.document_sync import get_document_sync_remaining
+from alvio.background.celery.tasks.vespa.document_sync import (
+    get_document_sync_remaining,
+)
 from alvio.background.celery.tasks.vespa.document_sync import reset_document_sync
 from alvio.background.celery.tasks.vespa.document_sync import (
     try_generate_stale_document_sync_tasks,
@@ -34,10 +38,13 @@ from alvio.configs.constants import AlvioCeleryTask
 from alvio.configs.constants import AlvioRedisConstants
 from alvio.configs.constants import AlvioRedisLocks
 from alvio.db.document import get_document
+from alvio.db.document import get_documents_by_ids
 from alvio.db.document import mark_document_as_synced
+from alvio.db.document import mark_documents_as_synced
 from alvio.db.document_set import delete_document_set
 from alvio.db.document_set import fetch_document_sets
 from alvio.db.document_set import fetch_document_sets_for_document
+from alvio.db.document_set import fetch_document_sets_for_documents
 from alvio.db.document_set import get_document_set_by_id
 from alvio.db.document_set import mark_document_set_as_synced
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
@@ -265,7 +272,7 @@ def try_generate_document_set_sync_tasks(
 
     task_logger.info(
         f"RedisDocumentSet.generate_tasks finished. "
-        f"document_set={document_set.id} tasks_generated={tasks_generated}"
+        f"document_set={document_set.id} tasks_generated={tasks_generated} docs={result[1]}"
     )
 
     # create before setting fence to avoid race condition where the monitoring
@@ -341,7 +348,7 @@ def try_generate_user_group_sync_tasks(
 
     task_logger.info(
         f"RedisUserGroup.generate_tasks finished. "
-        f"usergroup={usergroup.id} tasks_generated={tasks_generated}"
+        f"usergroup={usergroup.id} tasks_generated={tasks_generated} docs={result[1]}"
     )
 
     # create before setting fence to avoid race condition where the monitoring
@@ -525,52 +532,118 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         task_logger.info(f"SoftTimeLimitExceeded exception. doc={document_id}")
         completion_status = AlvioCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
     except Exception as ex:
-        e: Exception | None = None
-        while True:
-            if isinstance(ex, RetryError):
-                task_logger.warning(
-                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
-                )
+        completion_status, retry_exception = classify_vespa_sync_exception(
+            self, ex, f"doc={document_id}"
+        )
+        if retry_exception is not None:
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            # this will raise a celery exception
+            self.retry(exc=retry_exception, countdown=countdown)
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+        )
+
+    return completion_status == AlvioCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=AlvioCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Same as vespa_metadata_sync_task for a page of documents. Document sets, access
+    and boost are loaded for the whole page at once, the chunk updates are fed to
+    Vespa in bulk and the page is marked as synced in a single statement."""
+    start = time.monotonic()
+
+    completion_status = AlvioCeleryTaskCompletionStatus.UNDEFINED
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
 
-                # only set the inner exception if it is of type Exception
-                e_temp = ex.last_attempt.exception()
-                if isinstance(e_temp, Exception):
-                    e = e_temp
+            docs = get_documents_by_ids(db_session, document_ids)
+            if not docs:
+                elapsed = time.monotonic() - start
+                task_logger.info(
+                    f"docs={len(document_ids)} "
+                    f"action=no_operation "
+                    f"elapsed={elapsed:.2f}"
+                )
+                completion_status = AlvioCeleryTaskCompletionStatus.SKIPPED
             else:
-                e = ex
-
-            if isinstance(e, httpx.HTTPStatusError):
-                if e.response.status_code == HTTPStatus.BAD_REQUEST:
-                    task_logger.exception(
-                        f"Non-retryable HTTPStatusError: "
-                        f"doc={document_id} "
-                        f"status={e.response.status_code}"
-                    )
-                completion_status = (
-                    AlvioCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                found_document_ids = [doc.id for doc in docs]
+                doc_id_to_doc_sets = dict(
+                    fetch_document_sets_for_documents(found_document_ids, db_session)
+                )
+                doc_id_to_access = get_access_for_documents(
+                    document_ids=found_document_ids, db_session=db_session
                 )
-                break
 
-            task_logger.exception(
-                f"vespa_metadata_sync_task exceptioned: doc={document_id}"
-            )
+                doc_id_to_fields = {
+                    doc.id: VespaDocumentFields(
+                        document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                        access=doc_id_to_access.get(doc.id)
+                        or get_null_document_access(),
+                        boost=doc.boost,
+                        hidden=doc.hidden,
+                    )
+                    for doc in docs
+                }
 
-            completion_status = AlvioCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
-            if (
-                self.max_retries is not None
-                and self.request.retries >= self.max_retries
-            ):
-                completion_status = (
-                    AlvioCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                # update Vespa. OK if a doc doesn't exist. Raises exception otherwise.
+                doc_id_to_chunks_affected = retry_index.update_multiple(
+                    doc_id_to_fields,
+                    tenant_id=tenant_id,
+                    doc_id_to_chunk_count={doc.id: doc.chunk_count for doc in docs},
                 )
 
+                # update db last. Worst case = we crash right before this and
+                # the sync of the whole page might repeat again later
+                mark_documents_as_synced(found_document_ids, db_session)
+
+                elapsed = time.monotonic() - start
+                task_logger.info(
+                    f"docs={len(found_document_ids)} "
+                    f"missing={len(document_ids) - len(found_document_ids)} "
+                    f"action=sync "
+                    f"chunks={sum(doc_id_to_chunks_affected.values())} "
+                    f"elapsed={elapsed:.2f}"
+                )
+                completion_status = AlvioCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. first_doc={document_ids[0]} "
+            f"docs={len(document_ids)}"
+        )
+        completion_status = AlvioCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        completion_status, retry_exception = classify_vespa_sync_exception(
+            self, ex, f"first_doc={document_ids[0]} docs={len(document_ids)}"
+        )
+        if retry_exception is not None:
             # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
             countdown = 2 ** (self.request.retries + 4)
-            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
-            break  # we won't hit this, but it looks weird not to have it
+            # this will raise a celery exception
+            self.retry(exc=retry_exception, countdown=countdown)
     finally:
         task_logger.info(
-            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+            f"vespa_metadata_sync_batch_task completed: status={completion_status.value} "
+            f"first_doc={document_ids[0]} docs={len(document_ids)}"
         )
 
     return completion_status == AlvioCeleryTaskCompletionStatus.SUCCEEDED
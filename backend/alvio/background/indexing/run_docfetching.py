@@ -113,6 +113,10 @@ def _get_connector_runner(
             connector_specific_config=attempt.connector_credential_pair.connector.connector_specific_config,
             credential=attempt.connector_credential_pair.credential,
         )
+        runnable_connector.set_state_scope(
+            cc_pair_id=attempt.connector_credential_pair_id,
+            search_settings_id=attempt.search_settings_id,
+        )
 
         # validate the connector settings
         if not INTEGRATION_TESTS_MODE:
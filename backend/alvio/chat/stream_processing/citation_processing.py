@@ -1,3 +1,4 @@
+import abc
 import re
 from collections.abc import Generator
 
@@ -46,21 +47,55 @@ def in_code_block(llm_text: str) -> bool:
     return count % 2 != 0
 
 
-class CitationProcessor:
-    def __init__(
-        self,
-        context_docs: list[LlmDoc],
-        final_doc_id_to_rank_map: DocumentIdOrderMapping,
-        display_doc_id_to_rank_map: DocumentIdOrderMapping,
-        stop_stream: str | None = STOP_STREAM_PAT,
-    ):
+class CodeFenceTracker:
+    """
+    Incremental version of `in_code_block` for streamed text: counts the code fences
+    of the text so far the same way `str.count` does, but only looks at each new
+    token (plus the last two characters before it, which could start a fence).
+    """
+
+    def __init__(self) -> None:
+        self.fence_count = 0
+        # end of the text so far that could still be part of a fence
+        self._tail = ""
+
+    def feed(self, token: str) -> None:
+        text = self._tail + token
+        start = 0
+        while (fence_idx := text.find(TRIPLE_BACKTICK, start)) != -1:
+            self.fence_count += 1
+            start = fence_idx + len(TRIPLE_BACKTICK)
+        self._tail = text[max(start, len(text) - len(TRIPLE_BACKTICK) + 1) :]
+
+    @property
+    def in_code_block(self) -> bool:
+        return self.fence_count % 2 != 0
+
+
+class _BaseCitationProcessor(abc.ABC):
+    """
+    Token handling shared by the citation processors: stop pattern detection, code
+    fences and finding (possible) citations in the held back segment. Every step only
+    looks at the new token and the segment held back for citation processing, never
+    at the entire output so far, so processing a token is linear in its length.
+    """
+
+    @property
+    @abc.abstractmethod
+    def possible_citation_pattern(self) -> re.Pattern[str]:
+        """Matches a possible start of a citation at the end of the segment."""
+
+    @property
+    @abc.abstractmethod
+    def citation_pattern(self) -> re.Pattern[str]:
+        """Matches complete citations."""
+
+    def __init__(self, context_docs: list[LlmDoc], stop_stream: str | None) -> None:
         self.context_docs = context_docs  # list of docs in the order the LLM sees
-        self.final_order_mapping = final_doc_id_to_rank_map.order_mapping
-        self.display_order_mapping = display_doc_id_to_rank_map.order_mapping
         self.max_citation_num = len(context_docs)
         self.stop_stream = stop_stream
 
-        self.llm_out = ""  # entire output so far
+        self.code_fences = CodeFenceTracker()  # code fences in the entire output
         self.curr_segment = ""  # tokens held for citation processing
         self.hold = ""  # tokens held for stop token processing
 
@@ -68,33 +103,23 @@ class CitationProcessor:
         self.cited_documents: set[str] = set()  # docs cited in the entire stream
         self.non_citation_count = 0
 
-        # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
-        self.possible_citation_pattern = re.compile(r"(\[+(?:\d+,? ?)*$)")
-
-        # group 1: '[[1]]', [[2]], etc.
-        # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
-        self.citation_pattern = re.compile(r"(\[\[\d+\]\])|(\[\d+(?:, ?\d+)*\])")
-
-    def process_token(
-        self, token: str | None
-    ) -> Generator[AlvioAnswerPiece | CitationInfo, None, None]:
-        # None -> end of stream
-        if token is None:
-            yield AlvioAnswerPiece(answer_piece=self.curr_segment)
-            return
-
+    def _add_token(self, token: str) -> bool:
+        """
+        Add a streamed token to the current segment. Returns False if there is nothing
+        to process, i.e. the token is held back or dropped because of the stop pattern.
+        """
         if self.stop_stream:
             next_hold = self.hold + token
             if self.stop_stream in next_hold:
-                return
+                return False
             if next_hold == self.stop_stream[: len(next_hold)]:
                 self.hold = next_hold
-                return
+                return False
             token = next_hold
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.code_fences.feed(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -102,40 +127,100 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if piece_that_comes_after == "\n" and self.code_fences.in_code_block:
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
+        return True
+
+    def _possible_citation_found(self) -> bool:
+        # a possible citation is a run of '[' followed by anything but '[' up to the
+        # end of the segment, so it can always be matched from the last '['
+        last_bracket_idx = self.curr_segment.rfind("[")
+        return (
+            last_bracket_idx != -1
+            and self.possible_citation_pattern.search(
+                self.curr_segment, last_bracket_idx
+            )
+            is not None
         )
 
+    def _process_citation_matches(
+        self, citation_matches: list[re.Match[str]]
+    ) -> tuple[str, list[CitationInfo]]:
+        """
+        Replace the citation matches in the current segment, which keeps only what is
+        left after the last match.
+        """
+        result = ""
+        citation_infos: list[CitationInfo] = []
+        match_idx = 0
+        for match in citation_matches:
+            match_span = match.span()
+
+            # add stuff before/between the matches
+            intermatch_str = self.curr_segment[match_idx : match_span[0]]
+            self.non_citation_count += len(intermatch_str)
+            match_idx = match_span[1]
+            result += intermatch_str
+
+            # reset recent citations if no citations found for a while
+            if self.non_citation_count > 5:
+                self.recent_cited_documents.clear()
+
+            # process the citation string and emit citation info
+            res, citation_info = self.process_citation(match)
+            result += res
+            citation_infos.extend(citation_info)
+            self.non_citation_count = 0
+
+        # leftover could be part of next citation
+        self.curr_segment = self.curr_segment[match_idx:]
+        self.non_citation_count = len(self.curr_segment)
+
+        return result, citation_infos
+
+    @abc.abstractmethod
+    def process_citation(self, match: re.Match) -> tuple[str, list[CitationInfo]]:
+        """Returns the replacement text and the citations for a citation match."""
+
+
+class CitationProcessor(_BaseCitationProcessor):
+    # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
+    possible_citation_pattern = re.compile(r"(\[+(?:\d+,? ?)*$)")
+
+    # group 1: '[[1]]', [[2]], etc.
+    # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
+    citation_pattern = re.compile(r"(\[\[\d+\]\])|(\[\d+(?:, ?\d+)*\])")
+
+    def __init__(
+        self,
+        context_docs: list[LlmDoc],
+        final_doc_id_to_rank_map: DocumentIdOrderMapping,
+        display_doc_id_to_rank_map: DocumentIdOrderMapping,
+        stop_stream: str | None = STOP_STREAM_PAT,
+    ):
+        super().__init__(context_docs=context_docs, stop_stream=stop_stream)
+        self.final_order_mapping = final_doc_id_to_rank_map.order_mapping
+        self.display_order_mapping = display_doc_id_to_rank_map.order_mapping
+
+    def process_token(
+        self, token: str | None
+    ) -> Generator[AlvioAnswerPiece | CitationInfo, None, None]:
+        # None -> end of stream
+        if token is None:
+            yield AlvioAnswerPiece(answer_piece=self.curr_segment)
+            return
+
+        if not self._add_token(token):
+            return
+
+        citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
+        possible_citation_found = self._possible_citation_found()
+
         result = ""
-        if citation_matches and not in_code_block(self.llm_out):
-            match_idx = 0
-            for match in citation_matches:
-                match_span = match.span()
-
-                # add stuff before/between the matches
-                intermatch_str = self.curr_segment[match_idx : match_span[0]]
-                self.non_citation_count += len(intermatch_str)
-                match_idx = match_span[1]
-                result += intermatch_str
-
-                # reset recent citations if no citations found for a while
-                if self.non_citation_count > 5:
-                    self.recent_cited_documents.clear()
-
-                # process the citation string and emit citation info
-                res, citation_info = self.process_citation(match)
-                result += res
-                for citation in citation_info:
-                    yield citation
-                self.non_citation_count = 0
-
-            # leftover could be part of next citation
-            self.curr_segment = self.curr_segment[match_idx:]
-            self.non_citation_count = len(self.curr_segment)
+        if citation_matches and not self.code_fences.in_code_block:
+            result, citation_infos = self._process_citation_matches(citation_matches)
+            yield from citation_infos
 
         # hold onto the current segment if potential citations found, otherwise stream
         if not possible_citation_found:
@@ -203,34 +288,24 @@ class CitationProcessor:
         return final_processed_str, final_citation_info
 
 
-class CitationProcessorGraph:
+class CitationProcessorGraph(_BaseCitationProcessor):
+    # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
+    # Also supports '[D1', '[D1, D3' type patterns
+    possible_citation_pattern = re.compile(r"(\[+(?:(?:\d+|D\d+),? ?)*$)")
+
+    # group 1: '[[1]]', [[2]], etc.
+    # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
+    # Also supports '[D1]', '[D1, D3]', '[[D1]]' type patterns
+    citation_pattern = re.compile(
+        r"(\[\[(?:\d+|D\d+)\]\])|(\[(?:\d+|D\d+)(?:, ?(?:\d+|D\d+))*\])"
+    )
+
     def __init__(
         self,
         context_docs: list[LlmDoc],
         stop_stream: str | None = STOP_STREAM_PAT,
     ):
-        self.context_docs = context_docs  # list of docs in the order the LLM sees
-        self.max_citation_num = len(context_docs)
-        self.stop_stream = stop_stream
-
-        self.llm_out = ""  # entire output so far
-        self.curr_segment = ""  # tokens held for citation processing
-        self.hold = ""  # tokens held for stop token processing
-
-        self.recent_cited_documents: set[str] = set()  # docs recently cited
-        self.cited_documents: set[str] = set()  # docs cited in the entire stream
-        self.non_citation_count = 0
-
-        # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
-        # Also supports '[D1', '[D1, D3' type patterns
-        self.possible_citation_pattern = re.compile(r"(\[+(?:(?:\d+|D\d+),? ?)*$)")
-
-        # group 1: '[[1]]', [[2]], etc.
-        # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
-        # Also supports '[D1]', '[D1, D3]', '[[D1]]' type patterns
-        self.citation_pattern = re.compile(
-            r"(\[\[(?:\d+|D\d+)\]\])|(\[(?:\d+|D\d+)(?:, ?(?:\d+|D\d+))*\])"
-        )
+        super().__init__(context_docs=context_docs, stop_stream=stop_stream)
 
     def process_token(
         self, token: str | None
@@ -239,63 +314,17 @@ class CitationProcessorGraph:
         if token is None:
             return None
 
-        if self.stop_stream:
-            next_hold = self.hold + token
-            if self.stop_stream in next_hold:
-                return None
-            if next_hold == self.stop_stream[: len(next_hold)]:
-                self.hold = next_hold
-                return None
-            token = next_hold
-            self.hold = ""
-
-        self.curr_segment += token
-        self.llm_out += token
-
-        # Handle code blocks without language tags
-        if "`" in self.curr_segment:
-            if self.curr_segment.endswith("`"):
-                pass
-            elif "```" in self.curr_segment:
-                piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
-                    self.curr_segment = self.curr_segment.replace("```", "```plaintext")
+        if not self._add_token(token):
+            return None
 
         citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
-        )
+        possible_citation_found = self._possible_citation_found()
 
-        result = ""
-        if citation_matches and not in_code_block(self.llm_out):
-            match_idx = 0
-            citation_infos = []
-            for match in citation_matches:
-                match_span = match.span()
-
-                # add stuff before/between the matches
-                intermatch_str = self.curr_segment[match_idx : match_span[0]]
-                self.non_citation_count += len(intermatch_str)
-                match_idx = match_span[1]
-                result += intermatch_str
-
-                # reset recent citations if no citations found for a while
-                if self.non_citation_count > 5:
-                    self.recent_cited_documents.clear()
-
-                # process the citation string and emit citation info
-                res, citation_info = self.process_citation(match)
-                result += res
-                citation_infos.extend(citation_info)
-                self.non_citation_count = 0
-
-            # leftover could be part of next citation
-            self.curr_segment = self.curr_segment[match_idx:]
-            self.non_citation_count = len(self.curr_segment)
-
-            return result, citation_infos
+        if citation_matches and not self.code_fences.in_code_block:
+            return self._process_citation_matches(citation_matches)
 
         # hold onto the current segment if potential citations found, otherwise stream
+        result = ""
         if not possible_citation_found:
             result += self.curr_segment
             self.non_citation_count += len(self.curr_segment)
@@ -46,7 +46,9 @@ SHOW_EXTRA_CONNECTORS = os.environ.get("SHOW_EXTRA_CONNECTORS", "").lower() == "
 # 2. anonymized user emails
 # 3. no queries
 ALVIO_QUERY_HISTORY_TYPE = QueryHistoryType(
-    (os.environ.get("ALVIO_QUERY_HISTORY_TYPE") or QueryHistoryType.NORMAL.value).lower()
+    (
+        os.environ.get("ALVIO_QUERY_HISTORY_TYPE") or QueryHistoryType.NORMAL.value
+    ).lower()
 )
 
 #####
@@ -187,6 +189,18 @@ VESPA_DEPLOYMENT_ZIP = (
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 
+# Feed index/update/delete operations to Vespa through a single asyncio HTTP/2 client
+# instead of one blocking request per thread
+VESPA_ASYNC_FEED_ENABLED = (
+    os.environ.get("VESPA_ASYNC_FEED_ENABLED", "true").lower() == "true"
+)
+# Upper bound on in-flight feed operations, the actual window adapts to Vespa throttling
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or 1024)
+VESPA_FEED_MIN_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MIN_IN_FLIGHT") or 8)
+# HTTP/2 connections opened to the Vespa container for feeding
+VESPA_FEED_MAX_CONNECTIONS = int(os.environ.get("VESPA_FEED_MAX_CONNECTIONS") or 4)
+VESPA_FEED_MAX_RETRIES = int(os.environ.get("VESPA_FEED_MAX_RETRIES") or 10)
+
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
@@ -378,6 +392,14 @@ except ValueError:
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
 
+# The number of documents synced to Vespa by a single metadata sync task
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 64)
+
+# The number of documents cleaned up by a single connector deletion task
+CONNECTOR_DELETION_BATCH_SIZE = int(
+    os.environ.get("CONNECTOR_DELETION_BATCH_SIZE") or 64
+)
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -414,6 +436,32 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Pages are first fetched without a browser, only pages that need javascript (or
+# that block plain HTTP clients) are rendered with Playwright
+WEB_CONNECTOR_STATIC_FETCH_ENABLED = (
+    os.environ.get("WEB_CONNECTOR_STATIC_FETCH_ENABLED") or "true"
+).lower() == "true"
+# Static pages with less text than this are rendered in a browser instead
+WEB_CONNECTOR_STATIC_MIN_TEXT_LENGTH = int(
+    os.environ.get("WEB_CONNECTOR_STATIC_MIN_TEXT_LENGTH") or 200
+)
+WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS") or 8
+)
+# Each browser is a separate Chromium process
+WEB_CONNECTOR_MAX_BROWSERS = int(os.environ.get("WEB_CONNECTOR_MAX_BROWSERS") or 2)
+# Politeness limits, applied per host
+WEB_CONNECTOR_MAX_REQUESTS_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_REQUESTS_PER_HOST") or 4
+)
+WEB_CONNECTOR_HOST_REQUEST_INTERVAL_SECONDS = float(
+    os.environ.get("WEB_CONNECTOR_HOST_REQUEST_INTERVAL_SECONDS") or 0
+)
+# ETag / Last-Modified of every crawled page are kept this long so incremental
+# crawls can skip unchanged pages
+WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS = int(
+    os.environ.get("WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS") or 30 * 24 * 60 * 60
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -543,6 +591,21 @@ LINEAR_CLIENT_SECRET = os.getenv("LINEAR_CLIENT_SECRET")
 # Slack specific configs
 SLACK_NUM_THREADS = int(os.getenv("SLACK_NUM_THREADS") or 8)
 MAX_SLACK_QUERY_EXPANSIONS = int(os.environ.get("MAX_SLACK_QUERY_EXPANSIONS", "5"))
+# Slack lookups done by federated Slack search (threads, user names) are cached in
+# redis. Threads change the most, so they are only kept briefly. Channel types are
+# never cached, they decide which private channels are filtered out
+SLACK_FEDERATED_SEARCH_CACHE_ENABLED = (
+    os.environ.get("SLACK_FEDERATED_SEARCH_CACHE_ENABLED", "true").lower() == "true"
+)
+SLACK_FEDERATED_THREAD_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_FEDERATED_THREAD_CACHE_TTL_SECONDS") or 60
+)
+SLACK_FEDERATED_USER_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_FEDERATED_USER_CACHE_TTL_SECONDS") or 60 * 60
+)
+SLACK_FEDERATED_RATE_LIMIT_MAX_RETRIES = int(
+    os.environ.get("SLACK_FEDERATED_RATE_LIMIT_MAX_RETRIES") or 3
+)
 
 DASK_JOB_CLIENT_ENABLED = (
     os.environ.get("DASK_JOB_CLIENT_ENABLED", "").lower() == "true"
@@ -568,6 +631,12 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# The maximum number of source document IDs a pruning job keeps in memory. Beyond that,
+# IDs are spilled to sorted temporary files and diffed against the index by merging.
+PRUNING_MAX_IDS_IN_MEMORY = int(
+    os.environ.get("PRUNING_MAX_IDS_IN_MEMORY") or 1_000_000
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -628,6 +697,31 @@ INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 8
 )
 
+# Number of embedding requests kept in flight against the (indexing) model server.
+# The model server coalesces concurrent requests, so a few in flight keeps it busy
+# while the previous batch is being serialized / sent back.
+INDEXING_MODEL_SERVER_EMBEDDING_CONCURRENCY = int(
+    os.environ.get("INDEXING_MODEL_SERVER_EMBEDDING_CONCURRENCY") or 4
+)
+
+# API based embedding / rerank providers are called through process wide clients
+# (one per provider, URL and API key). Requests in flight per client are capped,
+# and once a provider rate limits a request every caller backs off
+API_PROVIDER_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("API_PROVIDER_MAX_CONCURRENT_REQUESTS") or 8
+)
+API_PROVIDER_RATE_LIMIT_MAX_RETRIES = int(
+    os.environ.get("API_PROVIDER_RATE_LIMIT_MAX_RETRIES") or 5
+)
+# Used when the provider doesn't send a Retry-After, doubled on every consecutive
+# rate limited request
+API_PROVIDER_RATE_LIMIT_BACKOFF_SECONDS = float(
+    os.environ.get("API_PROVIDER_RATE_LIMIT_BACKOFF_SECONDS") or 2
+)
+API_PROVIDER_RATE_LIMIT_MAX_BACKOFF_SECONDS = float(
+    os.environ.get("API_PROVIDER_RATE_LIMIT_MAX_BACKOFF_SECONDS") or 60
+)
+
 # During an indexing attempt, specifies the number of batches which are allowed to
 # exception without aborting the attempt.
 INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
@@ -653,6 +747,28 @@ AVERAGE_SUMMARY_EMBEDDINGS = (
 
 MAX_TOKENS_FOR_FULL_INCLUSION = 4096
 
+# Max number of contextual RAG LLM calls in flight at the same time, shared by all
+# documents being indexed by this process
+CONTEXTUAL_RAG_MAX_CONCURRENCY = int(
+    os.environ.get("CONTEXTUAL_RAG_MAX_CONCURRENCY") or 16
+)
+# Max number of contextual RAG LLM calls started per minute by this process, 0 means
+# no limit
+CONTEXTUAL_RAG_MAX_REQUESTS_PER_MINUTE = int(
+    os.environ.get("CONTEXTUAL_RAG_MAX_REQUESTS_PER_MINUTE") or 0
+)
+# Contextual RAG summaries are cached in redis by the hash of their prompt
+CONTEXTUAL_RAG_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONTEXTUAL_RAG_CACHE_TTL_SECONDS") or 7 * 24 * 60 * 60
+)
+
+# Documents whose chunks all have the same content hash as when they were last indexed
+# skip contextual RAG, embedding and the rewrite into the document index, only their
+# metadata is updated
+ENABLE_INCREMENTAL_REINDEXING = (
+    os.environ.get("ENABLE_INCREMENTAL_REINDEXING", "true").lower() == "true"
+)
+
 
 #####
 # Tool Configs
@@ -851,6 +967,20 @@ IMAGE_SUMMARIZATION_USER_PROMPT = os.environ.get(
     DEFAULT_IMAGE_SUMMARIZATION_USER_PROMPT,
 )
 
+# Max number of images summarized by the vision LLM at the same time while indexing
+IMAGE_SUMMARIZATION_MAX_CONCURRENCY = int(
+    os.environ.get("IMAGE_SUMMARIZATION_MAX_CONCURRENCY") or 8
+)
+
+# Image summaries are cached in redis by image content (and LLM / prompts), so the same
+# image embedded in many documents or indexed again is only summarized once
+IMAGE_SUMMARY_CACHE_ENABLED = (
+    os.environ.get("IMAGE_SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+)
+IMAGE_SUMMARY_CACHE_TTL_SECONDS = int(
+    os.environ.get("IMAGE_SUMMARY_CACHE_TTL_SECONDS") or 30 * 24 * 60 * 60
+)
+
 IMAGE_ANALYSIS_SYSTEM_PROMPT = os.environ.get(
     "IMAGE_ANALYSIS_SYSTEM_PROMPT",
     DEFAULT_IMAGE_ANALYSIS_SYSTEM_PROMPT,
@@ -879,6 +1009,24 @@ S3_VERIFY_SSL = os.environ.get("S3_VERIFY_SSL", "").lower() == "true"
 S3_AWS_ACCESS_KEY_ID = os.environ.get("S3_AWS_ACCESS_KEY_ID")
 S3_AWS_SECRET_ACCESS_KEY = os.environ.get("S3_AWS_SECRET_ACCESS_KEY")
 
+# Uploads larger than this are streamed to S3 as a multipart upload with parts of
+# this size (S3 requires at least 5MB per part)
+S3_MULTIPART_PART_SIZE_BYTES = max(
+    5 * 1024 * 1024,
+    int(os.environ.get("S3_MULTIPART_PART_SIZE_BYTES") or 16 * 1024 * 1024),
+)
+
+# Optional on-disk LRU cache of objects read from the file store, disabled if unset.
+# Can be shared by all workers on a host.
+FILE_STORE_LOCAL_CACHE_DIR = os.environ.get("FILE_STORE_LOCAL_CACHE_DIR") or None
+FILE_STORE_LOCAL_CACHE_MAX_BYTES = int(
+    os.environ.get("FILE_STORE_LOCAL_CACHE_MAX_BYTES") or 1024 * 1024 * 1024
+)
+# larger objects are never cached
+FILE_STORE_LOCAL_CACHE_MAX_OBJECT_BYTES = int(
+    os.environ.get("FILE_STORE_LOCAL_CACHE_MAX_OBJECT_BYTES") or 32 * 1024 * 1024
+)
+
 # Forcing Vespa Language
 # English: en, German:de, etc. See: https://docs.vespa.ai/en/linguistics.html
 VESPA_LANGUAGE_OVERRIDE = os.environ.get("VESPA_LANGUAGE_OVERRIDE")
@@ -135,6 +135,12 @@ KG_CLUSTERING_THRESHOLD: float = float(
     os.environ.get("KG_CLUSTERING_THRESHOLD", "0.96")
 )
 
+# number of staging entities of one entity type clustered and committed together
+KG_CLUSTERING_BATCH_SIZE: int = int(os.environ.get("KG_CLUSTERING_BATCH_SIZE", "256"))
+
+# entity types are clustered independently, this many at a time
+KG_CLUSTERING_MAX_WORKERS: int = int(os.environ.get("KG_CLUSTERING_MAX_WORKERS", "4"))
+
 KG_MAX_SEARCH_DOCUMENTS: int = int(os.environ.get("KG_MAX_SEARCH_DOCUMENTS", "15"))
 
 KG_MAX_DECOMPOSITION_SEGMENTS: int = int(
@@ -46,6 +46,36 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Query embedding cache, a per-process LRU in front of a tenant scoped Redis cache.
+# Entries are keyed by the search settings id so an embedding model swap never serves
+# stale vectors.
+QUERY_EMBEDDING_CACHE_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_ENABLED") or "true"
+).lower() == "true"
+QUERY_EMBEDDING_CACHE_LOCAL_MAX_ENTRIES = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_LOCAL_MAX_ENTRIES") or 2048
+)
+QUERY_EMBEDDING_CACHE_LOCAL_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_LOCAL_TTL_SECONDS") or 600
+)
+QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS") or 60 * 60 * 24
+)
+# Per-process cache of cross-encoder scores keyed by (model, query, chunk), so
+# repeated rerankings of overlapping chunk sets only score the new chunks
+RERANK_SCORE_CACHE_ENABLED = (
+    os.environ.get("RERANK_SCORE_CACHE_ENABLED") or "true"
+).lower() == "true"
+RERANK_SCORE_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RERANK_SCORE_CACHE_MAX_ENTRIES") or 50_000
+)
+RERANK_SCORE_CACHE_TTL_SECONDS = int(
+    os.environ.get("RERANK_SCORE_CACHE_TTL_SECONDS") or 600
+)
+# Passages sent to the model server are split into shards of this size that are
+# scored concurrently
+RERANK_SHARD_SIZE = int(os.environ.get("RERANK_SHARD_SIZE") or 16)
+RERANK_MAX_CONCURRENT_SHARDS = int(os.environ.get("RERANK_MAX_CONCURRENT_SHARDS") or 4)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
@@ -24,3 +24,19 @@ if _CUSTOM_TOOL_PASS_THROUGH_HEADERS_RAW:
         logger.error(
             "Failed to parse CUSTOM_TOOL_PASS_THROUGH_HEADERS, must be a valid JSON object"
         )
+
+# MCP sessions are kept open per (server, credentials) and reused across tool calls.
+# Sessions that weren't used for this long are closed
+MCP_SESSION_IDLE_TIMEOUT_SECONDS = int(
+    os.environ.get("MCP_SESSION_IDLE_TIMEOUT_SECONDS") or 5 * 60
+)
+# Sessions that were idle for longer than this are pinged before they are reused
+MCP_SESSION_HEALTH_CHECK_INTERVAL_SECONDS = int(
+    os.environ.get("MCP_SESSION_HEALTH_CHECK_INTERVAL_SECONDS") or 30
+)
+# Timeout for connecting to an MCP server, including the initialize handshake
+MCP_CONNECT_TIMEOUT_SECONDS = int(os.environ.get("MCP_CONNECT_TIMEOUT_SECONDS") or 30)
+# Discovered tools and resources are reused for this long, 0 disables the cache
+MCP_DISCOVERY_CACHE_TTL_SECONDS = int(
+    os.environ.get("MCP_DISCOVERY_CACHE_TTL_SECONDS") or 5 * 60
+)
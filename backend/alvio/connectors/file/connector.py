@@ -277,15 +277,16 @@ class LocalFileConnector(LoadConnector):
                 continue
 
             metadata = self._get_file_metadata(file_record.display_name)
-            file_io = file_store.read_file(file_id=file_id, mode="b")
-            new_docs = _process_file(
-                file_id=file_id,
-                file_name=file_record.display_name,
-                file=file_io,
-                metadata=metadata,
-                pdf_pass=self.pdf_pass,
-                file_type=file_record.file_type,
-            )
+            # large uploads are streamed from the file store rather than read into memory
+            with file_store.open_file(file_id) as file_io:
+                new_docs = _process_file(
+                    file_id=file_id,
+                    file_name=file_record.display_name,
+                    file=file_io,
+                    metadata=metadata,
+                    pdf_pass=self.pdf_pass,
+                    file_type=file_record.file_type,
+                )
             documents.extend(new_docs)
 
             if len(documents) >= self.batch_size:
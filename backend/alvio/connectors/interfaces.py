@@ -76,6 +76,12 @@ class BaseConnector(abc.ABC, Generic[CT]):
         """Implement if the underlying connector wants to skip/allow image downloading
         based on the application level image analysis setting."""
 
+    def set_state_scope(self, cc_pair_id: int, search_settings_id: int) -> None:
+        """Implement if the underlying connector keeps its own state between runs
+        (e.g. in redis). That state must belong to the cc_pair and index (search
+        settings) being indexed, it must never be shared with other cc_pairs or with
+        a re-index into new search settings."""
+
     def build_dummy_checkpoint(self) -> CT:
         # TODO: find a way to make this work without type: ignore
         return ConnectorCheckpoint(has_more=True)  # type: ignore
@@ -1,11 +1,19 @@
+import contextvars
+import hashlib
 import io
 import ipaddress
 import random
 import socket
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
+from functools import partial
 from typing import Any
 from typing import cast
 from typing import Tuple
@@ -22,9 +30,13 @@ from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from alvio.configs.app_configs import INDEX_BATCH_SIZE
+from alvio.configs.app_configs import WEB_CONNECTOR_MAX_BROWSERS
+from alvio.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS
 from alvio.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from alvio.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from alvio.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
+from alvio.configs.app_configs import WEB_CONNECTOR_STATIC_FETCH_ENABLED
+from alvio.configs.app_configs import WEB_CONNECTOR_STATIC_MIN_TEXT_LENGTH
 from alvio.configs.app_configs import WEB_CONNECTOR_VALIDATE_URLS
 from alvio.configs.constants import DocumentSource
 from alvio.connectors.exceptions import ConnectorValidationError
@@ -33,8 +45,16 @@ from alvio.connectors.exceptions import InsufficientPermissionsError
 from alvio.connectors.exceptions import UnexpectedValidationError
 from alvio.connectors.interfaces import GenerateDocumentsOutput
 from alvio.connectors.interfaces import LoadConnector
+from alvio.connectors.interfaces import PollConnector
+from alvio.connectors.interfaces import SecondsSinceUnixEpoch
 from alvio.connectors.models import Document
 from alvio.connectors.models import TextSection
+from alvio.connectors.web.crawler import BrowserPool
+from alvio.connectors.web.crawler import BrowserWorker
+from alvio.connectors.web.crawler import HostLimiter
+from alvio.connectors.web.crawler import PageState
+from alvio.connectors.web.crawler import PageStateStore
+from alvio.connectors.web.crawler import WebCrawlStats
 from alvio.file_processing.extract_file_text import read_pdf_file
 from alvio.file_processing.html_utils import web_html_cleanup
 from alvio.utils.logger import setup_logger
@@ -45,7 +65,8 @@ logger = setup_logger()
 
 
 class ScrapeSessionContext:
-    """Session level context for scraping"""
+    """Session level context for scraping, only used from the thread driving the
+    crawl"""
 
     def __init__(self, base_url: str, to_visit: list[str]):
         self.base_url = base_url
@@ -54,31 +75,32 @@ class ScrapeSessionContext:
         self.content_hashes: set[int] = set()
 
         self.doc_batch: list[Document] = []
+        # states of the pages in doc_batch, staged once the caller took the batch
+        self.doc_batch_page_states: dict[str, PageState] = {}
+        # pages that no longer exist
+        self.gone_links: list[str] = []
 
         self.at_least_one_doc: bool = False
         self.last_error: str | None = None
-        self.needs_retry: bool = False
 
-        self.playwright: Playwright | None = None
-        self.playwright_context: BrowserContext | None = None
-
-    def initialize(self) -> None:
-        self.stop()
-        self.playwright, self.playwright_context = start_playwright()
-
-    def stop(self) -> None:
-        if self.playwright_context:
-            self.playwright_context.close()
-            self.playwright_context = None
-
-        if self.playwright:
-            self.playwright.stop()
-            self.playwright = None
+        self.stats = WebCrawlStats()
 
 
 class ScrapeResult:
-    doc: Document | None = None
-    retry: bool = False
+    def __init__(self) -> None:
+        self.doc: Document | None = None
+        self.retry: bool = False
+        self.error: str | None = None
+        # the static HTML isn't enough, the page has to be rendered in a browser
+        self.needs_render: bool = False
+        self.rendered: bool = False
+        # the page didn't change since the previous crawl
+        self.not_modified: bool = False
+        self.gone: bool = False
+        self.final_url: str | None = None
+        self.links: set[str] = set()
+        self.content_hash: int | None = None
+        self.page_state: PageState | None = None
 
 
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
@@ -310,23 +332,29 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     """
     )
 
-    if (
+    oauth_headers = get_oauth_headers()
+    if oauth_headers:
+        context.set_extra_http_headers(oauth_headers)
+
+    return playwright, context
+
+
+def get_oauth_headers() -> dict[str, str]:
+    if not (
         WEB_CONNECTOR_OAUTH_CLIENT_ID
         and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
         and WEB_CONNECTOR_OAUTH_TOKEN_URL
     ):
-        client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
-            client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
-            client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
-        )
-        context.set_extra_http_headers(
-            {"Authorization": "Bearer {}".format(token["access_token"])}
-        )
-
-    return playwright, context
+        return {}
+
+    client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
+        client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
+        client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
+    )
+    return {"Authorization": "Bearer {}".format(token["access_token"])}
 
 
 def extract_urls_from_sitemap(sitemap_url: str) -> list[str]:
@@ -428,7 +456,15 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         )
 
 
-class WebConnector(LoadConnector):
+class WebConnector(LoadConnector, PollConnector):
+    """Crawls are concurrent: every page is first fetched without a browser, PDFs
+    and static HTML are handled right away and only the pages that need javascript
+    (or that block plain HTTP clients) are rendered in one of a few browsers.
+
+    `load_from_state` always crawls every page. Once given a state scope,
+    `poll_source` remembers the ETag / Last-Modified of every page it yields and
+    skips the pages that didn't change on the next poll."""
+
     MAX_RETRIES = 3
 
     def __init__(
@@ -440,11 +476,20 @@ class WebConnector(LoadConnector):
         scroll_before_scraping: bool = False,
         **kwargs: Any,
     ) -> None:
+        self.base_url = base_url
         self.mintlify_cleanup = mintlify_cleanup
         self.batch_size = batch_size
         self.recursive = False
         self.scroll_before_scraping = scroll_before_scraping
         self.web_connector_type = web_connector_type
+
+        self._host_limiter = HostLimiter()
+        # requests sessions aren't thread safe, every fetch thread gets its own
+        self._http_sessions = threading.local()
+        self._http_headers: dict[str, str] = dict(DEFAULT_HEADERS)
+        # identifies the page states of this connector, see `set_state_scope`
+        self._state_key: str | None = None
+
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
             self.to_visit_list = [_ensure_valid_url(base_url)]
@@ -479,55 +524,139 @@ class WebConnector(LoadConnector):
             logger.warning("Unexpected credentials provided for Web Connector")
         return None
 
-    def _do_scrape(
-        self,
-        index: int,
-        initial_url: str,
-        session_ctx: ScrapeSessionContext,
+    def set_state_scope(self, cc_pair_id: int, search_settings_id: int) -> None:
+        # the crawl settings are part of the key, so editing them starts over
+        config_hash = hashlib.sha256(
+            f"{self.web_connector_type}|{self.base_url}|{self.mintlify_cleanup}|"
+            f"{self.scroll_before_scraping}".encode("utf-8")
+        ).hexdigest()[:16]
+        self._state_key = f"{cc_pair_id}:{search_settings_id}:{config_hash}"
+
+    def _get_http_session(self) -> requests.Session:
+        session = getattr(self._http_sessions, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._http_headers)
+            self._http_sessions.session = session
+        return session
+
+    @staticmethod
+    def _build_document(
+        url: str,
+        text: str,
+        semantic_identifier: str,
+        last_modified: str | None,
+        metadata: dict[str, Any] | None = None,
+    ) -> Document:
+        return Document(
+            id=url,
+            sections=[TextSection(link=url, text=text)],
+            source=DocumentSource.WEB,
+            semantic_identifier=semantic_identifier,
+            metadata=metadata or {},
+            doc_updated_at=(
+                _get_datetime_from_last_modified_header(last_modified)
+                if last_modified
+                else None
+            ),
+        )
+
+    def _fetch_page(
+        self, index: int, initial_url: str, page_state: PageState | None
     ) -> ScrapeResult:
-        """Returns a ScrapeResult object with a doc and retry flag."""
+        """Fetches the page without a browser, with a conditional request if it was
+        crawled before. PDFs and static HTML pages are handled here, other pages
+        come back with `needs_render` set."""
+        result = ScrapeResult()
 
-        if session_ctx.playwright is None:
-            raise RuntimeError("scrape_context.playwright is None")
+        headers = page_state.conditional_headers() if page_state else {}
+        with self._host_limiter.slot(initial_url):
+            response = self._get_http_session().get(
+                initial_url, headers=headers, timeout=30, allow_redirects=True
+            )
 
-        if session_ctx.playwright_context is None:
-            raise RuntimeError("scrape_context.playwright_context is None")
+        if response.status_code == 304:
+            result.not_modified = True
+            result.page_state = page_state
+            return result
 
-        result = ScrapeResult()
+        if response.status_code in (404, 410):
+            result.gone = True
+            result.error = f"Skipped indexing {initial_url} due to HTTP {response.status_code} response"
+            logger.info(result.error)
+            return result
 
-        # Handle cookies for the URL
-        _handle_cookies(session_ctx.playwright_context, initial_url)
+        final_url = response.url
+        if final_url != initial_url:
+            protected_url_check(final_url)
+            result.final_url = final_url
 
-        # First do a HEAD request to check content type without downloading the entire content
-        head_response = requests.head(
-            initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
-        )
-        is_pdf = is_pdf_content(head_response)
-
-        if is_pdf or initial_url.lower().endswith(".pdf"):
+        if response.ok and (
+            is_pdf_content(response) or initial_url.lower().endswith(".pdf")
+        ):
             # PDF files are not checked for links
-            response = requests.get(initial_url, headers=DEFAULT_HEADERS)
             page_text, metadata, images = read_pdf_file(
                 file=io.BytesIO(response.content)
             )
-            last_modified = response.headers.get("Last-Modified")
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
-                source=DocumentSource.WEB,
+            result.doc = self._build_document(
+                url=initial_url,
+                text=page_text,
                 semantic_identifier=initial_url.split("/")[-1],
+                last_modified=response.headers.get("Last-Modified"),
                 metadata=metadata,
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
             )
+            result.page_state = PageState.from_headers(response.headers)
+            return result
 
+        if (
+            not response.ok
+            or not WEB_CONNECTOR_STATIC_FETCH_ENABLED
+            or self.scroll_before_scraping
+            or "html" not in response.headers.get("content-type", "").lower()
+        ):
+            result.needs_render = True
             return result
 
-        page = session_ctx.playwright_context.new_page()
+        url = final_url
+        soup = BeautifulSoup(response.text, "html.parser")
+        if self.recursive:
+            result.links = get_internal_links(self.to_visit_list[0], url, soup)
+
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if (
+            len(parsed_html.cleaned_text) < WEB_CONNECTOR_STATIC_MIN_TEXT_LENGTH
+            or JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+        ):
+            logger.debug(f"{index}: {url} needs javascript, rendering it")
+            result.links = set()
+            result.needs_render = True
+            return result
+
+        result.content_hash = hash((parsed_html.title, parsed_html.cleaned_text))
+        result.doc = self._build_document(
+            url=url,
+            text=parsed_html.cleaned_text,
+            semantic_identifier=parsed_html.title or url,
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        result.page_state = PageState.from_headers(response.headers)
+        return result
+
+    def _do_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        context: BrowserContext,
+    ) -> ScrapeResult:
+        """Renders the page in the browser `context`. Returns a ScrapeResult object
+        with a doc and retry flag."""
+        result = ScrapeResult()
+        result.rendered = True
+
+        # Handle cookies for the URL
+        _handle_cookies(context, initial_url)
+
+        page = context.new_page()
         try:
             # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
             page_response = page.goto(
@@ -542,16 +671,8 @@ class WebConnector(LoadConnector):
             final_url = page.url
             if final_url != initial_url:
                 protected_url_check(final_url)
+                result.final_url = final_url
                 initial_url = final_url
-                if initial_url in session_ctx.visited_links:
-                    logger.info(
-                        f"{index}: {initial_url} redirected to {final_url} - already indexed"
-                    )
-                    page.close()
-                    return result
-
-                logger.info(f"{index}: {initial_url} redirected to {final_url}")
-                session_ctx.visited_links.add(initial_url)
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
@@ -573,16 +694,13 @@ class WebConnector(LoadConnector):
             soup = BeautifulSoup(content, "html.parser")
 
             if self.recursive:
-                internal_links = get_internal_links(
-                    session_ctx.base_url, initial_url, soup
+                result.links = get_internal_links(
+                    self.to_visit_list[0], initial_url, soup
                 )
-                for link in internal_links:
-                    if link not in session_ctx.visited_links:
-                        session_ctx.to_visit.append(link)
 
             if page_response and str(page_response.status)[0] in ("4", "5"):
-                session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
-                logger.info(session_ctx.last_error)
+                result.error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
+                logger.info(result.error)
                 result.retry = True
                 return result
 
@@ -611,107 +729,265 @@ class WebConnector(LoadConnector):
 
             # Sometimes pages with #! will serve duplicate content
             # There are also just other ways this can happen
-            hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
-            if hashed_text in session_ctx.content_hashes:
-                logger.info(
-                    f"{index}: Skipping duplicate title + content for {initial_url}"
-                )
-                return result
-
-            session_ctx.content_hashes.add(hashed_text)
+            result.content_hash = hash((parsed_html.title, parsed_html.cleaned_text))
 
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
+            result.doc = self._build_document(
+                url=initial_url,
+                text=parsed_html.cleaned_text,
                 semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
+                last_modified=last_modified,
             )
+            if page_response:
+                result.page_state = PageState.from_headers(page_response.headers)
         finally:
             page.close()
 
         return result
 
-    def load_from_state(self) -> GenerateDocumentsOutput:
-        """Traverses through all pages found on the website
-        and converts them into documents"""
-
-        if not self.to_visit_list:
-            raise ValueError("No URLs to visit")
-
-        base_url = self.to_visit_list[0]  # For the recursive case
-        check_internet_connection(base_url)  # make sure we can connect to the base url
-
-        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
-        session_ctx.initialize()
+    def _render_page(
+        self, index: int, initial_url: str, browser: BrowserWorker
+    ) -> ScrapeResult:
+        """Runs on the thread of `browser`, never raises."""
+        result = ScrapeResult()
+        # Add retry mechanism with exponential backoff
+        retry_count = 0
 
-        while session_ctx.to_visit:
-            initial_url = session_ctx.to_visit.pop()
-            if initial_url in session_ctx.visited_links:
-                continue
-            session_ctx.visited_links.add(initial_url)
+        while retry_count < self.MAX_RETRIES:
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
+                )
+                time.sleep(delay)
 
             try:
-                protected_url_check(initial_url)
+                with self._host_limiter.slot(initial_url):
+                    result = self._do_scrape(index, initial_url, browser.context)
+                if result.retry:
+                    continue
             except Exception as e:
-                session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
-                logger.warning(session_ctx.last_error)
+                result = ScrapeResult()
+                result.error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(result.error)
+                browser.restart()
                 continue
+            finally:
+                retry_count += 1
 
-            index = len(session_ctx.visited_links)
-            logger.info(f"{index}: Visiting {initial_url}")
+            break  # success / don't retry
 
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
+        return result
 
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
-                    )
-                    time.sleep(delay)
+    def _handle_scrape_result(
+        self, session_ctx: ScrapeSessionContext, initial_url: str, result: ScrapeResult
+    ) -> None:
+        stats = session_ctx.stats
+        stats.pages += 1
+        if result.error:
+            session_ctx.last_error = result.error
+
+        if result.not_modified:
+            stats.not_modified += 1
+            if result.page_state:
+                # refreshes the expiry of the state
+                session_ctx.doc_batch_page_states[initial_url] = result.page_state
+            return
+
+        if result.gone:
+            session_ctx.gone_links.append(initial_url)
+            return
+
+        if result.doc is None and result.error:
+            stats.failed += 1
+        elif result.rendered:
+            stats.rendered += 1
+        else:
+            stats.static += 1
+
+        if result.final_url:
+            if result.final_url in session_ctx.visited_links:
+                logger.info(
+                    f"{initial_url} redirected to {result.final_url} - already indexed"
+                )
+                return
+
+            logger.info(f"{initial_url} redirected to {result.final_url}")
+            session_ctx.visited_links.add(result.final_url)
+
+        for link in result.links:
+            if link not in session_ctx.visited_links:
+                session_ctx.to_visit.append(link)
 
-                try:
-                    result = self._do_scrape(index, initial_url, session_ctx)
-                    if result.retry:
+        if result.doc is None:
+            return
+
+        if result.content_hash is not None:
+            if result.content_hash in session_ctx.content_hashes:
+                logger.info(f"Skipping duplicate title + content for {initial_url}")
+                return
+            session_ctx.content_hashes.add(result.content_hash)
+
+        session_ctx.doc_batch.append(result.doc)
+        stats.docs += 1
+        if result.page_state:
+            session_ctx.doc_batch_page_states[initial_url] = result.page_state
+
+    @staticmethod
+    def _save_page_states(
+        session_ctx: ScrapeSessionContext, page_state_store: PageStateStore | None
+    ) -> None:
+        if page_state_store is not None:
+            page_state_store.stage(session_ctx.doc_batch_page_states)
+            page_state_store.delete(session_ctx.gone_links)
+        session_ctx.doc_batch_page_states = {}
+        session_ctx.gone_links = []
+
+    def _crawl(
+        self, page_state_store: PageStateStore | None, incremental: bool
+    ) -> GenerateDocumentsOutput:
+        """Page states are staged in `page_state_store` (if given) once the batch of
+        their documents was taken by the caller. Pages whose committed state is
+        still current are only skipped if `incremental`."""
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
+
+        base_url = self.to_visit_list[0]  # For the recursive case
+        check_internet_connection(base_url)  # make sure we can connect to the base url
+        self._http_headers = {**DEFAULT_HEADERS, **get_oauth_headers()}
+        self._http_sessions = threading.local()
+
+        previous_states = (
+            page_state_store.load() if page_state_store and incremental else {}
+        )
+        to_visit = list(self.to_visit_list)
+        if self.recursive:
+            # unchanged pages aren't parsed, so the pages only they link to wouldn't
+            # be found again. All pages of the previous crawl are visited instead
+            to_visit = [
+                url for url in previous_states if url not in to_visit
+            ] + to_visit
+
+        session_ctx = ScrapeSessionContext(base_url, to_visit)
+
+        fetch_executor = ThreadPoolExecutor(
+            max_workers=WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS,
+            thread_name_prefix="web-fetch",
+        )
+        browser_pool = BrowserPool(WEB_CONNECTOR_MAX_BROWSERS, start_playwright)
+        fetches: dict[Future[ScrapeResult], tuple[int, str]] = {}
+        renders: dict[Future[ScrapeResult], tuple[int, str]] = {}
+        try:
+            while session_ctx.to_visit or fetches or renders:
+                while (
+                    session_ctx.to_visit
+                    and len(fetches) < WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS
+                ):
+                    initial_url = session_ctx.to_visit.pop()
+                    if initial_url in session_ctx.visited_links:
                         continue
+                    session_ctx.visited_links.add(initial_url)
 
-                    if result.doc:
-                        session_ctx.doc_batch.append(result.doc)
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
-                    continue
-                finally:
-                    retry_count += 1
+                    try:
+                        protected_url_check(initial_url)
+                    except Exception as e:
+                        session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
+                        logger.warning(session_ctx.last_error)
+                        continue
 
-                break  # success / don't retry
+                    index = len(session_ctx.visited_links)
+                    logger.info(f"{index}: Visiting {initial_url}")
+                    future = fetch_executor.submit(
+                        contextvars.copy_context().run,
+                        self._fetch_page,
+                        index,
+                        initial_url,
+                        previous_states.get(initial_url),
+                    )
+                    fetches[future] = (index, initial_url)
 
-            if len(session_ctx.doc_batch) >= self.batch_size:
-                session_ctx.initialize()
-                session_ctx.at_least_one_doc = True
-                yield session_ctx.doc_batch
-                session_ctx.doc_batch = []
+                if not fetches and not renders:
+                    continue
+
+                done, _ = wait([*fetches, *renders], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        index, initial_url = fetches.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.info(
+                                f"{index}: Failed to fetch {initial_url} without a "
+                                f"browser, rendering it instead: {e}"
+                            )
+                            result = ScrapeResult()
+                            result.needs_render = True
+
+                        if result.needs_render:
+                            render = browser_pool.submit(
+                                partial(self._render_page, index, initial_url)
+                            )
+                            renders[render] = (index, initial_url)
+                            continue
+                    else:
+                        index, initial_url = renders.pop(future)
+                        result = future.result()
+
+                    self._handle_scrape_result(session_ctx, initial_url, result)
+
+                if len(session_ctx.doc_batch) >= self.batch_size:
+                    browser_pool.recycle()
+                    session_ctx.at_least_one_doc = True
+                    yield session_ctx.doc_batch
+                    session_ctx.doc_batch = []
+                    self._save_page_states(session_ctx, page_state_store)
+                    session_ctx.stats.log(base_url, finished=False)
+        finally:
+            for future in [*fetches, *renders]:
+                future.cancel()
+            fetch_executor.shutdown(wait=True)
+            browser_pool.stop()
 
         if session_ctx.doc_batch:
-            session_ctx.stop()
             session_ctx.at_least_one_doc = True
             yield session_ctx.doc_batch
+            session_ctx.doc_batch = []
+        self._save_page_states(session_ctx, page_state_store)
+        session_ctx.stats.log(base_url, finished=True)
+
+        # nothing changed since the previous crawl
+        if session_ctx.stats.not_modified:
+            return
 
         if not session_ctx.at_least_one_doc:
             if session_ctx.last_error:
                 raise RuntimeError(session_ctx.last_error)
             raise RuntimeError("No valid pages found.")
 
-        session_ctx.stop()
+    def load_from_state(self) -> GenerateDocumentsOutput:
+        """Traverses through all pages found on the website
+        and converts them into documents"""
+        return self._crawl(page_state_store=None, incremental=False)
+
+    def poll_source(
+        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+    ) -> GenerateDocumentsOutput:
+        """Same as `load_from_state`, except that pages that didn't change since the
+        last successfully indexed poll are skipped. Web pages have no reliable update
+        time, so the window itself isn't used, but windows that don't start after
+        that poll's did (e.g. when re-indexing from the beginning) get a full crawl.
+        See `PageStateStore` for when the states of a poll count as indexed.
+
+        Without a state scope (see `set_state_scope`) every poll is a full crawl."""
+        if self._state_key is None:
+            yield from self._crawl(page_state_store=None, incremental=False)
+            return
+
+        page_state_store = PageStateStore(self._state_key)
+        incremental = page_state_store.start_crawl(start)
+
+        yield from self._crawl(page_state_store, incremental=incremental)
+        page_state_store.finish_crawl(start)
 
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
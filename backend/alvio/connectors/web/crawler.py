@@ -0,0 +1,321 @@
+"""Building blocks of the web connector's crawl.
+
+- `HostLimiter` caps the requests in flight to (and the request rate of) every host
+- `BrowserPool` is a bounded set of Playwright browsers. The sync Playwright API is
+  bound to the thread that started it, so every browser gets its own thread and
+  pages are rendered on the thread of the browser they are sent to
+- `PageStateStore` keeps the ETag / Last-Modified of every crawled page in Redis
+  so incremental crawls can send conditional requests and skip unchanged pages
+"""
+
+import contextvars
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import cast
+from typing import TypeVar
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext
+from playwright.sync_api import Playwright
+from pydantic import BaseModel
+
+from alvio.configs.app_configs import WEB_CONNECTOR_HOST_REQUEST_INTERVAL_SECONDS
+from alvio.configs.app_configs import WEB_CONNECTOR_MAX_REQUESTS_PER_HOST
+from alvio.configs.app_configs import WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_PAGE_STATE_KEY_PREFIX = "web_connector_pages"
+_CRAWL_STATE_KEY_PREFIX = "web_connector_crawl"
+
+
+class HostLimiter:
+    """Thread safe, shared by the fetch and the browser threads."""
+
+    def __init__(
+        self,
+        max_per_host: int = WEB_CONNECTOR_MAX_REQUESTS_PER_HOST,
+        min_interval: float = WEB_CONNECTOR_HOST_REQUEST_INTERVAL_SECONDS,
+    ) -> None:
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._next_request_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.BoundedSemaphore(self.max_per_host)
+            )
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                request_at = max(now, self._next_request_at.get(host, 0.0))
+                self._next_request_at[host] = request_at + self.min_interval
+            if request_at > now:
+                time.sleep(request_at - now)
+            yield
+
+
+class BrowserWorker:
+    """Owns one Playwright browser, must only be used from the thread it runs on."""
+
+    def __init__(self, start: Callable[[], tuple[Playwright, BrowserContext]]) -> None:
+        self._start = start
+        self._playwright: Playwright | None = None
+        self._context: BrowserContext | None = None
+
+    @property
+    def context(self) -> BrowserContext:
+        if self._context is None:
+            self._playwright, self._context = self._start()
+        return self._context
+
+    def restart(self) -> None:
+        """The browser is started again on next use."""
+        self.stop()
+
+    def stop(self) -> None:
+        try:
+            if self._context:
+                self._context.close()
+            if self._playwright:
+                self._playwright.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop Playwright: {e}")
+        finally:
+            self._context = None
+            self._playwright = None
+
+
+class BrowserPool:
+    def __init__(
+        self, size: int, start: Callable[[], tuple[Playwright, BrowserContext]]
+    ) -> None:
+        self._workers = [
+            (
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="web-browser"),
+                BrowserWorker(start),
+            )
+            for _ in range(size)
+        ]
+        self._pending = [0] * size
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable[[BrowserWorker], T]) -> Future[T]:
+        """Runs `function` on the thread of the least busy browser."""
+        with self._lock:
+            ind = min(range(len(self._pending)), key=self._pending.__getitem__)
+            self._pending[ind] += 1
+        executor, worker = self._workers[ind]
+
+        def _run() -> T:
+            try:
+                return function(worker)
+            finally:
+                with self._lock:
+                    self._pending[ind] -= 1
+
+        return executor.submit(contextvars.copy_context().run, _run)
+
+    def recycle(self) -> None:
+        """Browsers are restarted once the pages already sent to them are done, to
+        keep their memory in check during long crawls."""
+        for executor, worker in self._workers:
+            executor.submit(worker.restart)
+
+    def stop(self) -> None:
+        for executor, worker in self._workers:
+            executor.submit(worker.stop)
+            executor.shutdown(wait=True)
+
+
+class PageState(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]) -> "PageState | None":
+        # Playwright lower cases header names
+        headers = {key.lower(): value for key, value in headers.items()}
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return None
+        return cls(etag=etag, last_modified=last_modified)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageStateStore:
+    """Page states of one connector (see `WebConnector.set_state_scope`), in
+    tenant scoped Redis hashes. Redis errors are logged and treated as missing
+    state, which means a full crawl.
+
+    A crawl only stages the states it sees. They are committed by the next poll if
+    it starts after the staged crawl did: poll windows only move forward once an
+    index attempt succeeded (a failed attempt is retried with the same window), so
+    committed states only describe pages whose documents were indexed."""
+
+    def __init__(self, state_key: str) -> None:
+        self._pages_key = f"{_PAGE_STATE_KEY_PREFIX}:{state_key}"
+        self._staged_pages_key = f"{_PAGE_STATE_KEY_PREFIX}_staged:{state_key}"
+        self._crawl_key = f"{_CRAWL_STATE_KEY_PREFIX}:{state_key}"
+        self._staged_crawl_key = f"{_CRAWL_STATE_KEY_PREFIX}_staged:{state_key}"
+
+    @staticmethod
+    def _parse_start(value: object) -> float | None:
+        return float(value) if isinstance(value, (bytes, str)) else None
+
+    def start_crawl(self, start: float) -> bool:
+        """Commits the states staged by the previous crawl if its index attempt
+        succeeded and discards them otherwise. Returns whether the crawl starting
+        at `start` can skip the pages that didn't change since the committed one."""
+        try:
+            redis_client = get_redis_client()
+            staged_start = self._parse_start(redis_client.get(self._staged_crawl_key))
+            if staged_start is not None and start > staged_start:
+                staged_states = cast(
+                    dict[bytes | str, bytes | str],
+                    redis_client.hgetall(self._staged_pages_key),
+                )
+                if staged_states:
+                    redis_client.hset(self._pages_key, mapping=staged_states)
+                    redis_client.expire(
+                        self._pages_key, WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS
+                    )
+                redis_client.set(
+                    self._crawl_key,
+                    str(staged_start),
+                    ex=WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS,
+                )
+            # multi key deletes are only prefixed for the first key
+            redis_client.delete(self._staged_pages_key)
+            redis_client.delete(self._staged_crawl_key)
+
+            committed_start = self._parse_start(redis_client.get(self._crawl_key))
+        except Exception as e:
+            logger.warning(f"Failed to load web crawl state from redis: {e}")
+            return False
+
+        return committed_start is not None and start > committed_start
+
+    def load(self) -> dict[str, PageState]:
+        """Returns the committed states."""
+        try:
+            raw_states = cast(
+                dict[bytes | str, bytes | str],
+                get_redis_client().hgetall(self._pages_key),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load web page states from redis: {e}")
+            return {}
+
+        states: dict[str, PageState] = {}
+        for raw_url, raw_state in raw_states.items():
+            url = raw_url.decode("utf-8") if isinstance(raw_url, bytes) else raw_url
+            try:
+                states[url] = PageState.model_validate_json(raw_state)
+            except ValueError:
+                continue
+        return states
+
+    def stage(self, states: Mapping[str, PageState]) -> None:
+        if not states:
+            return
+        try:
+            redis_client = get_redis_client()
+            redis_client.hset(
+                self._staged_pages_key,
+                mapping={url: state.model_dump_json() for url, state in states.items()},
+            )
+            redis_client.expire(
+                self._staged_pages_key, WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"Failed to stage web page states in redis: {e}")
+
+    def delete(self, urls: list[str]) -> None:
+        """Pages that no longer exist. Forgetting a state is always safe, the page
+        is just fetched in full next time."""
+        if not urls:
+            return
+        try:
+            redis_client = get_redis_client()
+            redis_client.hdel(self._pages_key, *urls)
+            redis_client.hdel(self._staged_pages_key, *urls)
+        except Exception as e:
+            logger.warning(f"Failed to delete web page states from redis: {e}")
+
+    def finish_crawl(self, start: float) -> None:
+        """Marks the staged states as complete, they are committed by the next poll
+        if this one's index attempt succeeds."""
+        try:
+            get_redis_client().set(
+                self._staged_crawl_key,
+                str(start),
+                ex=WEB_CONNECTOR_PAGE_STATE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save web crawl state to redis: {e}")
+
+
+class WebCrawlStats:
+    """Only updated from the thread driving the crawl."""
+
+    def __init__(self) -> None:
+        self.pages = 0
+        self.static = 0
+        self.rendered = 0
+        self.not_modified = 0
+        self.failed = 0
+        self.docs = 0
+        self._start = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.not_modified / self.pages if self.pages else 0.0
+
+    def log(self, base_url: str, finished: bool) -> None:
+        logger.info(
+            f"event=web_crawl "
+            f"base_url={base_url} "
+            f"finished={finished} "
+            f"pages={self.pages} "
+            f"static={self.static} "
+            f"rendered={self.rendered} "
+            f"not_modified={self.not_modified} "
+            f"failed={self.failed} "
+            f"docs={self.docs} "
+            f"elapsed={self.elapsed:.1f} "
+            f"pages_per_sec={self.pages_per_second:.2f} "
+            f"skip_rate={self.skip_rate:.2f}"
+        )
@@ -4,7 +4,6 @@ from datetime import timedelta
 from typing import Any
 
 from langchain_core.messages import HumanMessage
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from sqlalchemy.orm import Session
 
@@ -15,6 +14,7 @@ from alvio.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from alvio.connectors.models import IndexingDocument
 from alvio.connectors.models import TextSection
 from alvio.context.search.federated.models import SlackMessage
+from alvio.context.search.federated.slack_search_client import SlackSearchClient
 from alvio.context.search.models import InferenceChunk
 from alvio.context.search.models import SearchQuery
 from alvio.db.document import DocumentSource
@@ -47,6 +47,7 @@ def _should_skip_channel(
     bot_token: str | None,
     access_token: str,
     include_dm: bool,
+    slack_client: SlackSearchClient | None = None,
 ) -> bool:
     """
     Determine if a channel should be skipped if in bot context. When an allowed_private_channel is passed in,
@@ -54,14 +55,11 @@ def _should_skip_channel(
     """
     if bot_token and not include_dm:
         try:
-            # Use bot token if available (has full permissions), otherwise fall back to user token
-            token_to_use = bot_token or access_token
-            channel_client = WebClient(token=token_to_use)
-            channel_info = channel_client.conversations_info(channel=channel_id)
-
-            if isinstance(channel_info.data, dict) and not _is_public_channel(
-                channel_info.data
-            ):
+            # Uses the bot token (has full permissions)
+            slack_client = slack_client or SlackSearchClient(access_token, bot_token)
+            channel_info = slack_client.get_channel_info(channel_id)
+
+            if not _is_public_channel(channel_info):
                 # This is a private channel - filter it out
                 if channel_id != allowed_private_channel:
                     logger.debug(
@@ -129,14 +127,12 @@ def query_slack(
     allowed_private_channel: str | None = None,
     bot_token: str | None = None,
     include_dm: bool = False,
+    slack_client: SlackSearchClient | None = None,
 ) -> list[SlackMessage]:
     # query slack
-    slack_client = WebClient(token=access_token)
+    slack_client = slack_client or SlackSearchClient(access_token, bot_token)
     try:
-        response = slack_client.search_messages(
-            query=query_string, count=limit, highlight=True
-        )
-        response.validate()
+        response = slack_client.search_messages(query_string, limit)
         messages: dict[str, Any] = response.get("messages", {})
         matches: list[dict[str, Any]] = messages.get("matches", [])
         logger.info(f"Successfully used search_messages, found {len(matches)} messages")
@@ -182,7 +178,12 @@ def query_slack(
 
         # Apply channel filtering if needed
         if _should_skip_channel(
-            channel_id, allowed_private_channel, bot_token, access_token, include_dm
+            channel_id,
+            allowed_private_channel,
+            bot_token,
+            access_token,
+            include_dm,
+            slack_client,
         ):
             filtered_count += 1
             continue
@@ -276,7 +277,11 @@ def merge_slack_messages(
     return merged_messages, docid_to_message
 
 
-def get_contextualized_thread_text(message: SlackMessage, access_token: str) -> str:
+def get_contextualized_thread_text(
+    message: SlackMessage,
+    access_token: str,
+    slack_client: SlackSearchClient | None = None,
+) -> str:
     """
     Retrieves the initial thread message as well as the text following the message
     and combines them into a single string. If the slack query fails, returns the
@@ -295,14 +300,9 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
         return message.text
 
     # get the thread messages
-    slack_client = WebClient(token=access_token)
+    slack_client = slack_client or SlackSearchClient(access_token)
     try:
-        response = slack_client.conversations_replies(
-            channel=channel_id,
-            ts=thread_id,
-        )
-        response.validate()
-        messages: list[dict[str, Any]] = response.get("messages", [])
+        messages = slack_client.get_thread_messages(channel_id, thread_id)
     except SlackApiError as e:
         logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
         return message.text
@@ -351,10 +351,7 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
     userids: set[str] = set(re.findall(r"<@([A-Z0-9]+)>", thread_text))
     for userid in userids:
         try:
-            response = slack_client.users_profile_get(user=userid)
-            response.validate()
-            profile: dict[str, Any] = response.get("profile", {})
-            name: str | None = profile.get("real_name") or profile.get("email")
+            name = slack_client.get_user_name(userid)
         except SlackApiError as e:
             logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
             continue
@@ -400,6 +397,9 @@ def slack_retrieval(
                 f"Private channel context: will only allow messages from {allowed_private_channel} + public channels"
             )
 
+    # shared by all the lookups of this search, so the same channel / thread / user
+    # is only looked up once
+    slack_client = SlackSearchClient(access_token, bot_token)
     results = run_functions_tuples_in_parallel(
         [
             (
@@ -412,6 +412,7 @@ def slack_retrieval(
                     allowed_private_channel,
                     bot_token,
                     include_dm,
+                    slack_client,
                 ),
             )
             for query_string in query_strings
@@ -420,14 +421,19 @@ def slack_retrieval(
     slack_messages, docid_to_message = merge_slack_messages(results)
     slack_messages = slack_messages[: limit or len(slack_messages)]
     if not slack_messages:
+        slack_client.stats.log()
         return []
 
     thread_texts: list[str] = run_functions_tuples_in_parallel(
         [
-            (get_contextualized_thread_text, (slack_message, access_token))
+            (
+                get_contextualized_thread_text,
+                (slack_message, access_token, slack_client),
+            )
             for slack_message in slack_messages
         ]
     )
+    slack_client.stats.log()
     for slack_message, thread_text in zip(slack_messages, thread_texts):
         slack_message.text = thread_text
 
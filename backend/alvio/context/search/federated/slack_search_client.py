@@ -0,0 +1,241 @@
+"""Slack API access for one federated Slack search.
+
+A search runs several Slack queries in parallel and then looks up the thread (and
+the names of its participants) of every matched message, and the type of the
+channel of every message when answering in a bot context. The same channels,
+threads and users come up again and again, both within a search and across the
+searches of a conversation, so:
+
+- every lookup is done at most once per search, concurrent requests for the same
+  lookup wait for the one in flight
+- thread and user lookups are cached in redis (tenant scoped through
+  `get_redis_client`), keyed by a hash of the token they were made with so results
+  are never shared between users. Redis errors are logged and treated as cache
+  misses. Channel lookups decide which private channels are filtered out of the
+  results, so they are never cached beyond the search
+- one WebClient per token is shared by the whole search and retries rate limited
+  calls, honoring Retry-After
+"""
+
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+from slack_sdk import WebClient
+from slack_sdk.http_retry import RateLimitErrorRetryHandler
+from slack_sdk.web import SlackResponse
+
+from alvio.configs.app_configs import SLACK_FEDERATED_RATE_LIMIT_MAX_RETRIES
+from alvio.configs.app_configs import SLACK_FEDERATED_SEARCH_CACHE_ENABLED
+from alvio.configs.app_configs import SLACK_FEDERATED_THREAD_CACHE_TTL_SECONDS
+from alvio.configs.app_configs import SLACK_FEDERATED_USER_CACHE_TTL_SECONDS
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_CACHE_KEY_PREFIX = "federated_slack"
+# only these fields of thread messages are used
+_THREAD_MESSAGE_FIELDS = ("ts", "user", "text")
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class SlackSearchStats:
+    """Thread safe, shared by the threads of one search."""
+
+    def __init__(self) -> None:
+        self.api_calls: dict[str, int] = defaultdict(int)
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+
+    def record_api_call(self, method: str) -> None:
+        with self._lock:
+            self.api_calls[method] += 1
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_deduplicated(self) -> None:
+        with self._lock:
+            self.deduplicated += 1
+
+    @property
+    def total_api_calls(self) -> int:
+        return sum(self.api_calls.values())
+
+    def log(self) -> None:
+        api_calls = " ".join(
+            f"{method}={count}" for method, count in sorted(self.api_calls.items())
+        )
+        logger.info(
+            f"event=slack_federated_search "
+            f"api_calls={self.total_api_calls} "
+            f"{api_calls + ' ' if api_calls else ''}"
+            f"cache_hits={self.cache_hits} "
+            f"deduplicated={self.deduplicated}"
+        )
+
+
+class SlackSearchClient:
+    """Must not outlive the search it was created for, the lookups it already did
+    are kept in memory."""
+
+    def __init__(self, access_token: str, bot_token: str | None = None) -> None:
+        self.stats = SlackSearchStats()
+        self._access_token = access_token
+        self._bot_token = bot_token
+        self._clients: dict[str, WebClient] = {}
+        self._lookups: dict[str, Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, token: str) -> WebClient:
+        with self._lock:
+            if token not in self._clients:
+                self._clients[token] = WebClient(
+                    token=token,
+                    retry_handlers=[
+                        RateLimitErrorRetryHandler(
+                            max_retry_count=SLACK_FEDERATED_RATE_LIMIT_MAX_RETRIES
+                        )
+                    ],
+                )
+            return self._clients[token]
+
+    def _client_for_call(self, token: str, method: str) -> WebClient:
+        self.stats.record_api_call(method)
+        return self._get_client(token)
+
+    def _lookup(self, key: str, ttl: int | None, fetch: Callable[[], T]) -> T:
+        """Returns the result of `fetch` (which must be JSON serializable) for
+        `key`, from this search's earlier lookups, redis or `fetch` itself. Redis
+        is skipped if there is no `ttl`. Failures are neither cached nor shared
+        with later callers."""
+        with self._lock:
+            future = self._lookups.get(key)
+            is_owner = future is None or (
+                future.done() and future.exception() is not None
+            )
+            if is_owner:
+                future = Future()
+                self._lookups[key] = future
+        assert future is not None
+
+        if not is_owner:
+            self.stats.record_deduplicated()
+            return cast(T, future.result())
+
+        try:
+            cached = self._cache_get(key) if ttl is not None else None
+            if cached is not None:
+                self.stats.record_cache_hit()
+                result = cast(T, cached)
+            else:
+                result = fetch()
+                if ttl is not None:
+                    self._cache_set(key, result, ttl)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        future.set_result(result)
+        return result
+
+    @staticmethod
+    def _cache_get(key: str) -> Any:
+        if not SLACK_FEDERATED_SEARCH_CACHE_ENABLED:
+            return None
+        try:
+            value = get_redis_client().get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read slack lookup from redis: {e}")
+            return None
+        return json.loads(value) if isinstance(value, bytes) else None
+
+    @staticmethod
+    def _cache_set(key: str, value: Any, ttl: int) -> None:
+        if not SLACK_FEDERATED_SEARCH_CACHE_ENABLED:
+            return
+        try:
+            get_redis_client().set(key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Failed to write slack lookup to redis: {e}")
+
+    @staticmethod
+    def _cache_key(kind: str, token: str, *parts: str) -> str:
+        return ":".join((_CACHE_KEY_PREFIX, kind, _hash_token(token), *parts))
+
+    def search_messages(self, query: str, count: int | None) -> SlackResponse:
+        """Never cached, search results depend on the query and change constantly."""
+        response = self._client_for_call(
+            self._access_token, "search.messages"
+        ).search_messages(query=query, count=count, highlight=True)
+        response.validate()
+        return response
+
+    def get_channel_info(self, channel_id: str) -> dict[str, Any]:
+        """Uses the bot token if there is one (it has full permissions). Only
+        shared within the search, a channel that turned private must be filtered
+        out right away."""
+        token = self._bot_token or self._access_token
+
+        def fetch() -> dict[str, Any]:
+            response = self._client_for_call(
+                token, "conversations.info"
+            ).conversations_info(channel=channel_id)
+            response.validate()
+            return {"channel": response.get("channel", {})}
+
+        return self._lookup(
+            self._cache_key("channel", token, channel_id),
+            None,
+            fetch,
+        )
+
+    def get_thread_messages(
+        self, channel_id: str, thread_ts: str
+    ) -> list[dict[str, Any]]:
+        def fetch() -> list[dict[str, Any]]:
+            response = self._client_for_call(
+                self._access_token, "conversations.replies"
+            ).conversations_replies(channel=channel_id, ts=thread_ts)
+            response.validate()
+            messages: list[dict[str, Any]] = response.get("messages", [])
+            return [
+                {field: msg[field] for field in _THREAD_MESSAGE_FIELDS if field in msg}
+                for msg in messages
+            ]
+
+        return self._lookup(
+            self._cache_key("thread", self._access_token, channel_id, thread_ts),
+            SLACK_FEDERATED_THREAD_CACHE_TTL_SECONDS,
+            fetch,
+        )
+
+    def get_user_name(self, user_id: str) -> str | None:
+        def fetch() -> str:
+            response = self._client_for_call(
+                self._access_token, "users.profile.get"
+            ).users_profile_get(user=user_id)
+            response.validate()
+            profile: dict[str, Any] = response.get("profile", {})
+            return profile.get("real_name") or profile.get("email") or ""
+
+        name = self._lookup(
+            self._cache_key("user", self._access_token, user_id),
+            SLACK_FEDERATED_USER_CACHE_TTL_SECONDS,
+            fetch,
+        )
+        return name or None
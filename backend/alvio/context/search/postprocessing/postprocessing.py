@@ -25,13 +25,13 @@ from alvio.context.search.models import MAX_METRICS_CONTENT
 from alvio.context.search.models import RerankingDetails
 from alvio.context.search.models import RerankMetricsContainer
 from alvio.context.search.models import SearchQuery
+from alvio.context.search.postprocessing.reranking import get_rerank_scores
 from alvio.document_index.document_index_utils import (
     translate_boost_count_to_multiplier,
 )
 from alvio.file_store.file_store import get_default_file_store
 from alvio.llm.interfaces import LLM
 from alvio.llm.utils import message_to_string
-from alvio.natural_language_processing.search_nlp_models import RerankingModel
 from alvio.secondary_llm_flows.chunk_usefulness import llm_batch_eval_sections
 from alvio.utils.logger import setup_logger
 from alvio.utils.threadpool_concurrency import FunctionCall
@@ -229,25 +229,12 @@ def semantic_reranking(
 
     Note: this updates the chunks in place, it updates the chunk scores which came from retrieval
     """
-    assert (
-        rerank_settings.rerank_model_name
-    ), "Reranking flow cannot run without a specific model"
-
     chunks_to_rerank = chunks[: rerank_settings.num_rerank]
 
-    cross_encoder = RerankingModel(
-        model_name=rerank_settings.rerank_model_name,
-        provider_type=rerank_settings.rerank_provider_type,
-        api_key=rerank_settings.rerank_api_key,
-        api_url=rerank_settings.rerank_api_url,
+    sim_scores_floats = get_rerank_scores(
+        query=query_str, chunks=chunks_to_rerank, rerank_settings=rerank_settings
     )
 
-    passages = [
-        f"{chunk.semantic_identifier or chunk.title or ''}\n{chunk.content}"
-        for chunk in chunks_to_rerank
-    ]
-    sim_scores_floats = cross_encoder.predict(query=query_str, passages=passages)
-
     # Old logic to handle multiple cross-encoders preserved but not used
     sim_scores = [numpy.array(sim_scores_floats)]
 
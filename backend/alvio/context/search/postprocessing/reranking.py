@@ -0,0 +1,210 @@
+"""Cross-encoder scoring for semantic reranking.
+
+Agent flows and query expansions rerank heavily overlapping chunk sets for the same
+(or near identical) queries. Scores only depend on the model, the query and the
+passage, so they are cached per process and only the chunks missing from the cache
+are scored. Keys contain the passage hash next to the chunk id so re-indexed chunks
+are scored again.
+
+Passages sent to the model server are split into shards that are scored
+concurrently, API providers get all missing passages in a single call.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import cast
+
+from alvio.configs.model_configs import RERANK_MAX_CONCURRENT_SHARDS
+from alvio.configs.model_configs import RERANK_SCORE_CACHE_ENABLED
+from alvio.configs.model_configs import RERANK_SCORE_CACHE_MAX_ENTRIES
+from alvio.configs.model_configs import RERANK_SCORE_CACHE_TTL_SECONDS
+from alvio.configs.model_configs import RERANK_SHARD_SIZE
+from alvio.context.search.models import InferenceChunk
+from alvio.context.search.models import RerankingDetails
+from alvio.context.search.query_embedding_cache import normalize_query_for_cache
+from alvio.natural_language_processing.search_nlp_models import RerankingModel
+from alvio.utils.logger import setup_logger
+from alvio.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.utils import batch_list
+
+logger = setup_logger()
+
+
+class _ScoreLRU:
+    """Thread safe LRU with a per entry TTL, read and written a batch at a time."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> list[float | None]:
+        now = time.monotonic()
+        scores: list[float | None] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    scores.append(None)
+                    continue
+
+                expires_at, score = entry
+                if expires_at < now:
+                    del self._entries[key]
+                    scores.append(None)
+                    continue
+
+                self._entries.move_to_end(key)
+                scores.append(score)
+        return scores
+
+    def set_many(self, items: dict[str, float]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, score in items.items():
+                self._entries[key] = (expires_at, score)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _RerankStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_SCORE_CACHE = _ScoreLRU(
+    max_entries=RERANK_SCORE_CACHE_MAX_ENTRIES,
+    ttl_seconds=RERANK_SCORE_CACHE_TTL_SECONDS,
+)
+RERANK_STATS = _RerankStats()
+
+
+def build_rerank_passage(chunk: InferenceChunk) -> str:
+    return f"{chunk.semantic_identifier or chunk.title or ''}\n{chunk.content}"
+
+
+def _build_key_prefix(query: str, rerank_settings: RerankingDetails) -> str:
+    model_fingerprint = hashlib.sha256(
+        f"{rerank_settings.rerank_provider_type}|{rerank_settings.rerank_model_name}|"
+        f"{rerank_settings.rerank_api_url or ''}".encode()
+    ).hexdigest()[:16]
+    query_hash = hashlib.sha256(
+        normalize_query_for_cache(query).encode("utf-8")
+    ).hexdigest()
+    # the cache is shared by every tenant served by this process
+    return f"{get_current_tenant_id()}:{model_fingerprint}:{query_hash}"
+
+
+def _build_chunk_key(key_prefix: str, chunk: InferenceChunk, passage: str) -> str:
+    passage_hash = hashlib.sha256(passage.encode("utf-8")).hexdigest()[:16]
+    return f"{key_prefix}:{chunk.unique_id}:{passage_hash}"
+
+
+def _score_passages(
+    cross_encoder: RerankingModel, query: str, passages: list[str]
+) -> tuple[list[float], int]:
+    """Returns the scores of `passages` (in order) and the number of requests used."""
+    # API providers bill per request and do their own batching
+    if cross_encoder.provider_type is not None or len(passages) <= RERANK_SHARD_SIZE:
+        return cross_encoder.predict(query=query, passages=passages), 1
+
+    shards = batch_list(passages, RERANK_SHARD_SIZE)
+    shard_scores: list[list[float]] = run_functions_tuples_in_parallel(
+        [(cross_encoder.predict, (query, shard)) for shard in shards],
+        max_workers=RERANK_MAX_CONCURRENT_SHARDS,
+    )
+    return [score for scores in shard_scores for score in scores], len(shards)
+
+
+def get_rerank_scores(
+    query: str,
+    chunks: list[InferenceChunk],
+    rerank_settings: RerankingDetails,
+) -> list[float]:
+    """Returns the cross-encoder score of every chunk, in order, only scoring the
+    chunks that are not cached yet."""
+    assert (
+        rerank_settings.rerank_model_name
+    ), "Reranking flow cannot run without a specific model"
+
+    start = time.monotonic()
+    cross_encoder = RerankingModel(
+        model_name=rerank_settings.rerank_model_name,
+        provider_type=rerank_settings.rerank_provider_type,
+        api_key=rerank_settings.rerank_api_key,
+        api_url=rerank_settings.rerank_api_url,
+    )
+    passages = [build_rerank_passage(chunk) for chunk in chunks]
+
+    if RERANK_SCORE_CACHE_ENABLED:
+        key_prefix = _build_key_prefix(query, rerank_settings)
+        keys = [
+            _build_chunk_key(key_prefix, chunk, passage)
+            for chunk, passage in zip(chunks, passages)
+        ]
+        scores = _SCORE_CACHE.get_many(keys)
+    else:
+        keys = []
+        scores = [None] * len(chunks)
+
+    # cache key (or position if the cache is disabled) -> positions to fill in
+    missing: dict[str | int, list[int]] = {}
+    for ind, score in enumerate(scores):
+        if score is None:
+            missing.setdefault(keys[ind] if keys else ind, []).append(ind)
+
+    num_requests = 0
+    if missing:
+        missing_positions = list(missing.values())
+        computed, num_requests = _score_passages(
+            cross_encoder,
+            query,
+            [passages[positions[0]] for positions in missing_positions],
+        )
+        for positions, score in zip(missing_positions, computed):
+            for ind in positions:
+                scores[ind] = score
+        if keys:
+            _SCORE_CACHE.set_many(
+                {
+                    keys[positions[0]]: score
+                    for positions, score in zip(missing_positions, computed)
+                }
+            )
+
+    hits = len(chunks) - sum(len(positions) for positions in missing.values())
+    RERANK_STATS.record(hits, len(missing))
+    logger.info(
+        f"event=rerank "
+        f"model={rerank_settings.rerank_model_name} "
+        f"chunks={len(chunks)} "
+        f"cache_hits={hits} "
+        f"scored={len(missing)} "
+        f"requests={num_requests} "
+        f"elapsed={time.monotonic() - start:.3f} "
+        f"request_hit_rate={hits / len(chunks) if chunks else 0.0:.2f} "
+        f"hit_rate={RERANK_STATS.hit_rate:.2f}"
+    )
+
+    return cast(list[float], scores)
@@ -0,0 +1,216 @@
+"""Two level cache for query embeddings.
+
+Search flows (Slack bot, agent search, multilingual rephrases, keyword/semantic
+expansions) re-embed the same queries constantly. Embeddings are cached first in a
+per-process LRU and then in Redis (tenant scoped through `get_redis_client`).
+
+Keys contain the search settings id, model name and query prefix, so once the
+search settings are swapped the old entries are simply never read again; Redis
+entries for the old settings are additionally purged on swap.
+"""
+
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import cast
+
+import numpy as np
+
+from alvio.configs.model_configs import QUERY_EMBEDDING_CACHE_ENABLED
+from alvio.configs.model_configs import QUERY_EMBEDDING_CACHE_LOCAL_MAX_ENTRIES
+from alvio.configs.model_configs import QUERY_EMBEDDING_CACHE_LOCAL_TTL_SECONDS
+from alvio.configs.model_configs import QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS
+from alvio.db.models import SearchSettings
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "query_embedding"
+
+
+class _LocalEmbeddingLRU:
+    """Thread safe LRU with a per entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Embedding]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Embedding | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, embedding = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return embedding
+
+    def set(self, key: str, embedding: Embedding) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _CacheStats:
+    def __init__(self) -> None:
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, local_hits: int, redis_hits: int, misses: int) -> None:
+        with self._lock:
+            self.local_hits += local_hits
+            self.redis_hits += redis_hits
+            self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.local_hits + self.redis_hits + self.misses
+        return (self.local_hits + self.redis_hits) / total if total else 0.0
+
+
+_LOCAL_CACHE = _LocalEmbeddingLRU(
+    max_entries=QUERY_EMBEDDING_CACHE_LOCAL_MAX_ENTRIES,
+    ttl_seconds=QUERY_EMBEDDING_CACHE_LOCAL_TTL_SECONDS,
+)
+QUERY_EMBEDDING_CACHE_STATS = _CacheStats()
+
+
+def normalize_query_for_cache(query: str) -> str:
+    """Whitespace/unicode normalization only; casing can change the embedding."""
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+def _settings_key_prefix(search_settings_id: int) -> str:
+    return f"{_REDIS_KEY_PREFIX}:{search_settings_id}"
+
+
+def build_query_embedding_cache_key(search_settings: SearchSettings, query: str) -> str:
+    model_fingerprint = hashlib.sha256(
+        f"{search_settings.provider_type}|{search_settings.model_name}|"
+        f"{search_settings.query_prefix or ''}|{search_settings.normalize}|"
+        f"{search_settings.reduced_dimension}".encode()
+    ).hexdigest()[:16]
+    text_hash = hashlib.sha256(
+        normalize_query_for_cache(query).encode("utf-8")
+    ).hexdigest()
+    return f"{_settings_key_prefix(search_settings.id)}:{model_fingerprint}:{text_hash}"
+
+
+def _redis_get(key: str) -> Embedding | None:
+    try:
+        value = get_redis_client().get(key)
+    except Exception as e:
+        logger.warning(f"Failed to read query embedding from redis: {e}")
+        return None
+
+    if not isinstance(value, bytes):
+        return None
+    return np.frombuffer(value, dtype="<f4").tolist()
+
+
+def _redis_set(key: str, embedding: Embedding) -> None:
+    try:
+        get_redis_client().set(
+            key,
+            np.asarray(embedding, dtype="<f4").tobytes(),
+            ex=QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to write query embedding to redis: {e}")
+
+
+def get_or_compute_query_embeddings(
+    queries: list[str],
+    search_settings: SearchSettings,
+    compute_embeddings: Callable[[list[str]], list[Embedding]],
+) -> list[Embedding]:
+    """Returns embeddings for `queries`, only calling `compute_embeddings` for the
+    (deduplicated) queries missing from both cache levels."""
+    if not QUERY_EMBEDDING_CACHE_ENABLED:
+        return compute_embeddings(queries)
+
+    tenant_id = get_current_tenant_id()
+    keys = [build_query_embedding_cache_key(search_settings, q) for q in queries]
+    results: list[Embedding | None] = [None] * len(queries)
+
+    local_hits = redis_hits = 0
+    # cache key -> positions in `queries` that still need an embedding
+    missing: dict[str, list[int]] = {}
+    for ind, key in enumerate(keys):
+        # the LRU is shared by every tenant served by this process
+        local_key = f"{tenant_id}:{key}"
+        embedding = _LOCAL_CACHE.get(local_key)
+        if embedding is not None:
+            local_hits += 1
+            results[ind] = embedding
+            continue
+
+        if key in missing:
+            missing[key].append(ind)
+            continue
+
+        embedding = _redis_get(key)
+        if embedding is not None:
+            redis_hits += 1
+            _LOCAL_CACHE.set(local_key, embedding)
+            results[ind] = embedding
+            continue
+
+        missing[key] = [ind]
+
+    if missing:
+        missing_keys = list(missing.keys())
+        computed = compute_embeddings([queries[missing[k][0]] for k in missing_keys])
+        for key, embedding in zip(missing_keys, computed):
+            _LOCAL_CACHE.set(f"{tenant_id}:{key}", embedding)
+            _redis_set(key, embedding)
+            for ind in missing[key]:
+                results[ind] = embedding
+
+    QUERY_EMBEDDING_CACHE_STATS.record(local_hits, redis_hits, len(missing))
+    logger.debug(
+        f"event=query_embedding_cache "
+        f"queries={len(queries)} "
+        f"local_hits={local_hits} "
+        f"redis_hits={redis_hits} "
+        f"misses={len(missing)} "
+        f"hit_rate={QUERY_EMBEDDING_CACHE_STATS.hit_rate:.2f}"
+    )
+
+    return cast(list[Embedding], results)
+
+
+def invalidate_query_embedding_cache(search_settings_id: int) -> None:
+    """Drops all cached query embeddings for the given search settings for the
+    current tenant."""
+    _LOCAL_CACHE.clear()
+    try:
+        redis_client = get_redis_client()
+        for key in redis_client.scan_iter(
+            match=f"{_settings_key_prefix(search_settings_id)}:*", count=1000
+        ):
+            redis_client.delete(key)
+    except Exception as e:
+        logger.warning(
+            f"Failed to purge query embedding cache for search settings {search_settings_id}: {e}"
+        )
@@ -12,6 +12,9 @@ from alvio.context.search.models import InferenceSection
 from alvio.context.search.models import SavedSearchDoc
 from alvio.context.search.models import SavedSearchDocWithContent
 from alvio.context.search.models import SearchDoc
+from alvio.context.search.query_embedding_cache import (
+    get_or_compute_query_embeddings,
+)
 from alvio.db.models import SearchDoc as DBSearchDoc
 from alvio.db.search_settings import get_current_search_settings
 from alvio.natural_language_processing.search_nlp_models import EmbeddingModel
@@ -138,15 +141,16 @@ def remove_stop_words_and_punctuation(keywords: list[str]) -> list[str]:
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
     search_settings = get_current_search_settings(db_session)
 
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
-    )
+    def _embed(uncached_queries: list[str]) -> list[Embedding]:
+        model = EmbeddingModel.from_db_model(
+            search_settings=search_settings,
+            # The below are globally set, this flow always uses the indexing one
+            server_host=MODEL_SERVER_HOST,
+            server_port=MODEL_SERVER_PORT,
+        )
+        return model.encode(uncached_queries, text_type=EmbedTextType.QUERY)
 
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
-    return query_embedding
+    return get_or_compute_query_embeddings(queries, search_settings, _embed)
 
 
 def get_query_embedding(query: str, db_session: Session) -> Embedding:
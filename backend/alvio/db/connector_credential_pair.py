@@ -597,6 +597,13 @@ def add_credential_to_connector(
 
     db_session.commit()
 
+    if access_type == AccessType.SYNC:
+        # the source may now need post query censoring
+        fetch_ee_implementation_or_noop(
+            "alvio.external_permissions.censoring_cache",
+            "invalidate_censoring_enabled_sources_cache",
+        )()
+
     return StatusResponse(
         success=True,
         message=f"Creating new association between Connector {connector_id} and Credential {credential_id}",
@@ -645,6 +652,15 @@ def remove_credential_from_connector(
         )
         db_session.delete(association)
         db_session.commit()
+        # the removed external group memberships may be part of cached user ACLs
+        fetch_ee_implementation_or_noop(
+            "alvio.access.acl_cache",
+            "invalidate_acl_cache",
+        )()
+        fetch_ee_implementation_or_noop(
+            "alvio.external_permissions.censoring_cache",
+            "invalidate_censoring_enabled_sources_cache",
+        )()
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
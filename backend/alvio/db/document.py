@@ -123,6 +123,25 @@ def construct_document_id_select_for_connector_credential_pair(
     return stmt
 
 
+def construct_sorted_document_id_select_for_connector_credential_pair(
+    connector_id: int, credential_id: int | None = None
+) -> Select:
+    """Document IDs of the cc_pair in ascending code point order (the "C" collation),
+    which matches how Python sorts strings."""
+    initial_doc_ids_stmt = select(DocumentByConnectorCredentialPair.id).where(
+        and_(
+            DocumentByConnectorCredentialPair.connector_id == connector_id,
+            DocumentByConnectorCredentialPair.credential_id == credential_id,
+        )
+    )
+    stmt = (
+        select(DbDocument.id)
+        .where(DbDocument.id.in_(initial_doc_ids_stmt))
+        .order_by(DbDocument.id.collate("C"))
+    )
+    return stmt
+
+
 def construct_document_select_for_connector_credential_pair(
     connector_id: int, credential_id: int | None = None
 ) -> Select:
@@ -611,6 +630,22 @@ def update_docs_chunk_count__no_commit(
         doc.chunk_count = doc_id_to_chunk_count[doc.id]
 
 
+def update_docs_chunk_content_hashes__no_commit(
+    doc_id_to_chunk_content_hashes: dict[str, list[str] | None],
+    db_session: Session,
+) -> None:
+    if not doc_id_to_chunk_content_hashes:
+        return
+
+    documents_to_update = (
+        db_session.query(DbDocument)
+        .filter(DbDocument.id.in_(list(doc_id_to_chunk_content_hashes)))
+        .all()
+    )
+    for doc in documents_to_update:
+        doc.chunk_content_hashes = doc_id_to_chunk_content_hashes[doc.id]
+
+
 def mark_document_as_modified(
     document_id: str,
     db_session: Session,
@@ -625,6 +660,19 @@ def mark_document_as_modified(
     db_session.commit()
 
 
+def mark_documents_as_modified(
+    document_ids: list[str],
+    db_session: Session,
+) -> None:
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_modified=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     stmt = select(DbDocument).where(DbDocument.id == document_id)
     doc = db_session.scalar(stmt)
@@ -636,6 +684,16 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -3,10 +3,16 @@ from datetime import datetime
 from datetime import timezone
 from typing import List
 
+from sqlalchemy import and_
+from sqlalchemy import Boolean
 from sqlalchemy import func
+from sqlalchemy import Integer
 from sqlalchemy import literal
+from sqlalchemy import or_
 from sqlalchemy import select
+from sqlalchemy import String
 from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
@@ -20,6 +26,7 @@ from alvio.db.models import KGEntityType
 from alvio.kg.models import KGGroundingType
 from alvio.kg.models import KGStage
 from alvio.kg.utils.formatting_utils import make_entity_id
+from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
 
 
 def upsert_staging_entity(
@@ -232,6 +239,71 @@ def merge_entities(
     return result
 
 
+def get_similar_entities_for_names(
+    db_session: Session,
+    entity_type_id_name: str,
+    names: list[str],
+    exclude_document_entities: list[bool],
+    similarity_threshold: float,
+) -> list[list[KGEntity]]:
+    """Find the entities of one entity type with a name trigram-similar to each of
+    the given names, in a single query using the GIN index on the entity name.
+
+    Args:
+        db_session: SQLAlchemy session
+        entity_type_id_name: Entity type the entities must have
+        names: Names to find similar entities for
+        exclude_document_entities: Per name, whether to skip entities that already
+            have a document_id
+        similarity_threshold: pg_trgm similarity threshold
+
+    Returns:
+        For each name, the list of similar entities
+    """
+    if not names:
+        return []
+
+    # is_local, only applies to the current transaction
+    db_session.execute(
+        select(
+            func.set_config(
+                "pg_trgm.similarity_threshold", str(similarity_threshold), True
+            )
+        )
+    )
+    queries = (
+        func.unnest(
+            literal(list(range(len(names))), ARRAY(Integer)),
+            literal(names, ARRAY(String)),
+            literal(exclude_document_entities, ARRAY(Boolean)),
+        )
+        .table_valued("ind", "name", "exclude_document_entities")
+        .render_derived(name="queries")
+    )
+    stmt = (
+        select(queries.c.ind, KGEntity)
+        .select_from(queries)
+        .join(
+            KGEntity,
+            and_(
+                KGEntity.entity_type_id_name == entity_type_id_name,
+                KGEntity.name.op(f"OPERATOR({POSTGRES_DEFAULT_SCHEMA}.%)")(
+                    queries.c.name
+                ),
+                or_(
+                    queries.c.exclude_document_entities.is_(False),
+                    KGEntity.document_id.is_(None),
+                ),
+            ),
+        )
+    )
+
+    similar_entities: list[list[KGEntity]] = [[] for _ in names]
+    for ind, entity in db_session.execute(stmt):
+        similar_entities[ind].append(entity)
+    return similar_entities
+
+
 def get_kg_entity_by_document(db: Session, document_id: str) -> KGEntity | None:
     """
     Check if a document_id exists in the kg_entities table and return its id_name if found.
@@ -1,4 +1,5 @@
 from sqlalchemy import and_
+from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -81,6 +82,9 @@ def upsert_filerecord(
         filestore.file_metadata = file_metadata
         filestore.bucket_name = bucket_name
         filestore.object_key = object_key
+        # the object was (re)written even if none of the fields changed, and the
+        # local file cache keys on updated_at
+        filestore.updated_at = func.now()
     else:
         filestore = FileRecord(
             file_id=file_id,
@@ -573,6 +573,12 @@ class Document(Base):
     # Only null for documents indexed prior to this change
     chunk_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
+    # Content hash of every chunk (in Vespa) in chunk order, used to skip re-embedding
+    # documents whose chunks did not change. Null if unknown
+    chunk_content_hashes: Mapped[list[str] | None] = mapped_column(
+        postgresql.ARRAY(String), nullable=True
+    )
+
     # last time any vespa relevant row metadata or the doc changed.
     # does not include last_synced
     last_modified: Mapped[datetime.datetime | None] = mapped_column(
@@ -2073,6 +2079,8 @@ class ChatSession(Base):
     )
     persona: Mapped["Persona"] = relationship("Persona")
 
+    __table_args__ = (Index("ix_chat_session_time_created_id", time_created, id),)
+
 
 class ChatMessage(Base):
     """Note, the first message in a chain has no contents, it's a workaround to allow edits
@@ -2087,7 +2095,7 @@ class ChatMessage(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     chat_session_id: Mapped[UUID] = mapped_column(
-        PGUUID(as_uuid=True), ForeignKey("chat_session.id")
+        PGUUID(as_uuid=True), ForeignKey("chat_session.id"), index=True
     )
 
     alternate_assistant_id = mapped_column(
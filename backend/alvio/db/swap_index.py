@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 
 from alvio.configs.app_configs import VESPA_NUM_ATTEMPTS_ON_STARTUP
 from alvio.configs.constants import KV_REINDEX_KEY
+from alvio.context.search.query_embedding_cache import (
+    invalidate_query_embedding_cache,
+)
 from alvio.db.connector_credential_pair import get_connector_credential_pairs
 from alvio.db.connector_credential_pair import resync_cc_pair
 from alvio.db.document import delete_all_documents_for_connector_credential_pair
@@ -74,6 +77,9 @@ def _perform_index_swap(
         db_session=db_session,
     )
 
+    # embeddings from the old model must never be used against the new index
+    invalidate_query_embedding_cache(search_settings_id=current_search_settings.id)
+
     # remove the old index from the vector db
     document_index = get_default_document_index(secondary_search_settings, None)
 
@@ -102,12 +102,17 @@ class VespaDocumentFields:
     understandable like this for now.
     """
 
-    # all other fields except these 4 will always be left alone by the update request
+    # all other fields except these will always be left alone by the update request
     access: DocumentAccess | None = None
     document_sets: set[str] | None = None
     boost: float | None = None
     hidden: bool | None = None
     aggregated_chunk_boost_factor: float | None = None
+    # document level fields that don't affect the chunk contents, updated when a
+    # document is re-indexed without any changes to its chunks
+    doc_updated_at: datetime | None = None
+    primary_owners: list[str] | None = None
+    secondary_owners: list[str] | None = None
 
 
 @dataclass
@@ -255,6 +260,25 @@ class Deletable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def delete_multiple(
+        self,
+        doc_id_to_chunk_count: dict[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        """
+        Hard deletes several documents from the document index. Equivalent to calling
+        delete_single for every document but lets the implementation batch the requests.
+
+        Parameters:
+        - doc_id_to_chunk_count: the chunk count of each document, None if unknown
+
+        Return:
+            the number of chunks deleted for each document
+        """
+        raise NotImplementedError
+
 
 class Updatable(abc.ABC):
     """
@@ -292,6 +316,29 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def update_multiple(
+        self,
+        doc_id_to_fields: dict[str, VespaDocumentFields],
+        *,
+        tenant_id: str,
+        doc_id_to_chunk_count: dict[str, int | None],
+    ) -> dict[str, int]:
+        """
+        Updates all chunks of several documents, each with its own fields. Equivalent to
+        calling update_single for every document but lets the implementation batch the
+        requests.
+
+        Parameters:
+        - doc_id_to_fields: the fields to update for each document. Any field set to None
+                will not be changed.
+        - doc_id_to_chunk_count: the chunk count of each document, None if unknown
+
+        Return:
+            the number of chunks updated for each document
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def update(self, update_requests: list[UpdateRequest], *, tenant_id: str) -> None:
         """
@@ -4,6 +4,7 @@ from uuid import UUID
 import httpx
 from retry import retry
 
+from alvio.document_index.vespa.feed_client import VespaFeedOperation
 from alvio.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from alvio.document_index.vespa_constants import NUM_THREADS
 from alvio.utils.logger import setup_logger
@@ -59,3 +60,17 @@ def delete_vespa_chunks(
     finally:
         if not external_executor:
             executor.shutdown(wait=True)
+
+
+def build_delete_feed_operations(
+    doc_chunk_ids: list[UUID], index_name: str, document_id: str | None = None
+) -> list[VespaFeedOperation]:
+    """Async feed counterpart of `delete_vespa_chunks`."""
+    return [
+        VespaFeedOperation(
+            method="DELETE",
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
+            document_id=document_id or str(doc_chunk_id),
+        )
+        for doc_chunk_id in doc_chunk_ids
+    ]
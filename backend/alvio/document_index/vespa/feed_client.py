@@ -0,0 +1,314 @@
+"""Async feed client for the Vespa /document/v1 API.
+
+Vespa has no batch endpoint for puts/updates/removes, so throughput depends on how
+many operations are in flight at once. Instead of one blocking request per thread,
+all operations are sent from a single asyncio loop over a few HTTP/2 connections.
+The loop runs in a background thread and it and its HTTP/2 client live as long as
+the process, so small feeds don't pay for a new loop and new connections.
+The number of in-flight operations is adapted AIMD style: it grows while Vespa keeps
+up and is halved whenever Vespa throttles (429/503/507).
+
+Failed operations raise the same exceptions as the threaded path: the last
+httpx.TransportError, or httpx.HTTPStatusError for an error response.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+
+from alvio.configs.app_configs import VESPA_ASYNC_FEED_ENABLED
+from alvio.configs.app_configs import VESPA_FEED_MAX_CONNECTIONS
+from alvio.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from alvio.configs.app_configs import VESPA_FEED_MAX_RETRIES
+from alvio.configs.app_configs import VESPA_FEED_MIN_IN_FLIGHT
+from alvio.document_index.vespa.shared_utils.utils import get_vespa_async_http_client
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Vespa is overloaded or out of resources, back off and slow down
+_THROTTLE_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.INSUFFICIENT_STORAGE,
+}
+# transient errors that are retried without shrinking the window
+_RETRYABLE_STATUS_CODES = {HTTPStatus.BAD_GATEWAY, HTTPStatus.GATEWAY_TIMEOUT}
+
+_RETRY_BASE_DELAY_SECONDS = 0.1
+_RETRY_MAX_DELAY_SECONDS = 10.0
+
+
+@dataclass
+class VespaFeedOperation:
+    method: str
+    url: str
+    # alvio document id, only used for error messages
+    document_id: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class VespaFeedStats:
+    operations: int = 0
+    retries: int = 0
+    throttled: int = 0
+    max_in_flight: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    @property
+    def operations_per_second(self) -> float:
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+
+class _AdaptiveConcurrencyLimiter:
+    """Bounds the number of in-flight operations. The limit grows by one after every
+    `limit` successful operations and is halved on throttling."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+
+    def on_throttle(self) -> None:
+        # all requests in flight when Vespa started throttling fail together,
+        # only shrink once per burst
+        now = time.monotonic()
+        if now - self._last_decrease < 0.5:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit // 2)
+        self._successes = 0
+
+
+def _retry_delay(attempt: int) -> float:
+    delay = min(_RETRY_MAX_DELAY_SECONDS, _RETRY_BASE_DELAY_SECONDS * 2**attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def _send_operation(
+    operation: VespaFeedOperation,
+    content: bytes | None,
+    http_client: httpx.AsyncClient,
+    limiter: _AdaptiveConcurrencyLimiter,
+    stats: VespaFeedStats,
+    max_retries: int,
+) -> None:
+    headers = {"Content-Type": "application/json"} if content is not None else None
+
+    for attempt in range(max_retries + 1):
+        start = time.monotonic()
+        try:
+            response = await http_client.request(
+                operation.method, operation.url, content=content, headers=headers
+            )
+        except httpx.TransportError:
+            if attempt == max_retries:
+                logger.error(
+                    f"Failed to {operation.method} document '{operation.document_id}'"
+                )
+                raise
+            stats.retries += 1
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+
+        if response.is_success:
+            stats.latencies.append(time.monotonic() - start)
+            limiter.on_success()
+            return
+
+        if response.status_code in _THROTTLE_STATUS_CODES:
+            stats.throttled += 1
+            limiter.on_throttle()
+        elif response.status_code not in _RETRYABLE_STATUS_CODES:
+            _raise_for_failed_response(operation, response)
+
+        if attempt == max_retries:
+            _raise_for_failed_response(operation, response)
+        stats.retries += 1
+        await asyncio.sleep(_retry_delay(attempt))
+
+
+def _raise_for_failed_response(
+    operation: VespaFeedOperation, response: httpx.Response
+) -> None:
+    logger.error(
+        f"Failed to {operation.method} document '{operation.document_id}'. "
+        f"Status: {response.status_code}. Response: '{response.text}'"
+    )
+    response.raise_for_status()
+
+
+async def _feed(
+    operations: list[VespaFeedOperation],
+    http_client: httpx.AsyncClient,
+    limiter: _AdaptiveConcurrencyLimiter,
+    stats: VespaFeedStats,
+    max_retries: int,
+) -> None:
+    errors: list[BaseException] = []
+    tasks: set[asyncio.Task] = set()
+
+    async def _run(operation: VespaFeedOperation, content: bytes | None) -> None:
+        try:
+            await _send_operation(
+                operation, content, http_client, limiter, stats, max_retries
+            )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            await limiter.release()
+
+    for operation in operations:
+        await limiter.acquire()
+        if errors:
+            # stop feeding on the first failure, operations already sent are awaited
+            await limiter.release()
+            break
+
+        # serialized once, retries resend the same bytes
+        content = (
+            json.dumps(operation.body).encode("utf-8")
+            if operation.body is not None
+            else None
+        )
+        task = asyncio.create_task(_run(operation, content))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        stats.max_in_flight = max(stats.max_in_flight, limiter.in_flight)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    if errors:
+        raise errors[0]
+
+
+_feed_loop_lock = threading.Lock()
+_feed_loop: asyncio.AbstractEventLoop | None = None
+_feed_http_client: httpx.AsyncClient | None = None
+_feed_loop_pid: int | None = None
+
+
+def _get_feed_loop() -> tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]:
+    """Returns the process wide feed loop and its HTTP/2 client, starting them on
+    first use (and again in a forked child, which doesn't inherit the thread)."""
+    global _feed_loop, _feed_http_client, _feed_loop_pid
+
+    with _feed_loop_lock:
+        if (
+            _feed_loop is None
+            or _feed_http_client is None
+            or _feed_loop_pid != os.getpid()
+        ):
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="vespa-feed-loop", daemon=True
+            ).start()
+            _feed_loop = loop
+            _feed_http_client = get_vespa_async_http_client(
+                max_connections=VESPA_FEED_MAX_CONNECTIONS
+            )
+            _feed_loop_pid = os.getpid()
+
+        return _feed_loop, _feed_http_client
+
+
+def async_feed_available() -> bool:
+    """Feeding blocks the calling thread until the feed loop is done, so it isn't
+    used from a thread that is running an event loop itself (the threaded feeding
+    is used there instead)."""
+    if not VESPA_ASYNC_FEED_ENABLED:
+        return False
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+
+def feed_vespa_operations(
+    operations: list[VespaFeedOperation],
+    operation_name: str,
+    max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+    min_in_flight: int = VESPA_FEED_MIN_IN_FLIGHT,
+    max_retries: int = VESPA_FEED_MAX_RETRIES,
+    http_client: httpx.AsyncClient | None = None,
+) -> VespaFeedStats:
+    """Sends all `operations` to Vespa and blocks until they are done.
+    Operations may complete in any order. Raises the error of the first operation
+    that fails permanently (httpx.TransportError or httpx.HTTPStatusError)."""
+    stats = VespaFeedStats(operations=len(operations))
+    if not operations:
+        return stats
+
+    loop, shared_http_client = _get_feed_loop()
+
+    async def _main() -> None:
+        limiter = _AdaptiveConcurrencyLimiter(
+            initial=min_in_flight * 4, minimum=min_in_flight, maximum=max_in_flight
+        )
+        await _feed(
+            operations,
+            http_client or shared_http_client,
+            limiter,
+            stats,
+            max_retries,
+        )
+
+    start = time.monotonic()
+    try:
+        asyncio.run_coroutine_threadsafe(_main(), loop).result()
+    finally:
+        stats.elapsed = time.monotonic() - start
+        logger.info(
+            f"event=vespa_feed "
+            f"operation={operation_name} "
+            f"ops={stats.operations} "
+            f"elapsed={stats.elapsed:.2f} "
+            f"ops_per_sec={stats.operations_per_second:.1f} "
+            f"p50_ms={stats.latency_percentile(0.5) * 1000:.1f} "
+            f"p99_ms={stats.latency_percentile(0.99) * 1000:.1f} "
+            f"retries={stats.retries} "
+            f"throttled={stats.throttled} "
+            f"max_in_flight={stats.max_in_flight}"
+        )
+
+    return stats
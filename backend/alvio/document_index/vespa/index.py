@@ -46,13 +46,21 @@ from alvio.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
 from alvio.document_index.vespa.chunk_retrieval import query_vespa
+from alvio.document_index.vespa.deletion import build_delete_feed_operations
 from alvio.document_index.vespa.deletion import delete_vespa_chunks
+from alvio.document_index.vespa.feed_client import async_feed_available
+from alvio.document_index.vespa.feed_client import feed_vespa_operations
+from alvio.document_index.vespa.feed_client import VespaFeedOperation
 from alvio.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from alvio.document_index.vespa.indexing_utils import batch_index_vespa_chunks
-from alvio.document_index.vespa.indexing_utils import check_for_final_chunk_existence
+from alvio.document_index.vespa.indexing_utils import build_index_feed_operations
+from alvio.document_index.vespa.indexing_utils import (
+    batch_check_for_final_chunk_existence,
+)
 from alvio.document_index.vespa.indexing_utils import clean_chunk_id_copy
 from alvio.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from alvio.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
+from alvio.document_index.vespa.indexing_utils import vespa_get_updated_at_attribute
 from alvio.document_index.vespa.shared_utils.utils import get_vespa_http_client
 from alvio.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -64,10 +72,13 @@ from alvio.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from alvio.document_index.vespa_constants import BATCH_SIZE
 from alvio.document_index.vespa_constants import BOOST
 from alvio.document_index.vespa_constants import CONTENT_SUMMARY
+from alvio.document_index.vespa_constants import DOC_UPDATED_AT
 from alvio.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from alvio.document_index.vespa_constants import DOCUMENT_SETS
 from alvio.document_index.vespa_constants import HIDDEN
 from alvio.document_index.vespa_constants import NUM_THREADS
+from alvio.document_index.vespa_constants import PRIMARY_OWNERS
+from alvio.document_index.vespa_constants import SECONDARY_OWNERS
 from alvio.document_index.vespa_constants import USER_PROJECT
 from alvio.document_index.vespa_constants import VESPA_APPLICATION_ENDPOINT
 from alvio.document_index.vespa_constants import VESPA_TIMEOUT
@@ -126,6 +137,50 @@ class KGUDocumentUpdateRequest(BaseModel):
     terms: set[str]
 
 
+def _build_update_dict(
+    fields: VespaDocumentFields | None,
+    user_fields: VespaDocumentUserFields | None,
+) -> dict[str, dict]:
+    """Partial update body assigning every field that is set."""
+    update_dict: dict[str, dict] = {"fields": {}}
+
+    if fields is not None:
+        if fields.boost is not None:
+            update_dict["fields"][BOOST] = {"assign": fields.boost}
+
+        if fields.document_sets is not None:
+            update_dict["fields"][DOCUMENT_SETS] = {
+                "assign": {document_set: 1 for document_set in fields.document_sets}
+            }
+
+        if fields.access is not None:
+            update_dict["fields"][ACCESS_CONTROL_LIST] = {
+                "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
+            }
+
+        if fields.hidden is not None:
+            update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+
+        if fields.doc_updated_at is not None:
+            update_dict["fields"][DOC_UPDATED_AT] = {
+                "assign": vespa_get_updated_at_attribute(fields.doc_updated_at)
+            }
+
+        if fields.primary_owners is not None:
+            update_dict["fields"][PRIMARY_OWNERS] = {"assign": fields.primary_owners}
+
+        if fields.secondary_owners is not None:
+            update_dict["fields"][SECONDARY_OWNERS] = {
+                "assign": fields.secondary_owners
+            }
+
+    if user_fields is not None:
+        if user_fields.user_projects is not None:
+            update_dict["fields"][USER_PROJECT] = {"assign": user_fields.user_projects}
+
+    return update_dict
+
+
 def generate_kg_update_request(
     kg_update_request: KGUChunkUpdateRequest,
 ) -> dict[str, dict]:
@@ -460,16 +515,18 @@ class VespaIndex(DocumentIndex):
             # documents that have `chunk_count` in the database, but not for
             # `old_version` documents.
 
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = (
+                VespaIndex.batch_enrich_basic_chunk_info(
                     index_name=self.index_name,
                     http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    doc_id_to_previous_chunk_cnt={
+                        doc_id: doc_id_to_previous_chunk_cnt.get(doc_id, 0)
+                        for doc_id in doc_id_to_new_chunk_cnt.keys()
+                    },
+                    doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
+                    executor=executor,
                 )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
+            )
 
             for cleaned_doc_info in enriched_doc_infos:
                 # If the document has previously indexed chunks, we know it previously existed
@@ -484,23 +541,41 @@ class VespaIndex(DocumentIndex):
                 large_chunks_enabled=large_chunks_enabled,
             )
 
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
+            if async_feed_available():
+                # Old chunks must be gone before the new ones (which may reuse the
+                # same chunk ids) are written, so the two feeds run one after another
+                feed_vespa_operations(
+                    build_delete_feed_operations(chunks_to_delete, self.index_name),
+                    operation_name="delete",
                 )
-
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    multitenant=self.multitenant,
-                    executor=executor,
+                feed_vespa_operations(
+                    build_index_feed_operations(
+                        chunks=cleaned_chunks,
+                        index_name=self.index_name,
+                        multitenant=self.multitenant,
+                    ),
+                    operation_name="index",
                 )
+            else:
+                # Delete old Vespa documents
+                for doc_chunk_ids_batch in batch_generator(
+                    chunks_to_delete, BATCH_SIZE
+                ):
+                    delete_vespa_chunks(
+                        doc_chunk_ids=doc_chunk_ids_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
+
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        multitenant=self.multitenant,
+                        executor=executor,
+                    )
 
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
@@ -620,23 +695,29 @@ class VespaIndex(DocumentIndex):
             index_names.append(self.secondary_index_name)
 
         chunk_id_start_time = time.monotonic()
-        with self.httpx_client_context as http_client:
-            for update_request in update_requests:
-                for doc_info in update_request.minimal_document_indexing_info:
-                    for index_name in index_names:
-                        doc_chunk_info = VespaIndex.enrich_basic_chunk_info(
-                            index_name=index_name,
-                            http_client=http_client,
-                            document_id=doc_info.doc_id,
-                            previous_chunk_count=doc_info.chunk_start_index,
-                            new_chunk_count=0,
-                        )
-                        doc_chunk_ids = get_document_chunk_ids(
-                            enriched_document_info_list=[doc_chunk_info],
-                            tenant_id=tenant_id,
-                            large_chunks_enabled=False,
-                        )
-                        all_doc_chunk_ids[doc_info.doc_id] = doc_chunk_ids
+        doc_id_to_previous_chunk_cnt: dict[str, int | None] = {
+            doc_info.doc_id: doc_info.chunk_start_index
+            for update_request in update_requests
+            for doc_info in update_request.minimal_document_indexing_info
+        }
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self.httpx_client_context as http_client,
+        ):
+            # NOTE: the chunk ids found for the last index name are the ones kept
+            for index_name in index_names:
+                for doc_chunk_info in VespaIndex.batch_enrich_basic_chunk_info(
+                    index_name=index_name,
+                    http_client=http_client,
+                    doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+                    doc_id_to_new_chunk_cnt={},
+                    executor=executor,
+                ):
+                    all_doc_chunk_ids[doc_chunk_info.doc_id] = get_document_chunk_ids(
+                        enriched_document_info_list=[doc_chunk_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=False,
+                    )
 
         logger.debug(
             f"Took {time.monotonic() - chunk_id_start_time:.2f} seconds to fetch all Vespa chunk IDs"
@@ -676,8 +757,22 @@ class VespaIndex(DocumentIndex):
                         )
                     )
 
-        with self.httpx_client_context as httpx_client:
-            self._apply_updates_batched(processed_updates_requests, httpx_client)
+        if async_feed_available():
+            feed_vespa_operations(
+                [
+                    VespaFeedOperation(
+                        method="PUT",
+                        url=update.url,
+                        document_id=update.document_id,
+                        body=update.update_request,
+                    )
+                    for update in processed_updates_requests
+                ],
+                operation_name="update",
+            )
+        else:
+            with self.httpx_client_context as httpx_client:
+                self._apply_updates_batched(processed_updates_requests, httpx_client)
         logger.debug(
             "Finished updating Vespa documents in %.2f seconds",
             time.monotonic() - update_start,
@@ -745,31 +840,7 @@ class VespaIndex(DocumentIndex):
         Retries if we encounter transient HTTPStatusError (e.g., overload).
         """
 
-        update_dict: dict[str, dict] = {"fields": {}}
-
-        if fields is not None:
-            if fields.boost is not None:
-                update_dict["fields"][BOOST] = {"assign": fields.boost}
-
-            if fields.document_sets is not None:
-                update_dict["fields"][DOCUMENT_SETS] = {
-                    "assign": {document_set: 1 for document_set in fields.document_sets}
-                }
-
-            if fields.access is not None:
-                update_dict["fields"][ACCESS_CONTROL_LIST] = {
-                    "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
-                }
-
-            if fields.hidden is not None:
-                update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
-
-        if user_fields is not None:
-            if user_fields.user_projects is not None:
-                update_dict["fields"][USER_PROJECT] = {
-                    "assign": user_fields.user_projects
-                }
-
+        update_dict = _build_update_dict(fields, user_fields)
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
             return
@@ -844,6 +915,87 @@ class VespaIndex(DocumentIndex):
 
         return doc_chunk_count
 
+    def update_multiple(
+        self,
+        doc_id_to_fields: dict[str, VespaDocumentFields],
+        *,
+        tenant_id: str,
+        doc_id_to_chunk_count: dict[str, int | None],
+    ) -> dict[str, int]:
+        """Same as update_single for many documents at once: the chunk ranges of all
+        documents are resolved together and the chunk updates are fed in bulk.
+        Documents that don't exist are a no-op."""
+        vespa_doc_id_to_doc_id = {
+            replace_invalid_doc_id_characters(doc_id): doc_id
+            for doc_id in doc_id_to_fields
+        }
+        doc_id_to_chunks_updated = {doc_id: 0 for doc_id in doc_id_to_fields}
+        updates: list[_VespaUpdateRequest] = []
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self.httpx_client_context as http_client,
+        ):
+            for (
+                index_name,
+                large_chunks_enabled,
+            ) in self.index_to_large_chunks_enabled.items():
+                enriched_doc_infos = VespaIndex.batch_enrich_basic_chunk_info(
+                    index_name=index_name,
+                    http_client=http_client,
+                    doc_id_to_previous_chunk_cnt={
+                        vespa_doc_id: doc_id_to_chunk_count.get(doc_id)
+                        for vespa_doc_id, doc_id in vespa_doc_id_to_doc_id.items()
+                    },
+                    doc_id_to_new_chunk_cnt={},
+                    executor=executor,
+                )
+                for enriched_doc_info in enriched_doc_infos:
+                    doc_id = vespa_doc_id_to_doc_id[enriched_doc_info.doc_id]
+                    update_dict = _build_update_dict(doc_id_to_fields[doc_id], None)
+                    if not update_dict["fields"]:
+                        logger.error(
+                            f"Update request received but nothing to update. doc_id={doc_id}"
+                        )
+                        continue
+
+                    doc_chunk_ids = get_document_chunk_ids(
+                        enriched_document_info_list=[enriched_doc_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                    doc_id_to_chunks_updated[doc_id] += len(doc_chunk_ids)
+                    updates.extend(
+                        _VespaUpdateRequest(
+                            document_id=enriched_doc_info.doc_id,
+                            url=(
+                                f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}"
+                                "?create=true"
+                            ),
+                            update_request=update_dict,
+                        )
+                        for doc_chunk_id in doc_chunk_ids
+                    )
+
+        if async_feed_available():
+            feed_vespa_operations(
+                [
+                    VespaFeedOperation(
+                        method="PUT",
+                        url=update.url,
+                        document_id=update.document_id,
+                        body=update.update_request,
+                    )
+                    for update in updates
+                ],
+                operation_name="update",
+            )
+        else:
+            with self.httpx_client_context as httpx_client:
+                self._apply_updates_batched(updates, httpx_client)
+
+        return doc_id_to_chunks_updated
+
     def delete_single(
         self,
         doc_id: str,
@@ -882,6 +1034,16 @@ class VespaIndex(DocumentIndex):
                     large_chunks_enabled=large_chunks_enabled,
                 )
 
+                if async_feed_available():
+                    total_chunks_deleted += len(chunks_to_delete)
+                    feed_vespa_operations(
+                        build_delete_feed_operations(
+                            chunks_to_delete, index_name, document_id=doc_id
+                        ),
+                        operation_name="delete",
+                    )
+                    continue
+
                 for doc_chunk_ids_batch in batch_generator(
                     chunks_to_delete, BATCH_SIZE
                 ):
@@ -895,6 +1057,80 @@ class VespaIndex(DocumentIndex):
 
         return total_chunks_deleted
 
+    def delete_multiple(
+        self,
+        doc_id_to_chunk_count: dict[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        """Same as delete_single for many documents at once: the chunk ranges of all
+        documents are resolved together and the chunk deletes are fed in bulk."""
+        vespa_doc_id_to_doc_id = {
+            replace_invalid_doc_id_characters(doc_id): doc_id
+            for doc_id in doc_id_to_chunk_count
+        }
+        doc_id_to_chunks_deleted = {doc_id: 0 for doc_id in doc_id_to_chunk_count}
+        index_name_to_chunks_to_delete: dict[str, list[UUID]] = {}
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self.httpx_client_context as http_client,
+        ):
+            for (
+                index_name,
+                large_chunks_enabled,
+            ) in self.index_to_large_chunks_enabled.items():
+                enriched_doc_infos = VespaIndex.batch_enrich_basic_chunk_info(
+                    index_name=index_name,
+                    http_client=http_client,
+                    doc_id_to_previous_chunk_cnt={
+                        vespa_doc_id: doc_id_to_chunk_count.get(doc_id)
+                        for vespa_doc_id, doc_id in vespa_doc_id_to_doc_id.items()
+                    },
+                    doc_id_to_new_chunk_cnt={},
+                    executor=executor,
+                )
+                chunks_to_delete = index_name_to_chunks_to_delete.setdefault(
+                    index_name, []
+                )
+                for enriched_doc_info in enriched_doc_infos:
+                    doc_chunk_ids = get_document_chunk_ids(
+                        enriched_document_info_list=[enriched_doc_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                    doc_id = vespa_doc_id_to_doc_id[enriched_doc_info.doc_id]
+                    doc_id_to_chunks_deleted[doc_id] += len(doc_chunk_ids)
+                    chunks_to_delete.extend(doc_chunk_ids)
+
+            if async_feed_available():
+                feed_vespa_operations(
+                    [
+                        operation
+                        for index_name, chunks_to_delete in index_name_to_chunks_to_delete.items()
+                        for operation in build_delete_feed_operations(
+                            chunks_to_delete, index_name
+                        )
+                    ],
+                    operation_name="delete",
+                )
+            else:
+                for (
+                    index_name,
+                    chunks_to_delete,
+                ) in index_name_to_chunks_to_delete.items():
+                    for doc_chunk_ids_batch in batch_generator(
+                        chunks_to_delete, BATCH_SIZE
+                    ):
+                        delete_vespa_chunks(
+                            doc_chunk_ids=doc_chunk_ids_batch,
+                            index_name=index_name,
+                            http_client=http_client,
+                            executor=executor,
+                        )
+
+        return doc_id_to_chunks_deleted
+
     def id_based_retrieval(
         self,
         chunk_requests: list[VespaChunkRequest],
@@ -1026,30 +1262,65 @@ class VespaIndex(DocumentIndex):
         previous_chunk_count: int | None = None,
         new_chunk_count: int = 0,
     ) -> EnrichedDocumentIndexingInfo:
-        last_indexed_chunk = previous_chunk_count
+        return cls.batch_enrich_basic_chunk_info(
+            index_name=index_name,
+            http_client=http_client,
+            doc_id_to_previous_chunk_cnt={document_id: previous_chunk_count},
+            doc_id_to_new_chunk_cnt={document_id: new_chunk_count},
+        )[0]
 
+    @classmethod
+    def batch_enrich_basic_chunk_info(
+        cls,
+        index_name: str,
+        http_client: httpx.Client,
+        doc_id_to_previous_chunk_cnt: dict[str, int | None],
+        doc_id_to_new_chunk_cnt: dict[str, int],
+        executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    ) -> list[EnrichedDocumentIndexingInfo]:
+        """Returns the chunk range of every document in `doc_id_to_previous_chunk_cnt`
+        (in the same order). Only documents with no `chunk_count` in the database need
+        requests to Vespa, those are probed together."""
         # If the document has no `chunk_count` in the database, we know that it
         # has the old chunk ID system and we must check for the final chunk index
-        is_old_version = False
-        if last_indexed_chunk is None:
-            is_old_version = True
-            minimal_doc_info = MinimalDocumentIndexingInfo(
-                doc_id=document_id, chunk_start_index=new_chunk_count
+        old_version_doc_infos = [
+            MinimalDocumentIndexingInfo(
+                doc_id=document_id,
+                chunk_start_index=doc_id_to_new_chunk_cnt.get(document_id, 0),
             )
-            last_indexed_chunk = check_for_final_chunk_existence(
-                minimal_doc_info=minimal_doc_info,
-                start_index=new_chunk_count,
-                index_name=index_name,
-                http_client=http_client,
+            for document_id, previous_chunk_count in doc_id_to_previous_chunk_cnt.items()
+            if previous_chunk_count is None
+        ]
+        doc_id_to_final_chunk_index: dict[str, int] = {}
+        if old_version_doc_infos:
+            doc_id_to_final_chunk_index = dict(
+                zip(
+                    [doc_info.doc_id for doc_info in old_version_doc_infos],
+                    batch_check_for_final_chunk_existence(
+                        minimal_doc_infos=old_version_doc_infos,
+                        index_name=index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    ),
+                )
             )
 
-        enriched_doc_info = EnrichedDocumentIndexingInfo(
-            doc_id=document_id,
-            chunk_start_index=new_chunk_count,
-            chunk_end_index=last_indexed_chunk,
-            old_version=is_old_version,
-        )
-        return enriched_doc_info
+        enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = []
+        for document_id, previous_chunk_count in doc_id_to_previous_chunk_cnt.items():
+            is_old_version = previous_chunk_count is None
+            enriched_doc_infos.append(
+                EnrichedDocumentIndexingInfo(
+                    doc_id=document_id,
+                    chunk_start_index=doc_id_to_new_chunk_cnt.get(document_id, 0),
+                    chunk_end_index=(
+                        doc_id_to_final_chunk_index[document_id]
+                        if is_old_version
+                        else cast(int, previous_chunk_count)
+                    ),
+                    old_version=is_old_version,
+                )
+            )
+        return enriched_doc_infos
 
     @classmethod
     def delete_entries_by_tenant_id(
@@ -7,6 +7,8 @@ from collections.abc import Callable
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
+from typing import Any
+from typing import cast
 
 import httpx
 from retry import retry
@@ -17,6 +19,7 @@ from alvio.connectors.cross_connector_utils.miscellaneous_utils import (
 from alvio.document_index.document_index_utils import get_uuid_from_chunk
 from alvio.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from alvio.document_index.interfaces import MinimalDocumentIndexingInfo
+from alvio.document_index.vespa.feed_client import VespaFeedOperation
 from alvio.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from alvio.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -58,6 +61,11 @@ from alvio.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# number of chunk ids probed per document in the first round of
+# `batch_check_for_final_chunk_existence`, doubled every round up to the max
+_CHUNK_PROBE_MIN_WINDOW = 4
+_CHUNK_PROBE_MAX_WINDOW = 64
+
 
 @retry(tries=3, delay=1, backoff=2)
 def _does_doc_chunk_exist(
@@ -79,7 +87,7 @@ def _does_doc_chunk_exist(
     return True
 
 
-def _vespa_get_updated_at_attribute(t: datetime | None) -> int | None:
+def vespa_get_updated_at_attribute(t: datetime | None) -> int | None:
     if not t:
         return None
 
@@ -125,22 +133,13 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
-    multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+def _build_vespa_document_fields(
+    chunk: DocMetadataAwareIndexChunk, multitenant: bool
+) -> dict[str, Any]:
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -168,7 +167,7 @@ def _index_vespa_chunk(
             remove_invalid_unicode_chars(metadata) for metadata in metadata_list
         ]
 
-    vespa_document_fields = {
+    vespa_document_fields: dict[str, Any] = {
         DOCUMENT_ID: document.id,
         CHUNK_ID: chunk.chunk_id,
         BLURB: remove_invalid_unicode_chars(chunk.blurb),
@@ -196,7 +195,7 @@ def _index_vespa_chunk(
         DOC_SUMMARY: chunk.doc_summary,
         EMBEDDINGS: embeddings_name_vector_map,
         TITLE_EMBEDDING: chunk.title_embedding,
-        DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
+        DOC_UPDATED_AT: vespa_get_updated_at_attribute(document.doc_updated_at),
         PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
         SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
         # the only `set` vespa has is `weightedset`, so we have to give each
@@ -215,6 +214,24 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
+
+    return vespa_document_fields
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    vespa_document_fields = _build_vespa_document_fields(chunk, multitenant)
+
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
     res = http_client.post(
@@ -266,6 +283,23 @@ def batch_index_vespa_chunks(
             executor.shutdown(wait=True)
 
 
+def build_index_feed_operations(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+) -> list[VespaFeedOperation]:
+    """Async feed counterpart of `batch_index_vespa_chunks`."""
+    return [
+        VespaFeedOperation(
+            method="POST",
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{get_uuid_from_chunk(chunk)}",
+            document_id=chunk.source_document.id,
+            body={"fields": _build_vespa_document_fields(chunk, multitenant)},
+        )
+        for chunk in chunks
+    ]
+
+
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
 ) -> DocMetadataAwareIndexChunk:
@@ -299,6 +333,64 @@ def check_for_final_chunk_existence(
         index += 1
 
 
+def batch_check_for_final_chunk_existence(
+    minimal_doc_infos: list[MinimalDocumentIndexingInfo],
+    index_name: str,
+    http_client: httpx.Client,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+) -> list[int]:
+    """Same result as calling `check_for_final_chunk_existence` for every document
+    starting at its `chunk_start_index`, but instead of probing one chunk at a time,
+    each round probes a window of chunk ids for all unresolved documents in parallel.
+    The window doubles every round, so a document with n chunks takes O(log n)
+    rounds instead of n sequential requests."""
+    external_executor = True
+
+    if not executor:
+        external_executor = False
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
+
+    next_index = [doc_info.chunk_start_index for doc_info in minimal_doc_infos]
+    final_index: list[int | None] = [None] * len(minimal_doc_infos)
+    window = _CHUNK_PROBE_MIN_WINDOW
+    try:
+        while unresolved := [
+            ind for ind, final in enumerate(final_index) if final is None
+        ]:
+            probe_futures: dict[tuple[int, int], concurrent.futures.Future[bool]] = {}
+            for doc_ind in unresolved:
+                for chunk_index in range(
+                    next_index[doc_ind], next_index[doc_ind] + window
+                ):
+                    doc_chunk_id = get_uuid_from_chunk_info_old(
+                        document_id=minimal_doc_infos[doc_ind].doc_id,
+                        chunk_id=chunk_index,
+                        large_chunk_reference_ids=[],
+                    )
+                    probe_futures[(doc_ind, chunk_index)] = executor.submit(
+                        _does_doc_chunk_exist, doc_chunk_id, index_name, http_client
+                    )
+
+            for doc_ind in unresolved:
+                for chunk_index in range(
+                    next_index[doc_ind], next_index[doc_ind] + window
+                ):
+                    # the first missing chunk is the final index, like the serial probe
+                    if not probe_futures[(doc_ind, chunk_index)].result():
+                        final_index[doc_ind] = chunk_index
+                        break
+                else:
+                    next_index[doc_ind] += window
+
+            window = min(window * 2, _CHUNK_PROBE_MAX_WINDOW)
+
+    finally:
+        if not external_executor:
+            executor.shutdown(wait=True)
+
+    return cast(list[int], final_index)
+
+
 class BaseHTTPXClientContext(ABC):
     """Abstract base class for an HTTPX client context manager."""
 
@@ -80,6 +80,28 @@ def get_vespa_http_client(no_timeout: bool = False, http2: bool = True) -> httpx
     )
 
 
+def get_vespa_async_http_client(max_connections: int) -> httpx.AsyncClient:
+    """
+    Async counterpart of `get_vespa_http_client` used for feeding. Requests wait for
+    a free HTTP/2 stream instead of timing out in the connection pool.
+    """
+
+    return httpx.AsyncClient(
+        cert=(
+            cast(tuple[str, str], (VESPA_CLOUD_CERT_PATH, VESPA_CLOUD_KEY_PATH))
+            if MANAGED_VESPA
+            else None
+        ),
+        verify=False if not MANAGED_VESPA else True,
+        timeout=httpx.Timeout(VESPA_REQUEST_TIMEOUT, pool=None),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        http2=True,
+    )
+
+
 def wait_for_vespa_with_timeout(wait_interval: int = 5, wait_limit: int = 60) -> bool:
     """Waits for Vespa to become ready subject to a timeout.
     Returns True if Vespa is ready, False otherwise."""
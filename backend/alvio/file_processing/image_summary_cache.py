@@ -0,0 +1,87 @@
+"""Redis cache for image summaries generated while indexing.
+
+Logos, icons and screenshots are embedded over and over in slide decks and wiki
+pages, and every re-index of a document used to summarize its images again. Summaries
+are cached in Redis (tenant scoped through `get_redis_client`) keyed by the hash of
+the image bytes, the vision LLM and the prompts, so an image is only sent to the LLM
+once until the entry expires.
+
+Redis errors are logged and treated as cache misses.
+"""
+
+import hashlib
+import threading
+
+from alvio.configs.app_configs import IMAGE_SUMMARIZATION_SYSTEM_PROMPT
+from alvio.configs.app_configs import IMAGE_SUMMARIZATION_USER_PROMPT
+from alvio.configs.app_configs import IMAGE_SUMMARY_CACHE_ENABLED
+from alvio.configs.app_configs import IMAGE_SUMMARY_CACHE_TTL_SECONDS
+from alvio.llm.interfaces import LLM
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "image_summary"
+
+
+class _SummaryStats:
+    def __init__(self) -> None:
+        self.cache_hits = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, cache_hits: int, llm_calls: int, llm_seconds: float) -> None:
+        with self._lock:
+            self.cache_hits += cache_hits
+            self.llm_calls += llm_calls
+            self.llm_seconds += llm_seconds
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.cache_hits + self.llm_calls
+        return self.cache_hits / total if total else 0.0
+
+    @property
+    def avg_llm_seconds(self) -> float:
+        return self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+
+
+IMAGE_SUMMARY_STATS = _SummaryStats()
+
+
+def build_image_summary_cache_key(llm: LLM, image_data: bytes) -> str:
+    # the file name is part of the prompt as well but is left out of the key, the
+    # same image embedded under different names gets the same summary
+    model_fingerprint = hashlib.sha256(
+        f"{llm.config.model_provider}|{llm.config.model_name}|"
+        f"{IMAGE_SUMMARIZATION_SYSTEM_PROMPT}|{IMAGE_SUMMARIZATION_USER_PROMPT}".encode()
+    ).hexdigest()[:16]
+    image_hash = hashlib.sha256(image_data).hexdigest()
+    return f"{_REDIS_KEY_PREFIX}:{model_fingerprint}:{image_hash}"
+
+
+def get_cached_image_summary(key: str) -> str | None:
+    if not IMAGE_SUMMARY_CACHE_ENABLED:
+        return None
+
+    try:
+        value = get_redis_client().get(key)
+    except Exception as e:
+        logger.warning(f"Failed to read image summary from redis: {e}")
+        return None
+
+    if not isinstance(value, bytes):
+        return None
+    return value.decode("utf-8")
+
+
+def cache_image_summary(key: str, summary: str) -> None:
+    if not IMAGE_SUMMARY_CACHE_ENABLED:
+        return
+
+    try:
+        get_redis_client().set(key, summary, ex=IMAGE_SUMMARY_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to write image summary to redis: {e}")
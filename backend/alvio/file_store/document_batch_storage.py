@@ -1,8 +1,11 @@
+import gzip
 import json
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterator
 from enum import Enum
-from io import StringIO
+from io import BytesIO
+from typing import IO
 from typing import List
 from typing import Optional
 from typing import TypeAlias
@@ -19,6 +22,17 @@ from alvio.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Batches are stored as gzip compressed JSON lines: a header line with the format
+# version, then one document per line. Older batches are a single JSON array.
+BATCH_FORMAT_VERSION = 1
+_BATCH_SUFFIX = ".jsonl.gz"
+_BATCH_FILE_TYPE = "application/gzip"
+_LEGACY_BATCH_SUFFIX = ".json"
+_LEGACY_BATCH_FILE_TYPE = "application/json"
+# document text already compresses well at the fastest level, higher levels
+# mostly cost docfetching CPU
+_COMPRESS_LEVEL = 1
+
 
 class DocumentBatchStorageStateType(str, Enum):
     EXTRACTION = "extraction"
@@ -83,13 +97,31 @@ class DocumentBatchStorage(ABC):
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
         """Extract path info from a path."""
 
-    def _serialize_documents(self, documents: list[Document]) -> str:
-        """Serialize documents to JSON string."""
-        # Use mode='json' to properly serialize datetime and other complex types
-        return json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2)
+    def _serialize_documents(self, documents: list[Document]) -> bytes:
+        """Serialize documents to the compact batch format: gzip compressed JSON lines,
+        a header line followed by one document per line."""
+        header = json.dumps(
+            {
+                "format_version": BATCH_FORMAT_VERSION,
+                "document_count": len(documents),
+            }
+        ).encode("utf-8")
+        lines = [header] + [doc.model_dump_json().encode("utf-8") for doc in documents]
+        return gzip.compress(b"\n".join(lines), compresslevel=_COMPRESS_LEVEL)
+
+    def _iter_deserialized_documents(self, content: IO[bytes]) -> Iterator[Document]:
+        """Stream documents out of a compact batch, one line at a time."""
+        with gzip.GzipFile(fileobj=content, mode="rb") as lines:
+            header = json.loads(lines.readline())
+            if header.get("format_version") != BATCH_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported document batch format version: {header.get('format_version')}"
+                )
+            for line in lines:
+                yield Document.model_validate_json(line)
 
-    def _deserialize_documents(self, data: str) -> list[Document]:
-        """Deserialize documents from JSON string."""
+    def _deserialize_legacy_documents(self, data: str) -> list[Document]:
+        """Deserialize documents from a legacy (.json) batch."""
         doc_dicts = json.loads(data)
         return [Document.model_validate(doc_dict) for doc_dict in doc_dicts]
 
@@ -105,23 +137,40 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         super().__init__(cc_pair_id, index_attempt_id)
         self.file_store = file_store
 
-    def _get_batch_file_name(self, batch_num: int) -> str:
+    def _get_batch_file_name(self, batch_num: int, legacy: bool = False) -> str:
         """Generate file name for a document batch."""
-        return f"{self.base_path}/{batch_num}.json"
+        suffix = _LEGACY_BATCH_SUFFIX if legacy else _BATCH_SUFFIX
+        return f"{self.base_path}/{batch_num}{suffix}"
+
+    def _find_batch_file_name(self, batch_num: int) -> str | None:
+        """Name of the stored batch, batches written before the compact format was
+        introduced are still found under their .json name."""
+        for legacy, file_type in (
+            (False, _BATCH_FILE_TYPE),
+            (True, _LEGACY_BATCH_FILE_TYPE),
+        ):
+            file_name = self._get_batch_file_name(batch_num, legacy=legacy)
+            if self.file_store.has_file(
+                file_id=file_name,
+                file_origin=FileOrigin.OTHER,
+                file_type=file_type,
+            ):
+                return file_name
+        return None
 
     def store_batch(self, batch_num: int, documents: list[Document]) -> None:
         """Store a batch of documents using FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
             data = self._serialize_documents(documents)
-            content = StringIO(data)
+            content = BytesIO(data)
 
             self.file_store.save_file(
                 file_id=file_name,
                 content=content,
                 display_name=f"Document Batch {batch_num}",
                 file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+                file_type=_BATCH_FILE_TYPE,
                 file_metadata={
                     "batch_num": batch_num,
                     "document_count": str(len(documents)),
@@ -137,23 +186,22 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
 
     def get_batch(self, batch_num: int) -> list[Document] | None:
         """Retrieve a batch of documents from FileStore."""
-        file_name = self._get_batch_file_name(batch_num)
         try:
             # Check if file exists
-            if not self.file_store.has_file(
-                file_id=file_name,
-                file_origin=FileOrigin.OTHER,
-                file_type="application/json",
-            ):
+            file_name = self._find_batch_file_name(batch_num)
+            if file_name is None:
                 logger.warning(
-                    f"Batch {batch_num} not found in FileStore with name {file_name}"
+                    f"Batch {batch_num} not found in FileStore under {self.base_path}"
                 )
                 return None
 
             content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
-
-            documents = self._deserialize_documents(data)
+            if file_name.endswith(_LEGACY_BATCH_SUFFIX):
+                documents = self._deserialize_legacy_documents(
+                    content_io.read().decode("utf-8")
+                )
+            else:
+                documents = list(self._iter_deserialized_documents(content_io))
             logger.debug(
                 f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
             )
@@ -169,7 +217,12 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
 
     def delete_batch_by_num(self, batch_num: int) -> None:
         """Delete a specific batch from FileStore."""
-        batch_file_name = self._get_batch_file_name(batch_num)
+        batch_file_name = self._find_batch_file_name(batch_num)
+        if batch_file_name is None:
+            logger.warning(
+                f"Batch {batch_num} not found in FileStore, nothing to delete"
+            )
+            return
         self.delete_batch_by_name(batch_file_name)
         logger.debug(f"Deleted batch num {batch_num} {batch_file_name} from FileStore")
 
@@ -200,7 +253,11 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
                     f"Could not extract path info from batch file: {batch_file_name}"
                 )
                 continue
-            new_batch_file_name = self._get_batch_file_name(path_info.batch_num)
+            # the file contents are not rewritten, so legacy batches keep their suffix
+            new_batch_file_name = self._get_batch_file_name(
+                path_info.batch_num,
+                legacy=batch_file_name.endswith(_LEGACY_BATCH_SUFFIX),
+            )
             self.file_store.change_file_id(batch_file_name, new_batch_file_name)
 
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
@@ -214,7 +271,7 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
             return BatchStoragePathInfo(
                 cc_pair_id=int(cc_pair_id),
                 index_attempt_id=int(index_attempt_id),
-                batch_num=int(batch_num.split(".")[0]),  # remove .json
+                batch_num=int(batch_num.split(".")[0]),  # remove .jsonl.gz / .json
             )
         except Exception as e:
             logger.error(f"Failed to extract path info from {path}: {e}")
@@ -1,3 +1,4 @@
+import shutil
 import tempfile
 import uuid
 from abc import ABC
@@ -20,6 +21,7 @@ from alvio.configs.app_configs import S3_AWS_SECRET_ACCESS_KEY
 from alvio.configs.app_configs import S3_ENDPOINT_URL
 from alvio.configs.app_configs import S3_FILE_STORE_BUCKET_NAME
 from alvio.configs.app_configs import S3_FILE_STORE_PREFIX
+from alvio.configs.app_configs import S3_MULTIPART_PART_SIZE_BYTES
 from alvio.configs.app_configs import S3_VERIFY_SSL
 from alvio.configs.constants import FileOrigin
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
@@ -31,7 +33,10 @@ from alvio.db.file_record import get_filerecord_by_prefix
 from alvio.db.file_record import upsert_filerecord
 from alvio.db.models import FileRecord
 from alvio.db.models import FileRecord as FileStoreModel
+from alvio.file_store.local_file_cache import get_local_file_cache
 from alvio.file_store.s3_key_utils import generate_s3_key
+from alvio.file_store.s3_streaming import open_s3_object
+from alvio.file_store.s3_streaming import upload_fileobj_to_s3
 from alvio.utils.file import FileWithMimeType
 from alvio.utils.logger import setup_logger
 from shared_configs.contextvars import get_current_tenant_id
@@ -39,6 +44,17 @@ from shared_configs.contextvars import get_current_tenant_id
 logger = setup_logger()
 
 
+_STREAM_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _local_cache_key(file_record: FileStoreModel) -> str:
+    # save_file upserts the record after every upload and upsert_filerecord always
+    # bumps updated_at, so an overwritten object gets a new key
+    return (
+        f"{file_record.bucket_name}/{file_record.object_key}@{file_record.updated_at}"
+    )
+
+
 class FileStore(ABC):
     """
     An abstraction for storing files and large binary objects.
@@ -112,6 +128,16 @@ class FileStore(ABC):
             Contents of the file and metadata dict
         """
 
+    @abstractmethod
+    def open_file(self, file_id: str) -> IO[bytes]:
+        """
+        Open a file for streaming reads without loading it into memory.
+        The returned object is seekable and must be closed by the caller.
+
+        Parameters:
+        - file_id: Unique ID of file to open
+        """
+
     @abstractmethod
     def read_file_record(self, file_id: str) -> FileStoreModel:
         """
@@ -172,6 +198,7 @@ class S3BackedFileStore(FileStore):
         self._s3_endpoint_url = s3_endpoint_url
         self._s3_prefix = s3_prefix or "alvio-files"
         self._s3_verify_ssl = s3_verify_ssl
+        self._local_cache = get_local_file_cache()
 
     def _get_s3_client(self) -> S3Client:
         """Initialize S3 client if not already done"""
@@ -320,21 +347,27 @@ class S3BackedFileStore(FileStore):
         bucket_name = self._get_bucket_name()
         s3_key = self._get_s3_key(file_id)
 
-        # Read content from IO object
+        # Stream content from IO objects, large ones are sent as a multipart upload
         if hasattr(content, "read"):
-            file_content = content.read()
-            if hasattr(content, "seek"):
-                content.seek(0)  # Reset position for potential re-reads
+            upload_fileobj_to_s3(
+                s3_client=s3_client,
+                bucket_name=bucket_name,
+                object_key=s3_key,
+                content=content,
+                content_type=file_type,
+                part_size=S3_MULTIPART_PART_SIZE_BYTES,
+            )
+            # Reset position for potential re-reads, content generated on the fly
+            # can't be re-read
+            if hasattr(content, "seek") and content.seekable():
+                content.seek(0)
         else:
-            file_content = content
-
-        # Upload to S3
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=file_content,
-            ContentType=file_type,
-        )
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=content,
+                ContentType=file_type,
+            )
 
         with get_session_with_current_tenant_if_none(db_session) as db_session:
             # Save metadata to database
@@ -364,6 +397,12 @@ class S3BackedFileStore(FileStore):
                 file_id=file_id, db_session=db_session
             )
 
+        cache_key = _local_cache_key(file_record)
+        if not use_tempfile and self._local_cache is not None:
+            cached_content = self._local_cache.get(cache_key)
+            if cached_content is not None:
+                return BytesIO(cached_content)
+
         s3_client = self._get_s3_client()
         try:
             response = s3_client.get_object(
@@ -373,16 +412,36 @@ class S3BackedFileStore(FileStore):
             logger.error(f"Failed to read file {file_id} from S3")
             raise
 
-        file_content = response["Body"].read()
-
         if use_tempfile:
-            # Always open in binary mode for temp files since we're writing bytes
+            # Always open in binary mode for temp files since we're writing bytes.
+            # Copied in chunks so the whole file is never held in memory.
             temp_file = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
-            temp_file.write(file_content)
+            with response["Body"] as body:
+                shutil.copyfileobj(body, temp_file, _STREAM_COPY_CHUNK_SIZE)
             temp_file.seek(0)
             return temp_file
-        else:
-            return BytesIO(file_content)
+
+        file_content = response["Body"].read()
+        if self._local_cache is not None:
+            self._local_cache.put(cache_key, file_content)
+        return BytesIO(file_content)
+
+    def open_file(self, file_id: str, db_session: Session | None = None) -> IO[bytes]:
+        with get_session_with_current_tenant_if_none(db_session) as db_session:
+            file_record = get_filerecord_by_file_id(
+                file_id=file_id, db_session=db_session
+            )
+
+        if self._local_cache is not None:
+            cached_file = self._local_cache.open(_local_cache_key(file_record))
+            if cached_file is not None:
+                return cached_file
+
+        return open_s3_object(
+            s3_client=self._get_s3_client(),
+            bucket_name=file_record.bucket_name,
+            object_key=file_record.object_key,
+        )
 
     def read_file_record(
         self, file_id: str, db_session: Session | None = None
@@ -0,0 +1,138 @@
+"""
+Size bounded on-disk LRU cache for file store objects (e.g. images referenced by
+chunks that are read on every search), configured with FILE_STORE_LOCAL_CACHE_DIR.
+
+Entries are plain files named by the hash of their key, so every process on a host
+can share one directory. Recency is the file mtime, which is bumped on every hit;
+when the directory grows past the size limit the least recently used files are
+removed. Keys must change whenever the object changes (the file store includes the
+record's `updated_at`), entries are never updated in place.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from typing import IO
+
+from alvio.configs.app_configs import FILE_STORE_LOCAL_CACHE_DIR
+from alvio.configs.app_configs import FILE_STORE_LOCAL_CACHE_MAX_BYTES
+from alvio.configs.app_configs import FILE_STORE_LOCAL_CACHE_MAX_OBJECT_BYTES
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# temporary files being written, ignored by eviction
+_PARTIAL_SUFFIX = ".partial"
+# evict down to this fraction of the limit so eviction doesn't run on every put
+_EVICT_TO_FRACTION = 0.9
+
+
+class LocalFileCache:
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._lock = threading.Lock()
+        # bytes written since the directory size was last checked, None forces a check
+        self._bytes_since_check: int | None = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
+
+    def open(self, key: str) -> IO[bytes] | None:
+        """Returns the cached object opened for reading, None on a miss."""
+        path = self._path(key)
+        try:
+            cached_file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # evicted by another process in the meantime, the open handle still works
+            pass
+        return cached_file
+
+    def get(self, key: str) -> bytes | None:
+        cached_file = self.open(key)
+        if cached_file is None:
+            return None
+        with cached_file:
+            return cached_file.read()
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_object_bytes:
+            return
+
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, suffix=_PARTIAL_SUFFIX, delete=False
+            ) as temp_file:
+                temp_file.write(data)
+            # atomic, readers never see a partially written entry
+            os.replace(temp_file.name, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write file store cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._bytes_since_check is not None:
+                self._bytes_since_check += len(data)
+                # not enough written by this process since the last check to matter
+                if self._bytes_since_check < self.max_bytes * (1 - _EVICT_TO_FRACTION):
+                    return
+            self._bytes_since_check = 0
+
+        self._evict()
+
+    def _evict(self) -> None:
+        entries: list[tuple[float, int, str]] = []
+        total_bytes = 0
+        with os.scandir(self.directory) as dir_entries:
+            for entry in dir_entries:
+                if entry.name.endswith(_PARTIAL_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        target_bytes = self.max_bytes * _EVICT_TO_FRACTION
+        for _, size, path in sorted(entries):
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+
+@lru_cache(maxsize=1)
+def get_local_file_cache() -> LocalFileCache | None:
+    if not FILE_STORE_LOCAL_CACHE_DIR:
+        return None
+
+    try:
+        return LocalFileCache(
+            directory=FILE_STORE_LOCAL_CACHE_DIR,
+            max_bytes=FILE_STORE_LOCAL_CACHE_MAX_BYTES,
+            max_object_bytes=FILE_STORE_LOCAL_CACHE_MAX_OBJECT_BYTES,
+        )
+    except OSError as e:
+        logger.warning(
+            f"Failed to create file store cache at {FILE_STORE_LOCAL_CACHE_DIR}, "
+            f"caching disabled: {e}"
+        )
+        return None
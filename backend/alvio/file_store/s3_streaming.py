@@ -0,0 +1,221 @@
+"""
+Streaming helpers for S3-compatible storage, used so that large files (PDFs, user
+uploads) are never fully held in worker memory.
+"""
+
+import io
+from collections.abc import Iterator
+from typing import IO
+
+from botocore.response import StreamingBody
+from mypy_boto3_s3 import S3Client
+
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Seekable, read-only file object over an S3 object.
+
+    Sequential reads are served from a single streaming GET. Seeking closes the
+    current body and the next read issues a ranged GET starting at the new position,
+    so readers that jump around (e.g. PDF parsers reading the trailer first) only
+    download what they read.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        bucket_name: str,
+        object_key: str,
+        size: int | None = None,
+    ) -> None:
+        super().__init__()
+        self._s3_client = s3_client
+        self._bucket_name = bucket_name
+        self._object_key = object_key
+        self._size = size
+        self._position = 0
+        self._body: StreamingBody | None = None
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            response = self._s3_client.head_object(
+                Bucket=self._bucket_name, Key=self._object_key
+            )
+            self._size = response["ContentLength"]
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        if position != self._position:
+            self._close_body()
+            self._position = position
+        return self._position
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._position >= self.size:
+            return 0
+
+        data = self._get_body().read(len(buffer))
+        num_bytes = len(data)
+        buffer[:num_bytes] = data
+        self._position += num_bytes
+        return num_bytes
+
+    def readall(self) -> bytes:
+        # one read of the rest of the body instead of the default small-chunk loop
+        if self._position >= self.size:
+            return b""
+        data = self._get_body().read()
+        self._position += len(data)
+        return data
+
+    def close(self) -> None:
+        self._close_body()
+        super().close()
+
+    def _get_body(self) -> StreamingBody:
+        if self._body is None:
+            response = self._s3_client.get_object(
+                Bucket=self._bucket_name,
+                Key=self._object_key,
+                Range=f"bytes={self._position}-",
+            )
+            self._body = response["Body"]
+        return self._body
+
+    def _close_body(self) -> None:
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+
+
+def open_s3_object(
+    s3_client: S3Client,
+    bucket_name: str,
+    object_key: str,
+    buffer_size: int = 1024 * 1024,
+) -> IO[bytes]:
+    """Buffered, seekable reader over an S3 object (see S3ObjectReader)."""
+    return io.BufferedReader(
+        S3ObjectReader(s3_client, bucket_name, object_key), buffer_size=buffer_size
+    )
+
+
+class IteratorReader(io.RawIOBase):
+    """
+    Read-only, non-seekable file object over an iterator of byte chunks, used to
+    upload content that is generated on the fly (e.g. exports) without building it
+    in memory first.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        super().__init__()
+        self._chunks = chunks
+        self._leftover = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        while not self._leftover:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._leftover = chunk
+
+        num_bytes = min(len(buffer), len(self._leftover))
+        buffer[:num_bytes] = self._leftover[:num_bytes]
+        self._leftover = self._leftover[num_bytes:]
+        return num_bytes
+
+
+def open_iterator(chunks: Iterator[bytes], buffer_size: int = 1024 * 1024) -> IO[bytes]:
+    """Buffered reader over an iterator of byte chunks (see IteratorReader)."""
+    return io.BufferedReader(IteratorReader(chunks), buffer_size=buffer_size)
+
+
+def _read_part(content: IO, part_size: int) -> bytes:
+    part = content.read(part_size)
+    if isinstance(part, str):
+        part = part.encode("utf-8")
+    return part
+
+
+def upload_fileobj_to_s3(
+    s3_client: S3Client,
+    bucket_name: str,
+    object_key: str,
+    content: IO,
+    content_type: str,
+    part_size: int,
+) -> None:
+    """
+    Upload `content` without reading it fully into memory. Content smaller than one
+    part is sent with a single put_object, anything larger as a multipart upload
+    holding at most one part in memory at a time.
+    """
+    part = _read_part(content, part_size)
+    if len(part) < part_size:
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=object_key,
+            Body=part,
+            ContentType=content_type,
+        )
+        return
+
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=bucket_name, Key=object_key, ContentType=content_type
+    )["UploadId"]
+    try:
+        parts = []
+        part_number = 1
+        while part:
+            response = s3_client.upload_part(
+                Bucket=bucket_name,
+                Key=object_key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=part,
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            part_number += 1
+            part = _read_part(content, part_size)
+
+        s3_client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},  # type: ignore[typeddict-item]
+        )
+    except Exception:
+        logger.exception(f"Multipart upload of {object_key} failed, aborting")
+        s3_client.abort_multipart_upload(
+            Bucket=bucket_name, Key=object_key, UploadId=upload_id
+        )
+        raise
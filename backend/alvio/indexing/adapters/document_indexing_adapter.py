@@ -13,6 +13,7 @@ from alvio.db.chunk import update_chunk_boost_components__no_commit
 from alvio.db.document import fetch_chunk_counts_for_documents
 from alvio.db.document import mark_document_as_indexed_for_cc_pair__no_commit
 from alvio.db.document import prepare_to_modify_documents
+from alvio.db.document import update_docs_chunk_content_hashes__no_commit
 from alvio.db.document import update_docs_chunk_count__no_commit
 from alvio.db.document import update_docs_last_modified__no_commit
 from alvio.db.document import update_docs_updated_at__no_commit
@@ -191,6 +192,11 @@ class DocumentIndexingBatchAdapter:
             db_session=self.db_session,
         )
 
+        update_docs_chunk_content_hashes__no_commit(
+            doc_id_to_chunk_content_hashes=context.id_to_chunk_content_hashes,
+            db_session=self.db_session,
+        )
+
         # these documents can now be counted as part of the CC Pairs
         # document count, so we need to mark them as indexed
         # NOTE: even documents we skipped since they were already up
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import cast
 
 from chonkie import SentenceChunker
@@ -34,6 +35,10 @@ CHUNK_OVERLAP = 0
 # overwhelm the actual contents of the chunk
 MAX_METADATA_PERCENTAGE = 0.25
 CHUNK_MIN_CONTENT = 256
+# Token counts are cached per Chunker. The blurb and mini-chunk splitters split the text
+# of every chunk again, so most of their sentences were already counted when the
+# section was split into chunks
+TOKEN_COUNT_CACHE_SIZE = 16384
 
 logger = setup_logger()
 
@@ -158,9 +163,12 @@ class Chunker:
         self.prompt_tokens = 0
 
         # Create a token counter function that returns the count instead of the tokens
+        @lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
         def token_counter(text: str) -> int:
             return len(tokenizer.encode(text))
 
+        self._count_tokens = token_counter
+
         self.blurb_splitter = SentenceChunker(
             tokenizer_or_token_counter=token_counter,
             chunk_size=blurb_size,
@@ -321,7 +329,7 @@ class Chunker:
                 continue
 
             # CASE 2: Normal text section
-            section_token_count = len(self.tokenizer.encode(section_text))
+            section_token_count = self._count_tokens(section_text)
 
             # If the section is large on its own, split it separately
             if section_token_count > content_token_limit:
@@ -345,7 +353,7 @@ class Chunker:
                     # If even the split_text is bigger than strict limit, further split
                     if (
                         STRICT_CHUNK_TOKEN_LIMIT
-                        and len(self.tokenizer.encode(split_text)) > content_token_limit
+                        and self._count_tokens(split_text) > content_token_limit
                     ):
                         smaller_chunks = self._split_oversized_chunk(
                             split_text, content_token_limit
@@ -375,10 +383,10 @@ class Chunker:
                 continue
 
             # If we can still fit this section into the current chunk, do so
-            current_token_count = len(self.tokenizer.encode(chunk_text))
+            current_token_count = self._count_tokens(chunk_text)
             current_offset = len(shared_precompare_cleanup(chunk_text))
             next_section_tokens = (
-                len(self.tokenizer.encode(SECTION_SEPARATOR)) + section_token_count
+                self._count_tokens(SECTION_SEPARATOR) + section_token_count
             )
 
             if next_section_tokens + current_token_count <= content_token_limit:
@@ -426,7 +434,7 @@ class Chunker:
         # Title prep
         title = self._extract_blurb(document.get_title_for_document_index() or "")
         title_prefix = title + RETURN_SEPARATOR if title else ""
-        title_tokens = len(self.tokenizer.encode(title_prefix))
+        title_tokens = self._count_tokens(title_prefix)
 
         # Metadata prep
         metadata_suffix_semantic = ""
@@ -439,7 +447,7 @@ class Chunker:
             ) = _get_metadata_suffix_for_document_index(
                 document.metadata, include_separator=True
             )
-            metadata_tokens = len(self.tokenizer.encode(metadata_suffix_semantic))
+            metadata_tokens = self._count_tokens(metadata_suffix_semantic)
 
         # If metadata is too large, skip it in the semantic content
         if metadata_tokens >= self.chunk_token_limit * MAX_METADATA_PERCENTAGE:
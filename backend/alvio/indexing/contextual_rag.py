@@ -0,0 +1,329 @@
+"""Document summaries and chunk contexts (contextual RAG) for a batch of chunks.
+
+The LLM calls of all documents in the batch are scheduled together. Every call goes
+through a process wide limiter (max concurrency and, optionally, max requests per
+minute) so several indexing threads can't overload the provider.
+
+Summaries are cached in Redis (tenant scoped through `get_redis_client`) by the hash
+of their prompt, so documents that are indexed again (retries, the same document in
+several connectors) don't pay for them twice. Redis errors are treated as misses.
+
+The chunk context prompts of a document all start with the same document prefix.
+The first chunk of every document is sent before the others so the prefix is in the
+provider's prompt cache by the time the rest go out. Providers that need explicit
+cache breakpoints get one after the document prefix.
+"""
+
+import contextlib
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+
+from langchain.schema.language_model import LanguageModelInput
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from alvio.configs.app_configs import CONTEXTUAL_RAG_CACHE_TTL_SECONDS
+from alvio.configs.app_configs import CONTEXTUAL_RAG_MAX_CONCURRENCY
+from alvio.configs.app_configs import CONTEXTUAL_RAG_MAX_REQUESTS_PER_MINUTE
+from alvio.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
+from alvio.configs.app_configs import USE_CHUNK_SUMMARY
+from alvio.configs.app_configs import USE_DOCUMENT_SUMMARY
+from alvio.indexing.models import DocAwareChunk
+from alvio.llm.chat_llm import LLMRateLimitError
+from alvio.llm.interfaces import LLM
+from alvio.llm.utils import MAX_CONTEXT_TOKENS
+from alvio.llm.utils import message_to_string
+from alvio.natural_language_processing.utils import BaseTokenizer
+from alvio.natural_language_processing.utils import tokenizer_trim_middle
+from alvio.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
+from alvio.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
+from alvio.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+from alvio.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "contextual_rag"
+
+
+class _LLMCallLimiter:
+    """Bounds the number of LLM calls in flight and spaces out their start times."""
+
+    def __init__(self, max_concurrency: int, max_requests_per_minute: int) -> None:
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._min_interval = (
+            60 / max_requests_per_minute if max_requests_per_minute > 0 else 0.0
+        )
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._semaphore:
+            if self._min_interval:
+                with self._lock:
+                    start = max(self._next_start, time.monotonic())
+                    self._next_start = start + self._min_interval
+                time.sleep(max(start - time.monotonic(), 0.0))
+            yield
+
+
+_LLM_CALL_LIMITER = _LLMCallLimiter(
+    max_concurrency=CONTEXTUAL_RAG_MAX_CONCURRENCY,
+    max_requests_per_minute=CONTEXTUAL_RAG_MAX_REQUESTS_PER_MINUTE,
+)
+
+
+class ContextualRAGBatchStats(BaseModel):
+    docs: int = 0
+    chunks: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    # prompt tokens repeating the document prefix of an earlier call of the same
+    # document, these are served from the provider's prompt cache
+    prefix_cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed: float = 0.0
+
+
+def _supports_explicit_prompt_caching(llm: LLM) -> bool:
+    # other providers (e.g. OpenAI) cache identical prompt prefixes on their own
+    return (
+        llm.config.model_provider == "anthropic"
+        or "claude" in str(llm.config.model_name).lower()
+    )
+
+
+class ContextualRAGSummarizer:
+    def __init__(
+        self, llm: LLM, tokenizer: BaseTokenizer, chunk_token_limit: int
+    ) -> None:
+        self.llm = llm
+        self.tokenizer = tokenizer
+
+        # The number of tokens allowed for the document when computing a document summary
+        self.trunc_doc_summary_tokens = llm.config.max_input_tokens - len(
+            tokenizer.encode(DOCUMENT_SUMMARY_PROMPT)
+        )
+
+        self.chunk_prompt_tokens = len(
+            tokenizer.encode(CONTEXTUAL_RAG_PROMPT1 + CONTEXTUAL_RAG_PROMPT2)
+        )
+        # The number of tokens allowed for the document when computing a
+        # "chunk in context of document" summary
+        self.trunc_doc_chunk_tokens = (
+            llm.config.max_input_tokens - self.chunk_prompt_tokens - chunk_token_limit
+        )
+
+        self._model_fingerprint = hashlib.sha256(
+            f"{llm.config.model_provider}|{llm.config.model_name}".encode()
+        ).hexdigest()[:16]
+        self._explicit_prompt_caching = _supports_explicit_prompt_caching(llm)
+        self._stats = ContextualRAGBatchStats()
+        self._stats_lock = threading.Lock()
+
+    def _cache_key(self, prompt_text: str) -> str:
+        prompt_hash = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+        return f"{_REDIS_KEY_PREFIX}:{self._model_fingerprint}:{prompt_hash}"
+
+    def _invoke(
+        self,
+        prompt: LanguageModelInput,
+        prompt_text: str,
+        prompt_tokens: int,
+        prefix_cached_prompt_tokens: int = 0,
+    ) -> str:
+        """Returns the cached answer for `prompt_text` or calls the LLM with `prompt`
+        (which holds the same text)."""
+        key = self._cache_key(prompt_text)
+        try:
+            cached = get_redis_client().get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read contextual RAG summary from redis: {e}")
+            cached = None
+
+        if isinstance(cached, bytes):
+            with self._stats_lock:
+                self._stats.cache_hits += 1
+            return cached.decode("utf-8")
+
+        with _LLM_CALL_LIMITER.slot():
+            answer = message_to_string(
+                self.llm.invoke(prompt, max_tokens=MAX_CONTEXT_TOKENS)
+            )
+
+        completion_tokens = len(self.tokenizer.encode(answer))
+        with self._stats_lock:
+            self._stats.llm_calls += 1
+            self._stats.prompt_tokens += prompt_tokens
+            self._stats.prefix_cached_prompt_tokens += prefix_cached_prompt_tokens
+            self._stats.completion_tokens += completion_tokens
+
+        try:
+            get_redis_client().set(key, answer, ex=CONTEXTUAL_RAG_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to write contextual RAG summary to redis: {e}")
+
+        return answer
+
+    def _summarize_document(self, doc_tokens: list[int], trunc_tokens: int) -> str:
+        doc_content = tokenizer_trim_middle(doc_tokens, trunc_tokens, self.tokenizer)
+        summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
+        return self._invoke(
+            summary_prompt,
+            summary_prompt,
+            prompt_tokens=min(len(doc_tokens), trunc_tokens),
+        )
+
+    def _add_document_summary(
+        self, chunks_by_doc: list[DocAwareChunk], doc_tokens: list[int]
+    ) -> None:
+        doc_summary = self._summarize_document(
+            doc_tokens, self.trunc_doc_summary_tokens
+        )
+        for chunk in chunks_by_doc:
+            chunk.doc_summary = doc_summary
+
+    def _get_document_prompt(
+        self, chunks_by_doc: list[DocAwareChunk], doc_tokens: list[int]
+    ) -> tuple[str, int]:
+        """The document part shared by the chunk context prompts of a document, along
+        with its number of tokens."""
+        # only compute doc summary if needed
+        if len(doc_tokens) <= MAX_TOKENS_FOR_FULL_INCLUSION:
+            doc_info = tokenizer_trim_middle(
+                doc_tokens, self.trunc_doc_chunk_tokens, self.tokenizer
+            )
+        else:
+            doc_info = chunks_by_doc[0].doc_summary
+        if not doc_info:
+            # This happens if the document is too long AND document summaries are
+            # turned off. In this case we compute a doc summary using the LLM
+            doc_info = self._summarize_document(doc_tokens, self.trunc_doc_chunk_tokens)
+        doc_info_tokens = (
+            min(len(doc_tokens), self.trunc_doc_chunk_tokens)
+            if len(doc_tokens) <= MAX_TOKENS_FOR_FULL_INCLUSION
+            else len(self.tokenizer.encode(doc_info))
+        )
+
+        return CONTEXTUAL_RAG_PROMPT1.format(document=doc_info), doc_info_tokens
+
+    def _add_chunk_context(
+        self,
+        chunk: DocAwareChunk,
+        document_prompt: str,
+        document_tokens: int,
+        first: bool,
+    ) -> None:
+        chunk_prompt = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
+        prompt: LanguageModelInput = document_prompt + chunk_prompt
+        if self._explicit_prompt_caching:
+            prompt = [
+                HumanMessage(
+                    content=[
+                        {
+                            "type": "text",
+                            "text": document_prompt,
+                            "cache_control": {"type": "ephemeral"},
+                        },
+                        {"type": "text", "text": chunk_prompt},
+                    ]
+                )
+            ]
+
+        try:
+            chunk.chunk_context = self._invoke(
+                prompt,
+                document_prompt + chunk_prompt,
+                prompt_tokens=self.chunk_prompt_tokens
+                + document_tokens
+                + len(self.tokenizer.encode(chunk.content)),
+                prefix_cached_prompt_tokens=0 if first else document_tokens,
+            )
+        except LLMRateLimitError as e:
+            # Erroring during chunker is undesirable, so we log the error and continue
+            logger.exception(f"Rate limit adding chunk summary: {e}", exc_info=e)
+            chunk.chunk_context = ""
+        except Exception as e:
+            logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
+            chunk.chunk_context = ""
+
+    def summarize(self, chunks: list[DocAwareChunk]) -> ContextualRAGBatchStats:
+        """Adds the document summary and chunk-within-document context to the chunks
+        based on which environment variables are set."""
+        start = time.monotonic()
+
+        doc2chunks: dict[str, list[DocAwareChunk]] = defaultdict(list)
+        for chunk in chunks:
+            doc2chunks[chunk.source_document.id].append(chunk)
+
+        # all chunks within a document have the same contextual_rag_reserved_tokens,
+        # 0 means there is not enough space for contextual RAG (the chunk content and
+        # possibly metadata took up too much space)
+        docs = [
+            chunks_by_doc
+            for chunks_by_doc in doc2chunks.values()
+            if chunks_by_doc[0].contextual_rag_reserved_tokens != 0
+        ]
+        # every document is only tokenized once
+        docs_tokens = [
+            self.tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
+            for chunks_by_doc in docs
+        ]
+
+        if USE_DOCUMENT_SUMMARY:
+            run_functions_tuples_in_parallel(
+                [
+                    (self._add_document_summary, (chunks_by_doc, doc_tokens))
+                    for chunks_by_doc, doc_tokens in zip(docs, docs_tokens)
+                ],
+                max_workers=CONTEXTUAL_RAG_MAX_CONCURRENCY,
+            )
+
+        if USE_CHUNK_SUMMARY:
+            document_prompts: list[tuple[str, int]] = run_functions_tuples_in_parallel(
+                [
+                    (self._get_document_prompt, (chunks_by_doc, doc_tokens))
+                    for chunks_by_doc, doc_tokens in zip(docs, docs_tokens)
+                ],
+                max_workers=CONTEXTUAL_RAG_MAX_CONCURRENCY,
+            )
+            # the first chunk of every document warms the provider's prompt cache
+            # for the remaining chunks of the document
+            for first in (True, False):
+                run_functions_tuples_in_parallel(
+                    [
+                        (
+                            self._add_chunk_context,
+                            (chunk, document_prompt, document_tokens, first),
+                        )
+                        for chunks_by_doc, (document_prompt, document_tokens) in zip(
+                            docs, document_prompts
+                        )
+                        for chunk in (chunks_by_doc[:1] if first else chunks_by_doc[1:])
+                    ],
+                    max_workers=CONTEXTUAL_RAG_MAX_CONCURRENCY,
+                )
+
+        stats = self._stats
+        stats.docs = len(docs)
+        stats.chunks = sum(len(chunks_by_doc) for chunks_by_doc in docs)
+        stats.elapsed = time.monotonic() - start
+        logger.info(
+            f"event=contextual_rag "
+            f"docs={stats.docs} "
+            f"chunks={stats.chunks} "
+            f"llm_calls={stats.llm_calls} "
+            f"cache_hits={stats.cache_hits} "
+            f"prompt_tokens={stats.prompt_tokens} "
+            f"prefix_cached_prompt_tokens={stats.prefix_cached_prompt_tokens} "
+            f"completion_tokens={stats.completion_tokens} "
+            f"elapsed={stats.elapsed:.3f} "
+            f"calls_per_second={stats.llm_calls / stats.elapsed if stats.elapsed else 0.0:.2f}"
+        )
+        return stats
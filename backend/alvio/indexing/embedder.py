@@ -3,6 +3,7 @@ from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
 
+from alvio.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from alvio.connectors.models import ConnectorFailure
 from alvio.connectors.models import ConnectorStopSignal
 from alvio.connectors.models import DocumentFailure
@@ -12,6 +13,7 @@ from alvio.indexing.models import ChunkEmbedding
 from alvio.indexing.models import DocAwareChunk
 from alvio.indexing.models import IndexChunk
 from alvio.natural_language_processing.search_nlp_models import EmbeddingModel
+from alvio.natural_language_processing.utils import tokenizer_trim_content
 from alvio.utils.logger import setup_logger
 from alvio.utils.timing import log_function_time
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
@@ -144,14 +146,6 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
-            texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
-            large_chunks_present=large_chunks_present,
-            tenant_id=tenant_id,
-            request_id=request_id,
-        )
-
         chunk_titles = {
             chunk.source_document.get_title_for_document_index() for chunk in chunks
         }
@@ -160,22 +154,38 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # If there is no title or the title is empty, the title embedding field will be null
         # which is ok, it just won't contribute at all to the scoring.
         chunk_titles_list = [title for title in chunk_titles if title]
+        if large_chunks_present:
+            # titles go through the same request as the large chunks, keep them to the
+            # regular context size so their embeddings match a title-only request
+            chunk_titles_texts = [
+                tokenizer_trim_content(
+                    content=title,
+                    desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
+                    tokenizer=self.embedding_model.tokenizer,
+                )
+                for title in chunk_titles_list
+            ]
+        else:
+            chunk_titles_texts = chunk_titles_list
+
+        # Chunks, mini chunks and titles are embedded as a single stream so the
+        # embedding model can batch and pipeline all of them together
+        all_embeddings = self.embedding_model.encode(
+            texts=flat_chunk_texts + chunk_titles_texts,
+            text_type=EmbedTextType.PASSAGE,
+            large_chunks_present=large_chunks_present,
+            tenant_id=tenant_id,
+            request_id=request_id,
+        )
+        embeddings = all_embeddings[: len(flat_chunk_texts)]
 
         # Cache the Title embeddings to only have to do it once
-        title_embed_dict: dict[str, Embedding] = {}
-        if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
-                chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
-                tenant_id=tenant_id,
-                request_id=request_id,
-            )
-            title_embed_dict.update(
-                {
-                    title: vector
-                    for title, vector in zip(chunk_titles_list, title_embeddings)
-                }
+        title_embed_dict: dict[str, Embedding] = {
+            title: vector
+            for title, vector in zip(
+                chunk_titles_list, all_embeddings[len(flat_chunk_texts) :]
             )
+        }
 
         # Mapping embeddings to chunks
         embedded_chunks: list[IndexChunk] = []
@@ -1,5 +1,11 @@
+import hashlib
+import json
+import threading
+import time
 from collections import defaultdict
 from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
 from typing import Protocol
 
 from pydantic import BaseModel
@@ -9,8 +15,9 @@ from sqlalchemy.orm import Session
 from alvio.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from alvio.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from alvio.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from alvio.configs.app_configs import ENABLE_INCREMENTAL_REINDEXING
+from alvio.configs.app_configs import IMAGE_SUMMARIZATION_MAX_CONCURRENCY
 from alvio.configs.app_configs import MAX_DOCUMENT_CHARS
-from alvio.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from alvio.configs.app_configs import USE_CHUNK_SUMMARY
 from alvio.configs.app_configs import USE_DOCUMENT_SUMMARY
 from alvio.configs.llm_configs import get_image_extraction_and_analysis_enabled
@@ -40,9 +47,17 @@ from alvio.document_index.document_index_utils import (
 from alvio.document_index.interfaces import DocumentIndex
 from alvio.document_index.interfaces import DocumentMetadata
 from alvio.document_index.interfaces import IndexBatchParams
-from alvio.file_processing.image_summarization import summarize_image_with_error_handling
+from alvio.document_index.interfaces import VespaDocumentFields
+from alvio.file_processing.image_summarization import (
+    summarize_image_with_error_handling,
+)
+from alvio.file_processing.image_summary_cache import build_image_summary_cache_key
+from alvio.file_processing.image_summary_cache import cache_image_summary
+from alvio.file_processing.image_summary_cache import get_cached_image_summary
+from alvio.file_processing.image_summary_cache import IMAGE_SUMMARY_STATS
 from alvio.file_store.file_store import get_default_file_store
 from alvio.indexing.chunker import Chunker
+from alvio.indexing.contextual_rag import ContextualRAGSummarizer
 from alvio.indexing.embedder import embed_chunks_with_failure_handling
 from alvio.indexing.embedder import IndexingEmbedder
 from alvio.indexing.models import DocAwareChunk
@@ -50,21 +65,14 @@ from alvio.indexing.models import IndexChunk
 from alvio.indexing.models import IndexingBatchAdapter
 from alvio.indexing.models import UpdatableChunkData
 from alvio.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
-from alvio.llm.chat_llm import LLMRateLimitError
 from alvio.llm.factory import get_default_llm_with_vision
 from alvio.llm.factory import get_llm_for_contextual_rag
 from alvio.llm.interfaces import LLM
-from alvio.llm.utils import MAX_CONTEXT_TOKENS
-from alvio.llm.utils import message_to_string
 from alvio.natural_language_processing.search_nlp_models import (
     InformationContentClassificationModel,
 )
 from alvio.natural_language_processing.utils import BaseTokenizer
 from alvio.natural_language_processing.utils import get_tokenizer
-from alvio.natural_language_processing.utils import tokenizer_trim_middle
-from alvio.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
-from alvio.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
-from alvio.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from alvio.utils.logger import setup_logger
 from alvio.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from alvio.utils.timing import log_function_time
@@ -80,6 +88,11 @@ class DocumentBatchPrepareContext(BaseModel):
     updatable_docs: list[Document]
     id_to_boost_map: dict[str, int]
     indexable_docs: list[IndexingDocument] = []
+    # chunk content hashes of the documents as they are currently indexed
+    id_to_previous_chunk_content_hashes: dict[str, list[str]] = {}
+    # chunk content hashes to store once indexing is done, None for documents that
+    # failed to index
+    id_to_chunk_content_hashes: dict[str, list[str] | None] = {}
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
@@ -95,6 +108,9 @@ class IndexingPipelineResult(BaseModel):
 
     failures: list[ConnectorFailure]
 
+    # number of chunks left as they were in Vespa because their content did not change
+    skipped_chunks: int = 0
+
 
 class IndexingPipelineProtocol(Protocol):
     def __call__(
@@ -349,8 +365,17 @@ def index_doc_batch_prepare(
         return None
 
     id_to_boost_map = {doc.id: doc.boost for doc in db_docs}
+    id_to_previous_chunk_content_hashes = {
+        doc.id: doc.chunk_content_hashes
+        for doc in db_docs
+        # the hashes are only trusted if they match what is in the document index
+        if doc.chunk_content_hashes is not None
+        and doc.chunk_count == len(doc.chunk_content_hashes)
+    }
     return DocumentBatchPrepareContext(
-        updatable_docs=updatable_docs, id_to_boost_map=id_to_boost_map
+        updatable_docs=updatable_docs,
+        id_to_boost_map=id_to_boost_map,
+        id_to_previous_chunk_content_hashes=id_to_previous_chunk_content_hashes,
     )
 
 
@@ -412,6 +437,123 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
+class _ImageSummary(BaseModel):
+    text: str
+    from_cache: bool = False
+    # only set for the images that were sent to the LLM
+    llm_seconds: float | None = None
+
+
+def _summarize_image(
+    image_data: bytes, context_name: str, cache_key: str, llm: LLM
+) -> tuple[str, float]:
+    start = time.monotonic()
+    try:
+        summary = summarize_image_with_error_handling(
+            llm=llm,
+            image_data=image_data,
+            context_name=context_name,
+        )
+    except Exception as e:
+        logger.error(f"Error processing image section: {e}")
+        return "[Error processing image]", time.monotonic() - start
+    elapsed = time.monotonic() - start
+
+    if not summary:
+        return "[Image could not be summarized]", elapsed
+
+    cache_image_summary(cache_key, summary)
+    return summary, elapsed
+
+
+def _summarize_image_file(
+    image_file_id: str,
+    llm: LLM,
+    in_flight: dict[str, Future[str]],
+    lock: threading.Lock,
+) -> _ImageSummary:
+    """Reads and summarizes one image, so only the images currently being worked on
+    are held in memory. Identical images (same cache key) wait for the summary of
+    the first one in `in_flight`."""
+    try:
+        file_store = get_default_file_store()
+
+        file_record = file_store.read_file_record(file_id=image_file_id)
+        if not file_record:
+            logger.warning(f"Image file {image_file_id} not found in FileStore")
+            return _ImageSummary(text="[Image could not be processed]")
+
+        image_data = file_store.read_file(file_id=image_file_id).read()
+    except Exception as e:
+        logger.error(f"Error processing image section: {e}")
+        return _ImageSummary(text="[Error processing image]")
+
+    cache_key = build_image_summary_cache_key(llm, image_data)
+    cached_summary = get_cached_image_summary(cache_key)
+    if cached_summary is not None:
+        return _ImageSummary(text=cached_summary, from_cache=True)
+
+    with lock:
+        future = in_flight.get(cache_key)
+        is_owner = future is None
+        if future is None:
+            future = Future()
+            in_flight[cache_key] = future
+    if not is_owner:
+        # the owner is already running, waiting can't starve the pool
+        return _ImageSummary(text=future.result())
+
+    try:
+        text, elapsed = _summarize_image(
+            image_data, file_record.display_name or "Image", cache_key, llm
+        )
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    future.set_result(text)
+    return _ImageSummary(text=text, llm_seconds=elapsed)
+
+
+def _summarize_image_files(image_file_ids: list[str], llm: LLM) -> dict[str, str]:
+    """Returns the section text of every image file. Images are read and summarized
+    with bounded concurrency, cached summaries are reused and identical images are
+    only summarized once."""
+    if not image_file_ids:
+        return {}
+
+    in_flight: dict[str, Future[str]] = {}
+    lock = threading.Lock()
+    summaries: list[_ImageSummary] = run_functions_tuples_in_parallel(
+        [
+            (_summarize_image_file, (image_file_id, llm, in_flight, lock))
+            for image_file_id in image_file_ids
+        ],
+        max_workers=IMAGE_SUMMARIZATION_MAX_CONCURRENCY,
+    )
+
+    cache_hits = sum(1 for summary in summaries if summary.from_cache)
+    llm_times = [
+        summary.llm_seconds for summary in summaries if summary.llm_seconds is not None
+    ]
+    llm_seconds = sum(llm_times)
+    IMAGE_SUMMARY_STATS.record(cache_hits, len(llm_times), llm_seconds)
+    logger.info(
+        f"event=image_summarization "
+        f"images={len(image_file_ids)} "
+        f"cache_hits={cache_hits} "
+        f"llm_calls={len(llm_times)} "
+        f"llm_time={llm_seconds:.3f} "
+        f"max_llm_time={max(llm_times, default=0.0):.3f} "
+        f"avg_llm_time={IMAGE_SUMMARY_STATS.avg_llm_seconds:.3f} "
+        f"hit_rate={IMAGE_SUMMARY_STATS.hit_rate:.2f}"
+    )
+
+    return {
+        image_file_id: summary.text
+        for image_file_id, summary in zip(image_file_ids, summaries)
+    }
+
+
 def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     """
     Process all sections in documents by:
@@ -453,54 +595,31 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
             for document in documents
         ]
 
+    image_file_id_to_text = _summarize_image_files(
+        list(
+            {
+                section.image_file_id: None
+                for document in documents
+                for section in document.sections
+                if isinstance(section, ImageSection)
+            }
+        ),
+        llm,
+    )
+
     indexed_documents: list[IndexingDocument] = []
 
     for document in documents:
         processed_sections: list[Section] = []
 
         for section in document.sections:
-            # For ImageSection, process and create base Section with both text and image_file_id
+            # For ImageSection, create base Section with both the summary and image_file_id
             if isinstance(section, ImageSection):
-                # Default section with image path preserved - ensure text is always a string
                 processed_section = Section(
                     link=section.link,
                     image_file_id=section.image_file_id,
-                    text="",  # Initialize with empty string
+                    text=image_file_id_to_text[section.image_file_id],
                 )
-
-                # Try to get image summary
-                try:
-                    file_store = get_default_file_store()
-
-                    file_record = file_store.read_file_record(
-                        file_id=section.image_file_id
-                    )
-                    if not file_record:
-                        logger.warning(
-                            f"Image file {section.image_file_id} not found in FileStore"
-                        )
-
-                        processed_section.text = "[Image could not be processed]"
-                    else:
-                        # Get the image data
-                        image_data_io = file_store.read_file(
-                            file_id=section.image_file_id
-                        )
-                        image_data = image_data_io.read()
-                        summary = summarize_image_with_error_handling(
-                            llm=llm,
-                            image_data=image_data,
-                            context_name=file_record.display_name or "Image",
-                        )
-
-                        if summary:
-                            processed_section.text = summary
-                        else:
-                            processed_section.text = "[Image could not be summarized]"
-                except Exception as e:
-                    logger.error(f"Error processing image section: {e}")
-                    processed_section.text = "[Error processing image]"
-
                 processed_sections.append(processed_section)
 
             # For TextSection, create a base Section with text and link
@@ -521,100 +640,6 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     return indexed_documents
 
 
-def add_document_summaries(
-    chunks_by_doc: list[DocAwareChunk],
-    llm: LLM,
-    tokenizer: BaseTokenizer,
-    trunc_doc_tokens: int,
-) -> list[int] | None:
-    """
-    Adds a document summary to a list of chunks from the same document.
-    Returns the number of tokens in the document.
-    """
-
-    doc_tokens = []
-    # this is value is the same for each chunk in the document; 0 indicates
-    # There is not enough space for contextual RAG (the chunk content
-    # and possibly metadata took up too much space)
-    if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
-        return None
-
-    doc_tokens = tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
-    doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
-    summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
-    doc_summary = message_to_string(
-        llm.invoke(summary_prompt, max_tokens=MAX_CONTEXT_TOKENS)
-    )
-
-    for chunk in chunks_by_doc:
-        chunk.doc_summary = doc_summary
-
-    return doc_tokens
-
-
-def add_chunk_summaries(
-    chunks_by_doc: list[DocAwareChunk],
-    llm: LLM,
-    tokenizer: BaseTokenizer,
-    trunc_doc_chunk_tokens: int,
-    doc_tokens: list[int] | None,
-) -> None:
-    """
-    Adds chunk summaries to the chunks grouped by document id.
-    Chunk summaries look at the chunk as well as the entire document (or a summary,
-    if the document is too long) and describe how the chunk relates to the document.
-    """
-    # all chunks within a document have the same contextual_rag_reserved_tokens
-    if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
-        return
-
-    # use values computed in above doc summary section if available
-    doc_tokens = doc_tokens or tokenizer.encode(
-        chunks_by_doc[0].source_document.get_text_content()
-    )
-    doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_chunk_tokens, tokenizer)
-
-    # only compute doc summary if needed
-    doc_info = (
-        doc_content
-        if len(doc_tokens) <= MAX_TOKENS_FOR_FULL_INCLUSION
-        else chunks_by_doc[0].doc_summary
-    )
-    if not doc_info:
-        # This happens if the document is too long AND document summaries are turned off
-        # In this case we compute a doc summary using the LLM
-        doc_info = message_to_string(
-            llm.invoke(
-                DOCUMENT_SUMMARY_PROMPT.format(document=doc_content),
-                max_tokens=MAX_CONTEXT_TOKENS,
-            )
-        )
-
-    context_prompt1 = CONTEXTUAL_RAG_PROMPT1.format(document=doc_info)
-
-    def assign_context(chunk: DocAwareChunk) -> None:
-        context_prompt2 = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
-        try:
-            chunk.chunk_context = message_to_string(
-                llm.invoke(
-                    context_prompt1 + context_prompt2,
-                    max_tokens=MAX_CONTEXT_TOKENS,
-                )
-            )
-        except LLMRateLimitError as e:
-            # Erroring during chunker is undesirable, so we log the error and continue
-            # TODO: for v2, add robust retry logic
-            logger.exception(f"Rate limit adding chunk summary: {e}", exc_info=e)
-            chunk.chunk_context = ""
-        except Exception as e:
-            logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
-            chunk.chunk_context = ""
-
-    run_functions_tuples_in_parallel(
-        [(assign_context, (chunk,)) for chunk in chunks_by_doc]
-    )
-
-
 def add_contextual_summaries(
     chunks: list[DocAwareChunk],
     llm: LLM,
@@ -625,36 +650,91 @@ def add_contextual_summaries(
     Adds Document summary and chunk-within-document context to the chunks
     based on which environment variables are set.
     """
-    doc2chunks = defaultdict(list)
+    ContextualRAGSummarizer(llm, tokenizer, chunk_token_limit).summarize(chunks)
+    return chunks
+
+
+def get_chunk_content_hash_fingerprint(
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    enable_contextual_rag: bool,
+    llm: LLM | None,
+) -> str:
+    """Everything besides the chunks themselves that determines what ends up in the
+    document index. Hashes computed with a different fingerprint never match."""
+    fingerprint: dict[str, Any] = {
+        "index_name": document_index.index_name,
+        "model_name": embedder.model_name,
+        "normalize": embedder.normalize,
+        "passage_prefix": embedder.passage_prefix,
+        "provider_type": embedder.provider_type,
+        "contextual_rag": enable_contextual_rag,
+    }
+    if enable_contextual_rag:
+        fingerprint["contextual_rag_llm"] = (
+            f"{llm.config.model_provider}/{llm.config.model_name}" if llm else None
+        )
+        fingerprint["use_document_summary"] = USE_DOCUMENT_SUMMARY
+        fingerprint["use_chunk_summary"] = USE_CHUNK_SUMMARY
+
+    return json.dumps(fingerprint, sort_keys=True, default=str)
+
+
+def compute_chunk_content_hashes(
+    chunks: list[DocAwareChunk], fingerprint: str
+) -> dict[str, list[str]]:
+    """Hashes every chunk (in chunk order, per document) over the fields that are
+    embedded or written to the document index, along with the document fields that
+    are part of every chunk. The contextual RAG summaries are generated from these
+    so they are left out."""
+    doc_id_to_hashes: dict[str, list[str]] = defaultdict(list)
     for chunk in chunks:
-        doc2chunks[chunk.source_document.id].append(chunk)
+        document = chunk.source_document
+        hash_input = {
+            "fingerprint": fingerprint,
+            "chunk": chunk.model_dump(
+                mode="json",
+                exclude={"source_document", "doc_summary", "chunk_context"},
+            ),
+            "title": document.get_title_for_document_index(),
+            "semantic_identifier": document.semantic_identifier,
+            "source": document.source.value,
+            "metadata": document.metadata,
+        }
+        doc_id_to_hashes[document.id].append(
+            hashlib.sha256(
+                json.dumps(hash_input, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        )
 
-    # The number of tokens allowed for the document when computing a document summary
-    trunc_doc_summary_tokens = llm.config.max_input_tokens - len(
-        tokenizer.encode(DOCUMENT_SUMMARY_PROMPT)
-    )
+    return doc_id_to_hashes
 
-    prompt_tokens = len(
-        tokenizer.encode(CONTEXTUAL_RAG_PROMPT1 + CONTEXTUAL_RAG_PROMPT2)
-    )
-    # The number of tokens allowed for the document when computing a
-    # "chunk in context of document" summary
-    trunc_doc_chunk_tokens = (
-        llm.config.max_input_tokens - prompt_tokens - chunk_token_limit
-    )
-    for chunks_by_doc in doc2chunks.values():
-        doc_tokens = None
-        if USE_DOCUMENT_SUMMARY:
-            doc_tokens = add_document_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens
-            )
 
-        if USE_CHUNK_SUMMARY:
-            add_chunk_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_chunk_tokens, doc_tokens
+def _update_unchanged_documents_metadata(
+    document_index: DocumentIndex,
+    unchanged_docs: list[Document],
+    doc_id_to_chunk_count: dict[str, int],
+    tenant_id: str,
+) -> None:
+    """Partial update of the document level fields of documents whose chunks did
+    not change. Access, document sets and boost are synced by the metadata sync
+    that follows every indexing."""
+    document_index.update_multiple(
+        {
+            doc.id: VespaDocumentFields(
+                doc_updated_at=doc.doc_updated_at,
+                primary_owners=get_experts_stores_representations(doc.primary_owners),
+                secondary_owners=get_experts_stores_representations(
+                    doc.secondary_owners
+                ),
             )
-
-    return chunks
+            for doc in unchanged_docs
+        },
+        tenant_id=tenant_id,
+        doc_id_to_chunk_count={
+            doc.id: doc_id_to_chunk_count[doc.id] for doc in unchanged_docs
+        },
+    )
 
 
 @log_function_time(debug_only=True)
@@ -710,6 +790,44 @@ def index_doc_batch(
     chunks: list[DocAwareChunk] = chunker.chunk(context.indexable_docs)
     llm_tokenizer: BaseTokenizer | None = None
 
+    # documents whose chunks are all unchanged keep their chunks (with the embeddings
+    # and contextual RAG summaries) in the document index as they are
+    doc_id_to_chunk_content_hashes = compute_chunk_content_hashes(
+        chunks,
+        get_chunk_content_hash_fingerprint(
+            embedder, document_index, enable_contextual_rag, llm
+        ),
+    )
+    unchanged_docs = (
+        [
+            doc
+            for doc in context.updatable_docs
+            if doc.id in context.id_to_previous_chunk_content_hashes
+            and doc_id_to_chunk_content_hashes.get(doc.id, [])
+            == context.id_to_previous_chunk_content_hashes[doc.id]
+        ]
+        if ENABLE_INCREMENTAL_REINDEXING
+        else []
+    )
+    unchanged_doc_id_to_chunk_count = {
+        doc.id: len(context.id_to_previous_chunk_content_hashes[doc.id])
+        for doc in unchanged_docs
+    }
+    if unchanged_docs:
+        chunks = [
+            chunk
+            for chunk in chunks
+            if chunk.source_document.id not in unchanged_doc_id_to_chunk_count
+        ]
+    skipped_chunks = sum(unchanged_doc_id_to_chunk_count.values())
+    logger.info(
+        f"event=incremental_reindex "
+        f"docs={len(context.updatable_docs)} "
+        f"unchanged_docs={len(unchanged_docs)} "
+        f"skipped_chunks={skipped_chunks} "
+        f"chunks_to_index={len(chunks)}"
+    )
+
     # contextual RAG
     if enable_contextual_rag:
         assert llm is not None, "must provide an LLM for contextual RAG"
@@ -773,6 +891,17 @@ def index_doc_batch(
             context=context,
         )
 
+        # unchanged documents are left out of the write, only their metadata is updated
+        for document_id, chunk_count in unchanged_doc_id_to_chunk_count.items():
+            result.doc_id_to_new_chunk_cnt[document_id] = chunk_count
+        if unchanged_docs:
+            _update_unchanged_documents_metadata(
+                document_index=document_index,
+                unchanged_docs=unchanged_docs,
+                doc_id_to_chunk_count=unchanged_doc_id_to_chunk_count,
+                tenant_id=tenant_id,
+            )
+
         short_descriptor_list = [chunk.to_short_descriptor() for chunk in result.chunks]
         short_descriptor_log = str(short_descriptor_list)[:1024]
         logger.debug(f"Indexing the following chunks: {short_descriptor_log}")
@@ -787,29 +916,30 @@ def index_doc_batch(
             document_index=document_index,
             chunks=result.chunks,
             index_batch_params=IndexBatchParams(
-                doc_id_to_previous_chunk_cnt=result.doc_id_to_previous_chunk_cnt,
-                doc_id_to_new_chunk_cnt=result.doc_id_to_new_chunk_cnt,
+                doc_id_to_previous_chunk_cnt={
+                    document_id: chunk_count
+                    for document_id, chunk_count in result.doc_id_to_previous_chunk_cnt.items()
+                    if document_id not in unchanged_doc_id_to_chunk_count
+                },
+                doc_id_to_new_chunk_cnt={
+                    document_id: chunk_count
+                    for document_id, chunk_count in result.doc_id_to_new_chunk_cnt.items()
+                    if document_id not in unchanged_doc_id_to_chunk_count
+                },
                 tenant_id=tenant_id,
                 large_chunks_enabled=chunker.enable_large_chunks,
             ),
         )
 
+        failed_doc_ids = {
+            record.failed_document.document_id
+            for record in vector_db_write_failures + embedding_failures
+            if record.failed_document
+        }
         all_returned_doc_ids = (
             {record.document_id for record in insertion_records}
-            .union(
-                {
-                    record.failed_document.document_id
-                    for record in vector_db_write_failures
-                    if record.failed_document
-                }
-            )
-            .union(
-                {
-                    record.failed_document.document_id
-                    for record in embedding_failures
-                    if record.failed_document
-                }
-            )
+            .union(failed_doc_ids)
+            .union(unchanged_doc_id_to_chunk_count)
         )
         if all_returned_doc_ids != set(updatable_ids):
             raise RuntimeError(
@@ -819,6 +949,15 @@ def index_doc_batch(
                 "This should never happen."
             )
 
+        context.id_to_chunk_content_hashes = {
+            document_id: (
+                None
+                if document_id in failed_doc_ids
+                else doc_id_to_chunk_content_hashes.get(document_id, [])
+            )
+            for document_id in updatable_ids
+        }
+
         adapter.post_index(
             context=context,
             updatable_chunk_data=updatable_chunk_data,
@@ -831,6 +970,7 @@ def index_doc_batch(
         total_docs=len(filtered_documents),
         total_chunks=len(chunks_with_embeddings),
         failures=vector_db_write_failures + embedding_failures,
+        skipped_chunks=skipped_chunks,
     )
 
 
@@ -1,18 +1,22 @@
+import re
 import time
+from collections.abc import Callable
 from collections.abc import Generator
 from typing import cast
 
+from rapidfuzz import process
 from rapidfuzz.fuzz import ratio
 from redis.lock import Lock as RedisLock
-from sqlalchemy import func
-from sqlalchemy import text
 
 from alvio.background.celery.tasks.kg_processing.utils import extend_lock
 from alvio.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
+from alvio.configs.kg_configs import KG_CLUSTERING_BATCH_SIZE
+from alvio.configs.kg_configs import KG_CLUSTERING_MAX_WORKERS
 from alvio.configs.kg_configs import KG_CLUSTERING_RETRIEVE_THRESHOLD
 from alvio.configs.kg_configs import KG_CLUSTERING_THRESHOLD
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
 from alvio.db.entities import KGEntity
+from alvio.db.entities import get_similar_entities_for_names
 from alvio.db.entities import KGEntityExtractionStaging
 from alvio.db.entities import merge_entities
 from alvio.db.entities import transfer_entity
@@ -34,33 +38,29 @@ from alvio.kg.models import KGGroundingType
 from alvio.kg.utils.formatting_utils import make_relationship_id
 from alvio.utils.logger import setup_logger
 from alvio.utils.threadpool_concurrency import run_functions_tuples_in_parallel
-from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
 
 logger = setup_logger()
 
+# pg_trgm splits names into words of alphanumeric characters
+_trigram_word_regex = re.compile(r"[^\W_]+")
 
-def _get_batch_untransferred_grounded_entities(
-    batch_size: int,
-) -> Generator[list[KGEntityExtractionStaging], None, None]:
-    while True:
-        with get_session_with_current_tenant() as db_session:
-            batch = (
-                db_session.query(KGEntityExtractionStaging)
-                .join(
-                    KGEntityType,
-                    KGEntityExtractionStaging.entity_type_id_name
-                    == KGEntityType.id_name,
-                )
-                .filter(
-                    KGEntityType.grounding == KGGroundingType.GROUNDED,
-                    KGEntityExtractionStaging.transferred_id_name.is_(None),
-                )
-                .limit(batch_size)
-                .all()
+
+def _get_untransferred_grounded_entity_types() -> list[str]:
+    with get_session_with_current_tenant() as db_session:
+        rows = (
+            db_session.query(KGEntityExtractionStaging.entity_type_id_name)
+            .join(
+                KGEntityType,
+                KGEntityExtractionStaging.entity_type_id_name == KGEntityType.id_name,
             )
-            if not batch:
-                break
-            yield batch
+            .filter(
+                KGEntityType.grounding == KGGroundingType.GROUNDED,
+                KGEntityExtractionStaging.transferred_id_name.is_(None),
+            )
+            .distinct()
+            .all()
+        )
+    return [row.entity_type_id_name for row in rows]
 
 
 def _get_batch_untransferred_relationship_types(
@@ -144,78 +144,163 @@ def _get_batch_kg_processed_documents(
             offset += batch_size
 
 
-def _cluster_one_grounded_entity(
-    entity: KGEntityExtractionStaging,
-) -> tuple[KGEntity, bool]:
+def _has_digit(name: str) -> bool:
+    return any(char.isdigit() for char in name)
+
+
+def _trigrams(name: str) -> set[str]:
     """
-    Cluster a single grounded entity.
+    Trigrams of a name the way pg_trgm extracts them: each alphanumeric word is
+    lowercased and padded with two spaces in front and one behind.
     """
-    with get_session_with_current_tenant() as db_session:
-        # get entity name and filtering conditions
-        if entity.document_id is not None:
-            entity_name = cast(
-                str,
-                db_session.query(Document.semantic_id)
-                .filter(Document.id == entity.document_id)
-                .scalar(),
-            ).lower()
-            filtering = [KGEntity.document_id.is_(None)]
+    trigrams: set[str] = set()
+    for word in _trigram_word_regex.findall(name.lower()):
+        padded_word = f"  {word} "
+        trigrams.update(padded_word[i : i + 3] for i in range(len(padded_word) - 2))
+    return trigrams
+
+
+def _trigram_similarity(name1: str, name2: str) -> float:
+    """Same as pg_trgm's similarity(name1, name2)."""
+    trigrams1 = _trigrams(name1)
+    trigrams2 = _trigrams(name2)
+    if not trigrams1 or not trigrams2:
+        return 0.0
+    return len(trigrams1 & trigrams2) / len(trigrams1 | trigrams2)
+
+
+def _find_best_match(
+    entity_name: str, candidates: list[KGEntity], document_backed: bool
+) -> KGEntity | None:
+    eligible_candidates = [
+        candidate
+        for candidate in candidates
+        # skip those with numbers so we don't cluster version1 and version2, etc.
+        if not _has_digit(candidate.name)
+        # a document backed entity can't be merged into another document's entity
+        and not (document_backed and candidate.document_id is not None)
+    ]
+    match = process.extractOne(
+        entity_name,
+        [candidate.name for candidate in eligible_candidates],
+        scorer=ratio,
+        processor=None,
+        score_cutoff=KG_CLUSTERING_THRESHOLD * 100,
+    )
+    return eligible_candidates[match[2]] if match is not None else None
+
+
+def _resolve_grounded_entity_batch(
+    entities: list[KGEntityExtractionStaging],
+    entity_names: list[str],
+    similar_entities: list[list[KGEntity]],
+    merge: Callable[[KGEntity, KGEntityExtractionStaging], KGEntity],
+    transfer: Callable[[KGEntityExtractionStaging], KGEntity],
+) -> None:
+    """
+    Merges each staging entity into its best matching entity, or transfers it as a new
+    entity if there is no match. The entities must all be of the same entity type.
+
+    similar_entities were retrieved before any entity of the batch was transferred, so
+    entities created earlier in the batch are added as candidates here, which gives the
+    same result as clustering the entities one at a time.
+    """
+    new_entities: list[KGEntity] = []
+    for entity, entity_name, similar in zip(entities, entity_names, similar_entities):
+        candidates: list[KGEntity] = []
+        if not _has_digit(entity_name):
+            similar_ids = {id(candidate) for candidate in similar}
+            candidates = similar + [
+                new_entity
+                for new_entity in new_entities
+                if id(new_entity) not in similar_ids
+                and _trigram_similarity(new_entity.name, entity_name)
+                >= KG_CLUSTERING_RETRIEVE_THRESHOLD
+            ]
+
+        best_entity = _find_best_match(
+            entity_name, candidates, document_backed=entity.document_id is not None
+        )
+        if best_entity is not None:
+            logger.debug(f"Merged {entity.name} with {best_entity.name}")
+            merge(best_entity, entity)
         else:
-            entity_name = entity.name.lower()
-            filtering = []
+            new_entities.append(transfer(entity))
 
-        # skip those with numbers so we don't cluster version1 and version2, etc.
-        similar_entities: list[KGEntity] = []
-        if not any(char.isdigit() for char in entity_name):
-            # find similar entities, uses GIN index, very efficient
-            db_session.execute(
-                text(
-                    "SET pg_trgm.similarity_threshold = "
-                    + str(KG_CLUSTERING_RETRIEVE_THRESHOLD)
-                )
-            )
-            similar_entities = (
-                db_session.query(KGEntity)
-                .filter(
-                    # find entities of the same type with a similar name
-                    *filtering,
-                    KGEntity.entity_type_id_name == entity.entity_type_id_name,
-                    getattr(func, POSTGRES_DEFAULT_SCHEMA).similarity_op(
-                        KGEntity.name, entity_name
-                    ),
-                )
-                .all()
-            )
 
-    # find best match
-    best_score = -1.0
-    best_entity = None
-    for similar in similar_entities:
-        # skip those with numbers so we don't cluster version1 and version2, etc.
-        if any(char.isdigit() for char in similar.name):
-            continue
-        score = ratio(similar.name, entity_name)
-        if score >= KG_CLUSTERING_THRESHOLD * 100 and score > best_score:
-            best_score = score
-            best_entity = similar
-
-    # if there is a match, update the entity, otherwise create a new one
+def _cluster_grounded_entity_batch(entity_type_id_name: str, batch_size: int) -> int:
+    """
+    Cluster the next batch of untransferred grounded entities of one entity type in a
+    single transaction. Returns the number of entities transferred.
+    """
     with get_session_with_current_tenant() as db_session:
-        if best_entity:
-            logger.debug(f"Merged {entity.name} with {best_entity.name}")
-            update_vespa = (
-                best_entity.document_id is None and entity.document_id is not None
+        entities = (
+            db_session.query(KGEntityExtractionStaging)
+            .filter(
+                KGEntityExtractionStaging.entity_type_id_name == entity_type_id_name,
+                KGEntityExtractionStaging.transferred_id_name.is_(None),
             )
-            transferred_entity = merge_entities(
-                db_session=db_session, parent=best_entity, child=entity
-            )
-        else:
-            update_vespa = entity.document_id is not None
-            transferred_entity = transfer_entity(db_session=db_session, entity=entity)
+            .limit(batch_size)
+            .all()
+        )
+        if not entities:
+            return 0
 
+        # document backed entities are named after their document
+        document_ids = {
+            entity.document_id for entity in entities if entity.document_id is not None
+        }
+        semantic_ids = {
+            row.id: row.semantic_id
+            for row in db_session.query(Document.id, Document.semantic_id)
+            .filter(Document.id.in_(document_ids))
+            .all()
+        }
+        entity_names = [
+            (
+                semantic_ids[entity.document_id]
+                if entity.document_id is not None
+                else entity.name
+            ).lower()
+            for entity in entities
+        ]
+
+        # find similar entities for the whole batch at once, names with numbers are
+        # never clustered so they aren't searched for
+        searchable_inds = [
+            ind
+            for ind, entity_name in enumerate(entity_names)
+            if not _has_digit(entity_name)
+        ]
+        similar_entities: list[list[KGEntity]] = [[] for _ in entities]
+        for ind, similar in zip(
+            searchable_inds,
+            get_similar_entities_for_names(
+                db_session=db_session,
+                entity_type_id_name=entity_type_id_name,
+                names=[entity_names[ind] for ind in searchable_inds],
+                exclude_document_entities=[
+                    entities[ind].document_id is not None for ind in searchable_inds
+                ],
+                similarity_threshold=KG_CLUSTERING_RETRIEVE_THRESHOLD,
+            ),
+        ):
+            similar_entities[ind] = similar
+
+        _resolve_grounded_entity_batch(
+            entities=entities,
+            entity_names=entity_names,
+            similar_entities=similar_entities,
+            merge=lambda parent, child: merge_entities(
+                db_session=db_session, parent=parent, child=child
+            ),
+            transfer=lambda entity: transfer_entity(
+                db_session=db_session, entity=entity
+            ),
+        )
         db_session.commit()
 
-    return transferred_entity, update_vespa
+    return len(entities)
 
 
 def _create_one_parent_child_relationship(entity: KGEntityExtractionStaging) -> None:
@@ -319,25 +404,29 @@ def kg_clustering(
 
     last_lock_time = time.monotonic()
 
-    # Cluster and transfer grounded entities sequentially
+    # Cluster and transfer grounded entities. Entities are only ever clustered with
+    # entities of the same type, so each round clusters one batch of several entity
+    # types in parallel
     start_time = time.monotonic()
-    i_batch = 0
-    for i_batch, untransferred_grounded_entities in enumerate(
-        _get_batch_untransferred_grounded_entities(
-            batch_size=processing_chunk_batch_size
+    num_entities = 0
+    while entity_types := _get_untransferred_grounded_entity_types():
+        num_entities += sum(
+            run_functions_tuples_in_parallel(
+                [
+                    (
+                        _cluster_grounded_entity_batch,
+                        (entity_type_id_name, KG_CLUSTERING_BATCH_SIZE),
+                    )
+                    for entity_type_id_name in entity_types[:KG_CLUSTERING_MAX_WORKERS]
+                ]
+            )
         )
-    ):
-        for entity in untransferred_grounded_entities:
-            _cluster_one_grounded_entity(entity)
         last_lock_time = extend_lock(
             lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
         )
-        # logger.debug(f"Transferred entities batch {i}")
     # NOTE: we assume every entity is transferred, as we currently only have grounded entities
     time_delta = time.monotonic() - start_time
-    logger.info(
-        f"Finished transferring {i_batch+1} entity batches in {time_delta:.2f}s"
-    )
+    logger.info(f"Finished transferring {num_entities} entities in {time_delta:.2f}s")
 
     # Create parent-child relationships in parallel
     for _ in range(kg_config_settings.KG_MAX_PARENT_RECURSION_DEPTH):
@@ -0,0 +1,238 @@
+"""Process wide clients for the API based embedding and rerank providers.
+
+Provider SDK clients (and the HTTP connection pools behind them) used to be created
+for every batch, on an event loop that was created for that batch as well, so no
+connection or TLS session was ever reused. All provider calls now run on a single
+background event loop and share one client per (provider, API URL, API key).
+
+Every client also gets a limiter that caps the requests in flight and, once the
+provider rate limits a request, makes every caller wait before sending the next one
+(honoring Retry-After when the provider sends it).
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Coroutine
+from contextlib import AbstractAsyncContextManager
+from contextlib import AsyncExitStack
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+import httpx
+
+from alvio.configs.app_configs import API_PROVIDER_MAX_CONCURRENT_REQUESTS
+from alvio.configs.app_configs import API_PROVIDER_RATE_LIMIT_BACKOFF_SECONDS
+from alvio.configs.app_configs import API_PROVIDER_RATE_LIMIT_MAX_BACKOFF_SECONDS
+from alvio.configs.app_configs import API_PROVIDER_RATE_LIMIT_MAX_RETRIES
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_RATE_LIMIT_ERROR_NAMES = ("RateLimit", "TooManyRequests", "Throttling")
+
+
+def build_provider_client_key(
+    provider: str, api_url: str | None, api_key: str | None
+) -> str:
+    """Clients are never shared between API keys, the key is hashed so it doesn't
+    show up in the registry."""
+    api_key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return f"{provider}|{api_url or ''}|{api_key_hash}"
+
+
+def _parse_retry_after(headers: Any) -> float | None:
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def get_rate_limit_retry_after(error: BaseException) -> float | None:
+    """Returns how long to wait if `error` is a rate limit error, 0 if the provider
+    didn't say, and None if it's not a rate limit error.
+
+    Providers raise their own exception types, so this only relies on the
+    attributes they have in common (status code, response headers, class name)."""
+    response = getattr(error, "response", None)
+    status_code = (
+        getattr(error, "status_code", None)
+        or getattr(error, "http_status", None)
+        or getattr(response, "status_code", None)
+    )
+    # botocore keeps the error code in the parsed response
+    boto_error_code = (
+        response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+    )
+
+    if not (
+        status_code == 429
+        or any(name in type(error).__name__ for name in _RATE_LIMIT_ERROR_NAMES)
+        or (boto_error_code and "Throttling" in boto_error_code)
+    ):
+        return None
+
+    retry_after = _parse_retry_after(
+        getattr(error, "headers", None) or getattr(response, "headers", None)
+    )
+    return retry_after if retry_after is not None else 0.0
+
+
+class ProviderLimiter:
+    """Must only be used from the loop of the registry it belongs to."""
+
+    def __init__(
+        self,
+        label: str,
+        max_concurrency: int = API_PROVIDER_MAX_CONCURRENT_REQUESTS,
+        max_retries: int = API_PROVIDER_RATE_LIMIT_MAX_RETRIES,
+        backoff: float = API_PROVIDER_RATE_LIMIT_BACKOFF_SECONDS,
+        max_backoff: float = API_PROVIDER_RATE_LIMIT_MAX_BACKOFF_SECONDS,
+    ) -> None:
+        self.label = label
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.requests = 0
+        self.rate_limited = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._backoff_until = 0.0
+        self._consecutive_rate_limits = 0
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Runs `call` once a slot is free and no backoff is pending, retrying it
+        when it is rate limited."""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                while (delay := self._backoff_until - time.monotonic()) > 0:
+                    await asyncio.sleep(delay)
+
+                self.requests += 1
+                try:
+                    result = await call()
+                except Exception as e:
+                    retry_after = get_rate_limit_retry_after(e)
+                    if retry_after is None or attempt == self.max_retries:
+                        raise
+                    self._record_rate_limit(retry_after, attempt)
+                    continue
+
+                self._consecutive_rate_limits = 0
+                return result
+
+        raise RuntimeError("unreachable")
+
+    def _record_rate_limit(self, retry_after: float, attempt: int) -> None:
+        self.rate_limited += 1
+        self._consecutive_rate_limits += 1
+        backoff = retry_after or min(
+            self.backoff * 2 ** (self._consecutive_rate_limits - 1), self.max_backoff
+        )
+        self._backoff_until = max(self._backoff_until, time.monotonic() + backoff)
+        logger.warning(
+            f"event=provider_rate_limited "
+            f"provider={self.label} "
+            f"attempt={attempt + 1} "
+            f"backoff={backoff:.1f} "
+            f"requests={self.requests} "
+            f"rate_limited={self.rate_limited}"
+        )
+
+
+class ProviderClientRegistry:
+    """Holds the provider clients and their limiters. Must only be used from the loop
+    it was created for (see `run_provider_call`), the clients' connections are
+    bound to it."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, Any] = {}
+        self._limiters: dict[str, ProviderLimiter] = {}
+        self._exit_stack = AsyncExitStack()
+        self._context_client_lock = asyncio.Lock()
+
+    def get_client(self, key: str, factory: Callable[[], T]) -> T:
+        if key not in self._clients:
+            self._clients[key] = factory()
+        return cast(T, self._clients[key])
+
+    async def get_context_client(
+        self, key: str, factory: Callable[[], AbstractAsyncContextManager[T]]
+    ) -> T:
+        """For clients that are async context managers (e.g. aioboto3), they are
+        entered once and kept open."""
+        async with self._context_client_lock:
+            if key not in self._clients:
+                self._clients[key] = await self._exit_stack.enter_async_context(
+                    factory()
+                )
+        return cast(T, self._clients[key])
+
+    def get_http_client(self, key: str, timeout: float | None) -> httpx.AsyncClient:
+        return self.get_client(
+            key,
+            lambda: httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=API_PROVIDER_MAX_CONCURRENT_REQUESTS,
+                    max_keepalive_connections=API_PROVIDER_MAX_CONCURRENT_REQUESTS,
+                ),
+            ),
+        )
+
+    def get_limiter(self, key: str) -> ProviderLimiter:
+        if key not in self._limiters:
+            # the key ends with the API key hash, which is left out of the logs
+            self._limiters[key] = ProviderLimiter(label=key.rsplit("|", 1)[0])
+        return self._limiters[key]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            if isinstance(client, httpx.AsyncClient):
+                await client.aclose()
+        await self._exit_stack.aclose()
+        self._clients.clear()
+
+
+_registry_lock = threading.Lock()
+_registry_loop: asyncio.AbstractEventLoop | None = None
+_registry: ProviderClientRegistry | None = None
+_registry_pid: int | None = None
+
+
+def _get_provider_loop() -> tuple[asyncio.AbstractEventLoop, ProviderClientRegistry]:
+    """Returns the process wide registry and the loop it runs on, starting them on
+    first use (and again in a forked child, which doesn't inherit the thread)."""
+    global _registry_loop, _registry, _registry_pid
+
+    with _registry_lock:
+        if _registry_loop is None or _registry is None or _registry_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="provider-client-loop", daemon=True
+            ).start()
+            _registry_loop = loop
+            _registry = ProviderClientRegistry()
+            _registry_pid = os.getpid()
+
+        return _registry_loop, _registry
+
+
+def get_provider_client_registry() -> ProviderClientRegistry:
+    return _get_provider_loop()[1]
+
+
+def run_provider_call(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Runs `coroutine` on the provider loop and blocks until it is done. Safe to
+    call from any number of threads."""
+    loop, _ = _get_provider_loop()
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
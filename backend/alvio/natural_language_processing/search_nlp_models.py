@@ -24,6 +24,7 @@ from requests import Response
 from retry import retry
 
 from alvio.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
+from alvio.configs.app_configs import INDEXING_MODEL_SERVER_EMBEDDING_CONCURRENCY
 from alvio.configs.app_configs import LARGE_CHUNK_RATIO
 from alvio.configs.app_configs import SKIP_WARM_UP
 from alvio.configs.model_configs import BATCH_SIZE_ENCODE_CHUNKS
@@ -42,6 +43,15 @@ from alvio.natural_language_processing.constants import EmbeddingModelTextType
 from alvio.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
+from alvio.natural_language_processing.provider_clients import (
+    build_provider_client_key,
+)
+from alvio.natural_language_processing.provider_clients import (
+    get_provider_client_registry,
+)
+from alvio.natural_language_processing.provider_clients import ProviderClientRegistry
+from alvio.natural_language_processing.provider_clients import ProviderLimiter
+from alvio.natural_language_processing.provider_clients import run_provider_call
 from alvio.natural_language_processing.utils import get_tokenizer
 from alvio.natural_language_processing.utils import tokenizer_trim_content
 from alvio.utils.logger import setup_logger
@@ -50,11 +60,16 @@ from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_EMBEDDING_TRANSPORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
+from shared_configs.embedding_transport import BINARY_EMBEDDING_MEDIA_TYPE
+from shared_configs.embedding_transport import build_accept_header
+from shared_configs.embedding_transport import decode_embeddings
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransportFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import ConnectorClassificationRequest
@@ -113,6 +128,31 @@ def build_model_server_url(
     return f"http://{model_server_url}"
 
 
+def _get_embedding_transport_format() -> EmbeddingTransportFormat:
+    try:
+        return EmbeddingTransportFormat(MODEL_SERVER_EMBEDDING_TRANSPORT)
+    except ValueError:
+        logger.warning(
+            f"Unknown MODEL_SERVER_EMBEDDING_TRANSPORT '{MODEL_SERVER_EMBEDDING_TRANSPORT}', "
+            "falling back to JSON"
+        )
+        return EmbeddingTransportFormat.JSON
+
+
+def parse_model_server_embed_response(response: Response) -> EmbedResponse:
+    """Builds an EmbedResponse from either the binary or the JSON payload,
+    depending on what the model server chose to send back."""
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(BINARY_EMBEDDING_MEDIA_TYPE):
+        # decoding is a zero-copy view, but callers (and EmbedResponse) take lists of
+        # floats, so the per-float conversion still happens here
+        embeddings = decode_embeddings(response.content).tolist()
+        # the vectors come straight from the model server, skip re-validation
+        return EmbedResponse.model_construct(embeddings=embeddings)
+
+    return EmbedResponse(**response.json())
+
+
 def is_authentication_error(error: Exception) -> bool:
     """Check if an exception is related to authentication issues.
 
@@ -177,10 +217,19 @@ class CloudEmbedding:
         self.api_url = api_url
         self.api_version = api_version
         self.timeout = timeout
-        self.http_client = httpx.AsyncClient(timeout=timeout)
+        # provider clients are shared by all instances, see provider_clients
+        self.client_key = build_provider_client_key(provider, api_url, api_key)
         self._closed = False
         self.sanitized_api_key = api_key[:4] + "********" + api_key[-4:]
 
+    @property
+    def registry(self) -> ProviderClientRegistry:
+        return get_provider_client_registry()
+
+    @property
+    def limiter(self) -> ProviderLimiter:
+        return self.registry.get_limiter(self.client_key)
+
     async def _embed_openai(
         self, texts: list[str], model: str | None, reduced_dimension: int | None
     ) -> list[Embedding]:
@@ -190,22 +239,29 @@ class CloudEmbedding:
         import openai
 
         # Use the OpenAI specific timeout for this one
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
+        client = self.registry.get_client(
+            self.client_key,
+            lambda: openai.AsyncOpenAI(
+                api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
+            ),
         )
 
-        final_embeddings: list[Embedding] = []
-
-        for text_batch in batch_list(texts, _OPENAI_MAX_INPUT_LEN):
-            response = await client.embeddings.create(
-                input=text_batch,
-                model=model,
-                dimensions=reduced_dimension or openai.NOT_GIVEN,
-            )
-            final_embeddings.extend(
-                [embedding.embedding for embedding in response.data]
+        responses = await asyncio.gather(
+            *(
+                self.limiter.run(
+                    partial(
+                        client.embeddings.create,
+                        input=text_batch,
+                        model=model,
+                        dimensions=reduced_dimension or openai.NOT_GIVEN,
+                    )
+                )
+                for text_batch in batch_list(texts, _OPENAI_MAX_INPUT_LEN)
             )
-        return final_embeddings
+        )
+        return [
+            embedding.embedding for response in responses for embedding in response.data
+        ]
 
     async def _embed_cohere(
         self, texts: list[str], model: str | None, embedding_type: str
@@ -213,20 +269,31 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_COHERE_MODEL
 
-        client = CohereAsyncClient(api_key=self.api_key)
+        client = self.registry.get_client(
+            self.client_key, lambda: CohereAsyncClient(api_key=self.api_key)
+        )
 
-        final_embeddings: list[Embedding] = []
-        for text_batch in batch_list(texts, _COHERE_MAX_INPUT_LEN):
-            # Does not use the same tokenizer as the Alvio API server but it's approximately the same
-            # empirically it's only off by a very few tokens so it's not a big deal
-            response = await client.embed(
-                texts=text_batch,
-                model=model,
-                input_type=embedding_type,
-                truncate="END",
+        # Does not use the same tokenizer as the Alvio API server but it's approximately the same
+        # empirically it's only off by a very few tokens so it's not a big deal
+        responses = await asyncio.gather(
+            *(
+                self.limiter.run(
+                    partial(
+                        client.embed,
+                        texts=text_batch,
+                        model=model,
+                        input_type=embedding_type,
+                        truncate="END",
+                    )
+                )
+                for text_batch in batch_list(texts, _COHERE_MAX_INPUT_LEN)
             )
-            final_embeddings.extend(cast(list[Embedding], response.embeddings))
-        return final_embeddings
+        )
+        return [
+            embedding
+            for response in responses
+            for embedding in cast(list[Embedding], response.embeddings)
+        ]
 
     async def _embed_voyage(
         self, texts: list[str], model: str | None, embedding_type: str
@@ -234,15 +301,21 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VOYAGE_MODEL
 
-        client = voyageai.AsyncClient(
-            api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
+        client = self.registry.get_client(
+            self.client_key,
+            lambda: voyageai.AsyncClient(
+                api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
+            ),
         )
 
-        response = await client.embed(
-            texts=texts,
-            model=model,
-            input_type=embedding_type,
-            truncation=True,
+        response = await self.limiter.run(
+            partial(
+                client.embed,
+                texts=texts,
+                model=model,
+                input_type=embedding_type,
+                truncation=True,
+            )
         )
         return response.embeddings
 
@@ -251,13 +324,16 @@ class CloudEmbedding:
     ) -> list[Embedding]:
         from litellm import aembedding
 
-        response = await aembedding(
-            model=model,
-            input=texts,
-            timeout=API_BASED_EMBEDDING_TIMEOUT,
-            api_key=self.api_key,
-            api_base=self.api_url,
-            api_version=self.api_version,
+        response = await self.limiter.run(
+            partial(
+                aembedding,
+                model=model,
+                input=texts,
+                timeout=API_BASED_EMBEDDING_TIMEOUT,
+                api_key=self.api_key,
+                api_base=self.api_url,
+                api_version=self.api_version,
+            )
         )
         embeddings = [embedding["embedding"] for embedding in response.data]
         return embeddings
@@ -271,13 +347,16 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VERTEX_MODEL
 
-        service_account_info = json.loads(self.api_key)
-        credentials = service_account.Credentials.from_service_account_info(
-            service_account_info
-        )
-        project_id = service_account_info["project_id"]
-        vertexai.init(project=project_id, credentials=credentials)
-        client = TextEmbeddingModel.from_pretrained(model)
+        def _build_client() -> Any:
+            service_account_info = json.loads(self.api_key)
+            credentials = service_account.Credentials.from_service_account_info(
+                service_account_info
+            )
+            project_id = service_account_info["project_id"]
+            vertexai.init(project=project_id, credentials=credentials)
+            return TextEmbeddingModel.from_pretrained(model)
+
+        client = self.registry.get_client(f"{self.client_key}|{model}", _build_client)
 
         inputs = [TextEmbeddingInput(text, embedding_type) for text in texts]
 
@@ -290,7 +369,10 @@ class CloudEmbedding:
 
         # Dispatch all embedding calls asynchronously at once
         tasks = [
-            client.get_embeddings_async(batch, auto_truncate=True) for batch in batches
+            self.limiter.run(
+                partial(client.get_embeddings_async, batch, auto_truncate=True)
+            )
+            for batch in batches
         ]
 
         # Wait for all tasks to complete in parallel
@@ -311,16 +393,22 @@ class CloudEmbedding:
             {} if not self.api_key else {"Authorization": f"Bearer {self.api_key}"}
         )
 
-        response = await self.http_client.post(
-            self.api_url,
-            json={
-                "model": model_name,
-                "input": texts,
-            },
-            headers=headers,
-        )
-        response.raise_for_status()
-        result = response.json()
+        api_url = self.api_url
+        http_client = self.registry.get_http_client(self.client_key, self.timeout)
+
+        async def _post() -> httpx.Response:
+            response = await http_client.post(
+                api_url,
+                json={
+                    "model": model_name,
+                    "input": texts,
+                },
+                headers=headers,
+            )
+            response.raise_for_status()
+            return response
+
+        result = (await self.limiter.run(_post)).json()
         return [embedding["embedding"] for embedding in result["data"]]
 
     @retry(tries=_RETRY_TRIES, delay=_RETRY_DELAY)
@@ -397,10 +485,9 @@ class CloudEmbedding:
         return CloudEmbedding(api_key, provider, api_url, api_version)
 
     async def aclose(self) -> None:
-        """Explicitly close the client."""
-        if not self._closed:
-            await self.http_client.aclose()
-            self._closed = True
+        """The provider clients are shared and stay open, this only marks the
+        instance as closed."""
+        self._closed = True
 
     async def __aenter__(self) -> "CloudEmbedding":
         return self
@@ -413,20 +500,19 @@ class CloudEmbedding:
     ) -> None:
         await self.aclose()
 
-    def __del__(self) -> None:
-        """Finalizer to warn about unclosed clients."""
-        if not self._closed:
-            logger.warning(
-                "CloudEmbedding was not properly closed. Use 'async with' or call aclose()"
-            )
-
 
 # API-based reranking functions (moved from model server)
 async def cohere_rerank_api(
     query: str, docs: list[str], model_name: str, api_key: str
 ) -> list[float]:
-    cohere_client = CohereAsyncClient(api_key=api_key)
-    response = await cohere_client.rerank(query=query, documents=docs, model=model_name)
+    registry = get_provider_client_registry()
+    client_key = build_provider_client_key(RerankerProvider.COHERE, None, api_key)
+    cohere_client = registry.get_client(
+        client_key, lambda: CohereAsyncClient(api_key=api_key)
+    )
+    response = await registry.get_limiter(client_key).run(
+        partial(cohere_client.rerank, query=query, documents=docs, model=model_name)
+    )
     results = response.results
     sorted_results = sorted(results, key=lambda item: item.index)
     return [result.relevance_score for result in sorted_results]
@@ -440,19 +526,28 @@ async def cohere_rerank_aws(
     aws_access_key_id: str,
     aws_secret_access_key: str,
 ) -> list[float]:
-    session = aioboto3.Session(
-        aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key
+    registry = get_provider_client_registry()
+    client_key = build_provider_client_key(
+        RerankerProvider.BEDROCK,
+        region_name,
+        f"{aws_access_key_id}:{aws_secret_access_key}",
     )
-    async with session.client(
-        "bedrock-runtime", region_name=region_name
-    ) as bedrock_client:
-        body = json.dumps(
-            {
-                "query": query,
-                "documents": docs,
-                "api_version": 2,
-            }
-        )
+    bedrock_client = await registry.get_context_client(
+        client_key,
+        lambda: aioboto3.Session(
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+        ).client("bedrock-runtime", region_name=region_name),
+    )
+    body = json.dumps(
+        {
+            "query": query,
+            "documents": docs,
+            "api_version": 2,
+        }
+    )
+
+    async def _invoke() -> dict[str, Any]:
         # Invoke the Bedrock model asynchronously
         response = await bedrock_client.invoke_model(
             modelId=model_name,
@@ -460,22 +555,27 @@ async def cohere_rerank_aws(
             contentType="application/json",
             body=body,
         )
-
         # Read the response asynchronously
-        response_body = json.loads(await response["body"].read())
+        return json.loads(await response["body"].read())
+
+    response_body = await registry.get_limiter(client_key).run(_invoke)
 
-        # Extract and sort the results
-        results = response_body.get("results", [])
-        sorted_results = sorted(results, key=lambda item: item["index"])
+    # Extract and sort the results
+    results = response_body.get("results", [])
+    sorted_results = sorted(results, key=lambda item: item["index"])
 
-        return [result["relevance_score"] for result in sorted_results]
+    return [result["relevance_score"] for result in sorted_results]
 
 
 async def litellm_rerank(
     query: str, docs: list[str], api_url: str, model_name: str, api_key: str | None
 ) -> list[float]:
     headers = {} if not api_key else {"Authorization": f"Bearer {api_key}"}
-    async with httpx.AsyncClient() as client:
+    registry = get_provider_client_registry()
+    client_key = build_provider_client_key(RerankerProvider.LITELLM, api_url, api_key)
+    client = registry.get_http_client(client_key, timeout=None)
+
+    async def _post() -> httpx.Response:
         response = await client.post(
             api_url,
             json={
@@ -486,11 +586,13 @@ async def litellm_rerank(
             headers=headers,
         )
         response.raise_for_status()
-        result = response.json()
-        return [
-            item["relevance_score"]
-            for item in sorted(result["results"], key=lambda x: x["index"])
-        ]
+        return response
+
+    result = (await registry.get_limiter(client_key).run(_post)).json()
+    return [
+        item["relevance_score"]
+        for item in sorted(result["results"], key=lambda x: x["index"])
+    ]
 
 
 class EmbeddingModel:
@@ -510,6 +612,7 @@ class EmbeddingModel:
         api_version: str | None = None,
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
+        transport_format: EmbeddingTransportFormat | None = None,
     ) -> None:
         self.api_key = api_key
         self.provider_type = provider_type
@@ -526,6 +629,7 @@ class EmbeddingModel:
             model_name=model_name, provider_type=provider_type
         )
         self.callback = callback
+        self.transport_format = transport_format or _get_embedding_transport_format()
 
         # Only build model server endpoint for local models
         if self.provider_type is None:
@@ -618,7 +722,7 @@ class EmbeddingModel:
         endpoint = self.embed_server_endpoint
 
         def _make_request() -> Response:
-            headers = {}
+            headers = {"Accept": build_accept_header(self.transport_format)}
             if tenant_id:
                 headers["X-Alvio-Tenant-ID"] = tenant_id
 
@@ -656,7 +760,7 @@ class EmbeddingModel:
 
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
+            return parse_model_server_embed_response(response)
         except requests.HTTPError as e:
             if not response:
                 raise HTTPError("HTTP error occurred - response is None.") from e
@@ -675,11 +779,21 @@ class EmbeddingModel:
         text_type: EmbedTextType,
         batch_size: int,
         max_seq_length: int,
-        num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
+        num_threads: int | None = None,
         tenant_id: str | None = None,
         request_id: str | None = None,
     ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+        if num_threads is None:
+            num_threads = (
+                INDEXING_EMBEDDING_MODEL_NUM_THREADS
+                if self.provider_type
+                else INDEXING_MODEL_SERVER_EMBEDDING_CONCURRENCY
+            )
+
+        # Group texts of similar length into the same batch to cut down on padding,
+        # results are put back in the original order at the end
+        sorted_order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        text_batches = batch_list([texts[i] for i in sorted_order], batch_size)
 
         logger.debug(f"Encoding {len(texts)} texts in {len(text_batches)} batches")
 
@@ -718,17 +832,12 @@ class EmbeddingModel:
 
             # Route between direct API calls and model server calls
             if self.provider_type is not None:
-                # For API providers, make direct API call
-                loop = asyncio.new_event_loop()
-                try:
-                    asyncio.set_event_loop(loop)
-                    response = loop.run_until_complete(
-                        self._make_direct_api_call(
-                            embed_request, tenant_id=tenant_id, request_id=request_id
-                        )
+                # For API providers, make direct API call on the shared provider loop
+                response = run_provider_call(
+                    self._make_direct_api_call(
+                        embed_request, tenant_id=tenant_id, request_id=request_id
                     )
-                finally:
-                    loop.close()
+                )
             else:
                 # For local models, use model server
                 response = self._make_model_server_request(
@@ -746,9 +855,9 @@ class EmbeddingModel:
 
         # only multi thread if:
         #   1. num_threads is greater than 1
-        #   2. we are using an API-based embedding model (provider_type is not None)
-        #   3. there are more than 1 batch (no point in threading if only 1)
-        if num_threads >= 1 and self.provider_type and len(text_batches) > 1:
+        #   2. there are more than 1 batch (no point in threading if only 1)
+        # for local models this keeps several model server requests in flight
+        if num_threads > 1 and len(text_batches) > 1:
             with ThreadPoolExecutor(max_workers=num_threads) as executor:
                 future_to_batch = {
                     executor.submit(
@@ -790,7 +899,10 @@ class EmbeddingModel:
                 )
                 embeddings.extend(batch_embeddings)
 
-        return embeddings
+        ordered_embeddings: list[Embedding] = [[] for _ in texts]
+        for sorted_ind, original_ind in enumerate(sorted_order):
+            ordered_embeddings[original_ind] = embeddings[sorted_ind]
+        return ordered_embeddings
 
     def encode(
         self,
@@ -927,15 +1039,8 @@ class RerankingModel:
     def predict(self, query: str, passages: list[str]) -> list[float]:
         # Route between direct API calls and model server calls
         if self.provider_type is not None:
-            # For API providers, make direct API call
-            loop = asyncio.new_event_loop()
-            try:
-                asyncio.set_event_loop(loop)
-                return loop.run_until_complete(
-                    self._make_direct_rerank_call(query, passages)
-                )
-            finally:
-                loop.close()
+            # For API providers, make direct API call on the shared provider loop
+            return run_provider_call(self._make_direct_rerank_call(query, passages))
         else:
             # For local models, use model server
             if self.rerank_server_endpoint is None:
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
+from alvio.configs.app_configs import CONNECTOR_DELETION_BATCH_SIZE
 from alvio.configs.app_configs import DB_YIELD_PER_DEFAULT
 from alvio.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from alvio.configs.constants import AlvioCeleryPriority
@@ -17,11 +18,14 @@ from alvio.configs.constants import AlvioCeleryTask
 from alvio.configs.constants import AlvioRedisConstants
 from alvio.db.connector_credential_pair import get_connector_credential_pair_from_id
 from alvio.db.document import construct_document_id_select_for_connector_credential_pair
+from alvio.utils.batching import batch_generator
 
 
 class RedisConnectorDeletePayload(BaseModel):
     num_tasks: int | None
     submitted: datetime
+    # documents covered by the tasks, each task cleans up a batch of documents
+    num_docs: int | None = None
 
 
 class RedisConnectorDelete:
@@ -104,9 +108,10 @@ class RedisConnectorDelete:
         celery_app: Celery,
         db_session: Session,
         lock: RedisLock,
-    ) -> int | None:
+    ) -> tuple[int, int] | None:
         """Returns None if the cc_pair doesn't exist.
-        Otherwise, returns an int with the number of generated tasks."""
+        Otherwise, returns a tuple with the number of generated tasks and the number of
+        documents they cover. Each task cleans up a batch of documents."""
         last_lock_time = time.monotonic()
 
         cc_pair = get_connector_credential_pair_from_id(
@@ -117,12 +122,15 @@ class RedisConnectorDelete:
             return None
 
         num_tasks_sent = 0
+        num_docs = 0
 
         stmt = construct_document_id_select_for_connector_credential_pair(
             cc_pair.connector_id, cc_pair.credential_id
         )
-        for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
-            doc_id = cast(str, doc_id)
+        for doc_ids in batch_generator(
+            db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT),
+            CONNECTOR_DELETION_BATCH_SIZE,
+        ):
             current_time = time.monotonic()
             if current_time - last_lock_time >= (
                 CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT / 4
@@ -138,9 +146,9 @@ class RedisConnectorDelete:
 
             # Priority on sync's triggered by new indexing should be medium
             celery_app.send_task(
-                AlvioCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_TASK,
+                AlvioCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_BATCH_TASK,
                 kwargs=dict(
-                    document_id=doc_id,
+                    document_ids=cast(list[str], doc_ids),
                     connector_id=cc_pair.connector_id,
                     credential_id=cc_pair.credential_id,
                     tenant_id=self.tenant_id,
@@ -152,8 +160,9 @@ class RedisConnectorDelete:
             )
 
             num_tasks_sent += 1
+            num_docs += len(doc_ids)
 
-        return num_tasks_sent
+        return num_tasks_sent, num_docs
 
     def reset(self) -> None:
         self.redis.srem(AlvioRedisConstants.ACTIVE_FENCES, self.fence_key)
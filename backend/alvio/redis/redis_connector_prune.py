@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterable
 from datetime import datetime
 from typing import cast
 from uuid import uuid4
@@ -152,7 +153,7 @@ class RedisConnectorPrune:
 
     def generate_tasks(
         self,
-        documents_to_prune: set[str],
+        documents_to_prune: Iterable[str],
         celery_app: Celery,
         db_session: Session,
         lock: RedisLock | None,
@@ -9,6 +9,7 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
 from alvio.configs.app_configs import DB_YIELD_PER_DEFAULT
+from alvio.configs.app_configs import VESPA_SYNC_BATCH_SIZE
 from alvio.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from alvio.configs.constants import AlvioCeleryPriority
 from alvio.configs.constants import AlvioCeleryQueues
@@ -16,6 +17,7 @@ from alvio.configs.constants import AlvioCeleryTask
 from alvio.configs.constants import AlvioRedisConstants
 from alvio.db.document_set import construct_document_id_select_by_docset
 from alvio.redis.redis_object_helper import RedisObjectHelper
+from alvio.utils.batching import batch_generator
 
 
 class RedisDocumentSet(RedisObjectHelper):
@@ -63,10 +65,13 @@ class RedisDocumentSet(RedisObjectHelper):
         last_lock_time = time.monotonic()
 
         num_tasks_sent = 0
+        num_docs = 0
 
         stmt = construct_document_id_select_by_docset(int(self._id), current_only=False)
-        for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
-            doc_id = cast(str, doc_id)
+        for doc_ids in batch_generator(
+            db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT),
+            VESPA_SYNC_BATCH_SIZE,
+        ):
             current_time = time.monotonic()
             if current_time - last_lock_time >= (
                 CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT / 4
@@ -84,16 +89,17 @@ class RedisDocumentSet(RedisObjectHelper):
             redis_client.sadd(self.taskset_key, custom_task_id)
 
             celery_app.send_task(
-                AlvioCeleryTask.VESPA_METADATA_SYNC_TASK,
-                kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
+                AlvioCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+                kwargs=dict(document_ids=cast(list[str], doc_ids), tenant_id=tenant_id),
                 queue=AlvioCeleryQueues.VESPA_METADATA_SYNC,
                 task_id=custom_task_id,
                 priority=AlvioCeleryPriority.MEDIUM,
             )
 
             num_tasks_sent += 1
+            num_docs += len(doc_ids)
 
-        return num_tasks_sent, num_tasks_sent
+        return num_tasks_sent, num_docs
 
     def reset(self) -> None:
         self.redis.srem(AlvioRedisConstants.ACTIVE_FENCES, self.fence_key)
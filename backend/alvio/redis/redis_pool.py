@@ -78,6 +78,19 @@ class TenantRedis(redis.Redis):
 
         return wrapper
 
+    def _prefix_keys_method(self, method: Callable) -> Callable:
+        """For multi key commands (e.g. mget), every key is prefixed."""
+
+        @functools.wraps(method)
+        def wrapper(keys: Any, *args: Any, **kwargs: Any) -> Any:
+            if isinstance(keys, (str, bytes, memoryview)):
+                keys = self._prefixed(keys)
+            else:
+                keys = [self._prefixed(key) for key in keys]
+            return method(keys, *(self._prefixed(key) for key in args), **kwargs)
+
+        return wrapper
+
     def _prefix_scan_iter(self, method: Callable) -> Callable:
         @functools.wraps(method)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -111,6 +124,7 @@ class TenantRedis(redis.Redis):
             "set",
             "delete",
             "exists",
+            "incr",
             "incrby",
             "hset",
             "hget",
@@ -127,12 +141,16 @@ class TenantRedis(redis.Redis):
             "hexists",
             "hset",
             "hdel",
+            "hgetall",
+            "expire",
             "ttl",
             "pttl",
         ]  # Regular methods that need simple prefixing
 
         if item == "scan_iter" or item == "sscan_iter":
             return self._prefix_scan_iter(original_attr)
+        elif item == "mget":
+            return self._prefix_keys_method(original_attr)
         elif item in methods_to_wrap and callable(original_attr):
             return self._prefix_method(original_attr)
         return original_attr
@@ -127,7 +127,9 @@ def test_mcp_server_credentials(
     """Test if credentials work by calling the MCP server's tools/list endpoint"""
     try:
         # Attempt to discover tools using the provided credentials
-        tools = discover_mcp_tools(server_url, connection_headers, transport=transport)
+        tools = discover_mcp_tools(
+            server_url, connection_headers, transport=transport, use_cache=False
+        )
 
         if (
             tools is not None and len(tools) >= 0
@@ -1077,9 +1079,11 @@ def _list_mcp_tools_by_id(
     connection_config = _get_connection_config(mcp_server, is_admin, user, db)
 
     # Discover tools from the MCP server
+    # admins setting up a server always see its current tools
     tools = discover_mcp_tools(
         mcp_server.server_url,
         connection_config.config.get("headers", {}) if connection_config else {},
+        use_cache=not is_admin,
     )
 
     # TODO: Also list resources from the MCP server
@@ -1279,8 +1283,9 @@ def _add_tools_to_server(
     connection_config = _get_connection_config(mcp_server, True, user, db_session)
     headers = connection_config.config.get("headers", {}) if connection_config else {}
 
+    # the tools are saved, so they have to reflect the server as it is now
     available_tools = discover_mcp_tools(
-        mcp_server.server_url, headers, transport=transport
+        mcp_server.server_url, headers, transport=transport, use_cache=False
     )
     tools_by_name = {tool.name: tool for tool in available_tools}
 
@@ -135,6 +135,11 @@ def set_user_role(
 
     update_user_role(user_to_update, requested_role, db_session)
 
+    fetch_ee_implementation_or_noop(
+        "alvio.access.acl_cache",
+        "invalidate_acl_cache_for_user",
+    )(user_to_update.id)
+
 
 class TestUpsertRequest(BaseModel):
     email: str
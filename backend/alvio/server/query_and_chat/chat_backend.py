@@ -94,6 +94,8 @@ logger = setup_logger()
 
 router = APIRouter(prefix="/chat")
 
+_FILE_STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 @router.get("/get-user-chat-sessions")
 def get_user_chat_sessions(
@@ -733,9 +735,16 @@ def fetch_chat_file(
             file_id = txt_file_id
 
     media_type = file_record.file_type
-    file_io = file_store.read_file(file_id, mode="b")
 
-    return StreamingResponse(file_io, media_type=media_type)
+    def _stream_file() -> Generator[bytes, None, None]:
+        # streamed from the file store in chunks instead of loading it into memory.
+        # The file is only opened once the response starts, so it is always closed
+        # by the generator, even if the client disconnects early
+        with file_store.open_file(file_id) as file_io:
+            while chunk := file_io.read(_FILE_STREAM_CHUNK_SIZE):
+                yield chunk
+
+    return StreamingResponse(_stream_file(), media_type=media_type)
 
 
 @router.get("/search")
@@ -5,7 +5,8 @@ This module provides a proper MCP client that follows the JSON-RPC 2.0 specifica
 and handles connection initialization, session management, and protocol communication.
 """
 
-import asyncio
+import threading
+import time
 from collections.abc import Awaitable
 from collections.abc import Callable
 from enum import Enum
@@ -15,20 +16,24 @@ from typing import TypeVar
 from urllib.parse import urlencode
 
 from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client  # or use stdio_client
 from mcp.types import CallToolResult
 from mcp.types import InitializeResult
 from mcp.types import ListResourcesResult
 from mcp.types import Tool as MCPLibTool
 from pydantic import BaseModel
 
+from alvio.configs.tool_configs import MCP_DISCOVERY_CACHE_TTL_SECONDS
+from alvio.tools.tool_implementations.mcp.mcp_session_pool import build_session_key
+from alvio.tools.tool_implementations.mcp.mcp_session_pool import run_on_pool
 from alvio.utils.logger import setup_logger
 
 logger = setup_logger()
 
-T = TypeVar("T", covariant=True)
+T = TypeVar("T")
 
-MCPClientFunction = Callable[[ClientSession], Awaitable[T]]
+# called with a pooled session that is already initialized, and the result of its
+# initialize handshake
+MCPClientFunction = Callable[[ClientSession, InitializeResult], Awaitable[T]]
 
 
 class MCPTransport(str, Enum):
@@ -89,73 +94,22 @@ class MCPMessage(BaseModel):
         return msg
 
 
-# TODO: in the future we should do things like manage sessions and handle errors better
-# using an abstraction like this. For now things are purely functional and we initialize
-# a new session for each tool call.
-# class MCPClient:
-#     """
-#     MCP Client implementation that properly handles the protocol lifecycle
-#     and different transport mechanisms.
-#     """
-
-#     def __init__(
-#         self,
-#         server_url: str,
-#         transport: MCPTransport = MCPTransport.HTTP_STREAM,
-#         auth_token: str | None = None,
-#     ):
-#         self.server_url = server_url
-#         self.transport = transport
-#         self.auth_token = auth_token
-
-#         # Session management
-#         self.session: Optional[aiohttp.ClientSession] = None
-#         self.initialized = False
-#         self.capabilities: Dict[str, Any] = {}
-#         self.protocol_version = "2025-03-26"  # Current MCP protocol version
-#         self.session_id: str | None = None
-#         # Legacy HTTP+SSE transport support (backwards compatibility)
-#         self.legacy_post_endpoint: str | None = None
-
-#         # Message ID counter
-#         self._message_id_counter = 0
-
-#         # For stdio transport
-#         self.process: Optional[subprocess.Popen] = None
-
-
 def _call_mcp_client_function(
-    function: Callable[[ClientSession], Awaitable[T]],
+    function: MCPClientFunction[T],
     server_url: str,
     connection_headers: dict[str, str] | None = None,
     transport: MCPTransport = MCPTransport.HTTP_STREAM,
-    **kwargs: Any,
+    method: str = "call",
 ) -> T:
+    """Runs `function` with a pooled, already initialized session to the server."""
     auth_headers = connection_headers or {}
     sep = "?" if "?" not in server_url else "&"
     server_url = (
         server_url.rstrip("/") + sep + urlencode({"transportType": transport.value})
     )
 
-    async def run_client_function() -> T:
-        async with streamablehttp_client(server_url, headers=auth_headers) as (
-            read,
-            write,
-            _,
-        ):
-            async with ClientSession(read, write) as session:
-                return await function(session, **kwargs)
-
     try:
-        # Run the async function in a new event loop
-        # TODO: We should use asyncio.get_event_loop() instead,
-        # but not sure whether closing the loop is safe
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(run_client_function())
-        finally:
-            loop.close()
+        return run_on_pool(server_url, auth_headers, function, method)
     except Exception as e:
         logger.error(f"Failed to call MCP client function: {e}")
         if isinstance(e, ExceptionGroup):
@@ -166,6 +120,51 @@ def _call_mcp_client_function(
         raise e
 
 
+_discovery_cache: dict[tuple[str, str], tuple[float, Any]] = {}
+_discovery_cache_lock = threading.Lock()
+
+
+def _call_cached_mcp_client_function(
+    function: MCPClientFunction[T],
+    server_url: str,
+    connection_headers: dict[str, str] | None,
+    transport: MCPTransport,
+    method: str,
+    use_cache: bool,
+) -> T:
+    """Same as `_call_mcp_client_function`, reusing results of the same method on
+    the same server with the same credentials for MCP_DISCOVERY_CACHE_TTL_SECONDS."""
+    if not use_cache or MCP_DISCOVERY_CACHE_TTL_SECONDS <= 0:
+        return _call_mcp_client_function(
+            function, server_url, connection_headers, transport, method
+        )
+
+    cache_key = (
+        method,
+        build_session_key(f"{server_url}|{transport.value}", connection_headers or {}),
+    )
+    with _discovery_cache_lock:
+        cached = _discovery_cache.get(cache_key)
+        if cached is not None and cached[0] <= time.monotonic():
+            del _discovery_cache[cache_key]
+            cached = None
+    if cached is not None:
+        return cached[1]
+
+    result = _call_mcp_client_function(
+        function, server_url, connection_headers, transport, method
+    )
+    with _discovery_cache_lock:
+        now = time.monotonic()
+        # entries of servers (or credentials) that are no longer used would
+        # otherwise be kept forever
+        expired = [key for key, entry in _discovery_cache.items() if entry[0] <= now]
+        for key in expired:
+            del _discovery_cache[key]
+        _discovery_cache[cache_key] = (now + MCP_DISCOVERY_CACHE_TTL_SECONDS, result)
+    return result
+
+
 def process_mcp_result(call_tool_result: CallToolResult) -> str:
     """Flatten MCP CallToolResult->text (prefers text content blocks)."""
     # TODO: use structured_content if available
@@ -179,8 +178,7 @@ def process_mcp_result(call_tool_result: CallToolResult) -> str:
 
 
 def _call_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> MCPClientFunction[str]:
-    async def call_tool(session: ClientSession) -> str:
-        await session.initialize()
+    async def call_tool(session: ClientSession, _: InitializeResult) -> str:
         result = await session.call_tool(tool_name, arguments)
         return process_mcp_result(result)
 
@@ -200,6 +198,7 @@ def call_mcp_tool(
         server_url,
         connection_headers,
         MCPTransport(transport),
+        method="tools/call",
     )
 
 
@@ -209,19 +208,24 @@ def initialize_mcp_client(
     transport: str = "streamable-http",
 ) -> InitializeResult:
     return _call_mcp_client_function(
-        lambda session: session.initialize(),
+        _get_initialize_result,
         server_url,
         connection_headers,
         MCPTransport(transport),
+        method="initialize",
     )
 
 
-async def _discover_mcp_tools(session: ClientSession) -> list[MCPLibTool]:
-    # 1) initialize
-    init_result = await session.initialize()  # sends JSON-RPC "initialize"
-    logger.info(f"Initialized with server: {init_result.serverInfo}")
+async def _get_initialize_result(
+    _: ClientSession, init_result: InitializeResult
+) -> InitializeResult:
+    return init_result
+
 
-    # 2) tools/list
+async def _discover_mcp_tools(
+    session: ClientSession, init_result: InitializeResult
+) -> list[MCPLibTool]:
+    logger.info(f"Listing tools of server: {init_result.serverInfo}")
     tools_response = await session.list_tools()  # sends JSON-RPC "tools/list"
     return tools_response.tools
 
@@ -230,19 +234,24 @@ def discover_mcp_tools(
     server_url: str,
     connection_headers: dict[str, str] | None = None,
     transport: str = "streamable-http",
+    use_cache: bool = True,
 ) -> list[MCPLibTool]:
     """
     Synchronous wrapper for discovering MCP tools.
     """
-    return _call_mcp_client_function(
+    return _call_cached_mcp_client_function(
         _discover_mcp_tools,
         server_url,
         connection_headers,
         MCPTransport(transport),
+        method="tools/list",
+        use_cache=use_cache,
     )
 
 
-async def _discover_mcp_resources(session: ClientSession) -> ListResourcesResult:
+async def _discover_mcp_resources(
+    session: ClientSession, _: InitializeResult
+) -> ListResourcesResult:
     return await session.list_resources()
 
 
@@ -250,14 +259,17 @@ def discover_mcp_resources_sync(
     server_url: str,
     connection_headers: dict[str, str] | None = None,
     transport: str = "streamable-http",
+    use_cache: bool = True,
 ) -> ListResourcesResult:
     """
     Synchronous wrapper for discovering MCP resources.
     This is for compatibility with the existing codebase.
     """
-    return _call_mcp_client_function(
+    return _call_cached_mcp_client_function(
         _discover_mcp_resources,
         server_url,
         connection_headers,
         MCPTransport(transport),
+        method="resources/list",
+        use_cache=use_cache,
     )
@@ -0,0 +1,342 @@
+"""Long-lived MCP client sessions, shared by all tool calls of the process.
+
+Opening an MCP session means a new HTTP connection plus the initialize handshake,
+which used to be paid by every tool call. Sessions are now kept open per
+(server, transport, headers) on a single background event loop and reused by all
+threads. A session serves any number of concurrent requests.
+
+- sessions that were idle for a while are pinged before they are reused, and are
+  reopened if the ping fails or the connection was closed in the meantime
+- sessions that weren't used for MCP_SESSION_IDLE_TIMEOUT_SECONDS are closed
+- latency and error counts are tracked per server and logged with every call
+
+The `mcp` transports are async context managers that have to be entered and exited
+by the same task, so every session is owned by a task that keeps its contexts open
+until the session is closed.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+import anyio
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.types import InitializeResult
+
+from alvio.configs.tool_configs import MCP_CONNECT_TIMEOUT_SECONDS
+from alvio.configs.tool_configs import MCP_SESSION_HEALTH_CHECK_INTERVAL_SECONDS
+from alvio.configs.tool_configs import MCP_SESSION_IDLE_TIMEOUT_SECONDS
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_EVICTION_INTERVAL_SECONDS = 30
+_PING_TIMEOUT_SECONDS = 5
+
+# Raised when writing to / reading from the streams of a closed connection, the
+# request never reached the server so it is safe to send it again on a new session
+_CONNECTION_CLOSED_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class MCPServerStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.call_seconds = 0.0
+        self.connect_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_call(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += int(failed)
+            self.call_seconds += elapsed
+
+    def record_connect(self, elapsed: float, reconnect: bool) -> None:
+        with self._lock:
+            self.connects += 1
+            self.reconnects += int(reconnect)
+            self.connect_seconds += elapsed
+
+    @property
+    def avg_call_seconds(self) -> float:
+        return self.call_seconds / self.calls if self.calls else 0.0
+
+
+MCP_SERVER_STATS: dict[str, MCPServerStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_server_label(server_url: str) -> str:
+    # the query string is left out, some servers take API keys as query parameters
+    url = urlsplit(server_url)
+    return f"{url.netloc}{url.path}"
+
+
+def get_mcp_server_stats(server_url: str) -> MCPServerStats:
+    label = get_server_label(server_url)
+    with _stats_lock:
+        if label not in MCP_SERVER_STATS:
+            MCP_SERVER_STATS[label] = MCPServerStats()
+        return MCP_SERVER_STATS[label]
+
+
+def build_session_key(server_url: str, headers: dict[str, str]) -> str:
+    """Sessions are never shared between credentials, the headers are hashed so
+    they don't show up in the key."""
+    headers_hash = hashlib.sha256(
+        json.dumps(headers, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{server_url}|{headers_hash}"
+
+
+class _PooledSession:
+    def __init__(self, server_url: str, headers: dict[str, str]) -> None:
+        self.server_url = server_url
+        self.headers = headers
+        self.session: ClientSession | None = None
+        self.initialize_result: InitializeResult | None = None
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self._ready = asyncio.Event()
+        self._close = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not self._close.is_set()
+        )
+
+    async def open(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), MCP_CONNECT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # `_run` only checks `_close` once connected, a connect that hangs has
+            # to be cancelled
+            self._task.cancel()
+            await self.close()
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        self._close.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        try:
+            async with streamablehttp_client(self.server_url, headers=self.headers) as (
+                read,
+                write,
+                _,
+            ):
+                async with ClientSession(read, write) as session:
+                    self.initialize_result = await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._close.wait()
+        except BaseException as e:
+            # connection errors end up here as well, raised from the transport's
+            # task group. The session is reopened by the next call
+            self._error = e
+            if self.session is not None:
+                logger.warning(
+                    f"MCP session to {get_server_label(self.server_url)} closed "
+                    f"with error: {e!r}"
+                )
+        finally:
+            self.session = None
+            self._ready.set()
+
+
+class MCPSessionPool:
+    """Must only be used from the loop it was created for (see `run_on_pool`)."""
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, _PooledSession] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # keys that had a session before, to tell reconnects from first connects
+        self._connected_keys: set[str] = set()
+
+    async def _get_session(
+        self, key: str, server_url: str, headers: dict[str, str]
+    ) -> _PooledSession:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pooled = self._sessions.get(key)
+            if pooled is not None and pooled.is_open:
+                if (
+                    time.monotonic() - pooled.last_used
+                    < MCP_SESSION_HEALTH_CHECK_INTERVAL_SECONDS
+                    or await self._is_healthy(pooled)
+                ):
+                    return pooled
+            if pooled is not None:
+                self._sessions.pop(key, None)
+                await pooled.close()
+
+            start = time.monotonic()
+            pooled = _PooledSession(server_url, headers)
+            await pooled.open()
+            get_mcp_server_stats(server_url).record_connect(
+                time.monotonic() - start, reconnect=key in self._connected_keys
+            )
+            self._connected_keys.add(key)
+            self._sessions[key] = pooled
+            return pooled
+
+    @staticmethod
+    async def _is_healthy(pooled: _PooledSession) -> bool:
+        if pooled.session is None:
+            return False
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), _PING_TIMEOUT_SECONDS)
+            return True
+        except Exception as e:
+            logger.info(
+                f"MCP session to {get_server_label(pooled.server_url)} failed "
+                f"health check: {e}"
+            )
+            return False
+
+    async def run(
+        self,
+        server_url: str,
+        headers: dict[str, str],
+        function: Callable[[ClientSession, InitializeResult], Awaitable[T]],
+    ) -> T:
+        key = build_session_key(server_url, headers)
+        # one retry in case the connection was closed before the request was sent
+        for attempt in range(2):
+            pooled = await self._get_session(key, server_url, headers)
+            session = pooled.session
+            initialize_result = pooled.initialize_result
+            if session is None or initialize_result is None:
+                raise RuntimeError(
+                    f"MCP session to {get_server_label(server_url)} is not open"
+                )
+
+            pooled.in_use += 1
+            try:
+                return await function(session, initialize_result)
+            except _CONNECTION_CLOSED_ERRORS:
+                if attempt:
+                    raise
+                logger.info(
+                    f"MCP session to {get_server_label(server_url)} was closed, "
+                    "reconnecting"
+                )
+                self._sessions.pop(key, None)
+                await pooled.close()
+            finally:
+                pooled.in_use -= 1
+                pooled.last_used = time.monotonic()
+
+        raise RuntimeError("unreachable")
+
+    async def evict_idle_sessions(self, idle_timeout: float) -> None:
+        now = time.monotonic()
+        for key, pooled in list(self._sessions.items()):
+            if pooled.in_use or (
+                pooled.is_open and now - pooled.last_used < idle_timeout
+            ):
+                continue
+            self._sessions.pop(key, None)
+            await pooled.close()
+
+    async def close(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(
+            *(pooled.close() for pooled in sessions), return_exceptions=True
+        )
+
+
+_pool_lock = threading.Lock()
+_pool_loop: asyncio.AbstractEventLoop | None = None
+_pool: MCPSessionPool | None = None
+_pool_pid: int | None = None
+
+
+async def _evict_idle_sessions_forever(pool: MCPSessionPool) -> None:
+    while True:
+        await asyncio.sleep(_EVICTION_INTERVAL_SECONDS)
+        try:
+            await pool.evict_idle_sessions(MCP_SESSION_IDLE_TIMEOUT_SECONDS)
+        except Exception:
+            logger.exception("Failed to evict idle MCP sessions")
+
+
+def _get_pool() -> tuple[asyncio.AbstractEventLoop, MCPSessionPool]:
+    """Returns the process wide pool and the loop it runs on, starting them on first
+    use (and again in a forked child, which doesn't inherit the thread)."""
+    global _pool_loop, _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool_loop is None or _pool is None or _pool_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="mcp-session-loop", daemon=True
+            ).start()
+            pool = MCPSessionPool()
+            asyncio.run_coroutine_threadsafe(_evict_idle_sessions_forever(pool), loop)
+            _pool_loop = loop
+            _pool = pool
+            _pool_pid = os.getpid()
+
+        return _pool_loop, _pool
+
+
+def run_on_pool(
+    server_url: str,
+    headers: dict[str, str],
+    function: Callable[[ClientSession, InitializeResult], Awaitable[T]],
+    method: str,
+) -> T:
+    """Runs `function` with a pooled session to `server_url` and blocks until it
+    is done."""
+    loop, pool = _get_pool()
+
+    start = time.monotonic()
+    failed = True
+    try:
+        result = asyncio.run_coroutine_threadsafe(
+            pool.run(server_url, headers, function), loop
+        ).result()
+        failed = False
+        return result
+    finally:
+        elapsed = time.monotonic() - start
+        stats = get_mcp_server_stats(server_url)
+        stats.record_call(elapsed, failed)
+        logger.info(
+            f"event=mcp_call "
+            f"server={get_server_label(server_url)} "
+            f"method={method} "
+            f"elapsed={elapsed:.3f} "
+            f"failed={failed} "
+            f"calls={stats.calls} "
+            f"errors={stats.errors} "
+            f"connects={stats.connects} "
+            f"reconnects={stats.reconnects} "
+            f"avg_call_seconds={stats.avg_call_seconds:.3f}"
+        )
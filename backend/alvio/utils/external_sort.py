@@ -0,0 +1,118 @@
+import heapq
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+
+_ESCAPED_CHAR_PATTERN = re.compile(r"\\(.)", re.DOTALL)
+
+
+def _escape(value: str) -> str:
+    # one value per line, so newlines (and the escape character itself) are escaped
+    if "\\" in value or "\n" in value:
+        return value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value
+
+
+def _unescape(line: str) -> str:
+    if "\\" not in line:
+        return line
+    return _ESCAPED_CHAR_PATTERN.sub(
+        lambda match: "\n" if match.group(1) == "n" else match.group(1), line
+    )
+
+
+def _read_run(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        for line in f:
+            yield _unescape(line[:-1])
+
+
+class SortedSpillSet:
+    """A set of strings that only keeps up to `max_in_memory` of them in memory.
+
+    Whenever the in-memory buffer is full it is sorted and written to a temporary
+    file (a "run"). Iterating merges the runs and yields every distinct value once,
+    in ascending code point order. This is the same order as a Postgres
+    `ORDER BY ... COLLATE "C"` on UTF-8 text, so the output can be merged against
+    a sorted query with `sorted_difference`.
+
+    Meant to be used as a context manager so the temporary files are removed."""
+
+    def __init__(self, max_in_memory: int, directory: str | None = None) -> None:
+        if max_in_memory < 1:
+            raise ValueError("max_in_memory must be at least 1")
+
+        self.max_in_memory = max_in_memory
+        self._directory = directory
+        self._tmp_dir: str | None = None
+        self._buffer: set[str] = set()
+        self._run_paths: list[str] = []
+
+    def __enter__(self) -> "SortedSpillSet":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def num_runs(self) -> int:
+        return len(self._run_paths)
+
+    def add(self, values: Iterable[str]) -> None:
+        for value in values:
+            self._buffer.add(value)
+            if len(self._buffer) >= self.max_in_memory:
+                self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(
+                prefix="sorted_spill_", dir=self._directory
+            )
+
+        path = os.path.join(self._tmp_dir, f"run_{len(self._run_paths)}")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.writelines(f"{_escape(value)}\n" for value in sorted(self._buffer))
+
+        self._run_paths.append(path)
+        self._buffer = set()
+
+    def __iter__(self) -> Iterator[str]:
+        runs: list[Iterable[str]] = [_read_run(path) for path in self._run_paths]
+        runs.append(sorted(self._buffer))
+
+        previous: str | None = None
+        for value in heapq.merge(*runs):
+            # the same value may have been spilled into several runs
+            if value != previous:
+                yield value
+                previous = value
+
+    def close(self) -> None:
+        self._buffer = set()
+        self._run_paths = []
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+
+def sorted_difference(left: Iterable[str], right: Iterable[str]) -> Iterator[str]:
+    """Yields the values of `left` that are not in `right`. Both must be sorted in
+    ascending order. Only one value of each side is held at a time."""
+    right_iter = iter(right)
+    right_value = next(right_iter, None)
+    for left_value in left:
+        while right_value is not None and right_value < left_value:
+            right_value = next(right_iter, None)
+
+        if right_value is None or right_value != left_value:
+            yield left_value
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+from ee.alvio.access.acl_cache import get_or_build_acl_for_user
 from ee.alvio.db.external_perm import fetch_external_groups_for_user
 from ee.alvio.db.external_perm import fetch_public_external_group_ids
 from ee.alvio.db.user_group import fetch_user_groups_for_documents
@@ -122,8 +123,16 @@ def _get_acl_for_user(user: User | None, db_session: Session) -> set[str]:
     user should have access to a document if at least one entry in the document's ACL
     matches one entry in the returned set.
 
+    The result is cached per user, see `ee.alvio.access.acl_cache`.
+
     NOTE: is imported in alvio.access.access by `fetch_versioned_implementation`
     DO NOT REMOVE."""
+    return get_or_build_acl_for_user(
+        user, lambda: _build_acl_for_user(user, db_session)
+    )
+
+
+def _build_acl_for_user(user: User | None, db_session: Session) -> set[str]:
     db_user_groups = fetch_user_groups_for_user(db_session, user.id) if user else []
     prefixed_user_groups = [
         prefix_user_group(db_user_group.name) for db_user_group in db_user_groups
@@ -0,0 +1,138 @@
+"""Redis cache for user ACLs.
+
+Building the ACL of a user synced into thousands of external groups is one of the
+slowest parts of a search, so ACLs are cached per user in Redis (tenant scoped
+through `get_redis_client`).
+
+Entries are keyed by a tenant wide version and a per user version. Bumping the
+tenant version (user group / external group membership changes) or the user version
+(role changes) makes the old entries unreachable, they then just expire.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import cast
+from uuid import UUID
+
+from ee.alvio.configs.app_configs import USER_ACL_CACHE_ENABLED
+from ee.alvio.configs.app_configs import USER_ACL_CACHE_TTL_SECONDS
+from alvio.db.models import User
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "user_acl"
+_TENANT_VERSION_KEY = f"{_REDIS_KEY_PREFIX}:version"
+
+
+class _CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, build_seconds: float) -> None:
+        with self._lock:
+            self.misses += 1
+            self.build_seconds += build_seconds
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def avg_build_seconds(self) -> float:
+        return self.build_seconds / self.misses if self.misses else 0.0
+
+
+USER_ACL_CACHE_STATS = _CacheStats()
+
+
+def _user_version_key(user_id: UUID) -> str:
+    return f"{_REDIS_KEY_PREFIX}:user_version:{user_id}"
+
+
+def _version(value: object) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else "0"
+
+
+def get_or_build_acl_for_user(
+    user: User | None, build_acl: Callable[[], set[str]]
+) -> set[str]:
+    """Returns the cached ACL of `user`, only calling `build_acl` on a miss. Anonymous
+    users have no groups, their ACL is cheap and never cached. Redis errors fall back
+    to building the ACL."""
+    if not USER_ACL_CACHE_ENABLED or user is None:
+        return build_acl()
+
+    try:
+        redis_client = get_redis_client()
+        tenant_version, user_version = cast(
+            list[bytes | None],
+            redis_client.mget([_TENANT_VERSION_KEY, _user_version_key(user.id)]),
+        )
+        key = (
+            f"{_REDIS_KEY_PREFIX}:{_version(tenant_version)}:"
+            f"{_version(user_version)}:{user.id}"
+        )
+        cached = redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Failed to read user ACL from redis: {e}")
+        return build_acl()
+
+    if isinstance(cached, bytes):
+        USER_ACL_CACHE_STATS.record_hit()
+        logger.debug(
+            f"event=user_acl_cache "
+            f"hit=true "
+            f"hit_rate={USER_ACL_CACHE_STATS.hit_rate:.2f}"
+        )
+        return set(json.loads(cached))
+
+    start = time.monotonic()
+    acl = build_acl()
+    elapsed = time.monotonic() - start
+
+    USER_ACL_CACHE_STATS.record_miss(elapsed)
+    logger.debug(
+        f"event=user_acl_cache "
+        f"hit=false "
+        f"acl_entries={len(acl)} "
+        f"build_time={elapsed:.3f} "
+        f"avg_build_time={USER_ACL_CACHE_STATS.avg_build_seconds:.3f} "
+        f"hit_rate={USER_ACL_CACHE_STATS.hit_rate:.2f}"
+    )
+
+    # if the versions were bumped while building, this entry is simply never read
+    try:
+        redis_client.set(key, json.dumps(sorted(acl)), ex=USER_ACL_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to write user ACL to redis: {e}")
+
+    return acl
+
+
+def invalidate_acl_cache() -> None:
+    """Invalidates the cached ACLs of every user of the current tenant. Called when
+    user group or external group memberships change."""
+    try:
+        get_redis_client().incrby(_TENANT_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate user ACL cache: {e}")
+
+
+def invalidate_acl_cache_for_user(user_id: UUID) -> None:
+    """Invalidates the cached ACL of a single user of the current tenant."""
+    try:
+        get_redis_client().incrby(_user_version_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate user ACL cache: user={user_id} {e}")
@@ -1,5 +1,7 @@
 import csv
 import io
+import time
+from collections.abc import Iterator
 from datetime import datetime
 
 from celery import shared_task
@@ -7,6 +9,7 @@ from celery import Task
 
 from ee.alvio.server.query_history.api import fetch_and_process_chat_session_history
 from ee.alvio.server.query_history.api import ALVIO_ANONYMIZED_EMAIL
+from ee.alvio.server.query_history.models import ChatSessionSnapshot
 from ee.alvio.server.query_history.models import QuestionAnswerPairSnapshot
 from alvio.background.celery.apps.heavy import celery_app
 from alvio.background.task_utils import construct_query_history_report_name
@@ -21,11 +24,14 @@ from alvio.db.tasks import delete_task_with_id
 from alvio.db.tasks import mark_task_as_finished_with_id
 from alvio.db.tasks import mark_task_as_started_with_id
 from alvio.file_store.file_store import get_default_file_store
+from alvio.file_store.s3_streaming import open_iterator
 from alvio.utils.logger import setup_logger
 
 
 logger = setup_logger()
 
+_CSV_CHUNK_SIZE_CHARS = 1024 * 1024
+
 
 @shared_task(
     name=AlvioCeleryTask.EXPORT_QUERY_HISTORY_TASK,
@@ -47,12 +53,7 @@ def export_query_history_task(
         raise RuntimeError("No task id defined for this task; cannot identify it")
 
     task_id = self.request.id
-    stream = io.StringIO()
-    writer = csv.DictWriter(
-        stream,
-        fieldnames=list(QuestionAnswerPairSnapshot.model_fields.keys()),
-    )
-    writer.writeheader()
+    report_name = construct_query_history_report_name(task_id)
 
     with get_session_with_current_tenant() as db_session:
         try:
@@ -67,50 +68,29 @@ def export_query_history_task(
                 end=end,
             )
 
-            for snapshot in snapshot_generator:
-                if ALVIO_QUERY_HISTORY_TYPE == QueryHistoryType.ANONYMIZED:
-                    snapshot.user_email = ALVIO_ANONYMIZED_EMAIL
-
-                writer.writerows(
-                    qa_pair.to_json()
-                    for qa_pair in QuestionAnswerPairSnapshot.from_chat_session_snapshot(
-                        snapshot
-                    )
+            # the csv is generated while it is uploaded, only a chunk of it is held
+            # in memory at any time
+            with open_iterator(_iter_query_history_csv(snapshot_generator)) as content:
+                get_default_file_store().save_file(
+                    content=content,
+                    display_name=report_name,
+                    file_origin=FileOrigin.QUERY_HISTORY_CSV,
+                    file_type=FileType.CSV,
+                    file_metadata={
+                        "start": start.isoformat(),
+                        "end": end.isoformat(),
+                        "start_time": start_time.isoformat(),
+                    },
+                    file_id=report_name,
                 )
 
-        except Exception:
-            logger.exception(f"Failed to export query history with {task_id=}")
-            mark_task_as_finished_with_id(
-                db_session=db_session,
-                task_id=task_id,
-                success=False,
-            )
-            raise
-
-    report_name = construct_query_history_report_name(task_id)
-    with get_session_with_current_tenant() as db_session:
-        try:
-            stream.seek(0)
-            get_default_file_store().save_file(
-                content=stream,
-                display_name=report_name,
-                file_origin=FileOrigin.QUERY_HISTORY_CSV,
-                file_type=FileType.CSV,
-                file_metadata={
-                    "start": start.isoformat(),
-                    "end": end.isoformat(),
-                    "start_time": start_time.isoformat(),
-                },
-                file_id=report_name,
-            )
-
             delete_task_with_id(
                 db_session=db_session,
                 task_id=task_id,
             )
         except Exception:
             logger.exception(
-                f"Failed to save query history export file; {report_name=}"
+                f"Failed to export query history with {task_id=}; {report_name=}"
             )
             mark_task_as_finished_with_id(
                 db_session=db_session,
@@ -120,6 +100,50 @@ def export_query_history_task(
             raise
 
 
+def _iter_query_history_csv(
+    snapshots: Iterator[ChatSessionSnapshot],
+) -> Iterator[bytes]:
+    stream = io.StringIO()
+    writer = csv.DictWriter(
+        stream,
+        fieldnames=list(QuestionAnswerPairSnapshot.model_fields.keys()),
+    )
+    writer.writeheader()
+
+    num_chat_sessions = 0
+    num_bytes = 0
+    start = time.monotonic()
+    for snapshot in snapshots:
+        if ALVIO_QUERY_HISTORY_TYPE == QueryHistoryType.ANONYMIZED:
+            snapshot.user_email = ALVIO_ANONYMIZED_EMAIL
+
+        writer.writerows(
+            qa_pair.to_json()
+            for qa_pair in QuestionAnswerPairSnapshot.from_chat_session_snapshot(
+                snapshot
+            )
+        )
+        num_chat_sessions += 1
+
+        if stream.tell() >= _CSV_CHUNK_SIZE_CHARS:
+            chunk = stream.getvalue().encode("utf-8")
+            num_bytes += len(chunk)
+            yield chunk
+            stream.seek(0)
+            stream.truncate()
+
+    chunk = stream.getvalue().encode("utf-8")
+    num_bytes += len(chunk)
+    yield chunk
+
+    logger.info(
+        f"event=query_history_export "
+        f"chat_sessions={num_chat_sessions} "
+        f"bytes={num_bytes} "
+        f"elapsed={time.monotonic() - start:.3f}"
+    )
+
+
 celery_app.autodiscover_tasks(
     [
         "ee.alvio.background.celery.tasks.doc_permission_syncing",
@@ -124,6 +124,48 @@ CHECK_TTL_MANAGEMENT_TASK_FREQUENCY_IN_HOURS = float(
 )  # float for easier testing
 
 
+####
+# User ACL Cache
+####
+# ACLs are cached per user in redis and invalidated whenever user group or external
+# group memberships change. The TTL only bounds how long unused entries are kept.
+USER_ACL_CACHE_ENABLED = (
+    os.environ.get("USER_ACL_CACHE_ENABLED") or "true"
+).lower() == "true"
+USER_ACL_CACHE_TTL_SECONDS = int(
+    os.environ.get("USER_ACL_CACHE_TTL_SECONDS") or 60 * 60
+)
+
+
+####
+# Post Query Censoring
+####
+# Sources are censored in parallel, chunks of sources that don't finish within this
+# budget are dropped
+POST_QUERY_CENSORING_TIMEOUT_SECONDS = float(
+    os.environ.get("POST_QUERY_CENSORING_TIMEOUT_SECONDS") or 5
+)
+# The set of sources with censoring enabled is invalidated whenever cc_pairs are
+# added or removed, the TTL is only a safety net
+CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS") or 5 * 60
+)
+# How long the access decision of a user for a single source object is reused
+CENSORING_ACCESS_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_ACCESS_CACHE_TTL_SECONDS") or 60
+)
+
+
+####
+# Query History Export
+####
+# Chat sessions loaded per query when exporting query history, along with all
+# of their messages
+QUERY_HISTORY_EXPORT_PAGE_SIZE = int(
+    os.environ.get("QUERY_HISTORY_EXPORT_PAGE_SIZE") or 500
+)
+
+
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
 STRIPE_PRICE_ID = os.environ.get("STRIPE_PRICE")
 
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from ee.alvio.access.acl_cache import invalidate_acl_cache
 from alvio.access.utils import build_ext_group_name_for_alvio
 from alvio.configs.constants import DocumentSource
 from alvio.db.models import PublicExternalUserGroup
@@ -175,6 +176,8 @@ def upsert_external_groups(
 
     db_session.commit()
 
+    invalidate_acl_cache()
+
 
 def remove_stale_external_groups(
     db_session: Session,
@@ -194,6 +197,8 @@ def remove_stale_external_groups(
     )
     db_session.commit()
 
+    invalidate_acl_cache()
+
 
 def fetch_external_groups_for_user(
     db_session: Session,
@@ -1,5 +1,6 @@
 from collections.abc import Sequence
 from datetime import datetime
+from uuid import UUID
 
 from sqlalchemy import asc
 from sqlalchemy import BinaryExpression
@@ -8,11 +9,13 @@ from sqlalchemy import desc
 from sqlalchemy import distinct
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import case
 from sqlalchemy.sql import func
 from sqlalchemy.sql import select
 from sqlalchemy.sql.expression import literal
+from sqlalchemy.sql.expression import tuple_
 from sqlalchemy.sql.expression import UnaryExpression
 
 from ee.alvio.background.task_name_builders import QUERY_HISTORY_TASK_NAME_PREFIX
@@ -130,6 +133,45 @@ def get_page_of_chat_sessions(
     return db_session.scalars(stmt).unique().all()
 
 
+def get_chat_sessions_after(
+    start_time: datetime | None,
+    end_time: datetime | None,
+    db_session: Session,
+    page_size: int,
+    after: tuple[datetime, UUID] | None = None,
+    feedback_filter: QAFeedbackType | None = None,
+) -> Sequence[ChatSession]:
+    """
+    Keyset paginated version of `get_page_of_chat_sessions`, newest first.
+    after: (time_created, id) of the last chat session of the previous page
+    The messages of the page, along with their feedback and retrieved documents,
+    are loaded with one query each. Messages are not ordered.
+    """
+    conditions = _build_filter_conditions(start_time, end_time, feedback_filter)
+    if after is not None:
+        conditions.append(
+            tuple_(ChatSession.time_created, ChatSession.id)
+            < tuple_(literal(after[0]), literal(after[1]))
+        )
+
+    stmt = (
+        select(ChatSession)
+        .filter(*conditions)
+        .options(
+            joinedload(ChatSession.user),
+            joinedload(ChatSession.persona),
+            selectinload(ChatSession.messages).options(
+                selectinload(ChatMessage.chat_message_feedbacks),
+                selectinload(ChatMessage.search_docs),
+            ),
+        )
+        .order_by(desc(ChatSession.time_created), desc(ChatSession.id))
+        .limit(page_size)
+    )
+
+    return db_session.scalars(stmt).unique().all()
+
+
 def fetch_chat_sessions_eagerly_by_time(
     start: datetime,
     end: datetime,
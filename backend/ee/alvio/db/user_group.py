@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from ee.alvio.access.acl_cache import invalidate_acl_cache
 from ee.alvio.server.user_group.models import SetCuratorRequest
 from ee.alvio.server.user_group.models import UserGroupCreate
 from ee.alvio.server.user_group.models import UserGroupUpdate
@@ -405,6 +406,9 @@ def insert_user_group(db_session: Session, user_group: UserGroupCreate) -> UserG
     )
 
     db_session.commit()
+
+    if user_group.user_ids:
+        invalidate_acl_cache()
     return db_user_group
 
 
@@ -567,6 +571,7 @@ def update_user_curator_relationship(
         .first()
     )
 
+    added_to_group = relationship_to_update is None
     if relationship_to_update:
         relationship_to_update.is_curator = set_curator_request.is_curator
     else:
@@ -580,6 +585,10 @@ def update_user_curator_relationship(
     _validate_curator_status__no_commit(db_session, [target_user])
     db_session.commit()
 
+    # making a user curator of a group they weren't in adds them to the group
+    if added_to_group:
+        invalidate_acl_cache()
+
 
 def update_user_group(
     db_session: Session,
@@ -659,6 +668,9 @@ def update_user_group(
     db_user_group.time_last_modified_by_user = func.now()
 
     db_session.commit()
+
+    if added_user_ids or removed_user_ids:
+        invalidate_acl_cache()
     return db_user_group
 
 
@@ -702,6 +714,8 @@ def prepare_user_group_for_deletion(db_session: Session, user_group_id: int) ->
     db_user_group.is_up_for_deletion = True
     db_session.commit()
 
+    invalidate_acl_cache()
+
 
 def delete_user_group(db_session: Session, user_group: UserGroup) -> None:
     """
@@ -0,0 +1,106 @@
+"""Redis caches (tenant scoped through `get_redis_client`) used by post query
+censoring.
+
+- the set of sources with censoring enabled, invalidated on cc_pair changes
+- per (source, user, object id) access decisions with a short TTL, so repeated
+  queries by the same user don't repeat the remote permission checks
+
+Redis errors are logged and treated as cache misses.
+"""
+
+import json
+from typing import cast
+
+from ee.alvio.configs.app_configs import CENSORING_ACCESS_CACHE_TTL_SECONDS
+from ee.alvio.configs.app_configs import CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS
+from alvio.configs.constants import DocumentSource
+from alvio.redis.redis_pool import get_redis_client
+from alvio.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_ENABLED_SOURCES_KEY = "censoring_enabled_sources"
+_ACCESS_KEY_PREFIX = "censoring_access"
+
+
+def get_cached_censoring_enabled_sources() -> set[DocumentSource] | None:
+    try:
+        value = get_redis_client().get(_ENABLED_SOURCES_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to read censoring enabled sources from redis: {e}")
+        return None
+
+    if not isinstance(value, bytes):
+        return None
+    return {DocumentSource(source) for source in json.loads(value)}
+
+
+def set_cached_censoring_enabled_sources(sources: set[DocumentSource]) -> None:
+    try:
+        get_redis_client().set(
+            _ENABLED_SOURCES_KEY,
+            json.dumps(sorted(source.value for source in sources)),
+            ex=CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to write censoring enabled sources to redis: {e}")
+
+
+def invalidate_censoring_enabled_sources_cache() -> None:
+    """Called whenever cc_pairs of the current tenant are added or removed."""
+    try:
+        get_redis_client().delete(_ENABLED_SOURCES_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate censoring enabled sources cache: {e}")
+
+
+def _access_key(source: DocumentSource, user_email: str, object_id: str) -> str:
+    return f"{_ACCESS_KEY_PREFIX}:{source.value}:{user_email}:{object_id}"
+
+
+def get_cached_access_decisions(
+    source: DocumentSource, user_email: str, object_ids: list[str]
+) -> dict[str, bool]:
+    """Returns the cached access decisions of the user, objects without one are
+    left out."""
+    if not object_ids:
+        return {}
+
+    try:
+        values = cast(
+            list[bytes | None],
+            get_redis_client().mget(
+                [_access_key(source, user_email, object_id) for object_id in object_ids]
+            ),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read access decisions from redis: {e}")
+        return {}
+
+    return {
+        object_id: value == b"1"
+        for object_id, value in zip(object_ids, values)
+        if value is not None
+    }
+
+
+def cache_access_decisions(
+    source: DocumentSource, user_email: str, object_id_to_access: dict[str, bool]
+) -> None:
+    if not object_id_to_access:
+        return
+
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        # using pipeline doesn't automatically add the tenant_id prefix
+        tenant_prefix = f"{get_current_tenant_id()}:"
+        for object_id, has_access in object_id_to_access.items():
+            pipeline.set(
+                tenant_prefix + _access_key(source, user_email, object_id),
+                "1" if has_access else "0",
+                ex=CENSORING_ACCESS_CACHE_TTL_SECONDS,
+            )
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Failed to write access decisions to redis: {e}")
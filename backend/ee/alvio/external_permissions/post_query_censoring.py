@@ -1,4 +1,13 @@
+import time
+
+from ee.alvio.configs.app_configs import POST_QUERY_CENSORING_TIMEOUT_SECONDS
 from ee.alvio.db.connector_credential_pair import get_all_auto_sync_cc_pairs
+from ee.alvio.external_permissions.censoring_cache import (
+    get_cached_censoring_enabled_sources,
+)
+from ee.alvio.external_permissions.censoring_cache import (
+    set_cached_censoring_enabled_sources,
+)
 from ee.alvio.external_permissions.sync_params import get_all_censoring_enabled_sources
 from ee.alvio.external_permissions.sync_params import get_source_perm_sync_config
 from alvio.configs.constants import DocumentSource
@@ -6,6 +15,8 @@ from alvio.context.search.pipeline import InferenceChunk
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
 from alvio.db.models import User
 from alvio.utils.logger import setup_logger
+from alvio.utils.threadpool_concurrency import run_in_background
+from alvio.utils.threadpool_concurrency import TimeoutThread
 
 logger = setup_logger()
 
@@ -21,15 +32,22 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     indexed that chunk is not sync. This was done to avoid getting the cc_pair
     for every single chunk.
     """
+    cached_sources = get_cached_censoring_enabled_sources()
+    if cached_sources is not None:
+        return cached_sources
+
     all_censoring_enabled_sources = get_all_censoring_enabled_sources()
     with get_session_with_current_tenant() as db_session:
         enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
-        return {
+        sources = {
             cc_pair.connector.source
             for cc_pair in enabled_sync_connectors
             if cc_pair.connector.source in all_censoring_enabled_sources
         }
 
+    set_cached_censoring_enabled_sources(sources)
+    return sources
+
 
 # NOTE: This is only called if ee is enabled.
 def _post_query_chunk_censoring(
@@ -56,25 +74,41 @@ def _post_query_chunk_censoring(
         else:
             final_chunk_dict[chunk.unique_id] = chunk
 
-    # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
+    # For each source, filter out the chunks using the permission check function
+    # for that source. Sources are censored in parallel within a shared latency
+    # budget, the chunks of a source that fails or runs over it are thrown out.
+    source_to_task: dict[DocumentSource, TimeoutThread[list[InferenceChunk]]] = {}
     for source, chunks_for_source in chunks_to_process.items():
         sync_config = get_source_perm_sync_config(source)
         if sync_config is None or sync_config.censoring_config is None:
             raise ValueError(f"No sync config found for {source}")
 
-        censor_chunks_for_source = sync_config.censoring_config.chunk_censoring_func
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
+        source_to_task[source] = run_in_background(
+            sync_config.censoring_config.chunk_censoring_func,
+            chunks_for_source,
+            user.email,
+        )
+
+    deadline = time.monotonic() + POST_QUERY_CENSORING_TIMEOUT_SECONDS
+    for source, task in source_to_task.items():
+        task.join(max(deadline - time.monotonic(), 0))
+        if task.is_alive():
+            logger.error(
+                f"Censoring chunks for source {source} took longer than "
+                f"{POST_QUERY_CENSORING_TIMEOUT_SECONDS}s so throwing out all chunks "
+                "for this source and continuing"
+            )
+            continue
+
+        if task.exception is not None:
+            logger.error(
                 f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
+                f" chunks for this source and continuing: {task.exception}",
+                exc_info=task.exception,
             )
             continue
 
-        for censored_chunk in censored_chunks:
+        for censored_chunk in task.result:
             final_chunk_dict[censored_chunk.unique_id] = censored_chunk
 
     # IMPORTANT: make sure to retain the same ordering as the original `chunks` passed in
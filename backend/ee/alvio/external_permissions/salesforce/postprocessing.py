@@ -1,14 +1,19 @@
 import time
 
 from ee.alvio.db.external_perm import fetch_external_groups_for_user_email_and_group_ids
+from ee.alvio.external_permissions.censoring_cache import cache_access_decisions
+from ee.alvio.external_permissions.censoring_cache import get_cached_access_decisions
 from ee.alvio.external_permissions.salesforce.utils import (
     get_any_salesforce_client_for_doc_id,
 )
-from ee.alvio.external_permissions.salesforce.utils import get_objects_access_for_user_id
+from ee.alvio.external_permissions.salesforce.utils import (
+    get_objects_access_for_user_id,
+)
 from ee.alvio.external_permissions.salesforce.utils import (
     get_salesforce_user_id_from_email,
 )
 from alvio.configs.app_configs import BLURB_SIZE
+from alvio.configs.constants import DocumentSource
 from alvio.context.search.models import InferenceChunk
 from alvio.db.engine.sql_engine import get_session_with_current_tenant
 from alvio.utils.logger import setup_logger
@@ -40,7 +45,19 @@ def _get_objects_access_for_user_email_from_salesforce(
     """
     This function wraps the salesforce call as we may want to change how this
     is done in the future. (E.g. replace it with the above function)
+
+    Access decisions are cached for a short while, so only the objects without a
+    cached decision are sent to Salesforce.
     """
+    cached_access = get_cached_access_decisions(
+        DocumentSource.SALESFORCE, user_email, list(object_ids)
+    )
+    uncached_object_ids = [
+        object_id for object_id in object_ids if object_id not in cached_access
+    ]
+    if not uncached_object_ids:
+        return cached_access
+
     # This is cached in the function so the first query takes an extra 0.1-0.3 seconds
     # but subsequent queries for this source are essentially instant
     first_doc_id = chunks[0].document_id
@@ -64,10 +81,11 @@ def _get_objects_access_for_user_email_from_salesforce(
     # This is the only query that is not cached in the function
     # so it takes 0.1-0.2 seconds total
     object_id_to_access = get_objects_access_for_user_id(
-        salesforce_client, user_id, list(object_ids)
+        salesforce_client, user_id, uncached_object_ids
     )
     logger.debug(f"Object ID to access: {object_id_to_access}")
-    return object_id_to_access
+    cache_access_decisions(DocumentSource.SALESFORCE, user_email, object_id_to_access)
+    return {**cached_access, **object_id_to_access}
 
 
 def _extract_salesforce_object_id_from_url(url: str) -> str:
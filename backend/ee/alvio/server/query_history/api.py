@@ -13,7 +13,9 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ee.alvio.background.task_name_builders import query_history_task_name
+from ee.alvio.configs.app_configs import QUERY_HISTORY_EXPORT_PAGE_SIZE
 from ee.alvio.db.query_history import get_all_query_history_export_tasks
+from ee.alvio.db.query_history import get_chat_sessions_after
 from ee.alvio.db.query_history import get_page_of_chat_sessions
 from ee.alvio.db.query_history import get_total_filtered_chat_sessions_count
 from ee.alvio.server.query_history.models import ChatSessionMinimal
@@ -24,6 +26,7 @@ from alvio.auth.users import current_admin_user
 from alvio.auth.users import get_display_email
 from alvio.background.celery.versioned_apps.client import app as client_app
 from alvio.background.task_utils import construct_query_history_report_name
+from alvio.chat.chat_utils import build_chat_chain
 from alvio.chat.chat_utils import create_chat_chain
 from alvio.configs.app_configs import ALVIO_QUERY_HISTORY_TYPE
 from alvio.configs.constants import FileOrigin
@@ -40,6 +43,7 @@ from alvio.db.chat import get_chat_sessions_by_user
 from alvio.db.engine.sql_engine import get_session
 from alvio.db.enums import TaskStatus
 from alvio.db.file_record import get_query_history_export_files
+from alvio.db.models import ChatMessage
 from alvio.db.models import ChatSession
 from alvio.db.models import User
 from alvio.db.tasks import get_task_with_id
@@ -48,7 +52,6 @@ from alvio.file_store.file_store import get_default_file_store
 from alvio.server.documents.models import PaginatedReturn
 from alvio.server.query_and_chat.models import ChatSessionDetails
 from alvio.server.query_and_chat.models import ChatSessionsResponse
-from alvio.utils.threadpool_concurrency import parallel_yield
 from shared_configs.contextvars import get_current_tenant_id
 
 router = APIRouter()
@@ -66,55 +69,35 @@ def ensure_query_history_is_enabled(
         )
 
 
-def yield_snapshot_from_chat_session(
-    chat_session: ChatSession,
-    db_session: Session,
-) -> Generator[ChatSessionSnapshot | None]:
-    yield snapshot_from_chat_session(chat_session=chat_session, db_session=db_session)
-
-
 def fetch_and_process_chat_session_history(
     db_session: Session,
     start: datetime,
     end: datetime,
-    limit: int | None = 500,
+    page_size: int = QUERY_HISTORY_EXPORT_PAGE_SIZE,
 ) -> Generator[ChatSessionSnapshot]:
-    PAGE_SIZE = 100
-
-    page = 0
+    after: tuple[datetime, UUID] | None = None
     while True:
-        paged_chat_sessions = get_page_of_chat_sessions(
+        paged_chat_sessions = get_chat_sessions_after(
             start_time=start,
             end_time=end,
             db_session=db_session,
-            page_num=page,
-            page_size=PAGE_SIZE,
-        )
-
-        if not paged_chat_sessions:
-            break
-
-        paged_snapshots = parallel_yield(
-            [
-                yield_snapshot_from_chat_session(
-                    db_session=db_session,
-                    chat_session=chat_session,
-                )
-                for chat_session in paged_chat_sessions
-            ]
+            page_size=page_size,
+            after=after,
         )
 
-        for snapshot in paged_snapshots:
+        for chat_session in paged_chat_sessions:
+            snapshot = snapshot_from_loaded_chat_session(chat_session)
             if snapshot:
                 yield snapshot
 
-        # If we've fetched *less* than a `PAGE_SIZE` worth
+        # If we've fetched *less* than a `page_size` worth
         # of data, we have reached the end of the
         # pagination sequence; break.
-        if len(paged_chat_sessions) < PAGE_SIZE:
+        if len(paged_chat_sessions) < page_size:
             break
 
-        page += 1
+        last_chat_session = paged_chat_sessions[-1]
+        after = (last_chat_session.time_created, last_chat_session.id)
 
 
 def snapshot_from_chat_session(
@@ -130,6 +113,32 @@ def snapshot_from_chat_session(
     except RuntimeError:
         return None
 
+    return _build_chat_session_snapshot(chat_session, messages)
+
+
+def snapshot_from_loaded_chat_session(
+    chat_session: ChatSession,
+) -> ChatSessionSnapshot | None:
+    """Same as `snapshot_from_chat_session` for a chat session whose messages are
+    already loaded (see `get_chat_sessions_after`), without further queries"""
+    # the root message has no parent and has to come first
+    all_chat_messages = sorted(
+        chat_session.messages,
+        key=lambda message: (message.parent_message is not None, message.id),
+    )
+    try:
+        # Older chats may not have the right structure
+        last_message, messages = build_chat_chain(all_chat_messages)
+        messages.append(last_message)
+    except RuntimeError:
+        return None
+
+    return _build_chat_session_snapshot(chat_session, messages)
+
+
+def _build_chat_session_snapshot(
+    chat_session: ChatSession, messages: list[ChatMessage]
+) -> ChatSessionSnapshot:
     flow_type = SessionType.SLACK if chat_session.alviobot_flow else SessionType.CHAT
 
     return ChatSessionSnapshot(
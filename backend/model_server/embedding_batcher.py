@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+import numpy as np
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+from alvio.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+_QUEUE_DEPTH = Gauge(
+    "embedding_batcher_queue_depth",
+    "Number of embedding requests waiting to be batched",
+    ["model"],
+)
+_BATCH_SIZE = Histogram(
+    "embedding_batcher_batch_size",
+    "Number of texts embedded per forward pass",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+_REQUESTS_PER_BATCH = Histogram(
+    "embedding_batcher_requests_per_batch",
+    "Number of embedding requests coalesced into one forward pass",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+_WAIT_TIME = Histogram(
+    "embedding_batcher_wait_seconds",
+    "Time between a request being queued and its forward pass starting",
+    ["model"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+@dataclass
+class _PendingEmbedRequest:
+    texts: list[str]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests for one model into shared forward passes.
+
+    Requests are queued and a single worker task drains them: it waits up to
+    `max_wait_seconds` after the first request for more to arrive (or until
+    `max_batch_size` texts are collected), runs `encode_fn` once in the default
+    executor and scatters the rows back. `encode_fn` is expected to order the texts
+    by length itself (SentenceTransformer.encode does) to cut padding.
+    Requests are never split, so a single request larger than `max_batch_size`
+    is run on its own. Only one forward pass per batcher runs at a time.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        encode_fn: Callable[[list[str]], Any],
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.loop = asyncio.get_running_loop()
+
+        self._encode_fn = encode_fn
+        self._queue: asyncio.Queue[_PendingEmbedRequest] = asyncio.Queue()
+        # a request that did not fit in the previous batch, processed first next time
+        self._carry_over: _PendingEmbedRequest | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        pending = _PendingEmbedRequest(texts=texts, future=self.loop.create_future())
+        self._queue.put_nowait(pending)
+        _QUEUE_DEPTH.labels(model=self.model_name).inc()
+
+        if self._worker is None or self._worker.done():
+            self._worker = self.loop.create_task(self._run())
+
+        return await pending.future
+
+    async def aclose(self) -> None:
+        """Stops the worker task. Requests still queued are left unanswered."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _next_request(self, timeout: float | None) -> _PendingEmbedRequest | None:
+        if self._carry_over is not None:
+            pending, self._carry_over = self._carry_over, None
+            return pending
+
+        try:
+            if timeout is None:
+                pending = await self._queue.get()
+            elif timeout <= 0:
+                pending = self._queue.get_nowait()
+            else:
+                pending = await asyncio.wait_for(self._queue.get(), timeout)
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            return None
+
+        _QUEUE_DEPTH.labels(model=self.model_name).dec()
+        return pending
+
+    async def _collect_batch(self) -> list[_PendingEmbedRequest]:
+        first = await self._next_request(timeout=None)
+        assert first is not None
+
+        batch = [first]
+        num_texts = len(first.texts)
+        deadline = self.loop.time() + self.max_wait_seconds
+
+        while num_texts < self.max_batch_size:
+            pending = await self._next_request(timeout=deadline - self.loop.time())
+            if pending is None:
+                break
+
+            if num_texts + len(pending.texts) > self.max_batch_size:
+                self._carry_over = pending
+                break
+
+            batch.append(pending)
+            num_texts += len(pending.texts)
+
+        return batch
+
+    async def _run_batch(self, batch: list[_PendingEmbedRequest]) -> None:
+        # callers that went away (e.g. client disconnected) don't need embeddings
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+
+        start = time.monotonic()
+        for pending in batch:
+            _WAIT_TIME.labels(model=self.model_name).observe(
+                start - pending.enqueued_at
+            )
+
+        texts = [text for pending in batch for text in pending.texts]
+
+        _BATCH_SIZE.labels(model=self.model_name).observe(len(texts))
+        _REQUESTS_PER_BATCH.labels(model=self.model_name).observe(len(batch))
+
+        try:
+            vectors = np.asarray(
+                await self.loop.run_in_executor(None, self._encode_fn, texts)
+            )
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        logger.debug(
+            f"Embedded batch of {len(texts)} texts from {len(batch)} requests "
+            f"with model {self.model_name} in {time.monotonic() - start:.3f}s"
+        )
+
+        offset = 0
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_result(vectors[offset : offset + len(pending.texts)])
+            offset += len(pending.texts)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._run_batch(batch)
+            except Exception:
+                logger.exception(f"Embedding batcher for {self.model_name} failed")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(
+                            RuntimeError("Embedding batcher failed")
+                        )
@@ -3,16 +3,26 @@ import time
 from typing import Any
 from typing import Optional
 
+import numpy as np
 from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
+from fastapi import Response
 from litellm.exceptions import RateLimitError
 from sentence_transformers import CrossEncoder  # type: ignore
 from sentence_transformers import SentenceTransformer  # type: ignore
 
+from model_server.embedding_batcher import EmbeddingBatcher
 from model_server.utils import simple_log_function_time
 from alvio.utils.logger import setup_logger
+from shared_configs.configs import EMBEDDING_BATCHER_ENABLED
+from shared_configs.configs import EMBEDDING_BATCHER_MAX_BATCH_SIZE
+from shared_configs.configs import EMBEDDING_BATCHER_MAX_WAIT_MS
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.embedding_transport import BINARY_EMBEDDING_MEDIA_TYPE
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.embedding_transport import parse_accept_header
+from shared_configs.enums import EmbeddingTransportFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
@@ -27,6 +37,8 @@ router = APIRouter(prefix="/encoder")
 
 _GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
 _RERANK_MODEL: Optional["CrossEncoder"] = None
+# keyed by (model_name, max_context_length, normalize_embeddings)
+_EMBEDDING_BATCHERS: dict[tuple[str, int, bool], EmbeddingBatcher] = {}
 
 # If we are not only indexing, dont want retry very long
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
@@ -118,15 +130,47 @@ def _concurrent_embedding(
     return model.encode(texts, normalize_embeddings=normalize_embeddings)
 
 
+def get_embedding_batcher(
+    model_name: str,
+    max_context_length: int,
+    normalize_embeddings: bool,
+) -> EmbeddingBatcher:
+    """Returns the batcher for this model configuration on the running event loop,
+    creating it if needed."""
+    key = (model_name, max_context_length, normalize_embeddings)
+    batcher = _EMBEDDING_BATCHERS.get(key)
+    if batcher is not None and batcher.loop is asyncio.get_running_loop():
+        return batcher
+
+    def _encode(texts: list[str]) -> Any:
+        local_model = get_embedding_model(
+            model_name=model_name, max_context_length=max_context_length
+        )
+        # encode keeps its own (smaller) forward pass batch size, the batcher limit
+        # only bounds how many texts are coalesced into one encode call
+        return _concurrent_embedding(texts, local_model, normalize_embeddings)
+
+    batcher = EmbeddingBatcher(
+        model_name=model_name,
+        encode_fn=_encode,
+        max_batch_size=EMBEDDING_BATCHER_MAX_BATCH_SIZE,
+        max_wait_seconds=EMBEDDING_BATCHER_MAX_WAIT_MS / 1000,
+    )
+    _EMBEDDING_BATCHERS[key] = batcher
+    return batcher
+
+
 @simple_log_function_time()
-async def embed_text(
+async def embed_text_vectors(
     texts: list[str],
     model_name: str | None,
     max_context_length: int,
     normalize_embeddings: bool,
     prefix: str | None,
     gpu_type: str = "UNKNOWN",
-) -> list[Embedding]:
+) -> np.ndarray:
+    """Embeds the texts and returns a (len(texts), dim) array. Kept as an array so the
+    binary transport can serialize it without going through python floats."""
     if not all(texts):
         logger.error("Empty strings provided for embedding")
         raise ValueError("Empty strings are not allowed for embedding.")
@@ -151,20 +195,26 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        if EMBEDDING_BATCHER_ENABLED:
+            # Coalesced with concurrent requests into a shared forward pass
+            batcher = get_embedding_batcher(
+                model_name=model_name,
+                max_context_length=max_context_length,
+                normalize_embeddings=normalize_embeddings,
+            )
+            embeddings = await batcher.embed(prefixed_texts)
+        else:
+            local_model = get_embedding_model(
+                model_name=model_name, max_context_length=max_context_length
+            )
+            # Run CPU-bound embedding in a thread pool
+            embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: _concurrent_embedding(
+                    prefixed_texts, local_model, normalize_embeddings
+                ),
+            )
+            embeddings = np.asarray(embeddings_vectors)
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -186,6 +236,25 @@ async def embed_text(
     return embeddings
 
 
+async def embed_text(
+    texts: list[str],
+    model_name: str | None,
+    max_context_length: int,
+    normalize_embeddings: bool,
+    prefix: str | None,
+    gpu_type: str = "UNKNOWN",
+) -> list[Embedding]:
+    embeddings = await embed_text_vectors(
+        texts=texts,
+        model_name=model_name,
+        max_context_length=max_context_length,
+        normalize_embeddings=normalize_embeddings,
+        prefix=prefix,
+        gpu_type=gpu_type,
+    )
+    return embeddings.tolist()
+
+
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
     cross_encoder = get_local_reranking_model(model_name)
@@ -196,17 +265,34 @@ async def local_rerank(query: str, docs: list[str], model_name: str) -> list[flo
     )
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
-) -> EmbedResponse:
-    return await process_embed_request(embed_request, request.app.state.gpu_type)
+) -> EmbedResponse | Response:
+    transport_format = parse_accept_header(request.headers.get("accept"))
+    if transport_format == EmbeddingTransportFormat.JSON:
+        return await process_embed_request(embed_request, request.app.state.gpu_type)
+
+    embeddings = await _process_embed_request_vectors(
+        embed_request, request.app.state.gpu_type
+    )
+    return Response(
+        content=encode_embeddings(embeddings, transport_format),
+        media_type=BINARY_EMBEDDING_MEDIA_TYPE,
+    )
 
 
 async def process_embed_request(
     embed_request: EmbedRequest, gpu_type: str = "UNKNOWN"
 ) -> EmbedResponse:
+    embeddings = await _process_embed_request_vectors(embed_request, gpu_type)
+    return EmbedResponse(embeddings=embeddings.tolist())
+
+
+async def _process_embed_request_vectors(
+    embed_request: EmbedRequest, gpu_type: str = "UNKNOWN"
+) -> np.ndarray:
     # Only local models should use this endpoint - API providers should make direct API calls
     if embed_request.provider_type is not None:
         raise ValueError(
@@ -228,7 +314,7 @@ async def process_embed_request(
         else:
             prefix = None
 
-        embeddings = await embed_text(
+        return await embed_text_vectors(
             texts=embed_request.texts,
             model_name=embed_request.model_name,
             max_context_length=embed_request.max_context_length,
@@ -236,7 +322,6 @@ async def process_embed_request(
             prefix=prefix,
             gpu_type=gpu_type,
         )
-        return EmbedResponse(embeddings=embeddings)
     except RateLimitError as e:
         raise HTTPException(
             status_code=429,
@@ -0,0 +1,109 @@
+"""Compares chunking with and without the Chunker's token count cache.
+
+The corpus is fixed (seeded) synthetic text shaped like wiki pages: documents with
+a mix of short sections that get packed together and long sections that get split.
+Multipass is enabled so blurbs and mini-chunks are both computed. Both runs must
+produce identical chunks.
+
+The tokenizer is the default document embedding model's, so it has to be available
+locally or downloadable.
+
+Basic Usage:
+
+python scripts/chunker_benchmark.py --num-docs 50 --sections-per-doc 20
+"""
+
+import argparse
+import random
+import string
+import time
+
+import alvio.indexing.chunker as chunker_module
+from alvio.configs.constants import DocumentSource
+from alvio.configs.model_configs import DOCUMENT_ENCODER_MODEL
+from alvio.connectors.models import Document
+from alvio.connectors.models import IndexingDocument
+from alvio.connectors.models import TextSection
+from alvio.indexing.chunker import Chunker
+from alvio.indexing.indexing_pipeline import process_image_sections
+from alvio.indexing.models import DocAwareChunk
+from alvio.natural_language_processing.utils import get_tokenizer
+
+
+def _build_corpus(num_docs: int, sections_per_doc: int) -> list[IndexingDocument]:
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(3000)
+    ]
+
+    def _sentence() -> str:
+        return " ".join(rng.choices(words, k=rng.randint(5, 25))).capitalize() + "."
+
+    documents = [
+        Document(
+            id=f"https://wiki.example.com/pages/{ind}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Page {ind}",
+            metadata={"space": "ENG", "labels": ["design", "backend"]},
+            sections=[
+                TextSection(
+                    # mostly short sections, some long enough to be split
+                    text=" ".join(
+                        _sentence()
+                        for _ in range(
+                            rng.randint(1, 8)
+                            if rng.random() < 0.7
+                            else rng.randint(40, 150)
+                        )
+                    ),
+                    link=f"https://wiki.example.com/pages/{ind}#section-{section}",
+                )
+                for section in range(sections_per_doc)
+            ],
+        )
+        for ind in range(num_docs)
+    ]
+    return process_image_sections(documents)
+
+
+def _run(documents: list[IndexingDocument]) -> tuple[float, list[DocAwareChunk]]:
+    chunker = Chunker(
+        tokenizer=get_tokenizer(DOCUMENT_ENCODER_MODEL, None),
+        enable_multipass=True,
+        enable_large_chunks=True,
+    )
+    start = time.perf_counter()
+    chunks = chunker.chunk(documents)
+    return time.perf_counter() - start, chunks
+
+
+def run_benchmark(num_docs: int, sections_per_doc: int) -> None:
+    documents = _build_corpus(num_docs, sections_per_doc)
+
+    cache_size = chunker_module.TOKEN_COUNT_CACHE_SIZE
+    chunker_module.TOKEN_COUNT_CACHE_SIZE = 0
+    uncached_elapsed, uncached_chunks = _run(documents)
+    chunker_module.TOKEN_COUNT_CACHE_SIZE = cache_size
+    cached_elapsed, cached_chunks = _run(documents)
+
+    assert [chunk.model_dump() for chunk in uncached_chunks] == [
+        chunk.model_dump() for chunk in cached_chunks
+    ], "cached chunking differs from uncached chunking"
+
+    print(
+        f"{num_docs} documents, {sections_per_doc} sections each, "
+        f"{len(cached_chunks)} chunks (identical)\n"
+    )
+    print(f"{'method':<10}{'elapsed (s)':>14}")
+    print(f"{'uncached':<10}{uncached_elapsed:>14.2f}")
+    print(f"{'cached':<10}{cached_elapsed:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunker benchmark")
+    parser.add_argument("--num-docs", type=int, default=50)
+    parser.add_argument("--sections-per-doc", type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_docs, args.sections_per_doc)
@@ -0,0 +1,159 @@
+"""Micro-benchmark of CitationProcessor on long synthetic streamed answers.
+
+CitationProcessor used to rescan the entire answer so far for code fences and the
+whole held back segment for possible citations on every token, which made a stream
+quadratic in its length. The "rescanning" processor below reproduces that on top of
+the current implementation, so both produce the same output (which is asserted) and
+only the per-token work differs.
+
+Basic Usage:
+
+python scripts/citation_processing_benchmark.py --num-tokens 50000 --num-answers 3
+"""
+
+import argparse
+import gc
+import random
+import re
+import string
+import time
+from datetime import datetime
+
+from alvio.chat.models import LlmDoc
+from alvio.chat.stream_processing.citation_processing import CitationProcessor
+from alvio.chat.stream_processing.citation_processing import in_code_block
+from alvio.chat.stream_processing.utils import DocumentIdOrderMapping
+from alvio.configs.constants import DocumentSource
+
+
+class _RescanningFenceTracker:
+    def __init__(self) -> None:
+        self.llm_out = ""
+
+    def feed(self, token: str) -> None:
+        self.llm_out += token
+
+    @property
+    def in_code_block(self) -> bool:
+        return in_code_block(self.llm_out)
+
+
+class _RescanningCitationProcessor(CitationProcessor):
+    """CitationProcessor as it was before the incremental code fence tracking."""
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        self.code_fences = _RescanningFenceTracker()  # type: ignore[assignment]
+
+    def _possible_citation_found(self) -> bool:
+        return bool(re.search(self.possible_citation_pattern, self.curr_segment))
+
+
+def _build_docs(num_docs: int) -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{ind}",
+            content="Document content",
+            blurb=f"Document #{ind}",
+            semantic_identifier=f"Doc {ind}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://example.com/{ind}",
+            source_links={},
+            match_highlights=[],
+        )
+        for ind in range(num_docs)
+    ]
+
+
+def _build_answer_tokens(
+    rng: random.Random, num_tokens: int, num_docs: int
+) -> list[str]:
+    """Prose with citations in all supported forms, inline code and code blocks."""
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+        for _ in range(500)
+    ]
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        kind = rng.random()
+        if kind < 0.05:
+            citation = rng.choice(
+                [
+                    f"[{rng.randint(1, num_docs)}]",
+                    f"[[{rng.randint(1, num_docs)}]]",
+                    f"[{rng.randint(1, num_docs)}, {rng.randint(1, num_docs)}]",
+                ]
+            )
+            # citations are usually split over several tokens
+            split = rng.randint(1, len(citation) - 1)
+            tokens.extend([citation[:split], citation[split:]])
+        elif kind < 0.06:
+            tokens.extend(["```", "\n", "x = values[", "1", "]\n", "```", "\n"])
+        elif kind < 0.08:
+            tokens.extend([" `", rng.choice(words), "`"])
+        else:
+            tokens.append(" " + rng.choice(words))
+    return tokens
+
+
+def _run(
+    processor_cls: type[CitationProcessor], docs: list[LlmDoc], tokens: list[str]
+) -> tuple[float, list[object]]:
+    doc_mapping = DocumentIdOrderMapping(
+        order_mapping={doc.document_id: ind + 1 for ind, doc in enumerate(docs)}
+    )
+    processor = processor_cls(
+        context_docs=docs,
+        final_doc_id_to_rank_map=doc_mapping,
+        display_doc_id_to_rank_map=doc_mapping,
+        stop_stream=None,
+    )
+    output: list[object] = []
+    # the collected output grows with the answer, keep collections out of the timing
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for token in tokens:
+            output.extend(processor.process_token(token))
+        output.extend(processor.process_token(None))
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return elapsed, output
+
+
+def run_benchmark(num_tokens: int, num_answers: int, num_docs: int) -> None:
+    rng = random.Random(0)
+    docs = _build_docs(num_docs)
+    answers = [
+        _build_answer_tokens(rng, num_tokens, num_docs) for _ in range(num_answers)
+    ]
+
+    timings: dict[str, float] = {"rescanning": 0.0, "incremental": 0.0}
+    for tokens in answers:
+        rescanning_elapsed, rescanning_output = _run(
+            _RescanningCitationProcessor, docs, tokens
+        )
+        incremental_elapsed, incremental_output = _run(CitationProcessor, docs, tokens)
+        assert rescanning_output == incremental_output, "outputs differ"
+        timings["rescanning"] += rescanning_elapsed
+        timings["incremental"] += incremental_elapsed
+
+    total_tokens = num_tokens * num_answers
+    print(f"{num_answers} answers of {num_tokens} tokens, identical output\n")
+    print(f"{'method':<14}{'total (s)':>12}{'per token (us)':>18}")
+    for method, elapsed in timings.items():
+        print(f"{method:<14}{elapsed:>12.3f}{elapsed / total_tokens * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Citation processing benchmark")
+    parser.add_argument("--num-tokens", type=int, default=50000)
+    parser.add_argument("--num-answers", type=int, default=3)
+    parser.add_argument("--num-docs", type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_tokens, args.num_answers, args.num_docs)
@@ -0,0 +1,131 @@
+"""Compares the legacy (indented JSON array) and compact (gzip JSON lines) formats
+used by DocumentBatchStorage for docfetching batches.
+
+Batches are synthetic but shaped like Confluence / Google Drive documents: a
+handful of long text sections, links, owners and metadata. No file store is used,
+only serialization and deserialization are timed.
+
+Basic Usage:
+
+python scripts/document_batch_storage_benchmark.py --num-docs 64 --section-chars 20000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import string
+import time
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+
+from alvio.configs.constants import DocumentSource
+from alvio.connectors.models import BasicExpertInfo
+from alvio.connectors.models import Document
+from alvio.connectors.models import TextSection
+from alvio.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+
+
+def _random_text(rng: random.Random, num_chars: int) -> str:
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(2000)
+    ]
+    # word frequencies in natural text roughly follow Zipf's law
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    text: list[str] = []
+    length = 0
+    while length < num_chars:
+        sentence = rng.choices(words, weights=weights, k=rng.randint(5, 25))
+        text.append(" ".join(sentence).capitalize() + ".")
+        length += len(text[-1]) + 1
+    return " ".join(text)
+
+
+def _build_documents(num_docs: int, section_chars: int) -> list[Document]:
+    rng = random.Random(0)
+    return [
+        Document(
+            id=f"https://wiki.example.com/pages/{ind}",
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=f"Design doc {ind}",
+            title=f"Design doc {ind}",
+            sections=[
+                TextSection(
+                    text=_random_text(rng, section_chars // 4),
+                    link=f"https://wiki.example.com/pages/{ind}#section-{section}",
+                )
+                for section in range(4)
+            ],
+            metadata={"labels": ["design", "backend"], "space": "ENG"},
+            doc_updated_at=datetime.now(tz=timezone.utc),
+            primary_owners=[BasicExpertInfo(email=f"owner{ind}@example.com")],
+            secondary_owners=[BasicExpertInfo(display_name="Platform team")],
+        )
+        for ind in range(num_docs)
+    ]
+
+
+def _time_it(func: Callable[[], object], iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_benchmark(num_docs: int, section_chars: int, iterations: int) -> None:
+    documents = _build_documents(num_docs, section_chars)
+    storage = FileStoreDocumentBatchStorage(
+        cc_pair_id=0, index_attempt_id=0, file_store=None  # type: ignore
+    )
+
+    def _legacy_write() -> bytes:
+        return json.dumps(
+            [doc.model_dump(mode="json") for doc in documents], indent=2
+        ).encode("utf-8")
+
+    legacy_payload = _legacy_write()
+    compact_payload = storage._serialize_documents(documents)
+    assert list(storage._iter_deserialized_documents(BytesIO(compact_payload))) == (
+        storage._deserialize_legacy_documents(legacy_payload.decode("utf-8"))
+    )
+
+    print(f"{num_docs} documents, ~{section_chars} chars each")
+    print(f"median of {iterations} runs\n")
+    print(f"{'format':<10}{'size (KB)':>12}{'write (ms)':>14}{'read (ms)':>14}")
+
+    legacy_write = _time_it(_legacy_write, iterations)
+    legacy_read = _time_it(
+        lambda: storage._deserialize_legacy_documents(legacy_payload.decode("utf-8")),
+        iterations,
+    )
+    print(
+        f"{'legacy':<10}{len(legacy_payload) / 1024:>12.1f}"
+        f"{legacy_write * 1000:>14.2f}{legacy_read * 1000:>14.2f}"
+    )
+
+    compact_write = _time_it(
+        lambda: storage._serialize_documents(documents), iterations
+    )
+    compact_read = _time_it(
+        lambda: list(storage._iter_deserialized_documents(BytesIO(compact_payload))),
+        iterations,
+    )
+    print(
+        f"{'compact':<10}{len(compact_payload) / 1024:>12.1f}"
+        f"{compact_write * 1000:>14.2f}{compact_read * 1000:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Document batch storage benchmark")
+    parser.add_argument("--num-docs", type=int, default=64)
+    parser.add_argument("--section-chars", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_docs, args.section_chars, args.iterations)
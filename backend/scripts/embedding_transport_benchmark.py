@@ -0,0 +1,91 @@
+"""Compares the JSON and binary wire formats used for /bi-encoder-embed responses.
+
+Measures the server side (serialize) and client side (parse into EmbedResponse)
+cost of each format on synthetic embeddings, without needing a running model server.
+
+Decoding the binary formats is a zero-copy np.frombuffer view, but EmbedResponse and
+its callers still work with python lists of floats, so the client pays a per-float
+conversion on top. That conversion is reported in its own column.
+
+Basic Usage:
+
+python scripts/embedding_transport_benchmark.py --num-vectors 2048 --dim 768
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.enums import EmbeddingTransportFormat
+from shared_configs.model_server_models import EmbedResponse
+
+
+def _time_it(func: Callable[[], object], iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_benchmark(num_vectors: int, dim: int, iterations: int) -> None:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_vectors, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    print(f"Embeddings: {num_vectors} x {dim}, median of {iterations} runs\n")
+    print(
+        f"{'format':<10}{'size (KB)':>12}{'encode (ms)':>14}{'decode (ms)':>14}"
+        f"{'to lists (ms)':>16}"
+    )
+
+    # JSON: what the model server did before, tolist -> pydantic -> json text
+    json_payload = EmbedResponse(embeddings=vectors.tolist()).model_dump_json()
+    json_encode = _time_it(
+        lambda: EmbedResponse(embeddings=vectors.tolist()).model_dump_json(),
+        iterations,
+    )
+    json_decode = _time_it(
+        lambda: EmbedResponse(**json.loads(json_payload)), iterations
+    )
+    print(
+        f"{'json':<10}{len(json_payload) / 1024:>12.1f}"
+        f"{json_encode * 1000:>14.2f}{json_decode * 1000:>14.2f}{'-':>16}"
+    )
+
+    for transport_format in (
+        EmbeddingTransportFormat.FLOAT32,
+        EmbeddingTransportFormat.FLOAT16,
+    ):
+        payload = encode_embeddings(vectors, transport_format)
+        encode_time = _time_it(
+            lambda: encode_embeddings(vectors, transport_format), iterations
+        )
+        decode_time = _time_it(lambda: decode_embeddings(payload), iterations)
+        # the conversion to python lists done by parse_model_server_embed_response
+        decoded = decode_embeddings(payload)
+        to_lists_time = _time_it(decoded.tolist, iterations)
+        max_error = float(np.abs(decoded - vectors).max())
+        print(
+            f"{transport_format.value:<10}{len(payload) / 1024:>12.1f}"
+            f"{encode_time * 1000:>14.2f}{decode_time * 1000:>14.2f}"
+            f"{to_lists_time * 1000:>16.2f}"
+            f"    (max abs error {max_error:.2e})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding transport benchmark")
+    parser.add_argument("--num-vectors", type=int, default=2048)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_vectors, args.dim, args.iterations)
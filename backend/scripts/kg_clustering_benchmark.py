@@ -0,0 +1,257 @@
+"""Compares clustering grounded KG entities one at a time (the previous
+`_cluster_one_grounded_entity` loop) with the batched, per entity type parallel
+clustering used by `kg_clustering`.
+
+Postgres is replaced by an in-process stand-in: kg_entity is a dict with a trigram
+inverted index (playing the GIN index) and every database round trip sleeps for a
+fixed latency. The synthetic entity set contains spelling variants of the same names
+so that a good share of the entities get merged, and both methods must produce the
+same clusters.
+
+Basic Usage:
+
+python scripts/kg_clustering_benchmark.py --num-entities 2000 --num-types 4 --latency-ms 1
+"""
+
+import argparse
+import random
+import string
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any
+
+from alvio.configs.kg_configs import KG_CLUSTERING_BATCH_SIZE
+from alvio.configs.kg_configs import KG_CLUSTERING_MAX_WORKERS
+from alvio.configs.kg_configs import KG_CLUSTERING_RETRIEVE_THRESHOLD
+from alvio.kg.clustering.clustering import _find_best_match
+from alvio.kg.clustering.clustering import _has_digit
+from alvio.kg.clustering.clustering import _resolve_grounded_entity_batch
+from alvio.kg.clustering.clustering import _trigram_similarity
+from alvio.kg.clustering.clustering import _trigrams
+from alvio.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+
+
+class _EntityStoreStandIn:
+    """kg_entity for a set of entity types, every method is one round trip."""
+
+    def __init__(self, latency_seconds: float) -> None:
+        self.latency_seconds = latency_seconds
+        self.round_trips = 0
+        self.entities: dict[str, list[Any]] = defaultdict(list)
+        self._trigram_index: dict[tuple[str, str], list[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def round_trip(self) -> None:
+        with self._lock:
+            self.round_trips += 1
+        time.sleep(self.latency_seconds)
+
+    def _similar(
+        self, entity_type: str, name: str, exclude_document_entities: bool
+    ) -> list[Any]:
+        candidates = {
+            id(entity): entity
+            for trigram in _trigrams(name)
+            for entity in self._trigram_index[(entity_type, trigram)]
+        }
+        return [
+            entity
+            for entity in candidates.values()
+            if _trigram_similarity(entity.name, name)
+            >= KG_CLUSTERING_RETRIEVE_THRESHOLD
+            and not (exclude_document_entities and entity.document_id is not None)
+        ]
+
+    def similar(
+        self, entity_type: str, name: str, exclude_document_entities: bool
+    ) -> list[Any]:
+        self.round_trip()
+        return self._similar(entity_type, name, exclude_document_entities)
+
+    def similar_for_names(
+        self, entity_type: str, names: list[str], exclude_document_entities: list[bool]
+    ) -> list[list[Any]]:
+        self.round_trip()
+        return [
+            self._similar(entity_type, name, exclude)
+            for name, exclude in zip(names, exclude_document_entities)
+        ]
+
+    def transfer(self, entity: Any) -> Any:
+        # insert + staging update (+ document kg_stage update)
+        for _ in range(3 if entity.document_id is not None else 2):
+            self.round_trip()
+        new_entity = SimpleNamespace(
+            name=entity.name.casefold(), document_id=entity.document_id
+        )
+        self.entities[entity.entity_type].append(new_entity)
+        for trigram in _trigrams(new_entity.name):
+            self._trigram_index[(entity.entity_type, trigram)].append(new_entity)
+        entity.cluster = new_entity.name
+        return new_entity
+
+    def merge(self, parent: Any, child: Any) -> Any:
+        # update + staging update (+ document kg_stage update)
+        setting_doc = parent.document_id is None and child.document_id is not None
+        for _ in range(3 if setting_doc else 2):
+            self.round_trip()
+        if setting_doc:
+            parent.document_id = child.document_id
+        child.cluster = parent.name
+        return parent
+
+
+def _build_staging_entities(
+    num_entities: int, num_types: int, seed: int
+) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    base_names = [
+        " ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(rng.randint(1, 3))
+        )
+        for _ in range(num_entities // 3)
+    ]
+    entities = []
+    for ind in range(num_entities):
+        name = rng.choice(base_names)
+        variant = rng.random()
+        if variant < 0.2:
+            # plural / trailing character, usually close enough to be merged
+            name += "s"
+        elif variant < 0.25:
+            name += f" {rng.randint(1, 3)}"
+        entities.append(
+            SimpleNamespace(
+                name=name,
+                entity_type=f"TYPE_{ind % num_types}",
+                document_id=f"doc-{ind}" if rng.random() < 0.1 else None,
+                cluster=None,
+            )
+        )
+    return entities
+
+
+def _cluster_one_at_a_time(
+    entities: list[SimpleNamespace], store: _EntityStoreStandIn
+) -> None:
+    for entity in entities:
+        entity_name = entity.name.lower()
+        # staging batch query, amortized, and the SET pg_trgm.similarity_threshold
+        store.round_trip()
+        similar = (
+            []
+            if _has_digit(entity_name)
+            else store.similar(
+                entity.entity_type, entity_name, entity.document_id is not None
+            )
+        )
+        best_entity = _find_best_match(
+            entity_name, similar, document_backed=entity.document_id is not None
+        )
+        if best_entity is not None:
+            store.merge(best_entity, entity)
+        else:
+            store.transfer(entity)
+        # commit
+        store.round_trip()
+
+
+def _cluster_type_batch(
+    entities: list[SimpleNamespace], store: _EntityStoreStandIn
+) -> None:
+    entity_type = entities[0].entity_type
+    entity_names = [entity.name.lower() for entity in entities]
+    # staging batch query, document semantic ids and set_config
+    for _ in range(3):
+        store.round_trip()
+    searchable_inds = [
+        ind for ind, name in enumerate(entity_names) if not _has_digit(name)
+    ]
+    similar_entities: list[list[Any]] = [[] for _ in entities]
+    for ind, similar in zip(
+        searchable_inds,
+        store.similar_for_names(
+            entity_type,
+            [entity_names[ind] for ind in searchable_inds],
+            [entities[ind].document_id is not None for ind in searchable_inds],
+        ),
+    ):
+        similar_entities[ind] = similar
+    _resolve_grounded_entity_batch(
+        entities=entities,  # type: ignore[arg-type]
+        entity_names=entity_names,
+        similar_entities=similar_entities,
+        merge=store.merge,
+        transfer=store.transfer,
+    )
+    # commit
+    store.round_trip()
+
+
+def _cluster_batched(
+    entities: list[SimpleNamespace], store: _EntityStoreStandIn
+) -> None:
+    remaining: dict[str, list[SimpleNamespace]] = defaultdict(list)
+    for entity in entities:
+        remaining[entity.entity_type].append(entity)
+
+    while remaining:
+        round_types = list(remaining)[:KG_CLUSTERING_MAX_WORKERS]
+        run_functions_tuples_in_parallel(
+            [
+                (
+                    _cluster_type_batch,
+                    (remaining[entity_type][:KG_CLUSTERING_BATCH_SIZE], store),
+                )
+                for entity_type in round_types
+            ]
+        )
+        for entity_type in round_types:
+            remaining[entity_type] = remaining[entity_type][KG_CLUSTERING_BATCH_SIZE:]
+            if not remaining[entity_type]:
+                del remaining[entity_type]
+
+
+def run_benchmark(
+    num_entities: int, num_types: int, latency_ms: float, seed: int
+) -> None:
+    print(
+        f"{num_entities} staging entities of {num_types} types, "
+        f"{latency_ms}ms per round trip, batch size {KG_CLUSTERING_BATCH_SIZE}, "
+        f"{KG_CLUSTERING_MAX_WORKERS} workers\n"
+    )
+    print(f"{'method':<10}{'round trips':>14}{'entities':>10}{'elapsed (s)':>14}")
+
+    clusters: list[list[str]] = []
+    for method, cluster in (
+        ("serial", _cluster_one_at_a_time),
+        ("batched", _cluster_batched),
+    ):
+        entities = _build_staging_entities(num_entities, num_types, seed)
+        store = _EntityStoreStandIn(latency_ms / 1000)
+        start = time.monotonic()
+        cluster(entities, store)
+        elapsed = time.monotonic() - start
+        num_kg_entities = sum(
+            len(type_entities) for type_entities in store.entities.values()
+        )
+        print(
+            f"{method:<10}{store.round_trips:>14}{num_kg_entities:>10}{elapsed:>14.2f}"
+        )
+        clusters.append([entity.cluster for entity in entities])
+
+    assert clusters[0] == clusters[1], "batched clustering differs from serial"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KG entity clustering benchmark")
+    parser.add_argument("--num-entities", type=int, default=2000)
+    parser.add_argument("--num-types", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_entities, args.num_types, args.latency_ms, args.seed)
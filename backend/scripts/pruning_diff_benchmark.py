@@ -0,0 +1,135 @@
+"""Compares the in-memory set difference pruning used to do with the memory-bounded
+merge of sorted runs (SortedSpillSet + sorted_difference).
+
+The connector yields document IDs in a scrambled order, batch by batch, and the
+indexed IDs are streamed in sorted order the way the sorted Postgres query returns
+them. 1% of the indexed documents are gone from the source. Each mode runs in its
+own process so its peak memory (max RSS) can be reported.
+
+Basic Usage:
+
+python scripts/pruning_diff_benchmark.py --num-docs 10000000 --max-ids-in-memory 1000000
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+
+from alvio.utils.batching import batch_generator
+from alvio.utils.external_sort import sorted_difference
+from alvio.utils.external_sort import SortedSpillSet
+
+# every 100th indexed document is no longer in the source
+_REMOVED_EVERY = 100
+_CONNECTOR_BATCH_SIZE = 1000
+
+
+def _doc_id(i: int) -> str:
+    return f"https://example.com/wiki/page/{i:010d}"
+
+
+def _source_doc_ids(num_docs: int) -> Iterator[str]:
+    # a fixed permutation of the ids, connectors don't return documents sorted
+    multiplier = 7_919
+    while math.gcd(num_docs, multiplier) != 1:
+        multiplier += 2
+    for i in range(num_docs):
+        doc_num = (i * multiplier) % num_docs
+        if doc_num % _REMOVED_EVERY != 0:
+            yield _doc_id(doc_num)
+
+
+def _indexed_doc_ids(num_docs: int) -> Iterator[str]:
+    for i in range(num_docs):
+        yield _doc_id(i)
+
+
+def _run_set(num_docs: int) -> list[str]:
+    source_ids: set[str] = set()
+    for batch in batch_generator(_source_doc_ids(num_docs), _CONNECTOR_BATCH_SIZE):
+        source_ids.update(batch)
+    indexed_ids = set(_indexed_doc_ids(num_docs))
+    return sorted(indexed_ids - source_ids)
+
+
+def _run_spill(num_docs: int, max_ids_in_memory: int) -> list[str]:
+    with SortedSpillSet(max_ids_in_memory) as source_ids:
+        for batch in batch_generator(_source_doc_ids(num_docs), _CONNECTOR_BATCH_SIZE):
+            source_ids.add(batch)
+        # the ids to remove are few and sent off one by one in the task, collected
+        # here only to compare the two modes
+        return list(sorted_difference(_indexed_doc_ids(num_docs), source_ids))
+
+
+def _run_mode(mode: str, num_docs: int, max_ids_in_memory: int) -> None:
+    start = time.perf_counter()
+    if mode == "set":
+        removed = _run_set(num_docs)
+    else:
+        removed = _run_spill(num_docs, max_ids_in_memory)
+    elapsed = time.perf_counter() - start
+
+    digest = hashlib.sha256("\n".join(removed).encode("utf-8")).hexdigest()
+    # ru_maxrss is in KiB on linux
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        json.dumps(
+            dict(
+                elapsed=elapsed,
+                max_rss_mib=max_rss_mib,
+                removed=len(removed),
+                digest=digest,
+            )
+        )
+    )
+
+
+def run_benchmark(num_docs: int, max_ids_in_memory: int) -> None:
+    results = {}
+    for mode in ("set", "spill"):
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--num-docs",
+                str(num_docs),
+                "--max-ids-in-memory",
+                str(max_ids_in_memory),
+                "--mode",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    assert results["set"]["removed"] == results["spill"]["removed"]
+    assert results["set"]["digest"] == results["spill"]["digest"]
+
+    print(
+        f"num_docs={num_docs} max_ids_in_memory={max_ids_in_memory} "
+        f"docs_to_remove={results['set']['removed']}"
+    )
+    print(f"{'mode':<8}{'elapsed (s)':>14}{'max rss (MiB)':>16}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['elapsed']:>14.1f}{result['max_rss_mib']:>16.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs", type=int, default=10_000_000)
+    parser.add_argument("--max-ids-in-memory", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["set", "spill"], default=None)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.num_docs, args.max_ids_in_memory)
+    else:
+        run_benchmark(args.num_docs, args.max_ids_in_memory)
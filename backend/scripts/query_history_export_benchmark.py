@@ -0,0 +1,154 @@
+"""Compares the offset paginated query history export (a page of chat sessions at a
+time, then one query per chat session for its messages and lazy loads for their
+feedback and documents) with the keyset paginated export that bulk loads the
+messages of each page.
+
+Needs a running Postgres. Seed it first with --seed-sessions (uses the chat history
+seeding utility, every seeded chat session gets --seed-messages messages). Each
+mode runs in its own process so its peak memory (max RSS) can be reported.
+
+Basic Usage:
+
+python scripts/query_history_export_benchmark.py --seed-sessions 20000 --days 90
+python scripts/query_history_export_benchmark.py --days 90
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+
+# Ensure PYTHONPATH is set up for direct script execution
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from sqlalchemy import event  # noqa: E402
+
+from ee.alvio.db.query_history import get_page_of_chat_sessions  # noqa: E402
+from ee.alvio.server.query_history.api import (  # noqa: E402
+    fetch_and_process_chat_session_history,
+)
+from ee.alvio.server.query_history.api import snapshot_from_chat_session  # noqa: E402
+from ee.alvio.server.query_history.models import ChatSessionSnapshot  # noqa: E402
+from alvio.db.engine.sql_engine import get_session_with_current_tenant  # noqa: E402
+from alvio.db.engine.sql_engine import get_sqlalchemy_engine  # noqa: E402
+from alvio.db.engine.sql_engine import SqlEngine  # noqa: E402
+from alvio.db.seeding.chat_history_seeding import seed_chat_history  # noqa: E402
+
+_OFFSET_PAGE_SIZE = 100
+
+
+def _offset_snapshots(start: datetime, end: datetime) -> Iterator[ChatSessionSnapshot]:
+    with get_session_with_current_tenant() as db_session:
+        page = 0
+        while True:
+            chat_sessions = get_page_of_chat_sessions(
+                start_time=start,
+                end_time=end,
+                db_session=db_session,
+                page_num=page,
+                page_size=_OFFSET_PAGE_SIZE,
+            )
+            for chat_session in chat_sessions:
+                snapshot = snapshot_from_chat_session(chat_session, db_session)
+                if snapshot:
+                    yield snapshot
+            if len(chat_sessions) < _OFFSET_PAGE_SIZE:
+                break
+            page += 1
+
+
+def _keyset_snapshots(start: datetime, end: datetime) -> Iterator[ChatSessionSnapshot]:
+    with get_session_with_current_tenant() as db_session:
+        yield from fetch_and_process_chat_session_history(
+            db_session=db_session, start=start, end=end
+        )
+
+
+def _run_mode(mode: str, days: int) -> None:
+    SqlEngine.init_engine(pool_size=5, max_overflow=0)
+
+    num_queries = 0
+
+    def _count_query(*args: Any) -> None:
+        nonlocal num_queries
+        num_queries += 1
+
+    event.listen(get_sqlalchemy_engine(), "before_cursor_execute", _count_query)
+
+    end = datetime.now(tz=timezone.utc)
+    start = end - timedelta(days=days)
+    snapshots = _offset_snapshots if mode == "offset" else _keyset_snapshots
+
+    start_time = time.perf_counter()
+    num_chat_sessions = 0
+    num_messages = 0
+    for snapshot in snapshots(start, end):
+        num_chat_sessions += 1
+        num_messages += len(snapshot.messages)
+    elapsed = time.perf_counter() - start_time
+
+    # ru_maxrss is in KiB on linux
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        json.dumps(
+            dict(
+                elapsed=elapsed,
+                max_rss_mib=max_rss_mib,
+                queries=num_queries,
+                chat_sessions=num_chat_sessions,
+                messages=num_messages,
+            )
+        )
+    )
+
+
+def run_benchmark(days: int) -> None:
+    results = {}
+    for mode in ("offset", "keyset"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--days", str(days), "--mode", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    assert results["offset"]["chat_sessions"] == results["keyset"]["chat_sessions"]
+    assert results["offset"]["messages"] == results["keyset"]["messages"]
+
+    print(
+        f"days={days} chat_sessions={results['keyset']['chat_sessions']} "
+        f"messages={results['keyset']['messages']}"
+    )
+    print(f"{'mode':<8}{'elapsed (s)':>14}{'queries':>10}{'max rss (MiB)':>16}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<8}{result['elapsed']:>14.1f}{result['queries']:>10}"
+            f"{result['max_rss_mib']:>16.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed-sessions", type=int, default=0)
+    parser.add_argument("--seed-messages", type=int, default=6)
+    parser.add_argument("--mode", choices=["offset", "keyset"], default=None)
+    args = parser.parse_args()
+
+    if args.seed_sessions:
+        SqlEngine.init_engine(pool_size=5, max_overflow=0)
+        seed_chat_history(args.seed_sessions, args.seed_messages, args.days)
+    elif args.mode:
+        _run_mode(args.mode, args.days)
+    else:
+        run_benchmark(args.days)
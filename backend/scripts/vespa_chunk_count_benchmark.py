@@ -0,0 +1,99 @@
+"""Compares serial and batched chunk-count discovery for documents indexed with the
+old chunk id scheme (no `chunk_count` in Postgres), which is the only case where
+`enrich_basic_chunk_info` has to probe Vespa.
+
+Vespa is replaced by an in-process stand-in that answers document GETs after a fixed
+latency, so no running Vespa is needed.
+
+Basic Usage:
+
+python scripts/vespa_chunk_count_benchmark.py --num-docs 200 --max-chunks 40 --latency-ms 2
+"""
+
+import argparse
+import random
+import time
+
+import httpx
+
+from alvio.document_index.document_index_utils import get_uuid_from_chunk_info_old
+from alvio.document_index.interfaces import MinimalDocumentIndexingInfo
+from alvio.document_index.vespa.index import VespaIndex
+from alvio.document_index.vespa.indexing_utils import check_for_final_chunk_existence
+
+
+def _build_vespa_stand_in(
+    doc_id_to_chunk_count: dict[str, int], latency_seconds: float
+) -> tuple[httpx.Client, list[int]]:
+    existing_chunk_ids = {
+        str(
+            get_uuid_from_chunk_info_old(
+                document_id=doc_id, chunk_id=chunk_id, large_chunk_reference_ids=[]
+            )
+        )
+        for doc_id, chunk_count in doc_id_to_chunk_count.items()
+        for chunk_id in range(chunk_count)
+    }
+    request_count = [0]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        request_count[0] += 1
+        time.sleep(latency_seconds)
+        chunk_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200 if chunk_id in existing_chunk_ids else 404)
+
+    return httpx.Client(transport=httpx.MockTransport(handler)), request_count
+
+
+def run_benchmark(num_docs: int, max_chunks: int, latency_ms: float) -> None:
+    rng = random.Random(0)
+    doc_id_to_chunk_count = {
+        f"doc-{ind}": rng.randint(1, max_chunks) for ind in range(num_docs)
+    }
+    http_client, request_count = _build_vespa_stand_in(
+        doc_id_to_chunk_count, latency_ms / 1000
+    )
+    print(
+        f"{num_docs} old version documents, {sum(doc_id_to_chunk_count.values())} "
+        f"chunks, {latency_ms}ms per request\n"
+    )
+    print(f"{'method':<10}{'requests':>10}{'elapsed (s)':>14}")
+
+    # what enrich_basic_chunk_info used to do: one document and one chunk at a time
+    start = time.monotonic()
+    serial = [
+        check_for_final_chunk_existence(
+            minimal_doc_info=MinimalDocumentIndexingInfo(
+                doc_id=doc_id, chunk_start_index=0
+            ),
+            start_index=0,
+            index_name="benchmark_index",
+            http_client=http_client,
+        )
+        for doc_id in doc_id_to_chunk_count
+    ]
+    print(f"{'serial':<10}{request_count[0]:>10}{time.monotonic() - start:>14.2f}")
+
+    request_count[0] = 0
+    start = time.monotonic()
+    batched = VespaIndex.batch_enrich_basic_chunk_info(
+        index_name="benchmark_index",
+        http_client=http_client,
+        doc_id_to_previous_chunk_cnt={doc_id: None for doc_id in doc_id_to_chunk_count},
+        doc_id_to_new_chunk_cnt={},
+    )
+    print(f"{'batched':<10}{request_count[0]:>10}{time.monotonic() - start:>14.2f}")
+
+    assert serial == [info.chunk_end_index for info in batched]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Vespa chunk count discovery benchmark"
+    )
+    parser.add_argument("--num-docs", type=int, default=200)
+    parser.add_argument("--max-chunks", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_docs, args.max_chunks, args.latency_ms)
@@ -57,6 +57,20 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Dynamic micro-batching of /bi-encoder-embed requests in the model server. Concurrent
+# requests for the same model are coalesced into a single forward pass of up to
+# EMBEDDING_BATCHER_MAX_BATCH_SIZE texts, waiting at most EMBEDDING_BATCHER_MAX_WAIT_MS
+# for more requests to arrive. Lower wait favors query latency, higher favors throughput.
+EMBEDDING_BATCHER_ENABLED = (
+    os.environ.get("EMBEDDING_BATCHER_ENABLED", "true").lower() == "true"
+)
+EMBEDDING_BATCHER_MAX_BATCH_SIZE = int(
+    os.environ.get("EMBEDDING_BATCHER_MAX_BATCH_SIZE") or 64
+)
+EMBEDDING_BATCHER_MAX_WAIT_MS = float(
+    os.environ.get("EMBEDDING_BATCHER_MAX_WAIT_MS") or 5
+)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
@@ -87,6 +101,13 @@ OPENAI_EMBEDDING_TIMEOUT = int(
     os.environ.get("OPENAI_EMBEDDING_TIMEOUT", API_BASED_EMBEDDING_TIMEOUT)
 )
 
+# Wire format requested from the model server for /bi-encoder-embed responses.
+# "float32" / "float16" use a compact little-endian binary buffer, "json" keeps the
+# legacy list-of-floats payload. Older model servers always answer with JSON.
+MODEL_SERVER_EMBEDDING_TRANSPORT = (
+    os.environ.get("MODEL_SERVER_EMBEDDING_TRANSPORT") or "float32"
+).lower()
+
 # Whether or not to strictly enforce token limit for chunking.
 STRICT_CHUNK_TOKEN_LIMIT = (
     os.environ.get("STRICT_CHUNK_TOKEN_LIMIT", "").lower() == "true"
@@ -0,0 +1,133 @@
+"""Binary wire format for embeddings returned by the model server.
+
+JSON encoding of float vectors is expensive on both ends (float -> text -> float),
+so the model server can instead return a single little-endian buffer:
+
+    header (16 bytes): magic b"AEMB" | version u8 | dtype u8 | reserved u16 |
+                       num_vectors u32 | dim u32
+    body:              num_vectors * dim values of the given dtype
+
+The format is negotiated through the Accept header. Clients that do not ask for
+it (and servers that do not understand it) keep using JSON.
+"""
+
+import struct
+from typing import Any
+
+import numpy as np
+
+from shared_configs.enums import EmbeddingTransportFormat
+
+BINARY_EMBEDDING_MEDIA_TYPE = "application/x-alvio-embeddings"
+JSON_MEDIA_TYPE = "application/json"
+
+_MAGIC = b"AEMB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBHII")
+
+_DTYPE_CODES: dict[EmbeddingTransportFormat, int] = {
+    EmbeddingTransportFormat.FLOAT32: 0,
+    EmbeddingTransportFormat.FLOAT16: 1,
+}
+_CODE_TO_NUMPY_DTYPE: dict[int, np.dtype] = {
+    0: np.dtype("<f4"),
+    1: np.dtype("<f2"),
+}
+
+
+def _numpy_dtype(transport_format: EmbeddingTransportFormat) -> np.dtype:
+    return _CODE_TO_NUMPY_DTYPE[_DTYPE_CODES[transport_format]]
+
+
+def build_accept_header(transport_format: EmbeddingTransportFormat) -> str:
+    """Accept header asking for the binary format, with JSON as a fallback."""
+    if transport_format == EmbeddingTransportFormat.JSON:
+        return JSON_MEDIA_TYPE
+
+    return (
+        f"{BINARY_EMBEDDING_MEDIA_TYPE};dtype={transport_format.value}, "
+        f"{JSON_MEDIA_TYPE};q=0.9"
+    )
+
+
+def parse_accept_header(accept: str | None) -> EmbeddingTransportFormat:
+    """Pick the response format for a request based on its Accept header.
+
+    Anything unrecognized falls back to JSON so old clients are unaffected."""
+    if not accept:
+        return EmbeddingTransportFormat.JSON
+
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if media_type.lower() != BINARY_EMBEDDING_MEDIA_TYPE:
+            continue
+
+        transport_format = EmbeddingTransportFormat.FLOAT32
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "dtype":
+                try:
+                    transport_format = EmbeddingTransportFormat(value.strip().lower())
+                except ValueError:
+                    continue
+
+        if transport_format in _DTYPE_CODES:
+            return transport_format
+
+    return EmbeddingTransportFormat.JSON
+
+
+def encode_embeddings(
+    embeddings: Any,
+    transport_format: EmbeddingTransportFormat,
+) -> bytes:
+    """Serialize a (num_vectors, dim) array-like of embeddings to the binary format."""
+    if transport_format not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported binary embedding format: {transport_format}")
+
+    vectors = np.asarray(embeddings, dtype=_numpy_dtype(transport_format))
+    if vectors.ndim == 1 and vectors.size == 0:
+        vectors = vectors.reshape(0, 0)
+    if vectors.ndim != 2:
+        raise ValueError(
+            f"Embeddings must be a 2D array, got shape {vectors.shape} instead"
+        )
+
+    num_vectors, dim = vectors.shape
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, _DTYPE_CODES[transport_format], 0, num_vectors, dim
+    )
+    return header + np.ascontiguousarray(vectors).tobytes()
+
+
+def decode_embeddings(buffer: bytes | bytearray | memoryview) -> np.ndarray:
+    """Deserialize a binary embedding payload into a (num_vectors, dim) array.
+
+    float32 payloads are returned as a read-only view over the buffer (no copy);
+    float16 payloads are upcast to float32."""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Binary embedding payload is too short to contain a header")
+
+    magic, version, dtype_code, _, num_vectors, dim = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError("Binary embedding payload has an invalid magic number")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported binary embedding version: {version}")
+    if dtype_code not in _CODE_TO_NUMPY_DTYPE:
+        raise ValueError(f"Unsupported binary embedding dtype code: {dtype_code}")
+
+    dtype = _CODE_TO_NUMPY_DTYPE[dtype_code]
+    expected_size = _HEADER.size + num_vectors * dim * dtype.itemsize
+    if len(buffer) != expected_size:
+        raise ValueError(
+            f"Binary embedding payload has {len(buffer)} bytes, expected {expected_size}"
+        )
+
+    vectors = np.frombuffer(
+        buffer, dtype=dtype, count=num_vectors * dim, offset=_HEADER.size
+    ).reshape(num_vectors, dim)
+
+    if dtype != np.dtype("<f4"):
+        vectors = vectors.astype(np.float32)
+
+    return vectors
@@ -0,0 +1,249 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+import alvio.background.celery.tasks.shared.tasks as shared_tasks
+import alvio.redis.redis_connector_delete as redis_connector_delete
+from alvio.access.models import DocumentAccess
+from alvio.configs.constants import AlvioCeleryTask
+from alvio.document_index.interfaces import VespaDocumentFields
+from alvio.redis.redis_connector_delete import RedisConnectorDelete
+from alvio.redis.redis_connector_delete import RedisConnectorDeletePayload
+
+
+class _DocumentIndexStandIn:
+    def __init__(self) -> None:
+        self.delete_multiple_calls: list[dict[str, int | None]] = []
+        self.update_multiple_calls: list[dict[str, Any]] = []
+
+    def delete_multiple(
+        self,
+        doc_id_to_chunk_count: dict[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        self.delete_multiple_calls.append(doc_id_to_chunk_count)
+        return {doc_id: 4 for doc_id in doc_id_to_chunk_count}
+
+    def update_multiple(
+        self,
+        doc_id_to_fields: dict[str, VespaDocumentFields],
+        *,
+        tenant_id: str,
+        doc_id_to_chunk_count: dict[str, int | None],
+    ) -> dict[str, int]:
+        self.update_multiple_calls.append(
+            dict(
+                doc_id_to_fields=doc_id_to_fields,
+                doc_id_to_chunk_count=doc_id_to_chunk_count,
+            )
+        )
+        return {doc_id: 2 for doc_id in doc_id_to_fields}
+
+
+@pytest.fixture
+def cleanup_env(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    db_session = MagicMock()
+    doc_index = _DocumentIndexStandIn()
+    docs = {
+        doc_id: SimpleNamespace(id=doc_id, boost=0, hidden=False, chunk_count=3)
+        for doc_id in ["only-1", "only-2", "shared-1"]
+    }
+    calls: dict[str, list[Any]] = {
+        "delete_complete": [],
+        "delete_cc_pair_rels": [],
+        "marked_as_synced": [],
+    }
+
+    @contextmanager
+    def _session() -> Iterator[MagicMock]:
+        yield db_session
+
+    monkeypatch.setattr(shared_tasks, "get_session_with_current_tenant", _session)
+    monkeypatch.setattr(shared_tasks, "get_active_search_settings", MagicMock())
+    monkeypatch.setattr(
+        shared_tasks, "get_default_document_index", lambda *_, **__: doc_index
+    )
+    monkeypatch.setattr(shared_tasks.HttpxPool, "get", MagicMock())
+    monkeypatch.setattr(
+        shared_tasks,
+        "get_document_connector_counts",
+        lambda _, document_ids: [("only-1", 1), ("only-2", 1), ("shared-1", 2)],
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "get_documents_by_ids",
+        lambda _, document_ids: [docs[id] for id in document_ids if id in docs],
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "get_access_for_documents",
+        lambda document_ids, db_session: {
+            "shared-1": DocumentAccess.build(
+                user_emails=["user@example.com"],
+                user_groups=[],
+                external_user_emails=[],
+                external_user_group_ids=[],
+                is_public=False,
+            )
+        },
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "fetch_document_sets_for_documents",
+        lambda document_ids, _: [("shared-1", ["sales"])],
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "delete_documents_complete__no_commit",
+        lambda db_session, document_ids: calls["delete_complete"].append(document_ids),
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "delete_documents_by_connector_credential_pair__no_commit",
+        lambda db_session, document_ids, connector_credential_pair_identifier: calls[
+            "delete_cc_pair_rels"
+        ].append((document_ids, connector_credential_pair_identifier)),
+    )
+    monkeypatch.setattr(
+        shared_tasks,
+        "mark_documents_as_synced",
+        lambda document_ids, _: calls["marked_as_synced"].append(document_ids),
+    )
+    return SimpleNamespace(doc_index=doc_index, calls=calls)
+
+
+def test_cleanup_batch_deletes_and_updates_in_bulk(
+    cleanup_env: SimpleNamespace,
+) -> None:
+    succeeded = shared_tasks.document_by_cc_pair_cleanup_batch_task.run(
+        ["only-1", "shared-1", "only-2", "already-gone"],
+        connector_id=1,
+        credential_id=2,
+        tenant_id="tenant",
+    )
+
+    assert succeeded
+
+    # documents only referenced by this cc_pair are deleted together
+    assert cleanup_env.doc_index.delete_multiple_calls == [{"only-1": 3, "only-2": 3}]
+    assert cleanup_env.calls["delete_complete"] == [["only-1", "only-2"]]
+
+    # shared documents lose this cc_pair's access and relationship
+    assert len(cleanup_env.doc_index.update_multiple_calls) == 1
+    fields = cleanup_env.doc_index.update_multiple_calls[0]["doc_id_to_fields"]
+    assert list(fields) == ["shared-1"]
+    assert fields["shared-1"].document_sets == {"sales"}
+    assert fields["shared-1"].access.to_acl() == {"user_email:user@example.com"}
+
+    ((document_ids, cc_pair_identifier),) = cleanup_env.calls["delete_cc_pair_rels"]
+    assert document_ids == ["shared-1"]
+    assert cc_pair_identifier.connector_id == 1
+    assert cc_pair_identifier.credential_id == 2
+    assert cleanup_env.calls["marked_as_synced"] == [["shared-1"]]
+
+
+def test_cleanup_batch_skips_already_cleaned_up_documents(
+    cleanup_env: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # a retried batch finds no references left for what it already deleted
+    monkeypatch.setattr(
+        shared_tasks, "get_document_connector_counts", lambda _, document_ids: []
+    )
+
+    succeeded = shared_tasks.document_by_cc_pair_cleanup_batch_task.run(
+        ["only-1", "only-2"],
+        connector_id=1,
+        credential_id=2,
+        tenant_id="tenant",
+    )
+
+    assert not succeeded
+    assert cleanup_env.doc_index.delete_multiple_calls == []
+    assert cleanup_env.doc_index.update_multiple_calls == []
+    assert cleanup_env.calls["delete_complete"] == []
+
+
+def test_cleanup_batch_out_of_retries_marks_documents_for_reconciliation(
+    cleanup_env: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _fail(*args: Any, **kwargs: Any) -> dict[str, int]:
+        raise RuntimeError("vespa is down")
+
+    monkeypatch.setattr(cleanup_env.doc_index, "delete_multiple", _fail)
+    marked_as_modified: list[list[str]] = []
+    monkeypatch.setattr(
+        shared_tasks,
+        "mark_documents_as_modified",
+        lambda document_ids, _: marked_as_modified.append(document_ids),
+    )
+
+    # the first attempt is the last one
+    monkeypatch.setattr(
+        shared_tasks.document_by_cc_pair_cleanup_batch_task, "max_retries", 0
+    )
+    succeeded = shared_tasks.document_by_cc_pair_cleanup_batch_task.run(
+        ["only-1", "only-2"],
+        connector_id=1,
+        credential_id=2,
+        tenant_id="tenant",
+    )
+
+    assert not succeeded
+    assert marked_as_modified == [["only-1", "only-2"]]
+    ((document_ids, _),) = cleanup_env.calls["delete_cc_pair_rels"]
+    assert document_ids == ["only-1", "only-2"]
+
+
+def test_generate_tasks_sends_one_task_per_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    doc_ids = [f"doc-{i}" for i in range(5)]
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = iter(doc_ids)
+    redis_client = MagicMock()
+    celery_app = MagicMock()
+
+    monkeypatch.setattr(redis_connector_delete, "CONNECTOR_DELETION_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        redis_connector_delete,
+        "get_connector_credential_pair_from_id",
+        lambda db_session, cc_pair_id: SimpleNamespace(connector_id=1, credential_id=2),
+    )
+
+    result = RedisConnectorDelete("tenant", 7, redis_client).generate_tasks(
+        celery_app, db_session, MagicMock()
+    )
+
+    assert result == (3, 5)
+    sent = celery_app.send_task.call_args_list
+    assert [call.args[0] for call in sent] == [
+        AlvioCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_BATCH_TASK
+    ] * 3
+    assert [call.kwargs["kwargs"]["document_ids"] for call in sent] == [
+        ["doc-0", "doc-1"],
+        ["doc-2", "doc-3"],
+        ["doc-4"],
+    ]
+    # every task is tracked in the taskset before it is sent
+    assert redis_client.sadd.call_count == 3
+    assert all(
+        call.kwargs["task_id"].startswith("connectordeletion_7_") for call in sent
+    )
+
+
+def test_delete_payload_without_doc_count_still_parses() -> None:
+    payload = RedisConnectorDeletePayload.model_validate_json(
+        RedisConnectorDeletePayload(
+            num_tasks=3, submitted=datetime.now(timezone.utc)
+        ).model_dump_json(exclude={"num_docs"})
+    )
+
+    assert payload.num_tasks == 3
+    assert payload.num_docs is None
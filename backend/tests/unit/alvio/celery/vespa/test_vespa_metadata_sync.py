@@ -0,0 +1,139 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import alvio.background.celery.tasks.vespa.tasks as vespa_tasks
+from alvio.access.models import DocumentAccess
+from alvio.db.document import mark_documents_as_synced
+from alvio.document_index.interfaces import VespaDocumentFields
+
+
+class _DocumentIndexStandIn:
+    def __init__(self) -> None:
+        self.update_multiple_calls: list[dict[str, Any]] = []
+
+    def update_multiple(
+        self,
+        doc_id_to_fields: dict[str, VespaDocumentFields],
+        *,
+        tenant_id: str,
+        doc_id_to_chunk_count: dict[str, int | None],
+    ) -> dict[str, int]:
+        self.update_multiple_calls.append(
+            dict(
+                doc_id_to_fields=doc_id_to_fields,
+                tenant_id=tenant_id,
+                doc_id_to_chunk_count=doc_id_to_chunk_count,
+            )
+        )
+        return {doc_id: 2 for doc_id in doc_id_to_fields}
+
+
+def _access(is_public: bool) -> DocumentAccess:
+    return DocumentAccess.build(
+        user_emails=["user@example.com"],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=is_public,
+    )
+
+
+@pytest.fixture
+def sync_env(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    db_session = MagicMock()
+    doc_index = _DocumentIndexStandIn()
+    docs = {
+        "doc-1": SimpleNamespace(id="doc-1", boost=1, hidden=False, chunk_count=3),
+        "doc-2": SimpleNamespace(id="doc-2", boost=-1, hidden=True, chunk_count=None),
+    }
+    marked_as_synced: list[list[str]] = []
+
+    @contextmanager
+    def _session() -> Iterator[MagicMock]:
+        yield db_session
+
+    monkeypatch.setattr(vespa_tasks, "get_session_with_current_tenant", _session)
+    monkeypatch.setattr(vespa_tasks, "get_active_search_settings", MagicMock())
+    monkeypatch.setattr(
+        vespa_tasks, "get_default_document_index", lambda **_: doc_index
+    )
+    monkeypatch.setattr(vespa_tasks.HttpxPool, "get", MagicMock())
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_documents_by_ids",
+        lambda _, document_ids: [docs[id] for id in document_ids if id in docs],
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "fetch_document_sets_for_documents",
+        lambda document_ids, _: [("doc-1", ["engineering", "sales"])],
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_access_for_documents",
+        lambda document_ids, db_session: {"doc-1": _access(is_public=True)},
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "mark_documents_as_synced",
+        lambda document_ids, _: marked_as_synced.append(document_ids),
+    )
+    return SimpleNamespace(doc_index=doc_index, marked_as_synced=marked_as_synced)
+
+
+def test_batch_sync_updates_a_page_in_one_call(sync_env: SimpleNamespace) -> None:
+    synced = vespa_tasks.vespa_metadata_sync_batch_task.run(
+        ["doc-1", "doc-missing", "doc-2"], tenant_id="tenant"
+    )
+
+    assert synced
+    assert len(sync_env.doc_index.update_multiple_calls) == 1
+    call = sync_env.doc_index.update_multiple_calls[0]
+    # documents that no longer exist are skipped
+    assert list(call["doc_id_to_fields"]) == ["doc-1", "doc-2"]
+    assert call["doc_id_to_chunk_count"] == {"doc-1": 3, "doc-2": None}
+    assert call["tenant_id"] == "tenant"
+
+    doc_1_fields = call["doc_id_to_fields"]["doc-1"]
+    assert doc_1_fields.document_sets == {"engineering", "sales"}
+    assert doc_1_fields.access.is_public
+    assert doc_1_fields.boost == 1
+
+    # no document sets and no access info fall back to empty / least permissive
+    doc_2_fields = call["doc_id_to_fields"]["doc-2"]
+    assert doc_2_fields.document_sets == set()
+    assert not doc_2_fields.access.is_public
+    assert doc_2_fields.access.to_acl() == set()
+    assert doc_2_fields.hidden
+
+    assert sync_env.marked_as_synced == [["doc-1", "doc-2"]]
+
+
+def test_batch_sync_skips_page_without_documents(sync_env: SimpleNamespace) -> None:
+    synced = vespa_tasks.vespa_metadata_sync_batch_task.run(
+        ["doc-missing"], tenant_id="tenant"
+    )
+
+    assert not synced
+    assert sync_env.doc_index.update_multiple_calls == []
+    assert sync_env.marked_as_synced == []
+
+
+def test_mark_documents_as_synced_is_one_statement() -> None:
+    db_session = MagicMock()
+
+    mark_documents_as_synced(["doc-1", "doc-2"], db_session)
+
+    assert db_session.execute.call_count == 1
+    statement = str(
+        db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert statement.startswith("UPDATE document SET last_synced=")
+    assert "WHERE document.id IN" in statement
+    db_session.commit.assert_called_once()
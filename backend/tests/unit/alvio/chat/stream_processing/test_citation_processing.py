@@ -1,10 +1,14 @@
+import re
 from datetime import datetime
 
 import pytest
 
 from alvio.chat.models import LlmDoc
 from alvio.chat.models import AlvioAnswerPiece
+from alvio.chat.stream_processing.citation_processing import _BaseCitationProcessor
 from alvio.chat.stream_processing.citation_processing import CitationProcessor
+from alvio.chat.stream_processing.citation_processing import CodeFenceTracker
+from alvio.chat.stream_processing.citation_processing import in_code_block
 from alvio.chat.stream_processing.utils import DocumentIdOrderMapping
 from alvio.configs.constants import DocumentSource
 from alvio.server.query_and_chat.streaming_models import CitationInfo
@@ -537,3 +541,32 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "no fences here",
+        "```python\nprint('hi')\n```\nafter",
+        "````\ncode\n`````",
+        "inline `code` and ``` an open fence",
+        "``````",
+    ],
+)
+def test_code_fence_tracker_matches_in_code_block(text: str) -> None:
+    for split_size in range(1, 5):
+        tracker = CodeFenceTracker()
+        for start in range(0, len(text), split_size):
+            tracker.feed(text[start : start + split_size])
+            assert tracker.in_code_block == in_code_block(text[: start + split_size])
+
+
+def test_citation_processor_without_patterns_fails_on_creation() -> None:
+    class _IncompleteCitationProcessor(_BaseCitationProcessor):
+        def process_citation(self, match: re.Match) -> tuple[str, list[CitationInfo]]:
+            return match.group(), []
+
+    with pytest.raises(TypeError, match="citation_pattern"):
+        _IncompleteCitationProcessor(  # type: ignore[abstract]
+            context_docs=[], stop_stream=None
+        )
@@ -0,0 +1,170 @@
+import time
+from typing import Any
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from alvio.connectors.web import connector as web_connector
+from alvio.connectors.web import crawler
+from alvio.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from alvio.connectors.web.connector import WebConnector
+from alvio.connectors.web.crawler import HostLimiter
+from alvio.connectors.web.crawler import PageState
+from tests.unit.conftest import InMemoryRedisServer
+
+BASE_URL = "https://docs.example.com/"
+BODY = "Some documentation about the product. " * 10
+SITE = {
+    "https://docs.example.com/": ["/a", "/b"],
+    "https://docs.example.com/a": ["/b"],
+    "https://docs.example.com/b": [],
+}
+
+
+class _FakeResponse:
+    def __init__(self, url: str, status_code: int, text: str = "") -> None:
+        self.url = url
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = CaseInsensitiveDict(
+            {"content-type": "text/html; charset=utf-8", "ETag": f'"{url}"'}
+        )
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, dict[str, str]]] = []
+
+    def get(self, url: str, headers: dict[str, str], **kwargs: Any) -> _FakeResponse:
+        self.requests.append((url, headers))
+        if headers.get("If-None-Match") == f'"{url}"':
+            return _FakeResponse(url, 304)
+        links = "".join(f'<a href="{link}">{link}</a>' for link in SITE[url])
+        return _FakeResponse(
+            url, 200, f"<html><title>{url}</title><body>{BODY}{links}</body></html>"
+        )
+
+
+@pytest.fixture
+def fake_session(
+    monkeypatch: pytest.MonkeyPatch, redis_server: InMemoryRedisServer
+) -> _FakeSession:
+    session = _FakeSession()
+    monkeypatch.setattr(crawler, "get_redis_client", redis_server.get_redis_client)
+    monkeypatch.setattr(web_connector, "check_internet_connection", lambda url: None)
+    monkeypatch.setattr(web_connector, "protected_url_check", lambda url: None)
+    monkeypatch.setattr(WebConnector, "_get_http_session", lambda self: session)
+    return session
+
+
+def _scoped_connector(cc_pair_id: int = 1) -> WebConnector:
+    connector = WebConnector(
+        base_url=BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+    )
+    connector.set_state_scope(cc_pair_id=cc_pair_id, search_settings_id=1)
+    return connector
+
+
+def _poll(connector: WebConnector, start: float) -> list[str]:
+    return [
+        doc.id for batch in connector.poll_source(start, start + 60) for doc in batch
+    ]
+
+
+def test_page_state_headers() -> None:
+    assert PageState.from_headers({"content-type": "text/html"}) is None
+
+    state = PageState.from_headers({"ETag": '"v1"', "last-modified": "yesterday"})
+    assert state is not None
+    assert state.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "yesterday",
+    }
+
+
+def test_host_limiter_spaces_requests_to_a_host() -> None:
+    limiter = HostLimiter(max_per_host=2, min_interval=0.05)
+
+    start = time.monotonic()
+    for _ in range(3):
+        with limiter.slot("https://docs.example.com/page"):
+            pass
+    # other hosts aren't held back
+    with limiter.slot("https://other.example.com/page"):
+        other_host_elapsed = time.monotonic() - start
+
+    assert time.monotonic() - start >= 0.1
+    assert other_host_elapsed < 0.15
+
+
+def test_static_pages_are_crawled_without_a_browser(
+    fake_session: _FakeSession,
+) -> None:
+    connector = WebConnector(
+        base_url=BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+    )
+
+    docs = [doc for batch in connector.load_from_state() for doc in batch]
+
+    assert sorted(doc.id for doc in docs) == sorted(SITE)
+    assert len(fake_session.requests) == len(SITE)
+    # a full crawl doesn't send conditional requests
+    assert all(not headers for _, headers in fake_session.requests)
+
+
+def test_unchanged_pages_are_skipped_on_the_next_poll(
+    fake_session: _FakeSession,
+) -> None:
+    connector = _scoped_connector()
+
+    assert sorted(_poll(connector, start=100)) == sorted(SITE)
+
+    # every page known from the previous poll is checked, none changed
+    fake_session.requests = []
+    assert _poll(connector, start=160) == []
+    assert sorted(url for url, _ in fake_session.requests) == sorted(SITE)
+    assert all(headers for _, headers in fake_session.requests)
+
+    # re-indexing from the beginning crawls everything again
+    assert sorted(_poll(connector, start=0)) == sorted(SITE)
+
+
+def test_page_states_of_a_failed_attempt_are_not_committed(
+    fake_session: _FakeSession,
+) -> None:
+    connector = _scoped_connector()
+
+    # the documents were fetched, but their index attempt failed: it is retried
+    # with the same window, which must fetch every page in full again
+    assert sorted(_poll(connector, start=100)) == sorted(SITE)
+    fake_session.requests = []
+    assert sorted(_poll(connector, start=100)) == sorted(SITE)
+    assert all(not headers for _, headers in fake_session.requests)
+
+    # once the window moves on, the retry's states are committed
+    assert _poll(connector, start=160) == []
+
+
+def test_page_states_are_not_shared_between_connectors(
+    fake_session: _FakeSession, redis_server: InMemoryRedisServer
+) -> None:
+    connector = _scoped_connector(cc_pair_id=1)
+    _poll(connector, start=100)
+    assert _poll(connector, start=160) == []
+
+    # another cc_pair crawling the same site with the same settings
+    assert sorted(_poll(_scoped_connector(cc_pair_id=2), start=160)) == sorted(SITE)
+
+    # without a scope nothing is stored and every poll is a full crawl
+    keys = set(redis_server.keys)
+    unscoped = WebConnector(
+        base_url=BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+    )
+    assert sorted(_poll(unscoped, start=100)) == sorted(SITE)
+    assert sorted(_poll(unscoped, start=160)) == sorted(SITE)
+    assert redis_server.keys == keys
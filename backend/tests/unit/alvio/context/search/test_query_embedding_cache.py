@@ -0,0 +1,65 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from alvio.context.search import query_embedding_cache
+from alvio.context.search.query_embedding_cache import get_or_compute_query_embeddings
+from shared_configs.model_server_models import Embedding
+from tests.unit.conftest import InMemoryRedisServer
+
+
+@pytest.fixture
+def fake_redis(redis_server: InMemoryRedisServer) -> Any:
+    query_embedding_cache._LOCAL_CACHE.clear()
+    with patch(
+        "alvio.context.search.query_embedding_cache.get_redis_client",
+        redis_server.get_redis_client,
+    ):
+        yield redis_server
+    query_embedding_cache._LOCAL_CACHE.clear()
+
+
+def _search_settings(search_settings_id: int) -> MagicMock:
+    search_settings = MagicMock()
+    search_settings.id = search_settings_id
+    search_settings.provider_type = None
+    search_settings.model_name = "fake-model"
+    search_settings.query_prefix = "search_query: "
+    search_settings.normalize = True
+    search_settings.reduced_dimension = None
+    return search_settings
+
+
+def test_query_embedding_cache_hits_and_dedupes(
+    fake_redis: InMemoryRedisServer,
+) -> None:
+    calls: list[list[str]] = []
+
+    def compute(queries: list[str]) -> list[Embedding]:
+        calls.append(queries)
+        return [[float(len(query)), 0.5] for query in queries]
+
+    search_settings = _search_settings(1)
+
+    first = get_or_compute_query_embeddings(
+        ["hello world", "hello   world", "other"], search_settings, compute
+    )
+    # whitespace variants share an entry and are only embedded once
+    assert calls == [["hello world", "other"]]
+    assert first == [[11.0, 0.5], [11.0, 0.5], [5.0, 0.5]]
+
+    second = get_or_compute_query_embeddings(["other"], search_settings, compute)
+    assert len(calls) == 1
+    assert second == [[5.0, 0.5]]
+
+    # after the local LRU is dropped, entries are still served from redis
+    query_embedding_cache._LOCAL_CACHE.clear()
+    third = get_or_compute_query_embeddings(["hello world"], search_settings, compute)
+    assert len(calls) == 1
+    assert third == [[11.0, 0.5]]
+
+    # new search settings never reuse the old embeddings
+    get_or_compute_query_embeddings(["hello world"], _search_settings(2), compute)
+    assert calls[-1] == ["hello world"]
@@ -0,0 +1,103 @@
+import threading
+from typing import Any
+
+import pytest
+
+from alvio.configs.constants import DocumentSource
+from alvio.context.search.models import InferenceChunk
+from alvio.context.search.models import RerankingDetails
+from alvio.context.search.postprocessing import reranking
+from alvio.context.search.postprocessing.reranking import get_rerank_scores
+from shared_configs.enums import RerankerProvider
+
+
+class _FakeRerankingModel:
+    calls: list[list[str]] = []
+    lock = threading.Lock()
+
+    def __init__(self, provider_type: RerankerProvider | None, **kwargs: Any) -> None:
+        self.provider_type = provider_type
+
+    def predict(self, query: str, passages: list[str]) -> list[float]:
+        with self.lock:
+            self.calls.append(passages)
+        return [float(len(passage)) for passage in passages]
+
+
+@pytest.fixture
+def fake_model(monkeypatch: pytest.MonkeyPatch) -> type[_FakeRerankingModel]:
+    _FakeRerankingModel.calls = []
+    reranking._SCORE_CACHE.clear()
+    monkeypatch.setattr(reranking, "RerankingModel", _FakeRerankingModel)
+    return _FakeRerankingModel
+
+
+def _chunk(chunk_id: int, content: str) -> InferenceChunk:
+    return InferenceChunk(
+        chunk_id=chunk_id,
+        document_id="doc",
+        semantic_identifier="doc",
+        title="doc",
+        blurb=content,
+        content=content,
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        image_file_id=None,
+        doc_summary="",
+        chunk_context="",
+    )
+
+
+def _rerank_settings(provider_type: RerankerProvider | None) -> RerankingDetails:
+    return RerankingDetails(
+        rerank_model_name="fake-reranker",
+        rerank_api_url=None,
+        rerank_provider_type=provider_type,
+        num_rerank=50,
+    )
+
+
+def test_only_uncached_chunks_are_scored(
+    fake_model: type[_FakeRerankingModel],
+) -> None:
+    settings = _rerank_settings(RerankerProvider.COHERE)
+    chunks = [_chunk(i, "x" * (i + 1)) for i in range(3)]
+
+    first = get_rerank_scores("what is x", chunks, settings)
+    assert first == [5.0, 6.0, 7.0]
+
+    # overlapping set for the same query, only the new chunk is scored
+    second = get_rerank_scores("what  is x", chunks[1:] + [_chunk(3, "xxxx")], settings)
+    assert second == [6.0, 7.0, 8.0]
+    assert fake_model.calls[1] == ["doc\nxxxx"]
+
+    # a different query or a re-indexed chunk is scored again
+    get_rerank_scores("something else", chunks[:1], settings)
+    get_rerank_scores("what is x", [_chunk(0, "changed")], settings)
+    assert fake_model.calls[2:] == [["doc\nx"], ["doc\nchanged"]]
+
+
+def test_model_server_passages_are_scored_in_shards(
+    fake_model: type[_FakeRerankingModel], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(reranking, "RERANK_SHARD_SIZE", 4)
+    chunks = [_chunk(i, "x" * (i + 1)) for i in range(10)]
+
+    scores = get_rerank_scores("query", chunks, _rerank_settings(None))
+
+    assert scores == [float(len("doc\n") + i + 1) for i in range(10)]
+    assert sorted(len(passages) for passages in fake_model.calls) == [2, 4, 4]
+
+    # API providers get all the passages in one call
+    fake_model.calls = []
+    reranking._SCORE_CACHE.clear()
+    get_rerank_scores("query", chunks, _rerank_settings(RerankerProvider.COHERE))
+    assert [len(passages) for passages in fake_model.calls] == [10]
@@ -0,0 +1,77 @@
+import httpx
+
+from alvio.document_index.document_index_utils import get_uuid_from_chunk_info_old
+from alvio.document_index.interfaces import MinimalDocumentIndexingInfo
+from alvio.document_index.vespa.index import VespaIndex
+from alvio.document_index.vespa.indexing_utils import (
+    batch_check_for_final_chunk_existence,
+)
+from alvio.document_index.vespa.indexing_utils import check_for_final_chunk_existence
+
+
+def _vespa_stand_in(doc_id_to_chunk_count: dict[str, int]) -> httpx.Client:
+    existing_chunk_ids = {
+        str(
+            get_uuid_from_chunk_info_old(
+                document_id=doc_id, chunk_id=chunk_id, large_chunk_reference_ids=[]
+            )
+        )
+        for doc_id, chunk_count in doc_id_to_chunk_count.items()
+        for chunk_id in range(chunk_count)
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        chunk_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200 if chunk_id in existing_chunk_ids else 404)
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_batch_chunk_probe_matches_serial_probe() -> None:
+    doc_id_to_chunk_count = {"a": 0, "b": 1, "c": 4, "d": 5, "e": 37, "f": 200}
+    http_client = _vespa_stand_in(doc_id_to_chunk_count)
+    doc_infos = [
+        MinimalDocumentIndexingInfo(doc_id=doc_id, chunk_start_index=start)
+        for doc_id in doc_id_to_chunk_count
+        for start in (0, 3)
+    ]
+
+    batched = batch_check_for_final_chunk_existence(
+        minimal_doc_infos=doc_infos, index_name="test_index", http_client=http_client
+    )
+    serial = [
+        check_for_final_chunk_existence(
+            minimal_doc_info=doc_info,
+            start_index=doc_info.chunk_start_index,
+            index_name="test_index",
+            http_client=http_client,
+        )
+        for doc_info in doc_infos
+    ]
+
+    assert batched == serial
+
+
+def test_batch_enrich_only_probes_old_version_documents() -> None:
+    requested_paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_paths.append(request.url.path)
+        return httpx.Response(404)
+
+    enriched = VespaIndex.batch_enrich_basic_chunk_info(
+        index_name="test_index",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        doc_id_to_previous_chunk_cnt={"new": 3, "old": None},
+        doc_id_to_new_chunk_cnt={"new": 2},
+    )
+
+    assert [(info.doc_id, info.old_version) for info in enriched] == [
+        ("new", False),
+        ("old", True),
+    ]
+    assert enriched[0].chunk_start_index == 2
+    assert enriched[0].chunk_end_index == 3
+    assert enriched[1].chunk_end_index == 0
+    # only the first probe window of the old version document was requested
+    assert len(requested_paths) == 4
@@ -0,0 +1,99 @@
+import json
+from collections import Counter
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from alvio.document_index.vespa.feed_client import _get_feed_loop
+from alvio.document_index.vespa.feed_client import feed_vespa_operations
+from alvio.document_index.vespa.feed_client import VespaFeedOperation
+
+
+def _operations(count: int) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            method="POST",
+            url=f"http://vespa/document/v1/default/test_index/docid/{ind}",
+            document_id=f"doc-{ind}",
+            body={"fields": {"chunk_id": ind}},
+        )
+        for ind in range(count)
+    ]
+
+
+@patch("alvio.document_index.vespa.feed_client._retry_delay", return_value=0)
+def test_feed_retries_throttled_operations(_: object) -> None:
+    attempts: Counter[str] = Counter()
+    bodies: dict[str, dict] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts[request.url.path] += 1
+        bodies[request.url.path] = json.loads(request.content)
+        # every operation is throttled once before being accepted
+        if attempts[request.url.path] == 1:
+            return httpx.Response(429)
+        return httpx.Response(200)
+
+    stats = feed_vespa_operations(
+        _operations(50),
+        operation_name="index",
+        max_in_flight=16,
+        min_in_flight=2,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert len(attempts) == 50
+    assert all(count == 2 for count in attempts.values())
+    assert bodies["/document/v1/default/test_index/docid/7"] == {
+        "fields": {"chunk_id": 7}
+    }
+    assert stats.throttled == 50
+    assert stats.retries == 50
+    assert stats.max_in_flight <= 16
+
+
+def test_feed_raises_on_permanent_failure() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/3"):
+            return httpx.Response(400, text="bad document")
+        return httpx.Response(200)
+
+    # same exception as the threaded path, callers rely on the status code
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        feed_vespa_operations(
+            _operations(10),
+            operation_name="index",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+    assert exc_info.value.response.status_code == 400
+    assert exc_info.value.request.url.path.endswith("/3")
+
+
+@patch("alvio.document_index.vespa.feed_client._retry_delay", return_value=0)
+def test_feed_reraises_transport_errors(_: object) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    with pytest.raises(httpx.ReadTimeout):
+        feed_vespa_operations(
+            _operations(2),
+            operation_name="update",
+            max_retries=1,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+
+def test_feeds_share_one_loop_and_client() -> None:
+    loop, http_client = _get_feed_loop()
+
+    feed_vespa_operations(
+        _operations(3),
+        operation_name="delete",
+        http_client=httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda _: httpx.Response(200))
+        ),
+    )
+
+    assert _get_feed_loop() == (loop, http_client)
+    assert loop.is_running()
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import httpx
+
+from alvio.document_index.interfaces import VespaDocumentFields
+from alvio.document_index.vespa.feed_client import VespaFeedOperation
+from alvio.document_index.vespa.index import VespaIndex
+from alvio.document_index.vespa_constants import DOCUMENT_SETS
+from alvio.document_index.vespa_constants import HIDDEN
+
+
+def test_update_multiple_feeds_all_documents_at_once() -> None:
+    requested_paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_paths.append(request.url.path)
+        return httpx.Response(404)
+
+    index = VespaIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+    fed: list[list[VespaFeedOperation]] = []
+
+    with (
+        patch(
+            "alvio.document_index.vespa.index.async_feed_available",
+            return_value=True,
+        ),
+        patch(
+            "alvio.document_index.vespa.index.feed_vespa_operations",
+            side_effect=lambda operations, operation_name: fed.append(operations),
+        ),
+    ):
+        chunks_updated = index.update_multiple(
+            {
+                "doc-1": VespaDocumentFields(document_sets={"engineering"}),
+                "doc-2": VespaDocumentFields(hidden=True),
+            },
+            tenant_id="tenant",
+            doc_id_to_chunk_count={"doc-1": 3, "doc-2": 2},
+        )
+
+    # chunk counts are known, so nothing had to be probed
+    assert requested_paths == []
+    assert chunks_updated == {"doc-1": 3, "doc-2": 2}
+    assert len(fed) == 1
+    operations = fed[0]
+    assert len(operations) == 5
+    assert all(operation.method == "PUT" for operation in operations)
+    assert all(operation.url.endswith("?create=true") for operation in operations)
+    bodies = {operation.document_id: operation.body for operation in operations}
+    assert bodies["doc-1"] == {
+        "fields": {DOCUMENT_SETS: {"assign": {"engineering": 1}}}
+    }
+    assert bodies["doc-2"] == {"fields": {HIDDEN: {"assign": True}}}
+
+
+def test_delete_multiple_feeds_all_documents_at_once() -> None:
+    index = VespaIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+        httpx_client=httpx.Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(404))
+        ),
+    )
+    fed: list[list[VespaFeedOperation]] = []
+
+    with (
+        patch(
+            "alvio.document_index.vespa.index.async_feed_available",
+            return_value=True,
+        ),
+        patch(
+            "alvio.document_index.vespa.index.feed_vespa_operations",
+            side_effect=lambda operations, operation_name: fed.append(operations),
+        ),
+    ):
+        chunks_deleted = index.delete_multiple(
+            {"doc-1": 3, "doc-2": 2},
+            tenant_id="tenant",
+        )
+
+    assert chunks_deleted == {"doc-1": 3, "doc-2": 2}
+    assert len(fed) == 1
+    operations = fed[0]
+    assert len(operations) == 5
+    assert all(operation.method == "DELETE" for operation in operations)
+    assert all("/test_index/docid/" in operation.url for operation in operations)
@@ -105,3 +105,40 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+def test_chunker_tokenizes_each_text_once(embedder: DefaultIndexingEmbedder) -> None:
+    tokenizer = embedder.embedding_model.tokenizer
+    encoded_texts: list[str] = []
+    original_encode = tokenizer.encode
+
+    def counting_encode(string: str) -> list[int]:
+        encoded_texts.append(string)
+        return original_encode(string)
+
+    document = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            TextSection(
+                text="This is a long section that should be split into multiple chunks. "
+                * 100,
+                link="link1",
+            ),
+        ],
+    )
+    indexing_documents = process_image_sections([document])
+
+    chunker = Chunker(tokenizer=tokenizer, enable_multipass=True)
+    tokenizer.encode = counting_encode  # type: ignore[method-assign]
+    try:
+        chunks = chunker.chunk(indexing_documents)
+    finally:
+        tokenizer.encode = original_encode  # type: ignore[method-assign]
+
+    assert len(chunks) > 1
+    # the blurb and mini-chunk splitters reuse the sentence counts of the chunk splitter
+    assert len(encoded_texts) == len(set(encoded_texts))
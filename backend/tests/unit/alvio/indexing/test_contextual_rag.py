@@ -0,0 +1,207 @@
+import threading
+from typing import Any
+from typing import cast
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import alvio.indexing.contextual_rag as contextual_rag
+from alvio.connectors.models import Document
+from alvio.connectors.models import DocumentSource
+from alvio.connectors.models import TextSection
+from alvio.indexing.contextual_rag import ContextualRAGSummarizer
+from alvio.indexing.models import DocAwareChunk
+from alvio.natural_language_processing.utils import BaseTokenizer
+from alvio.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
+from alvio.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
+from tests.unit.conftest import InMemoryRedisServer
+
+
+class _WordTokenizer(BaseTokenizer):
+    """One token per whitespace separated word."""
+
+    def __init__(self) -> None:
+        self.vocab: list[str] = []
+
+    def encode(self, string: str) -> list[int]:
+        tokens = []
+        for word in string.split():
+            if word not in self.vocab:
+                self.vocab.append(word)
+            tokens.append(self.vocab.index(word))
+        return tokens
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join(self.vocab[token] for token in tokens)
+
+
+class _LLM:
+    def __init__(self, model_provider: str, model_name: str) -> None:
+        self.config = Mock()
+        self.config.model_provider = model_provider
+        self.config.model_name = model_name
+        self.config.max_input_tokens = 10_000
+        self.prompts: list[Any] = []
+        self._lock = threading.Lock()
+        # every document summary waits for the summaries of the other documents,
+        # this only finishes if the documents are summarized concurrently
+        self.summary_barrier: threading.Barrier | None = None
+
+    def invoke(self, prompt: Any, max_tokens: int | None = None) -> Mock:
+        with self._lock:
+            self.prompts.append(prompt)
+            call = len(self.prompts)
+        if (
+            self.summary_barrier is not None
+            and isinstance(prompt, str)
+            and prompt.startswith(DOCUMENT_SUMMARY_PROMPT.split("{document}")[0])
+        ):
+            self.summary_barrier.wait()
+        response = Mock()
+        response.content = f"answer {call}"
+        return response
+
+
+def _chunks(doc_id: str, texts: list[str]) -> list[DocAwareChunk]:
+    document = Document(
+        id=doc_id,
+        semantic_identifier=doc_id,
+        sections=[TextSection(text=text, link=None) for text in texts],
+        source=DocumentSource.FILE,
+        metadata={},
+    )
+    return [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb=text,
+            content=text,
+            source_links=None,
+            image_file_id=None,
+            section_continuation=False,
+            source_document=document,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            contextual_rag_reserved_tokens=200,
+            doc_summary="",
+            chunk_context="",
+            mini_chunk_texts=None,
+            large_chunk_id=None,
+        )
+        for chunk_id, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def redis_client(
+    monkeypatch: pytest.MonkeyPatch, redis_server: InMemoryRedisServer
+) -> InMemoryRedisServer:
+    monkeypatch.setattr(
+        contextual_rag, "get_redis_client", redis_server.get_redis_client
+    )
+    monkeypatch.setattr(contextual_rag, "USE_DOCUMENT_SUMMARY", True)
+    monkeypatch.setattr(contextual_rag, "USE_CHUNK_SUMMARY", True)
+    return redis_server
+
+
+def test_documents_are_summarized_concurrently(
+    redis_client: InMemoryRedisServer,
+) -> None:
+    llm = _LLM("openai", "gpt-4o")
+    llm.summary_barrier = threading.Barrier(3, timeout=10)
+    chunks = [
+        chunk
+        for doc_id in ("doc1", "doc2", "doc3")
+        for chunk in _chunks(doc_id, [f"{doc_id} first", f"{doc_id} second"])
+    ]
+
+    stats = ContextualRAGSummarizer(llm, _WordTokenizer(), 512).summarize(  # type: ignore[arg-type]
+        chunks
+    )
+
+    assert stats.docs == 3
+    assert stats.chunks == 6
+    assert stats.llm_calls == 9
+    assert all(chunk.doc_summary.startswith("answer") for chunk in chunks)
+    assert all(chunk.chunk_context.startswith("answer") for chunk in chunks)
+    # the first chunk of every document is sent before all other chunks
+    first_chunk_prompts = llm.prompts[3:6]
+    for doc_id in ("doc1", "doc2", "doc3"):
+        assert any(
+            prompt.endswith(CONTEXTUAL_RAG_PROMPT2.format(chunk=f"{doc_id} first"))
+            for prompt in first_chunk_prompts
+        )
+    assert stats.prefix_cached_prompt_tokens > 0
+
+
+def test_cached_summaries_skip_the_llm(redis_client: InMemoryRedisServer) -> None:
+    tokenizer = _WordTokenizer()
+    first_llm = _LLM("openai", "gpt-4o")
+    first_chunks = _chunks("doc", ["alpha", "beta"])
+    ContextualRAGSummarizer(first_llm, tokenizer, 512).summarize(first_chunks)  # type: ignore[arg-type]
+
+    second_llm = _LLM("openai", "gpt-4o")
+    second_chunks = _chunks("doc", ["alpha", "beta"])
+    stats = ContextualRAGSummarizer(second_llm, tokenizer, 512).summarize(  # type: ignore[arg-type]
+        second_chunks
+    )
+
+    assert second_llm.prompts == []
+    assert stats.cache_hits == 3
+    assert [chunk.doc_summary for chunk in second_chunks] == [
+        chunk.doc_summary for chunk in first_chunks
+    ]
+    assert [chunk.chunk_context for chunk in second_chunks] == [
+        chunk.chunk_context for chunk in first_chunks
+    ]
+
+    # another model doesn't share the cached summaries
+    other_llm = _LLM("openai", "gpt-4o-mini")
+    ContextualRAGSummarizer(other_llm, tokenizer, 512).summarize(  # type: ignore[arg-type]
+        _chunks("doc", ["alpha", "beta"])
+    )
+    assert len(other_llm.prompts) == 3
+
+
+def test_anthropic_prompts_mark_the_document_prefix_as_cacheable(
+    redis_client: InMemoryRedisServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(contextual_rag, "USE_DOCUMENT_SUMMARY", False)
+    llm = _LLM("anthropic", "claude-3-5-sonnet")
+
+    ContextualRAGSummarizer(llm, _WordTokenizer(), 512).summarize(  # type: ignore[arg-type]
+        _chunks("doc", ["alpha", "beta"])
+    )
+
+    assert len(llm.prompts) == 2
+    prefixes = set()
+    for prompt in llm.prompts:
+        (message,) = prompt
+        assert isinstance(message, HumanMessage)
+        assert isinstance(message.content, list)
+        document_part, chunk_part = cast(list[dict[str, Any]], message.content)
+        assert document_part["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in chunk_part
+        prefixes.add(document_part["text"])
+    assert len(prefixes) == 1
+
+
+def test_chunk_context_errors_leave_the_context_empty(
+    redis_client: InMemoryRedisServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(contextual_rag, "USE_DOCUMENT_SUMMARY", False)
+    llm = _LLM("openai", "gpt-4o")
+    llm.invoke = Mock(side_effect=RuntimeError("provider down"))  # type: ignore[method-assign]
+    chunks = _chunks("doc", ["alpha", "beta"])
+
+    stats = ContextualRAGSummarizer(llm, _WordTokenizer(), 512).summarize(  # type: ignore[arg-type]
+        chunks
+    )
+
+    assert [chunk.chunk_context for chunk in chunks] == ["", ""]
+    assert stats.llm_calls == 0
+    assert redis_client.data == {}
@@ -0,0 +1,306 @@
+import contextlib
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+import alvio.indexing.indexing_pipeline as indexing_pipeline
+from alvio.access.models import DocumentAccess
+from alvio.connectors.models import Document
+from alvio.connectors.models import DocumentSource
+from alvio.connectors.models import IndexingDocument
+from alvio.connectors.models import Section
+from alvio.connectors.models import TextSection
+from alvio.document_index.interfaces import DocumentInsertionRecord
+from alvio.document_index.interfaces import IndexBatchParams
+from alvio.indexing.indexing_pipeline import compute_chunk_content_hashes
+from alvio.indexing.indexing_pipeline import DocumentBatchPrepareContext
+from alvio.indexing.indexing_pipeline import index_doc_batch
+from alvio.indexing.models import BuildMetadataAwareChunksResult
+from alvio.indexing.models import ChunkEmbedding
+from alvio.indexing.models import DocAwareChunk
+from alvio.indexing.models import DocMetadataAwareIndexChunk
+from alvio.indexing.models import IndexChunk
+from alvio.indexing.models import UpdatableChunkData
+
+
+def _document(doc_id: str, texts: list[str]) -> Document:
+    return Document(
+        id=doc_id,
+        semantic_identifier=doc_id,
+        sections=[TextSection(text=text, link=None) for text in texts],
+        source=DocumentSource.FILE,
+        metadata={},
+    )
+
+
+class _SectionChunker:
+    """One chunk per section."""
+
+    chunk_token_limit = 512
+    enable_large_chunks = False
+
+    def chunk(self, documents: list[IndexingDocument]) -> list[DocAwareChunk]:
+        return [
+            DocAwareChunk(
+                chunk_id=chunk_id,
+                blurb=section.text or "",
+                content=section.text or "",
+                source_links=None,
+                image_file_id=None,
+                section_continuation=False,
+                source_document=document,
+                title_prefix="",
+                metadata_suffix_semantic="",
+                metadata_suffix_keyword="",
+                contextual_rag_reserved_tokens=0,
+                doc_summary="",
+                chunk_context="",
+                mini_chunk_texts=None,
+                large_chunk_id=None,
+            )
+            for document in documents
+            for chunk_id, section in enumerate(document.processed_sections)
+        ]
+
+
+class _Adapter:
+    def __init__(self, previous_hashes: dict[str, list[str]]) -> None:
+        self.previous_hashes = previous_hashes
+        self.context: DocumentBatchPrepareContext | None = None
+        self.result: BuildMetadataAwareChunksResult | None = None
+
+    def prepare(
+        self, documents: list[Document], ignore_time_skip: bool
+    ) -> DocumentBatchPrepareContext:
+        return DocumentBatchPrepareContext(
+            updatable_docs=documents,
+            id_to_boost_map={},
+            id_to_previous_chunk_content_hashes=self.previous_hashes,
+        )
+
+    @contextlib.contextmanager
+    def lock_context(self, documents: list[Document]) -> Generator[None, None, None]:
+        yield
+
+    def build_metadata_aware_chunks(
+        self,
+        chunks_with_embeddings: list[IndexChunk],
+        chunk_content_scores: list[float],
+        tenant_id: str,
+        context: DocumentBatchPrepareContext,
+    ) -> BuildMetadataAwareChunksResult:
+        return BuildMetadataAwareChunksResult(
+            chunks=[
+                DocMetadataAwareIndexChunk.from_index_chunk(
+                    index_chunk=chunk,
+                    access=DocumentAccess.build([], [], [], [], is_public=True),
+                    document_sets=set(),
+                    user_project=[],
+                    boost=0,
+                    aggregated_chunk_boost_factor=1.0,
+                    tenant_id=tenant_id,
+                )
+                for chunk in chunks_with_embeddings
+            ],
+            doc_id_to_previous_chunk_cnt={
+                doc_id: len(hashes) for doc_id, hashes in self.previous_hashes.items()
+            },
+            doc_id_to_new_chunk_cnt={
+                doc.id: len(
+                    [
+                        chunk
+                        for chunk in chunks_with_embeddings
+                        if chunk.source_document.id == doc.id
+                    ]
+                )
+                for doc in context.updatable_docs
+            },
+            user_file_id_to_raw_text={},
+            user_file_id_to_token_count={},
+        )
+
+    def post_index(
+        self,
+        context: DocumentBatchPrepareContext,
+        updatable_chunk_data: list[UpdatableChunkData],
+        filtered_documents: list[Document],
+        result: BuildMetadataAwareChunksResult,
+    ) -> None:
+        self.context = context
+        self.result = result
+
+
+@pytest.fixture
+def pipeline(monkeypatch: pytest.MonkeyPatch) -> dict[str, list]:
+    calls: dict[str, list] = {"embedded": [], "written": []}
+
+    def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
+        return [
+            IndexingDocument(
+                **document.model_dump(),
+                processed_sections=[
+                    Section(text=section.text, link=None)
+                    for section in document.sections
+                    if isinstance(section, TextSection)
+                ],
+            )
+            for document in documents
+        ]
+
+    def embed(chunks: list[DocAwareChunk], **kwargs: Any) -> tuple[list, list]:
+        calls["embedded"].extend(chunk.content for chunk in chunks)
+        return [
+            IndexChunk(
+                **chunk.model_dump(),
+                embeddings=ChunkEmbedding(
+                    full_embedding=[0.0], mini_chunk_embeddings=[]
+                ),
+                title_embedding=None,
+            )
+            for chunk in chunks
+        ], []
+
+    def write(
+        document_index: Any,
+        chunks: list[DocMetadataAwareIndexChunk],
+        index_batch_params: IndexBatchParams,
+    ) -> tuple[list, list]:
+        calls["written"].append(index_batch_params)
+        return [
+            DocumentInsertionRecord(document_id=doc_id, already_existed=True)
+            for doc_id in index_batch_params.doc_id_to_new_chunk_cnt
+        ], []
+
+    monkeypatch.setattr(
+        indexing_pipeline, "process_image_sections", process_image_sections
+    )
+    monkeypatch.setattr(indexing_pipeline, "embed_chunks_with_failure_handling", embed)
+    monkeypatch.setattr(
+        indexing_pipeline, "write_chunks_to_vector_db_with_backoff", write
+    )
+    monkeypatch.setattr(indexing_pipeline, "ENABLE_INCREMENTAL_REINDEXING", True)
+    return calls
+
+
+def _embedder() -> Mock:
+    embedder = Mock()
+    embedder.model_name = "test-model"
+    embedder.normalize = True
+    embedder.passage_prefix = None
+    embedder.provider_type = None
+    return embedder
+
+
+def _document_index() -> Mock:
+    document_index = Mock()
+    document_index.index_name = "danswer_chunk_test"
+    return document_index
+
+
+def _index(
+    documents: list[Document], adapter: _Adapter, document_index: Mock
+) -> indexing_pipeline.IndexingPipelineResult:
+    return index_doc_batch(
+        document_batch=documents,
+        chunker=_SectionChunker(),  # type: ignore[arg-type]
+        embedder=_embedder(),
+        information_content_classification_model=Mock(),
+        document_index=document_index,
+        request_id=None,
+        tenant_id="public",
+        adapter=adapter,  # type: ignore[arg-type]
+        filter_fnc=lambda documents: documents,
+    )
+
+
+def test_unchanged_documents_are_not_reindexed(pipeline: dict[str, list]) -> None:
+    unchanged = _document("unchanged", ["a", "b"])
+    changed = _document("changed", ["c", "d"])
+    document_index = _document_index()
+
+    # index both documents once to learn their hashes
+    first = _Adapter(previous_hashes={})
+    _index([unchanged, changed], first, document_index)
+    assert first.context is not None
+    hashes = first.context.id_to_chunk_content_hashes
+    assert hashes["unchanged"] is not None and len(hashes["unchanged"]) == 2
+
+    pipeline["embedded"].clear()
+    pipeline["written"].clear()
+
+    changed = _document("changed", ["c", "d changed"])
+    second = _Adapter(
+        previous_hashes={
+            doc_id: doc_hashes
+            for doc_id, doc_hashes in hashes.items()
+            if doc_hashes is not None
+        }
+    )
+    result = _index([unchanged, changed], second, document_index)
+
+    assert result.skipped_chunks == 2
+    assert result.total_chunks == 2
+    assert pipeline["embedded"] == ["c", "d changed"]
+
+    # the unchanged document is left out of the write and only gets a metadata update
+    (index_batch_params,) = pipeline["written"]
+    assert set(index_batch_params.doc_id_to_new_chunk_cnt) == {"changed"}
+    assert set(index_batch_params.doc_id_to_previous_chunk_cnt) == {"changed"}
+    doc_id_to_fields = document_index.update_multiple.call_args.args[0]
+    assert set(doc_id_to_fields) == {"unchanged"}
+    assert document_index.update_multiple.call_args.kwargs["doc_id_to_chunk_count"] == {
+        "unchanged": 2
+    }
+
+    # the chunk count of the unchanged document is kept and its hashes stay the same
+    assert second.result is not None
+    assert second.result.doc_id_to_new_chunk_cnt == {"unchanged": 2, "changed": 2}
+    assert second.context is not None
+    assert second.context.id_to_chunk_content_hashes["unchanged"] == hashes["unchanged"]
+    assert second.context.id_to_chunk_content_hashes["changed"] != hashes["changed"]
+
+
+def test_incremental_reindexing_can_be_disabled(
+    pipeline: dict[str, list], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    document = _document("doc", ["a", "b"])
+    document_index = _document_index()
+
+    first = _Adapter(previous_hashes={})
+    _index([document], first, document_index)
+    assert first.context is not None
+    previous_hashes = first.context.id_to_chunk_content_hashes["doc"]
+    assert previous_hashes is not None
+
+    monkeypatch.setattr(indexing_pipeline, "ENABLE_INCREMENTAL_REINDEXING", False)
+    pipeline["embedded"].clear()
+    result = _index(
+        [document], _Adapter(previous_hashes={"doc": previous_hashes}), document_index
+    )
+
+    assert result.skipped_chunks == 0
+    assert pipeline["embedded"] == ["a", "b"]
+    document_index.update_multiple.assert_not_called()
+
+
+def test_chunk_content_hashes_depend_on_fingerprint_and_title() -> None:
+    chunker = _SectionChunker()
+
+    def hashes(document: Document, fingerprint: str) -> list[str]:
+        indexing_document = IndexingDocument(
+            **document.model_dump(),
+            processed_sections=[Section(text="a", link=None)],
+        )
+        return compute_chunk_content_hashes(
+            chunker.chunk([indexing_document]), fingerprint
+        )[document.id]
+
+    document = _document("doc", ["a"])
+    renamed = _document("doc", ["a"])
+    renamed.title = "New title"
+
+    assert hashes(document, "model-a") == hashes(document, "model-a")
+    assert hashes(document, "model-a") != hashes(document, "model-b")
+    assert hashes(document, "model-a") != hashes(renamed, "model-a")
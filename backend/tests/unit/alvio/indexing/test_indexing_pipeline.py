@@ -1,3 +1,5 @@
+import io
+import threading
 from typing import Any
 from typing import cast
 from typing import List
@@ -6,6 +8,8 @@ from unittest.mock import patch
 
 import pytest
 
+import alvio.file_processing.image_summary_cache as image_summary_cache
+import alvio.indexing.indexing_pipeline as indexing_pipeline
 from alvio.configs.app_configs import MAX_DOCUMENT_CHARS
 from alvio.connectors.models import Document
 from alvio.connectors.models import DocumentSource
@@ -26,6 +30,7 @@ from alvio.natural_language_processing.search_nlp_models import (
 from shared_configs.configs import (
     INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH,
 )
+from tests.unit.conftest import InMemoryRedisServer
 
 
 def create_test_document(
@@ -338,3 +343,159 @@ def test_contextual_rag(
             count += 1
         assert chunk.doc_summary == doc_summary
         assert chunk.chunk_context == chunk_context
+
+
+class _ImageFileStore:
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = files
+
+    def read_file_record(self, file_id: str) -> Mock | None:
+        if file_id not in self.files:
+            return None
+        record = Mock()
+        record.display_name = f"{file_id}.png"
+        return record
+
+    def read_file(self, file_id: str) -> io.BytesIO:
+        return io.BytesIO(self.files[file_id])
+
+
+def _image_document(doc_id: str, image_file_ids: list[str]) -> Document:
+    return Document(
+        id=doc_id,
+        semantic_identifier=doc_id,
+        sections=[TextSection(text="intro", link=None)]
+        + [
+            ImageSection(image_file_id=image_file_id, link=None)
+            for image_file_id in image_file_ids
+        ],
+        source=DocumentSource.FILE,
+        metadata={},
+    )
+
+
+@pytest.fixture
+def image_summarization(
+    monkeypatch: pytest.MonkeyPatch, redis_server: InMemoryRedisServer
+) -> dict[str, Any]:
+    file_store = _ImageFileStore(
+        {"logo1": b"logo", "logo2": b"logo", "chart": b"chart", "photo": b"photo"}
+    )
+    summarized: list[str] = []
+    lock = threading.Lock()
+
+    def summarize(llm: Any, image_data: bytes, context_name: str) -> str | None:
+        with lock:
+            summarized.append(context_name)
+        return f"summary of {image_data.decode()}"
+
+    llm = Mock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = "gpt-4o"
+
+    monkeypatch.setattr(
+        indexing_pipeline, "get_image_extraction_and_analysis_enabled", lambda: True
+    )
+    monkeypatch.setattr(indexing_pipeline, "get_default_llm_with_vision", lambda: llm)
+    monkeypatch.setattr(indexing_pipeline, "get_default_file_store", lambda: file_store)
+    monkeypatch.setattr(
+        indexing_pipeline, "summarize_image_with_error_handling", summarize
+    )
+    monkeypatch.setattr(
+        image_summary_cache, "get_redis_client", redis_server.get_redis_client
+    )
+    monkeypatch.setattr(image_summary_cache, "IMAGE_SUMMARY_CACHE_ENABLED", True)
+    return {"summarized": summarized, "redis": redis_server}
+
+
+def test_process_image_sections_deduplicates_and_caches(
+    image_summarization: dict[str, Any],
+) -> None:
+    documents = [
+        _image_document("doc1", ["logo1", "chart", "missing"]),
+        _image_document("doc2", ["logo2", "chart"]),
+    ]
+
+    indexing_documents = process_image_sections(documents)
+
+    assert [section.text for section in indexing_documents[0].processed_sections] == [
+        "intro",
+        "summary of logo",
+        "summary of chart",
+        "[Image could not be processed]",
+    ]
+    assert [section.text for section in indexing_documents[1].processed_sections] == [
+        "intro",
+        "summary of logo",
+        "summary of chart",
+    ]
+    assert [
+        section.image_file_id for section in indexing_documents[1].processed_sections
+    ] == [None, "logo2", "chart"]
+    # logo1 and logo2 have the same content, the vision LLM only sees it once
+    assert len(image_summarization["summarized"]) == 2
+
+    # the summaries are reused on the next indexing of the same images
+    image_summarization["summarized"].clear()
+    process_image_sections([_image_document("doc3", ["logo2", "chart", "photo"])])
+    assert image_summarization["summarized"] == ["photo.png"]
+
+
+def test_process_image_sections_summarizes_concurrently(
+    image_summarization: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # every summary waits for the other two, so this only finishes if they run at
+    # the same time
+    barrier = threading.Barrier(3, timeout=5)
+
+    def summarize(llm: Any, image_data: bytes, context_name: str) -> str | None:
+        barrier.wait()
+        return f"summary of {image_data.decode()}"
+
+    monkeypatch.setattr(
+        indexing_pipeline, "summarize_image_with_error_handling", summarize
+    )
+
+    (indexing_document,) = process_image_sections(
+        [_image_document("doc", ["logo1", "chart", "photo"])]
+    )
+
+    assert [section.text for section in indexing_document.processed_sections] == [
+        "intro",
+        "summary of logo",
+        "summary of chart",
+        "summary of photo",
+    ]
+
+
+def test_process_image_sections_reads_images_as_they_are_summarized(
+    image_summarization: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    events: list[str] = []
+    read_file = _ImageFileStore.read_file
+
+    def record_read(self: _ImageFileStore, file_id: str) -> io.BytesIO:
+        events.append(f"read {file_id}")
+        return read_file(self, file_id)
+
+    def summarize(llm: Any, image_data: bytes, context_name: str) -> str | None:
+        events.append(f"summarize {context_name}")
+        return f"summary of {image_data.decode()}"
+
+    monkeypatch.setattr(_ImageFileStore, "read_file", record_read)
+    monkeypatch.setattr(
+        indexing_pipeline, "summarize_image_with_error_handling", summarize
+    )
+    monkeypatch.setattr(indexing_pipeline, "IMAGE_SUMMARIZATION_MAX_CONCURRENCY", 1)
+
+    process_image_sections([_image_document("doc", ["logo1", "chart", "photo"])])
+
+    # with one worker, an image is only read once the previous one is summarized
+    assert events == [
+        "read logo1",
+        "summarize logo1.png",
+        "read chart",
+        "summarize chart.png",
+        "read photo",
+        "summarize photo.png",
+    ]
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from alvio.kg.clustering.clustering import _resolve_grounded_entity_batch
+from alvio.kg.clustering.clustering import _trigram_similarity
+
+
+@pytest.mark.parametrize(
+    "name1,name2,expected",
+    [
+        ("word", "word", 1.0),
+        ("word", "words", 4 / 7),
+        ("Acme Corp", "acme corp.", 1.0),
+        ("abc", "xyz", 0.0),
+        ("", "abc", 0.0),
+    ],
+)
+def test_trigram_similarity_matches_pg_trgm(
+    name1: str, name2: str, expected: float
+) -> None:
+    assert _trigram_similarity(name1, name2) == pytest.approx(expected)
+
+
+def _resolve(
+    names: list[str],
+    similar_entities: list[list[Any]] | None = None,
+    document_ids: list[str | None] | None = None,
+) -> tuple[list[tuple[str, str]], list[str]]:
+    """Returns the (child, parent) merges and the names of the new entities."""
+    entities = [
+        SimpleNamespace(
+            name=name, document_id=document_ids[ind] if document_ids else None
+        )
+        for ind, name in enumerate(names)
+    ]
+    merges: list[tuple[str, str]] = []
+    new_entities: list[str] = []
+
+    def merge(parent: Any, child: Any) -> Any:
+        merges.append((child.name, parent.name))
+        return parent
+
+    def transfer(entity: Any) -> Any:
+        new_entities.append(entity.name)
+        return SimpleNamespace(name=entity.name, document_id=entity.document_id)
+
+    _resolve_grounded_entity_batch(
+        entities=entities,  # type: ignore[arg-type]
+        entity_names=names,
+        similar_entities=similar_entities or [[] for _ in names],
+        merge=merge,
+        transfer=transfer,
+    )
+    return merges, new_entities
+
+
+def test_resolve_batch_merges_into_entities_created_earlier_in_the_batch() -> None:
+    merges, new_entities = _resolve(["acme corporation", "globex", "acme corporations"])
+    assert new_entities == ["acme corporation", "globex"]
+    assert merges == [("acme corporations", "acme corporation")]
+
+
+def test_resolve_batch_picks_best_existing_entity() -> None:
+    existing = [
+        SimpleNamespace(name="acme corporations", document_id=None),
+        SimpleNamespace(name="acme corporation", document_id=None),
+    ]
+    merges, new_entities = _resolve(["acme corporation"], [existing])
+    assert new_entities == []
+    assert merges == [("acme corporation", "acme corporation")]
+
+
+def test_resolve_batch_skips_names_with_numbers() -> None:
+    existing = SimpleNamespace(name="release", document_id=None)
+    merges, new_entities = _resolve(
+        ["release 1", "release 1", "release"], [[existing], [existing], [existing]]
+    )
+    assert new_entities == ["release 1", "release 1"]
+    assert merges == [("release", "release")]
+
+
+def test_resolve_batch_never_merges_two_documents() -> None:
+    merges, new_entities = _resolve(
+        ["design doc", "design doc"], document_ids=["doc-1", "doc-2"]
+    )
+    assert merges == []
+    assert new_entities == ["design doc", "design doc"]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from cohere.errors import TooManyRequestsError
+
+from alvio.natural_language_processing.provider_clients import (
+    get_provider_client_registry,
+)
+from alvio.natural_language_processing.provider_clients import (
+    get_rate_limit_retry_after,
+)
+from alvio.natural_language_processing.provider_clients import ProviderLimiter
+from alvio.natural_language_processing.provider_clients import run_provider_call
+
+
+def _status_error(status_code: int, headers: dict[str, str]) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://provider.example.com/embed")
+    return httpx.HTTPStatusError(
+        "error",
+        request=request,
+        response=httpx.Response(status_code, headers=headers, request=request),
+    )
+
+
+def test_get_rate_limit_retry_after() -> None:
+    assert get_rate_limit_retry_after(_status_error(429, {"Retry-After": "3"})) == 3.0
+    assert get_rate_limit_retry_after(_status_error(429, {})) == 0.0
+    rate_limited = TooManyRequestsError(body=None)  # type: ignore[arg-type]
+    assert get_rate_limit_retry_after(rate_limited) == 0.0
+    assert get_rate_limit_retry_after(_status_error(500, {})) is None
+    assert get_rate_limit_retry_after(ValueError("bad input")) is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_every_caller_after_a_rate_limit() -> None:
+    limiter = ProviderLimiter(
+        label="fake", max_concurrency=2, max_retries=3, backoff=0.05
+    )
+    in_flight = 0
+    max_in_flight = 0
+    sent_at: list[float] = []
+
+    async def call() -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        sent_at.append(time.monotonic())
+        request_number = len(sent_at)
+        try:
+            await asyncio.sleep(0.01)
+            # the first request is rate limited
+            if request_number == 1:
+                raise _status_error(429, {})
+            return request_number
+        finally:
+            in_flight -= 1
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(limiter.run(call) for _ in range(6)))
+
+    assert len(results) == 6
+    assert limiter.rate_limited == 1
+    assert limiter.requests == 7
+    assert max_in_flight <= 2
+    # apart from the request sent alongside the rate limited one, nothing is sent
+    # until the backoff is over
+    assert sum(t - start < 0.05 for t in sent_at) == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_gives_up_after_max_retries() -> None:
+    limiter = ProviderLimiter(label="fake", max_retries=1, backoff=0.01)
+
+    async def call() -> None:
+        raise _status_error(429, {})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await limiter.run(call)
+    assert limiter.requests == 2
+
+
+def test_provider_calls_share_the_loop_and_clients() -> None:
+    async def get_client() -> tuple[object, asyncio.AbstractEventLoop]:
+        client = get_provider_client_registry().get_client("fake|", object)
+        return client, asyncio.get_running_loop()
+
+    results: list[tuple[object, asyncio.AbstractEventLoop]] = []
+
+    def worker() -> None:
+        results.append(run_provider_call(get_client()))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client, _ in results}) == 1
+    assert len({id(loop) for _, loop in results}) == 1
@@ -1,4 +1,5 @@
 from collections.abc import AsyncGenerator
+from typing import Any
 from typing import List
 from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
@@ -9,8 +10,11 @@ from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 
 from alvio.natural_language_processing.search_nlp_models import CloudEmbedding
+from alvio.natural_language_processing.search_nlp_models import EmbeddingModel
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
 
 
 @pytest.fixture
@@ -81,3 +85,41 @@ async def test_rate_limit_handling() -> None:
                 model_name="fake-model",
                 text_type=EmbedTextType.QUERY,
             )
+
+
+def test_local_batch_encode_keeps_order_with_concurrent_requests() -> None:
+    model = EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name="fake-model",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        api_key=None,
+        api_url=None,
+        provider_type=None,
+    )
+
+    def fake_request(embed_request: EmbedRequest, **kwargs: Any) -> EmbedResponse:
+        return EmbedResponse(
+            embeddings=[[float(len(text))] for text in embed_request.texts]
+        )
+
+    texts = ["a" * length for length in [5, 1, 9, 3, 7, 2, 8, 4, 6]]
+    with patch.object(
+        model, "_make_model_server_request", side_effect=fake_request
+    ) as mock_request:
+        embeddings = model._batch_encode_texts(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            batch_size=2,
+            max_seq_length=512,
+            num_threads=4,
+        )
+
+    assert embeddings == [[float(len(text))] for text in texts]
+    assert mock_request.call_count == 5
+    # batches are built from length sorted texts to reduce padding
+    for call in mock_request.call_args_list:
+        batch = call.args[0].texts
+        assert max(len(t) for t in batch) - min(len(t) for t in batch) <= 1
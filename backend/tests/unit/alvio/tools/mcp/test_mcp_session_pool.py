@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import anyio
+import pytest
+
+import alvio.tools.tool_implementations.mcp.mcp_client as mcp_client
+import alvio.tools.tool_implementations.mcp.mcp_session_pool as mcp_session_pool
+from alvio.tools.tool_implementations.mcp.mcp_client import discover_mcp_tools
+from alvio.tools.tool_implementations.mcp.mcp_session_pool import MCPSessionPool
+
+
+class _Server:
+    """Stands in for the transport and the client session of the mcp library."""
+
+    def __init__(self) -> None:
+        self.connects: list[dict[str, str]] = []
+        self.closed = 0
+        self.list_tools_calls = 0
+        self.ping_fails = False
+        self.connect_hangs = False
+
+    @contextlib.asynccontextmanager
+    async def transport(
+        self, url: str, headers: dict[str, str]
+    ) -> AsyncIterator[tuple[None, None, None]]:
+        self.connects.append(headers)
+        if self.connect_hangs:
+            await asyncio.Event().wait()
+        try:
+            yield None, None, None
+        finally:
+            self.closed += 1
+
+    def session(self, read: Any, write: Any) -> "_Session":
+        return _Session(self)
+
+
+class _Session:
+    def __init__(self, server: _Server) -> None:
+        self.server = server
+        self.id = uuid4()
+
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def initialize(self) -> Any:
+        return SimpleNamespace(serverInfo="test server", session_id=self.id)
+
+    async def send_ping(self) -> None:
+        if self.server.ping_fails:
+            raise RuntimeError("connection lost")
+
+    async def list_tools(self) -> Any:
+        self.server.list_tools_calls += 1
+        return type("ListToolsResult", (), {"tools": ["tool"]})()
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> _Server:
+    server = _Server()
+    monkeypatch.setattr(mcp_session_pool, "streamablehttp_client", server.transport)
+    monkeypatch.setattr(mcp_session_pool, "ClientSession", server.session)
+    return server
+
+
+async def _session_id(session: Any, initialize_result: Any) -> str:
+    return str(initialize_result.session_id)
+
+
+def test_sessions_are_reused_per_server_and_credentials(server: _Server) -> None:
+    async def run() -> list[str]:
+        pool = MCPSessionPool()
+        results = [
+            await pool.run("http://mcp/a", {"Authorization": "a"}, _session_id),
+            await pool.run("http://mcp/a", {"Authorization": "a"}, _session_id),
+            await pool.run("http://mcp/a", {"Authorization": "b"}, _session_id),
+        ]
+        await pool.close()
+        return results
+
+    first, second, other_credentials = asyncio.run(run())
+
+    assert first == second
+    assert other_credentials != first
+    assert server.connects == [{"Authorization": "a"}, {"Authorization": "b"}]
+    assert server.closed == 2
+
+
+def test_closed_connections_are_reopened(
+    server: _Server, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = 0
+
+    async def fails_once(session: Any, initialize_result: Any) -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise anyio.ClosedResourceError()
+        return "done"
+
+    async def run() -> str:
+        pool = MCPSessionPool()
+        result = await pool.run("http://mcp/a", {}, fails_once)
+        await pool.close()
+        return result
+
+    assert asyncio.run(run()) == "done"
+    assert len(server.connects) == 2
+
+
+def test_unhealthy_and_idle_sessions_are_replaced(
+    server: _Server, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # every reuse is health checked
+    monkeypatch.setattr(
+        mcp_session_pool, "MCP_SESSION_HEALTH_CHECK_INTERVAL_SECONDS", -1
+    )
+
+    async def run() -> None:
+        pool = MCPSessionPool()
+        first = await pool.run("http://mcp/a", {}, _session_id)
+        assert await pool.run("http://mcp/a", {}, _session_id) == first
+
+        server.ping_fails = True
+        assert await pool.run("http://mcp/a", {}, _session_id) != first
+        assert len(server.connects) == 2
+
+        await pool.evict_idle_sessions(idle_timeout=0)
+        assert server.closed == 2
+
+    asyncio.run(run())
+
+
+def test_hanging_connects_are_cancelled(
+    server: _Server, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(mcp_session_pool, "MCP_CONNECT_TIMEOUT_SECONDS", 0.05)
+    server.connect_hangs = True
+
+    async def run() -> float:
+        pool = MCPSessionPool()
+        start = time.monotonic()
+        # the outer timeout only keeps the test from hanging
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run("http://mcp/a", {}, _session_id), 5)
+        elapsed = time.monotonic() - start
+        await pool.close()
+        return elapsed
+
+    assert asyncio.run(run()) < 1
+    assert server.connects == [{}]
+
+
+def test_discovered_tools_are_cached(
+    server: _Server, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(mcp_client, "_discovery_cache", {})
+    server_url = f"http://mcp/{uuid4()}"
+
+    assert len(discover_mcp_tools(server_url, {"Authorization": "a"})) == 1
+    assert len(discover_mcp_tools(server_url, {"Authorization": "a"})) == 1
+    assert server.list_tools_calls == 1
+
+    discover_mcp_tools(server_url, {"Authorization": "b"})
+    discover_mcp_tools(server_url, {"Authorization": "a"}, use_cache=False)
+    assert server.list_tools_calls == 3
+    # all calls went over the two pooled sessions
+    assert len(server.connects) == 2
+
+    stats = mcp_session_pool.get_mcp_server_stats(server_url)
+    assert stats.calls == 3
+    assert stats.connects == 2
+
+
+def test_expired_discovery_results_are_evicted(
+    server: _Server, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    server_url = f"http://mcp/{uuid4()}"
+    monkeypatch.setattr(
+        mcp_client,
+        "_discovery_cache",
+        {("list_tools", "expired"): (time.monotonic() - 1, ["stale tool"])},
+    )
+
+    discover_mcp_tools(server_url, {"Authorization": "a"})
+    (cache_key,) = mcp_client._discovery_cache
+
+    expires_at, tools = mcp_client._discovery_cache[cache_key]
+    mcp_client._discovery_cache[cache_key] = (time.monotonic() - 1, tools)
+    discover_mcp_tools(server_url, {"Authorization": "a"})
+    assert server.list_tools_calls == 2
+    assert list(mcp_client._discovery_cache) == [cache_key]
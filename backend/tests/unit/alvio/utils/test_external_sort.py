@@ -0,0 +1,43 @@
+import os
+import random
+
+from alvio.utils.external_sort import sorted_difference
+from alvio.utils.external_sort import SortedSpillSet
+
+
+def test_spill_set_yields_distinct_values_in_order(tmp_path: os.PathLike) -> None:
+    rng = random.Random(0)
+    values = [f"doc-{rng.randrange(500)}" for _ in range(2_000)]
+    # values that would break a naive one-value-per-line format
+    values += ["multi\nline", "back\\slash", "back\\nslash", "", "ünïcode", "Zeta"]
+
+    with SortedSpillSet(max_in_memory=64, directory=str(tmp_path)) as spill_set:
+        for start in range(0, len(values), 100):
+            spill_set.add(values[start : start + 100])
+
+        assert spill_set.num_runs > 1
+        assert list(spill_set) == sorted(set(values))
+
+    # temporary runs are removed on exit
+    assert os.listdir(tmp_path) == []
+
+
+def test_spill_set_without_spilling_stays_in_memory(tmp_path: os.PathLike) -> None:
+    with SortedSpillSet(max_in_memory=100, directory=str(tmp_path)) as spill_set:
+        spill_set.add(["b", "a", "c", "a"])
+
+        assert spill_set.num_runs == 0
+        assert list(spill_set) == ["a", "b", "c"]
+        assert os.listdir(tmp_path) == []
+
+
+def test_sorted_difference_matches_set_difference() -> None:
+    rng = random.Random(1)
+    indexed = {f"doc-{rng.randrange(10_000):05d}" for _ in range(3_000)}
+    in_source = {f"doc-{rng.randrange(10_000):05d}" for _ in range(3_000)}
+
+    assert list(sorted_difference(sorted(indexed), sorted(in_source))) == sorted(
+        indexed - in_source
+    )
+    assert list(sorted_difference(["a", "b"], [])) == ["a", "b"]
+    assert list(sorted_difference([], ["a"])) == []
@@ -0,0 +1,152 @@
+import threading
+from typing import Any
+
+import pytest
+import redis
+
+from alvio.redis.redis_pool import TenantRedis
+from shared_configs.contextvars import get_current_tenant_id
+
+
+def _to_bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return str(value).encode("utf-8")
+
+
+class InMemoryRedisServer:
+    """Stands in for the redis server behind `get_redis_client`.
+
+    Clients are real `TenantRedis` instances whose commands run against `data`
+    instead of a connection, so key prefixing (or the lack of it) is exactly what
+    production sends. `commands` records every command as sent."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, Any] = {}
+        self.ttls: dict[bytes, int] = {}
+        self.commands: list[tuple[Any, ...]] = []
+        self._lock = threading.Lock()
+
+    def get_redis_client(
+        self, *, tenant_id: str | None = None
+    ) -> "InMemoryTenantRedis":
+        return InMemoryTenantRedis(tenant_id or get_current_tenant_id(), self)
+
+    @property
+    def keys(self) -> set[str]:
+        return {key.decode("utf-8") for key in self.data}
+
+    def run(self, *args: Any) -> Any:
+        command, *rest = args
+        with self._lock:
+            self.commands.append(args)
+            handler = getattr(self, f"_{str(command).lower()}", None)
+            if handler is None:
+                raise NotImplementedError(f"{command} is not supported")
+            return handler(*rest)
+
+    def _get(self, key: Any) -> bytes | None:
+        return self.data.get(_to_bytes(key))
+
+    def _mget(self, *keys: Any) -> list[bytes | None]:
+        return [self.data.get(_to_bytes(key)) for key in keys]
+
+    def _set(self, key: Any, value: Any, *options: Any) -> bool | None:
+        key = _to_bytes(key)
+        flags = [str(option).upper() for option in options]
+        if "NX" in flags and key in self.data:
+            return None
+        if "XX" in flags and key not in self.data:
+            return None
+        self.data[key] = _to_bytes(value)
+        if "EX" in flags:
+            self.ttls[key] = int(options[flags.index("EX") + 1])
+        return True
+
+    def _del(self, *keys: Any) -> int:
+        deleted = 0
+        for key in map(_to_bytes, keys):
+            deleted += self.data.pop(key, None) is not None
+            self.ttls.pop(key, None)
+        return deleted
+
+    def _exists(self, *keys: Any) -> int:
+        return sum(_to_bytes(key) in self.data for key in keys)
+
+    def _incrby(self, key: Any, amount: Any) -> int:
+        key = _to_bytes(key)
+        value = int(self.data.get(key, b"0")) + int(amount)
+        self.data[key] = str(value).encode("utf-8")
+        return value
+
+    def _expire(self, key: Any, seconds: Any, *options: Any) -> bool:
+        key = _to_bytes(key)
+        if key not in self.data:
+            return False
+        self.ttls[key] = int(seconds)
+        return True
+
+    def _hset(self, key: Any, *pieces: Any) -> int:
+        hash_ = self.data.setdefault(_to_bytes(key), {})
+        added = 0
+        for field, value in zip(pieces[::2], pieces[1::2]):
+            added += _to_bytes(field) not in hash_
+            hash_[_to_bytes(field)] = _to_bytes(value)
+        return added
+
+    def _hget(self, key: Any, field: Any) -> bytes | None:
+        return self.data.get(_to_bytes(key), {}).get(_to_bytes(field))
+
+    def _hgetall(self, key: Any) -> dict[bytes, bytes]:
+        return dict(self.data.get(_to_bytes(key), {}))
+
+    def _hdel(self, key: Any, *fields: Any) -> int:
+        hash_ = self.data.get(_to_bytes(key), {})
+        deleted = sum(hash_.pop(_to_bytes(field), None) is not None for field in fields)
+        if not hash_:
+            self.data.pop(_to_bytes(key), None)
+        return deleted
+
+    def _rename(self, key: Any, new_key: Any) -> bool:
+        if _to_bytes(key) not in self.data:
+            raise redis.ResponseError("no such key")
+        self.data[_to_bytes(new_key)] = self.data.pop(_to_bytes(key))
+        return True
+
+
+class InMemoryTenantRedis(TenantRedis):
+    def __init__(self, tenant_id: str, server: InMemoryRedisServer) -> None:
+        super().__init__(tenant_id)
+        self.server = server
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        return self.server.run(*args)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> Any:
+        # like redis-py's Pipeline, commands queued on it are never prefixed
+        return _InMemoryPipeline(self.server)
+
+
+class _InMemoryPipeline(redis.Redis):
+    def __init__(self, server: InMemoryRedisServer) -> None:
+        super().__init__()
+        self.server = server
+        self.queued: list[tuple[Any, ...]] = []
+
+    def execute_command(self, *args: Any, **options: Any) -> "_InMemoryPipeline":
+        self.queued.append(args)
+        return self
+
+    def execute(self, raise_on_error: bool = True) -> list[Any]:
+        results = [self.server.run(*args) for args in self.queued]
+        self.queued = []
+        return results
+
+
+@pytest.fixture
+def redis_server() -> InMemoryRedisServer:
+    """Patch the `get_redis_client` of the module under test with
+    `redis_server.get_redis_client`."""
+    return InMemoryRedisServer()
@@ -0,0 +1,146 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+import ee.alvio.access.acl_cache as acl_cache
+from ee.alvio.access.acl_cache import get_or_build_acl_for_user
+from ee.alvio.access.acl_cache import invalidate_acl_cache
+from ee.alvio.access.acl_cache import invalidate_acl_cache_for_user
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+from tests.unit.conftest import InMemoryRedisServer
+
+
+class _AclBuilder:
+    def __init__(self) -> None:
+        self.acl = {"user_email:user@example.com", "group:engineering"}
+        self.calls = 0
+
+    def __call__(self) -> set[str]:
+        self.calls += 1
+        return set(self.acl)
+
+
+@pytest.fixture
+def redis_client(
+    monkeypatch: pytest.MonkeyPatch, redis_server: InMemoryRedisServer
+) -> InMemoryRedisServer:
+    monkeypatch.setattr(acl_cache, "get_redis_client", redis_server.get_redis_client)
+    monkeypatch.setattr(acl_cache, "USER_ACL_CACHE_ENABLED", True)
+    return redis_server
+
+
+def _user() -> Any:
+    return SimpleNamespace(id=uuid4())
+
+
+def test_acl_is_built_once_per_user(redis_client: InMemoryRedisServer) -> None:
+    user = _user()
+    build_acl = _AclBuilder()
+
+    first = get_or_build_acl_for_user(user, build_acl)
+    second = get_or_build_acl_for_user(user, build_acl)
+
+    assert first == second == build_acl.acl
+    assert build_acl.calls == 1
+
+    # other users have their own entry
+    get_or_build_acl_for_user(_user(), build_acl)
+    assert build_acl.calls == 2
+
+
+def test_group_change_invalidates_every_user(redis_client: InMemoryRedisServer) -> None:
+    users = [_user(), _user()]
+    build_acl = _AclBuilder()
+    for user in users:
+        get_or_build_acl_for_user(user, build_acl)
+
+    build_acl.acl = build_acl.acl | {"external_group:google_drive_all"}
+    invalidate_acl_cache()
+
+    for user in users:
+        assert "external_group:google_drive_all" in get_or_build_acl_for_user(
+            user, build_acl
+        )
+    assert build_acl.calls == 4
+
+
+def test_user_invalidation_only_affects_that_user(
+    redis_client: InMemoryRedisServer,
+) -> None:
+    changed_user, other_user = _user(), _user()
+    build_acl = _AclBuilder()
+    get_or_build_acl_for_user(changed_user, build_acl)
+    get_or_build_acl_for_user(other_user, build_acl)
+
+    invalidate_acl_cache_for_user(changed_user.id)
+
+    get_or_build_acl_for_user(other_user, build_acl)
+    assert build_acl.calls == 2
+    get_or_build_acl_for_user(changed_user, build_acl)
+    assert build_acl.calls == 3
+
+
+def test_anonymous_users_and_redis_errors_bypass_the_cache(
+    redis_client: InMemoryRedisServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    build_acl = _AclBuilder()
+
+    get_or_build_acl_for_user(None, build_acl)
+    get_or_build_acl_for_user(None, build_acl)
+    assert build_acl.calls == 2
+    assert redis_client.data == {}
+
+    def _unavailable() -> Any:
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(acl_cache, "get_redis_client", _unavailable)
+    assert get_or_build_acl_for_user(_user(), build_acl) == build_acl.acl
+    # invalidation failures are logged, not raised
+    invalidate_acl_cache()
+
+
+@contextmanager
+def _tenant(tenant_id: str) -> Iterator[None]:
+    token = CURRENT_TENANT_ID_CONTEXTVAR.set(tenant_id)
+    try:
+        yield
+    finally:
+        CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+
+def test_entries_and_versions_are_scoped_to_the_tenant(
+    redis_client: InMemoryRedisServer,
+) -> None:
+    user = _user()
+    build_acl = _AclBuilder()
+    with _tenant("tenant_a"):
+        get_or_build_acl_for_user(user, build_acl)
+        invalidate_acl_cache()
+        invalidate_acl_cache_for_user(user.id)
+        get_or_build_acl_for_user(user, build_acl)
+    assert build_acl.calls == 2
+
+    # every key sent to redis, the version keys included, has the tenant prefix
+    sent_keys = [
+        key
+        for command, *args in redis_client.commands
+        for key in (args if command == "MGET" else args[:1])
+    ]
+    assert {command for command, *_ in redis_client.commands} == {
+        "MGET",
+        "GET",
+        "SET",
+        "INCRBY",
+    }
+    assert all(key.startswith("tenant_a:") for key in sent_keys)
+
+    # group changes in another tenant leave this tenant's entries alone
+    with _tenant("tenant_b"):
+        invalidate_acl_cache()
+    with _tenant("tenant_a"):
+        get_or_build_acl_for_user(user, build_acl)
+    assert build_acl.calls == 2
@@ -0,0 +1,274 @@
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import ee.alvio.external_permissions.censoring_cache as censoring_cache
+import ee.alvio.external_permissions.post_query_censoring as post_query_censoring
+import ee.alvio.external_permissions.salesforce.postprocessing as postprocessing
+from ee.alvio.external_permissions.post_query_censoring import (
+    _get_all_censoring_enabled_sources,
+)
+from ee.alvio.external_permissions.post_query_censoring import (
+    _post_query_chunk_censoring,
+)
+from alvio.configs.constants import DocumentSource
+from alvio.context.search.models import InferenceChunk
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+from tests.unit.conftest import InMemoryRedisServer
+
+
+@pytest.fixture
+def redis_client(
+    monkeypatch: pytest.MonkeyPatch, redis_server: InMemoryRedisServer
+) -> InMemoryRedisServer:
+    monkeypatch.setattr(
+        censoring_cache, "get_redis_client", redis_server.get_redis_client
+    )
+    return redis_server
+
+
+def _chunk(doc_id: str, source: DocumentSource) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=doc_id,
+        chunk_id=0,
+        blurb=doc_id,
+        content=doc_id,
+        source_links={0: f"https://example.com/{doc_id}"},
+        section_continuation=False,
+        source_type=source,
+        semantic_identifier=doc_id,
+        title=doc_id,
+        boost=1,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=datetime.now(),
+        image_file_id=None,
+        doc_summary="",
+        chunk_context="",
+    )
+
+
+def _set_censoring_funcs(
+    monkeypatch: pytest.MonkeyPatch, funcs: dict[Any, Any]
+) -> None:
+    monkeypatch.setattr(
+        post_query_censoring,
+        "_get_all_censoring_enabled_sources",
+        lambda: set(funcs),
+    )
+    monkeypatch.setattr(
+        post_query_censoring,
+        "get_source_perm_sync_config",
+        lambda source: SimpleNamespace(
+            censoring_config=SimpleNamespace(chunk_censoring_func=funcs[source])
+        ),
+    )
+
+
+def test_sources_are_censored_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    # each censoring function waits for the other one, so this only finishes if
+    # they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def censor(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        barrier.wait()
+        return [chunk for chunk in chunks if not chunk.document_id.endswith("hidden")]
+
+    _set_censoring_funcs(
+        monkeypatch,
+        {DocumentSource.SALESFORCE: censor, DocumentSource.SLACK: censor},
+    )
+
+    chunks = [
+        _chunk("sf1", DocumentSource.SALESFORCE),
+        _chunk("web1", DocumentSource.WEB),
+        _chunk("slack1-hidden", DocumentSource.SLACK),
+        _chunk("slack2", DocumentSource.SLACK),
+        _chunk("sf2-hidden", DocumentSource.SALESFORCE),
+    ]
+    censored = _post_query_chunk_censoring(
+        chunks, SimpleNamespace(email="user@example.com")  # type: ignore[arg-type]
+    )
+
+    assert [chunk.document_id for chunk in censored] == ["sf1", "web1", "slack2"]
+
+
+def test_failed_and_slow_sources_are_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+
+    def slow(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        release.wait(5)
+        return chunks
+
+    def failing(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        raise RuntimeError("permission check failed")
+
+    def allow_all(
+        chunks: list[InferenceChunk], user_email: str
+    ) -> list[InferenceChunk]:
+        return chunks
+
+    _set_censoring_funcs(
+        monkeypatch,
+        {
+            DocumentSource.SALESFORCE: slow,
+            DocumentSource.SLACK: failing,
+            DocumentSource.JIRA: allow_all,
+        },
+    )
+    monkeypatch.setattr(
+        post_query_censoring, "POST_QUERY_CENSORING_TIMEOUT_SECONDS", 0.1
+    )
+
+    chunks = [
+        _chunk("jira1", DocumentSource.JIRA),
+        _chunk("sf1", DocumentSource.SALESFORCE),
+        _chunk("slack1", DocumentSource.SLACK),
+        _chunk("web1", DocumentSource.WEB),
+        _chunk("jira2", DocumentSource.JIRA),
+    ]
+    try:
+        censored = _post_query_chunk_censoring(
+            chunks, SimpleNamespace(email="user@example.com")  # type: ignore[arg-type]
+        )
+    finally:
+        release.set()
+
+    assert [chunk.document_id for chunk in censored] == ["jira1", "web1", "jira2"]
+
+
+def test_enabled_sources_are_cached(
+    monkeypatch: pytest.MonkeyPatch, redis_client: InMemoryRedisServer
+) -> None:
+    calls = 0
+
+    def get_cc_pairs(db_session: Any) -> list[Any]:
+        nonlocal calls
+        calls += 1
+        return [
+            SimpleNamespace(
+                connector=SimpleNamespace(source=DocumentSource.SALESFORCE)
+            ),
+            SimpleNamespace(connector=SimpleNamespace(source=DocumentSource.WEB)),
+        ]
+
+    class _Session:
+        def __enter__(self) -> None:
+            return None
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    monkeypatch.setattr(
+        post_query_censoring, "get_all_auto_sync_cc_pairs", get_cc_pairs
+    )
+    monkeypatch.setattr(
+        post_query_censoring, "get_session_with_current_tenant", _Session
+    )
+    monkeypatch.setattr(
+        post_query_censoring,
+        "get_all_censoring_enabled_sources",
+        lambda: {DocumentSource.SALESFORCE},
+    )
+
+    assert _get_all_censoring_enabled_sources() == {DocumentSource.SALESFORCE}
+    assert _get_all_censoring_enabled_sources() == {DocumentSource.SALESFORCE}
+    assert calls == 1
+
+    censoring_cache.invalidate_censoring_enabled_sources_cache()
+    assert _get_all_censoring_enabled_sources() == {DocumentSource.SALESFORCE}
+    assert calls == 2
+
+
+def test_salesforce_access_decisions_are_cached(
+    monkeypatch: pytest.MonkeyPatch, redis_client: InMemoryRedisServer
+) -> None:
+    queried: list[list[str]] = []
+
+    def get_access(
+        salesforce_client: Any, user_id: str, record_ids: list[str]
+    ) -> dict[str, bool]:
+        queried.append(sorted(record_ids))
+        return {record_id: record_id != "object2" for record_id in record_ids}
+
+    class _Session:
+        def __enter__(self) -> None:
+            return None
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    monkeypatch.setattr(postprocessing, "get_session_with_current_tenant", _Session)
+    monkeypatch.setattr(
+        postprocessing,
+        "get_any_salesforce_client_for_doc_id",
+        lambda db_session, doc_id: object(),
+    )
+    monkeypatch.setattr(
+        postprocessing,
+        "get_salesforce_user_id_from_email",
+        lambda salesforce_client, user_email: "user_id",
+    )
+    monkeypatch.setattr(postprocessing, "get_objects_access_for_user_id", get_access)
+
+    chunks = [_chunk("doc1", DocumentSource.SALESFORCE)]
+    first = postprocessing._get_objects_access_for_user_email_from_salesforce(
+        {"object1", "object2"}, "user@example.com", chunks
+    )
+    second = postprocessing._get_objects_access_for_user_email_from_salesforce(
+        {"object1", "object2", "object3"}, "user@example.com", chunks
+    )
+
+    assert first == {"object1": True, "object2": False}
+    assert second == {"object1": True, "object2": False, "object3": True}
+    # only the object without a cached decision is sent to salesforce
+    assert queried == [["object1", "object2"], ["object3"]]
+
+    # everything is cached, salesforce isn't queried at all
+    postprocessing._get_objects_access_for_user_email_from_salesforce(
+        {"object1", "object3"}, "user@example.com", chunks
+    )
+    assert len(queried) == 2
+
+
+def test_access_decisions_are_scoped_to_the_tenant(
+    redis_client: InMemoryRedisServer,
+) -> None:
+    token = CURRENT_TENANT_ID_CONTEXTVAR.set("tenant_a")
+    try:
+        censoring_cache.cache_access_decisions(
+            DocumentSource.SALESFORCE, "user@example.com", {"object1": True}
+        )
+        assert censoring_cache.get_cached_access_decisions(
+            DocumentSource.SALESFORCE, "user@example.com", ["object1"]
+        ) == {"object1": True}
+    finally:
+        CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+    # the keys of both the pipelined writes and the mget reads are prefixed
+    assert [command for command, *_ in redis_client.commands] == ["SET", "MGET"]
+    assert all(
+        key.startswith("tenant_a:censoring_access:")
+        for _, key, *_ in redis_client.commands
+    )
+    assert redis_client.keys == {
+        "tenant_a:censoring_access:salesforce:user@example.com:object1"
+    }
+
+    # the same user email in another tenant has no cached decisions
+    token = CURRENT_TENANT_ID_CONTEXTVAR.set("tenant_b")
+    try:
+        assert (
+            censoring_cache.get_cached_access_decisions(
+                DocumentSource.SALESFORCE, "user@example.com", ["object1"]
+            )
+            == {}
+        )
+    finally:
+        CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
@@ -0,0 +1,63 @@
+from datetime import datetime
+from datetime import timezone
+from uuid import uuid4
+
+from ee.alvio.server.query_history.api import snapshot_from_loaded_chat_session
+from alvio.configs.constants import MessageType
+from alvio.db.models import ChatMessage
+from alvio.db.models import ChatMessageFeedback
+from alvio.db.models import ChatSession
+
+
+def _message(
+    message_id: int,
+    message_type: MessageType,
+    parent_message: int | None,
+    latest_child_message: int | None,
+) -> ChatMessage:
+    return ChatMessage(
+        id=message_id,
+        message=f"message {message_id}",
+        message_type=message_type,
+        parent_message=parent_message,
+        latest_child_message=latest_child_message,
+        time_sent=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        token_count=0,
+    )
+
+
+def test_snapshot_from_loaded_chat_session_follows_the_latest_branch() -> None:
+    root = _message(1, MessageType.SYSTEM, None, 2)
+    question = _message(2, MessageType.USER, 1, 4)
+    # the first answer was regenerated, only the latest one is part of the chain
+    old_answer = _message(3, MessageType.ASSISTANT, 2, None)
+    answer = _message(4, MessageType.ASSISTANT, 2, None)
+    answer.chat_message_feedbacks = [
+        ChatMessageFeedback(is_positive=True, feedback_text="great")
+    ]
+    chat_session = ChatSession(
+        id=uuid4(),
+        description="session",
+        alviobot_flow=False,
+        persona_id=None,
+        time_created=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        # bulk loaded messages come in no particular order
+        messages=[answer, old_answer, root, question],
+    )
+
+    snapshot = snapshot_from_loaded_chat_session(chat_session)
+
+    assert snapshot is not None
+    assert [message.id for message in snapshot.messages] == [2, 4]
+    assert snapshot.messages[1].feedback_text == "great"
+
+
+def test_snapshot_from_loaded_chat_session_without_messages() -> None:
+    chat_session = ChatSession(
+        id=uuid4(),
+        alviobot_flow=False,
+        time_created=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        messages=[],
+    )
+
+    assert snapshot_from_loaded_chat_session(chat_session) is None
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from typing import IO
+
+from alvio.configs.constants import DocumentSource
+from alvio.configs.constants import FileOrigin
+from alvio.connectors.models import BasicExpertInfo
+from alvio.connectors.models import Document
+from alvio.connectors.models import ImageSection
+from alvio.connectors.models import TextSection
+from alvio.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+
+
+class _InMemoryFileStore:
+    def __init__(self) -> None:
+        self.files: dict[str, tuple[bytes, str]] = {}
+
+    def has_file(self, file_id: str, file_origin: FileOrigin, file_type: str) -> bool:
+        return file_id in self.files and self.files[file_id][1] == file_type
+
+    def save_file(self, content: IO, file_type: str, file_id: str, **_: object) -> str:
+        self.files[file_id] = (content.read(), file_type)
+        return file_id
+
+    def read_file(self, file_id: str) -> IO[bytes]:
+        return BytesIO(self.files[file_id][0])
+
+    def delete_file(self, file_id: str) -> None:
+        del self.files[file_id]
+
+    def change_file_id(self, old_file_id: str, new_file_id: str) -> None:
+        self.files[new_file_id] = self.files.pop(old_file_id)
+
+
+def _documents() -> list[Document]:
+    return [
+        Document(
+            id=f"doc-{ind}",
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=f"Page {ind} ✓",
+            sections=[
+                TextSection(text="some text\nwith lines", link="https://a.b/c"),
+                ImageSection(image_file_id="img-1"),
+            ],
+            metadata={"labels": ["x", "y"], "space": "ENG"},
+            doc_updated_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            primary_owners=[BasicExpertInfo(email="a@b.c")],
+        )
+        for ind in range(3)
+    ]
+
+
+def test_batch_round_trip_and_legacy_batches() -> None:
+    file_store = _InMemoryFileStore()
+    storage = FileStoreDocumentBatchStorage(
+        cc_pair_id=1, index_attempt_id=2, file_store=file_store  # type: ignore
+    )
+    documents = _documents()
+
+    storage.store_batch(0, documents)
+    assert list(file_store.files) == ["iab/1/2/0.jsonl.gz"]
+    assert storage.get_batch(0) == documents
+
+    # batches written by older versions are plain (indented) json arrays
+    file_store.files["iab/1/2/1.json"] = (
+        json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2).encode(
+            "utf-8"
+        ),
+        "application/json",
+    )
+    assert storage.get_batch(1) == documents
+
+    new_storage = FileStoreDocumentBatchStorage(
+        cc_pair_id=1, index_attempt_id=3, file_store=file_store  # type: ignore
+    )
+    new_storage.update_old_batches_to_new_index_attempt(
+        ["iab/1/2/0.jsonl.gz", "iab/1/2/1.json"]
+    )
+    assert sorted(file_store.files) == ["iab/1/3/0.jsonl.gz", "iab/1/3/1.json"]
+    assert new_storage.get_batch(1) == documents
+
+    new_storage.delete_batch_by_num(0)
+    new_storage.delete_batch_by_num(1)
+    assert file_store.files == {}
+    assert new_storage.get_batch(0) is None
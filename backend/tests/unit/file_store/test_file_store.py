@@ -317,3 +317,35 @@ class TestFileStoreInterface:
         # File store should always be S3BackedFileStore regardless of environment
         file_store = get_default_file_store()
         assert isinstance(file_store, S3BackedFileStore)
+
+
+def test_upsert_filerecord_bumps_updated_at_on_identical_overwrite() -> None:
+    """The local file cache keys on updated_at, it has to change on every save even
+    when the record fields are the same (e.g. checkpoints rewritten in place)"""
+    from alvio.db.file_record import upsert_filerecord
+    from alvio.db.models import FileRecord as FileRecordModel
+
+    existing = FileRecordModel(
+        file_id="checkpoint_1.json",
+        display_name="checkpoint_1.json",
+        file_origin=FileOrigin.OTHER,
+        file_type="application/json",
+        bucket_name="bucket",
+        object_key="tenant/checkpoint_1.json",
+        updated_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+    db_session = MagicMock()
+    db_session.query.return_value.filter_by.return_value.first.return_value = existing
+
+    upsert_filerecord(
+        file_id=existing.file_id,
+        display_name=existing.display_name,
+        file_origin=existing.file_origin,
+        file_type=existing.file_type,
+        bucket_name=existing.bucket_name,
+        object_key=existing.object_key,
+        db_session=db_session,
+    )
+
+    assert not isinstance(existing.updated_at, datetime.datetime)
+    assert str(existing.updated_at) == str(func.now())
@@ -0,0 +1,130 @@
+import io
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from alvio.file_store.local_file_cache import LocalFileCache
+from alvio.file_store.s3_streaming import open_iterator
+from alvio.file_store.s3_streaming import open_s3_object
+from alvio.file_store.s3_streaming import upload_fileobj_to_s3
+
+
+class _FakeS3Client:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.get_ranges: list[str] = []
+        self.multipart_parts: dict[str, list[bytes]] = {}
+        self.put_calls = 0
+
+    def head_object(self, Bucket: str, Key: str) -> dict[str, Any]:
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket: str, Key: str, Range: str) -> dict[str, Any]:
+        self.get_ranges.append(Range)
+        start = int(Range.removeprefix("bytes=").rstrip("-"))
+        return {"Body": io.BytesIO(self.objects[Key][start:])}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **_: Any) -> None:
+        self.put_calls += 1
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **_: Any) -> dict:
+        self.multipart_parts[Key] = []
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Key: str, PartNumber: int, Body: bytes, **_: Any) -> dict:
+        self.multipart_parts[Key].append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(
+        self, Key: str, MultipartUpload: dict, **_: Any
+    ) -> None:
+        assert [part["PartNumber"] for part in MultipartUpload["Parts"]] == list(
+            range(1, len(self.multipart_parts[Key]) + 1)
+        )
+        self.objects[Key] = b"".join(self.multipart_parts[Key])
+
+
+def test_ranged_reader_streams_and_seeks() -> None:
+    s3_client = _FakeS3Client()
+    s3_client.objects["key"] = bytes(range(256)) * 100
+
+    with open_s3_object(s3_client, "bucket", "key", buffer_size=1024) as reader:  # type: ignore
+        assert reader.read(10) == bytes(range(10))
+        # sequential reads reuse the open body
+        reader.read(5000)
+        assert s3_client.get_ranges == ["bytes=0-"]
+
+        reader.seek(-4, io.SEEK_END)
+        assert reader.read() == bytes(range(252, 256))
+        assert s3_client.get_ranges[-1] == f"bytes={256 * 100 - 4}-"
+
+        reader.seek(0)
+        assert reader.read() == s3_client.objects["key"]
+
+
+def test_upload_uses_multipart_only_for_large_content() -> None:
+    s3_client = _FakeS3Client()
+
+    upload_fileobj_to_s3(
+        s3_client, "bucket", "small", io.BytesIO(b"abc"), "text/plain", part_size=8  # type: ignore
+    )
+    assert s3_client.put_calls == 1
+    assert s3_client.objects["small"] == b"abc"
+
+    data = os.urandom(100)
+    upload_fileobj_to_s3(
+        s3_client, "bucket", "large", io.BytesIO(data), "text/plain", part_size=8  # type: ignore
+    )
+    assert s3_client.put_calls == 1
+    assert len(s3_client.multipart_parts["large"]) == 13
+    assert s3_client.objects["large"] == data
+
+
+def test_upload_pulls_generated_content_part_by_part() -> None:
+    s3_client = _FakeS3Client()
+    produced: list[int] = []
+
+    def chunks() -> Iterator[bytes]:
+        for i in range(10):
+            produced.append(i)
+            yield bytes([i]) * 5
+
+    content = open_iterator(chunks(), buffer_size=4)
+    assert not content.seekable()
+    assert content.read(7) == b"\x00" * 5 + b"\x01" * 2
+    # only the chunks needed for the read were generated
+    assert produced == [0, 1]
+
+    upload_fileobj_to_s3(
+        s3_client, "bucket", "generated", content, "text/csv", part_size=8  # type: ignore
+    )
+    assert (
+        s3_client.objects["generated"]
+        == b"".join(bytes([i]) * 5 for i in range(10))[7:]
+    )
+    assert produced == list(range(10))
+
+
+def test_local_file_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = LocalFileCache(str(tmp_path), max_bytes=350, max_object_bytes=150)
+
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    cache.put("too-big", b"x" * 200)
+    assert cache.get("too-big") is None
+
+    # make "a" the most recently used entry
+    past = time.time() - 60
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (past, past))
+    assert cache.get("a") == b"a" * 100
+
+    cache.put("c", b"c" * 100)
+    cache.put("d", b"d" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 100
+    assert cache.get("d") == b"d" * 100
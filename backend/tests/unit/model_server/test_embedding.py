@@ -5,11 +5,17 @@ from typing import List
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
 from model_server.encoders import process_embed_request
+from shared_configs.embedding_transport import build_accept_header
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.embedding_transport import parse_accept_header
+from shared_configs.enums import EmbeddingTransportFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import EmbedRequest
 
@@ -103,3 +109,35 @@ async def test_concurrent_embeddings() -> None:
         # However, the developer may still introduce unnecessary blocking above the mock and this test will
         # still pass as long as it's less than (7 - 5) / 5 seconds
         assert end_time - start_time < 7
+
+
+def test_binary_embedding_round_trip() -> None:
+    vectors = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+
+    payload = encode_embeddings(vectors, EmbeddingTransportFormat.FLOAT32)
+    decoded = decode_embeddings(payload)
+    assert decoded.shape == (2, 3)
+    assert np.array_equal(decoded, vectors)
+
+    payload = encode_embeddings(vectors, EmbeddingTransportFormat.FLOAT16)
+    decoded = decode_embeddings(payload)
+    assert decoded.dtype == np.float32
+    assert np.allclose(decoded, vectors, atol=1e-3)
+
+
+def test_embedding_transport_negotiation() -> None:
+    # no header / plain JSON keeps the legacy format
+    assert parse_accept_header(None) == EmbeddingTransportFormat.JSON
+    assert parse_accept_header("application/json") == EmbeddingTransportFormat.JSON
+
+    for transport_format in EmbeddingTransportFormat:
+        assert (
+            parse_accept_header(build_accept_header(transport_format))
+            == transport_format
+        )
+
+    # unknown dtypes fall back to JSON rather than erroring
+    assert (
+        parse_accept_header("application/x-alvio-embeddings;dtype=int8")
+        == EmbeddingTransportFormat.JSON
+    )
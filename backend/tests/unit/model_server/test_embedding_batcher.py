@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from model_server.embedding_batcher import EmbeddingBatcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_requests() -> None:
+    calls: list[list[str]] = []
+
+    def encode(texts: list[str]) -> np.ndarray:
+        calls.append(texts)
+        # embedding of a text is just its length, so results are easy to check
+        return np.array([[float(len(text))] for text in texts])
+
+    batcher = EmbeddingBatcher(
+        model_name="fake-model",
+        encode_fn=encode,
+        max_batch_size=64,
+        max_wait_seconds=0.05,
+    )
+
+    requests = [["a", "bbb"], ["cc"], ["dddd", "e", "ffffff"]]
+    results = await asyncio.gather(*(batcher.embed(texts) for texts in requests))
+    await batcher.aclose()
+
+    # one forward pass over the texts of all requests
+    assert len(calls) == 1
+    assert calls[0] == ["a", "bbb", "cc", "dddd", "e", "ffffff"]
+
+    # results are scattered back to the right request in the original order
+    for texts, result in zip(requests, results):
+        assert result.tolist() == [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_batcher_respects_max_batch_size_and_errors() -> None:
+    calls: list[list[str]] = []
+
+    def encode(texts: list[str]) -> np.ndarray:
+        calls.append(texts)
+        if "boom" in texts:
+            raise RuntimeError("encode failed")
+        return np.zeros((len(texts), 2))
+
+    batcher = EmbeddingBatcher(
+        model_name="fake-model",
+        encode_fn=encode,
+        max_batch_size=2,
+        max_wait_seconds=0.05,
+    )
+
+    results = await asyncio.gather(
+        batcher.embed(["a", "b"]),
+        batcher.embed(["c"]),
+        batcher.embed(["boom"]),
+        return_exceptions=True,
+    )
+    await batcher.aclose()
+
+    assert all(len(call) <= 2 for call in calls)
+    assert isinstance(results[0], np.ndarray) and results[0].shape == (2, 2)
+    assert isinstance(results[2], RuntimeError)